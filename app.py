@@ -1,22 +1,15 @@
+import importlib
+
 import streamlit as st
 from streamlit_option_menu import option_menu
 from core.config import aplicar_estilo, COR_PRIMARIA
 from core.sentry import init_sentry
-from core.cache import clear_cache
 
 # Inicializa Sentry o mais cedo possível (antes de qualquer view)
 init_sentry()
-from views.components.header_context import render_dashboard_head
-
-# Import dos Passos Modularizados
-from views.steps.passo_0 import show_passo_0
-from views.steps.passo_1 import show_passo_1
-from views.steps.passo_2 import show_passo_2
-from views.steps.passo_3 import show_passo_3
-from views.steps.passo_4 import show_passo_4
-from views.steps.passo_5 import show_passo_5
-from views.steps.passo_6 import show_passo_6
-from views.steps.passo_7 import show_passo_7
+
+# Menus e passos são importados só quando exibidos: a tela de login não espera
+# openai, pandas, plotly, fpdf2 nem gspread (benchmarks/bench_importacao.py)
 
 # --- 1. CONFIGURAÇÃO GLOBAL ---
 st.set_page_config(
@@ -24,23 +17,27 @@ st.set_page_config(
     layout="wide",
     page_icon="logoOPB.png"
 )
-aplicar_estilo()
-
-# --- 2. LOGIN GATE ---
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
+if 'tema_claro' not in st.session_state:
+    st.session_state.tema_claro = st.query_params.get("tema") == "claro"
+# Folha pré-montada por tema; o modo claro só vale depois do login
+aplicar_estilo(tema_claro=st.session_state.logged_in and st.session_state.tema_claro)
 
+# --- 2. LOGIN GATE ---
 if not st.session_state.logged_in:
     from views.login import show_login
     show_login()
+    from core.aquecimento import aquecer
+    aquecer()     # importa o resto em segundo plano enquanto o analista digita a senha
     st.stop()
 
 # Carrega configurações do analista uma vez por sessão (após login)
 if "config_usuario" not in st.session_state:
     _email = st.session_state.get("email_usuario", "")
     if _email:
-        from services.db_service import DBService as _DBService
-        st.session_state["config_usuario"] = _DBService().get_config_usuario(_email)
+        from services.db_service import obter_db
+        st.session_state["config_usuario"] = obter_db().get_config_usuario(_email)
     else:
         st.session_state["config_usuario"] = {
             "nome_empresa": "Paulo Bio Imóveis",
@@ -52,11 +49,24 @@ if "config_usuario" not in st.session_state:
 if 'step' not in st.session_state: st.session_state.step = 0
 if 'dados' not in st.session_state:
     st.session_state.dados = {"checklist_docs": {}}
-if 'tema_claro' not in st.session_state:
-    st.session_state.tema_claro = st.query_params.get("tema") == "claro"
 if 'usuario_logado' not in st.session_state: st.session_state.usuario_logado = "analista"
 if 'email_usuario' not in st.session_state: st.session_state.email_usuario = ""
 
+# Análise em andamento salva (timeout, reinício do servidor, outro navegador)
+from views.components.rascunho import autosalvar, restaurar_rascunho
+restaurar_rascunho()
+
+
+def _limpar_analise():
+    st.session_state.dados = {"checklist_docs": {}}
+    st.session_state.step = 0
+    st.session_state.pop("analise_id", None)   # nova análise: tarefas de IA anteriores ficam para trás
+    st.session_state.pop("_docs_antecipados", None)
+    st.session_state.pop("_prefetch_enviados", None)
+    st.session_state.pop("_arquivos_passos", None)
+    st.session_state.pop("_impressoes_passos", None)
+    st.session_state.pop("_digests_rascunho", None)
+
 
 
 # --- 3. MENU LATERAL ---
@@ -91,103 +101,7 @@ with st.sidebar:
         st.session_state.tema_claro = tema_novo
         st.query_params["tema"] = "claro" if tema_novo else "escuro"
         st.rerun()
-    
-    # Aplica CSS do tema com !important para sobrescrever config.py
-    if tema_claro:
-        st.markdown("""
-        <style>
-            /* Modo Claro - Alta Especificidade Total */
-            
-            /* Fundo principal e sidebar */
-            section.main, div.block-container, div.stApp {
-                background-color: #F5F6FA !important;
-            }
-            section[data-testid="stSidebar"], div[data-testid="stSidebarContent"] {
-                background-color: #FFFFFF !important;
-            }
-            
-            /* Forçar todos os textos a ficarem Pretos */
-            h1, h2, h3, h4, h5, h6, 
-            .stMarkdown h1, .stMarkdown h2, .stMarkdown h3, .stMarkdown h4, .stMarkdown h5, .stMarkdown h6,
-            p, span, label, div, small, li, blockquote {
-                color: #000000 !important;
-                -webkit-text-fill-color: #000000 !important;
-            }
-            
-            /* Exceto botões que devem conter sua cor de texto nativa (geralmente branco ou preto dependendo do fundo) */
-            .stButton>button div, .stButton>button span, .stButton>button p {
-                color: #000000 !important;
-                -webkit-text-fill-color: #000000 !important;
-            }
-
-            /* Inputs, Textareas e SelectBoxes (Fundo CINZA e Borda LARANJA) */
-            div[data-baseweb="input"] > div, 
-            div[data-baseweb="textarea"] > div,
-            div[data-baseweb="select"] > div,
-            div[data-baseweb="base-input"] > div {
-                background-color: #E2E8F0 !important; /* Cinza claro estilo campo */
-                border: 1px solid #F47920 !important; /* Borda laranja */
-                border-radius: 4px !important;
-            }
-            
-            /* O texto digitado dentro do input */
-            div[data-baseweb="input"] input, 
-            div[data-baseweb="textarea"] textarea,
-            div[data-baseweb="base-input"] input {
-                color: #000000 !important;
-                -webkit-text-fill-color: #000000 !important;
-                background-color: transparent !important;
-            }
-
-            /* File Uploader (Dropzone) - CINZA e BORDA LARANJA */
-            [data-testid="stFileUploadDropzone"] {
-                background-color: #D1D5DB !important; /* Cinza um pouco mais forte para destaque */
-                border: 2px dashed #F47920 !important;
-                border-radius: 4px !important;
-            }
-            [data-testid="stFileUploadDropzone"] div, 
-            [data-testid="stFileUploadDropzone"] span,
-            [data-testid="stFileUploadDropzone"] p {
-                color: #000000 !important;
-                -webkit-text-fill-color: #000000 !important;
-            }
-            
-            /* Ajuste para o widget de upload (texto de arquivos selecionados) */
-            div[data-testid="stFileUploaderFileData"] span {
-                color: #000000 !important;
-            }
-            
-            /* Linhas Divisórias e Filetes Verticais */
-            hr { border-color: #F47920 !important; }
-            div[data-testid="stVerticalBlockBorderWrapper"] > div { 
-                background-color: #FFFFFF !important; 
-                border: 1px solid #F47920 !important; 
-            }
-            
-            /* Stepper e Barras */
-            .ctx-bar { 
-                background-color: #FFFFFF !important; 
-                border-bottom: 2px solid #F47920 !important; 
-            }
-            .ctx-val {
-                color: #000000 !important;
-            }
-            .step-circle.active { 
-                background-color: #FFFFFF !important; 
-                color: #F47920 !important;
-                border: 2px solid #F47920 !important;
-            }
-            .step-label.active {
-                color: #000000 !important;
-                font-weight: 700 !important;
-            }
-            .step-label.pending {
-                color: #666666 !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
 
-    
     st.divider()
 
     nome_usuario = st.session_state.get("usuario_logado", "")
@@ -223,8 +137,7 @@ with st.sidebar:
     with col_rst:
         st.markdown('<div class="sidebar-action-btn">', unsafe_allow_html=True)
         if st.button("⟳ Reiniciar", use_container_width=True):
-            st.session_state.dados = {"checklist_docs": {}}
-            st.session_state.step = 0
+            _limpar_analise()     # o autosave apaga o rascunho no próximo rerun
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
     with col_sair:
@@ -233,6 +146,9 @@ with st.sidebar:
             st.session_state.logged_in = False
             st.session_state.usuario_logado = ""
             st.session_state.email_usuario = ""
+            # O rascunho fica salvo para o próximo login; a sessão não carrega a análise adiante
+            _limpar_analise()
+            st.session_state.pop("_autosave", None)
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -243,17 +159,23 @@ with st.sidebar:
         use_container_width=True,
         help="Limpar cache de análises para reprocessar os PDFs",
     ):
+        from core.cache import clear_cache
         clear_cache()
         st.toast("Cache limpo com sucesso.")
     st.markdown('</div>', unsafe_allow_html=True)
 
-from views.components.checklist import render_document_checklist
-
 # --- 4. ROTEAMENTO DE CONTEÚDO ---
 if menu == "Nova Análise":
+    from views.components.checklist import render_document_checklist
+    from views.components.prefetch import agendar_prefetch
+    from views.components.dependencias import render_dependencias
+
     with st.sidebar:
         render_document_checklist()
 
+    # Passos com PDFs adiantados e empresa/CNPJ conhecidos começam em segundo plano
+    agendar_prefetch()
+
     # ── STEPPER VISUAL ───────────────────────────────────────────
     PASSOS = [
         ("0", "Contrato"),
@@ -305,22 +227,19 @@ if menu == "Nova Análise":
 
     # ── CONTEXT HEADER (Passo 2 em diante) ───────────────────────
     if step_atual >= 2:
+        from views.components.header_context import render_dashboard_head
         render_dashboard_head()
 
     # ── ROTEADOR DE PASSOS ────────────────────────────────────────
-    roteador = {
-        0: show_passo_0,
-        1: show_passo_1,
-        2: show_passo_2,
-        3: show_passo_3,
-        4: show_passo_4,
-        5: show_passo_5,
-        6: show_passo_6,
-        7: show_passo_7,
-    }
+    # Módulo de cada passo, importado só quando o passo é exibido
+    roteador = {i: f"views.steps.passo_{i}" for i in range(len(PASSOS))}
+
+    # Campos corrigidos depois da análise: oferece reprocessar só os passos afetados
+    render_dependencias()
 
     if step_atual in roteador:
-        roteador[step_atual]()
+        passo = importlib.import_module(roteador[step_atual])
+        getattr(passo, f"show_passo_{step_atual}")()
     else:
         st.error("Erro no roteamento: Passo não encontrado.")
 
@@ -338,4 +257,7 @@ elif menu == "Auditoria":
 
 elif menu == "Configurações":
     from views.configuracoes import show_configuracoes
-    show_configuracoes()
\ No newline at end of file
+    show_configuracoes()
+
+# Grava só o que mudou no rascunho neste rerun (em segundo plano)
+autosalvar()
@@ -0,0 +1,75 @@
+"""
+benchmarks/bench_corpo.py
+Pico de memória para montar e enviar o corpo de uma requisição com PDFs:
+montagem anterior (f.read + base64 + json.dumps) contra CorpoJSON em blocos
+(core/corpo.py). Mede com tracemalloc, além dos PDFs já em memória (como o
+UploadedFile do Streamlit).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_corpo
+    python -m benchmarks.bench_corpo --mb 20 --arquivos 3
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import time
+import tracemalloc
+
+from core.corpo import AnexoPDF, CorpoJSON
+
+
+# ─── Implementação anterior (referência) ─────────────────────────────────────
+
+def corpo_legado(files: list[io.BytesIO]) -> int:
+    partes = []
+    for f in files:
+        f.seek(0)
+        content = f.read()
+        b64 = base64.standard_b64encode(content).decode("utf-8")
+        partes.append({"type": "file", "file": {"filename": f.name, "file_data": f"data:application/pdf;base64,{b64}"}})
+    corpo = json.dumps({"model": "m", "messages": [{"role": "user", "content": partes}]}).encode("utf-8")
+    return len(corpo)
+
+
+def corpo_blocos(files: list[io.BytesIO]) -> int:
+    partes = [{"type": "file", "file": {"filename": f.name, "file_data": AnexoPDF(f)}} for f in files]
+    corpo = CorpoJSON({"model": "m", "messages": [{"role": "user", "content": partes}]})
+    enviados = sum(len(pedaco) for pedaco in corpo)   # o que o cliente HTTP consome
+    assert enviados == corpo.tamanho
+    return enviados
+
+
+def _pdf(mb: float, i: int) -> io.BytesIO:
+    f = io.BytesIO(b"%PDF-1.4\n" + os.urandom(int(mb * 1024 * 1024)))
+    f.name = f"doc_{i}.pdf"
+    return f
+
+
+def _medir(nome: str, fn, *args) -> None:
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    fn(*args)
+    decorrido = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {nome:<30} pico {pico / 1e6:>8.1f} MB   {decorrido * 1e3:>8.1f} ms")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--mb", type=float, default=20, help="tamanho de cada PDF (MB)")
+    p.add_argument("--arquivos", type=int, default=2, help="PDFs por requisição")
+    a = p.parse_args()
+
+    files = [_pdf(a.mb, i) for i in range(a.arquivos)]
+    assert corpo_legado(files) == corpo_blocos(files)
+    print(f"{a.arquivos} PDF(s) de {a.mb:g} MB por requisição (PDFs já em memória)")
+    _medir("json.dumps + base64 (legado)", corpo_legado, files)
+    _medir("CorpoJSON em blocos", corpo_blocos, files)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+benchmarks/bench_estilo.py
+Bytes enviados ao navegador por execução do app.py: a primeira execução da
+sessão e os reruns seguintes, em cada tema, com destaque para o CSS.
+
+Reproduz o cache de mensagens do Streamlit: o navegador guarda as mensagens
+de elemento marcadas como cacheáveis (>= global.minCachedMessageSize) e, no
+rerun, informa os hashes que já tem; o servidor manda só a referência
+(ref_hash) de um elemento idêntico. O AppTest não tem navegador, então aqui
+o conjunto de hashes do "navegador" é mantido entre as execuções.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_estilo
+    python -m benchmarks.bench_estilo --reruns 10
+"""
+
+import argparse
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+@contextmanager
+def _navegador(hashes: set[str], medicao: dict):
+    """Intercepta o envio das mensagens: `hashes` faz o papel do cache do navegador."""
+    original = ScriptRunContext.enqueue
+
+    def enqueue(self, msg):
+        self.cached_message_hashes = frozenset(hashes)
+        enviar = self._enqueue
+
+        def contar(enviada):
+            tamanho = enviada.ByteSize()
+            medicao["total"] += tamanho
+            corpo = msg.delta.new_element.markdown.body if msg.HasField("delta") else ""
+            if "<style" in corpo:
+                medicao["css"] += tamanho
+            if enviada.metadata.cacheable:
+                hashes.add(enviada.hash)
+            enviar(enviada)
+
+        self._enqueue = contar
+        try:
+            original(self, msg)
+        finally:
+            self._enqueue = enviar
+
+    ScriptRunContext.enqueue = enqueue
+    try:
+        yield
+    finally:
+        ScriptRunContext.enqueue = original
+
+
+def _sessao(tema_claro: bool, reruns: int) -> tuple[dict, dict]:
+    """(primeira execução, média dos reruns), cada um com bytes totais e de CSS."""
+    app = AppTest.from_file(str(RAIZ / "app.py"), default_timeout=120)
+    app.secrets["RASCUNHOS_BACKEND"] = "local"
+    app.session_state["logged_in"] = True
+    app.session_state["usuario_logado"] = "benchmark"
+    app.session_state["tema_claro"] = tema_claro
+
+    hashes: set[str] = set()
+    primeira = {"total": 0, "css": 0}
+    seguintes = {"total": 0, "css": 0}
+    with _navegador(hashes, primeira):
+        app.run()
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    with _navegador(hashes, seguintes):
+        for _ in range(reruns):
+            app.run()
+    return primeira, {k: v / reruns for k, v in seguintes.items()}
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--reruns", type=int, default=5)
+    a = p.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="bench-estilo-"))
+    os.environ.setdefault("AQUECER_IMPORTS", "0")
+    for var, nome in (("RASCUNHOS_DB", "rascunhos.sqlite3"), ("TAREFAS_DB", "tarefas.sqlite3"),
+                      ("ESTADO_DB", "estado.sqlite3"), ("BLOBS_DIR", "blobs")):
+        os.environ.setdefault(var, str(tmp / nome))
+
+    print("Bytes enviados por execução (Nova Análise, passo 0)")
+    print(f"  {'':<14} {'1ª execução':>14} {'(CSS)':>10} {'por rerun':>12} {'(CSS)':>10}")
+    for rotulo, claro in (("tema escuro", False), ("tema claro", True)):
+        primeira, rerun = _sessao(claro, a.reruns)
+        print(f"  {rotulo:<14} {primeira['total']:>14,.0f} {primeira['css']:>10,.0f}"
+              f" {rerun['total']:>12,.0f} {rerun['css']:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
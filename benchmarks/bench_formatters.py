@@ -0,0 +1,94 @@
+"""
+benchmarks/bench_formatters.py
+Compara limpa_pdf / limpa_markdown atuais (regex pré-compiladas, passadas
+condicionais e memo LRU) com as versões anteriores em pareceres longos.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_formatters
+"""
+
+import re
+import timeit
+
+from utils.formatters import limpa_markdown, limpa_pdf
+
+
+# ─── Implementações anteriores (referência) ──────────────────────────────────
+
+def limpa_pdf_legado(texto):
+    texto_str = str(texto)
+    replacements = {
+        '“': '"', '”': '"', '‘': "'", '’': "'", '–': '-', '—': '-',
+        '…': '...', '•': '-', '​': '', '\xa0': ' '
+    }
+    for k, v in replacements.items():
+        texto_str = texto_str.replace(k, v)
+    return texto_str.encode('latin-1', 'ignore').decode('latin-1').strip()
+
+
+def limpa_markdown_legado(texto):
+    texto_str = str(texto)
+    texto_str = re.sub(r'\*\*(.*?)\*\*', r'\1', texto_str)
+    texto_str = re.sub(r'__(.*?)__', r'\1', texto_str)
+    texto_str = re.sub(r'^#+\s*', '', texto_str, flags=re.MULTILINE)
+    texto_str = re.sub(r'^\|?[\s\-:]+\|[\s\-:|]+$', '', texto_str, flags=re.MULTILINE)
+    texto_str = texto_str.replace('|', '  ')
+    texto_str = re.sub(r'\n{3,}', '\n\n', texto_str)
+    return texto_str.strip()
+
+
+# ─── Massa de teste ──────────────────────────────────────────────────────────
+
+_PARAGRAFO = (
+    "## **Parecer Técnico**\n"
+    "Trata-se de uma empresa com 14 anos de existência — fundada em 15/03/2010 — "
+    "com capital social de R$ 500.000,00. A empresa apresenta “risco baixo” no SERASA "
+    "(Score 850)… O sócio possui patrimônio declarado de __R$ 1.500.000,00__ • "
+    "composto por aplicações e imóveis.\xa0Não há objeção 👍.\n\n\n"
+    "| Indicador | 2024 | 2025 |\n|---|---|---|\n| Receita | R$ 1,2 mi | R$ 1,8 mi |\n\n"
+)
+PARECER_LONGO = _PARAGRAFO * 200           # ~100 KB, similar a um parecer extenso
+CELULAS = [" Indicador", " Valor", "Score Serasa:", "R$ 15.000,00", "Não anexado"] * 400
+
+
+def _verificar_equivalencia() -> None:
+    assert limpa_pdf(PARECER_LONGO) == limpa_pdf_legado(PARECER_LONGO)
+    assert limpa_markdown(PARECER_LONGO) == limpa_markdown_legado(PARECER_LONGO)
+    for c in CELULAS[:5]:
+        assert limpa_pdf(c) == limpa_pdf_legado(c)
+        assert limpa_markdown(c) == limpa_markdown_legado(c)
+
+
+def _medir(nome: str, fn, numero: int) -> float:
+    melhor = min(timeit.repeat(fn, number=numero, repeat=5)) / numero
+    print(f"  {nome:<38} {melhor * 1e6:>10.1f} µs/op")
+    return melhor
+
+
+def main() -> None:
+    _verificar_equivalencia()
+    print(f"Parecer longo: {len(PARECER_LONGO):,} caracteres")
+
+    print("limpa_pdf (parecer longo)")
+    a = _medir("legado", lambda: limpa_pdf_legado(PARECER_LONGO), 50)
+    b = _medir("atual", lambda: limpa_pdf(PARECER_LONGO), 50)
+    print(f"  speedup: {a / b:.1f}x")
+
+    print("limpa_markdown (parecer longo)")
+    a = _medir("legado", lambda: limpa_markdown_legado(PARECER_LONGO), 50)
+    b = _medir("atual", lambda: limpa_markdown(PARECER_LONGO), 50)
+    print(f"  speedup: {a / b:.1f}x")
+
+    print(f"limpa_pdf ({len(CELULAS)} células curtas repetidas)")
+    a = _medir("legado", lambda: [limpa_pdf_legado(c) for c in CELULAS], 20)
+    b = _medir("memoizado", lambda: [limpa_pdf(c) for c in CELULAS], 20)
+    print(f"  speedup: {a / b:.1f}x")
+
+    print(f"limpa_markdown ({len(CELULAS)} células curtas repetidas)")
+    a = _medir("legado", lambda: [limpa_markdown_legado(c) for c in CELULAS], 20)
+    b = _medir("memoizado", lambda: [limpa_markdown(c) for c in CELULAS], 20)
+    print(f"  speedup: {a / b:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
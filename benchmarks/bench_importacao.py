@@ -0,0 +1,108 @@
+"""
+benchmarks/bench_importacao.py
+Custo de import do app: cada medição roda num interpretador novo (import
+frio), como o primeiro acesso após subir o servidor.
+
+1. Módulos: tempo cumulativo de `python -X importtime -c "import <módulo>"`
+   para os menus, passos e serviços (descontado o import do streamlit, que
+   todo script paga).
+2. Telas: app.py executado com o AppTest do Streamlit até a tela de login e
+   até o passo 0 da "Nova Análise" já logado. Mostra o tempo da primeira
+   execução e quais dependências pesadas a execução carregou (sem o
+   aquecimento em segundo plano, core/aquecimento.py).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_importacao
+    python -m benchmarks.bench_importacao --modulos views.historico services.ai_service
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+MODULOS = (
+    "views.login",
+    "views.components.rascunho",
+    "views.components.prefetch",
+    "views.steps.passo_0",
+    "views.steps.passo_5",
+    "views.steps.passo_7",
+    "views.dashboard",
+    "views.historico",
+    "services.ai_service",
+    "services.db_service",
+    "services.pdf_service",
+)
+
+PESADOS = ("openai", "pandas", "plotly.express", "fpdf", "gspread", "oauth2client", "openpyxl", "PyPDF2")
+
+_SCRIPT_TELA = textwrap.dedent("""
+    import json, sys, time
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file("app.py", default_timeout=120)
+    app.secrets["RASCUNHOS_BACKEND"] = "local"
+    if {logado!r}:
+        app.session_state["logged_in"] = True
+        app.session_state["usuario_logado"] = "benchmark"
+    antes = set(sys.modules)
+    inicio = time.perf_counter()
+    app.run()
+    decorrido = time.perf_counter() - inicio
+    carregados = [m for m in {pesados!r} if m in sys.modules and m not in antes]
+    print(json.dumps({{"segundos": decorrido, "pesados": carregados, "erros": len(app.exception)}}))
+""")
+
+
+def _importtime(modulo: str) -> float:
+    """Tempo cumulativo (ms) do import frio de `modulo`, com o streamlit já carregado."""
+    r = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import streamlit; import {modulo}"],
+        cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    for linha in reversed(r.stderr.splitlines()):
+        partes = linha.split("|")
+        if len(partes) == 3 and partes[2].strip() == modulo:
+            return int(partes[1]) / 1000
+    return 0.0
+
+
+def _tela(logado: bool) -> dict:
+    script = _SCRIPT_TELA.format(logado=logado, pesados=PESADOS)
+    # Sem o aquecimento em segundo plano: mede só o que o script importa
+    tmp = Path(tempfile.mkdtemp(prefix="bench-importacao-"))
+    ambiente = {
+        **os.environ, "AQUECER_IMPORTS": "0", "RASCUNHOS_DB": str(tmp / "rascunhos.sqlite3"),
+        "TAREFAS_DB": str(tmp / "tarefas.sqlite3"), "ESTADO_DB": str(tmp / "estado.sqlite3"), "BLOBS_DIR": str(tmp / "blobs"),
+    }
+    r = subprocess.run(
+        [sys.executable, "-c", script], cwd=RAIZ, capture_output=True, text=True, env=ambiente, check=True,
+    )
+    return json.loads(r.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--modulos", nargs="*", default=MODULOS)
+    a = p.parse_args()
+
+    print("Import frio por módulo (cumulativo, sem o streamlit)")
+    for modulo in a.modulos:
+        print(f"  {modulo:<34} {_importtime(modulo):>8.0f} ms")
+
+    print("\nPrimeira execução do app.py (interpretador novo)")
+    for rotulo, logado in (("tela de login", False), ("Nova Análise, passo 0", True)):
+        r = _tela(logado)
+        pesados = ", ".join(r["pesados"]) or "nenhuma"
+        erro = f"  ({r['erros']} exceção(ões) na tela)" if r["erros"] else ""
+        print(f"  {rotulo:<24} {r['segundos']:>6.2f}s   dependências pesadas: {pesados}{erro}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+benchmarks/bench_moeda.py
+Mede parse_moeda / parse_moeda_series contra o parser anterior (safe_float
+com replaces + regex) sobre um milhão de strings monetárias.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_moeda
+"""
+
+import random
+import re
+import time
+
+import pandas as pd
+
+from utils.moeda import _parse_texto_memo, parse_moeda, parse_moeda_series
+
+N = 1_000_000
+
+
+# ─── Implementação anterior (referência) ─────────────────────────────────────
+
+def safe_float_legado(valor):
+    try:
+        if isinstance(valor, (int, float)): return float(valor)
+        v = str(valor).upper().replace('R$', '').strip()
+        if '.' in v and ',' in v: v = v.replace('.', '').replace(',', '.')
+        elif ',' in v: v = v.replace(',', '.')
+        v = re.sub(r'[^\d.-]', '', v)
+        return float(v) if v else 0.0
+    except Exception:
+        return 0.0
+
+
+# ─── Massa de teste ──────────────────────────────────────────────────────────
+
+def _gerar(n: int, distintos: int) -> list[str]:
+    rnd = random.Random(42)
+    base = [
+        f"R$ {rnd.randint(500, 2_000_000):,}.{rnd.randint(0, 99):02d}"
+        .replace(",", "X").replace(".", ",").replace("X", ".")
+        for _ in range(distintos)
+    ]
+    return [base[rnd.randrange(distintos)] for _ in range(n)]
+
+
+def _medir(nome: str, fn) -> float:
+    inicio = time.perf_counter()
+    fn()
+    decorrido = time.perf_counter() - inicio
+    print(f"  {nome:<34} {decorrido * 1e3:>9.1f} ms  ({decorrido / N * 1e9:>6.0f} ns/valor)")
+    return decorrido
+
+
+def main() -> None:
+    for distintos in (2_000, N):
+        valores = _gerar(N, distintos)
+        serie = pd.Series(valores)
+        assert [parse_moeda(v) for v in valores[:1000]] == [safe_float_legado(v) for v in valores[:1000]]
+
+        print(f"{N:,} strings sorteadas de {distintos:,} valores-base")
+        a = _medir("safe_float legado (loop)", lambda: [safe_float_legado(v) for v in valores])
+        _parse_texto_memo.cache_clear()
+        b = _medir("parse_moeda (loop, memo)", lambda: [parse_moeda(v) for v in valores])
+        _parse_texto_memo.cache_clear()
+        c = _medir("parse_moeda_series", lambda: parse_moeda_series(serie))
+        print(f"  speedup loop: {a / b:.1f}x   series: {a / c:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
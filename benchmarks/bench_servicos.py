@@ -0,0 +1,155 @@
+"""
+benchmarks/bench_servicos.py
+Custo de montar os serviços a cada rerun contra os clientes compartilhados
+do processo (services/ai_service.obter_cliente, services/db_service.obter_db).
+
+Antes, cada show_passo_*/show_historico/show_dashboard criava um OpenAI novo
+(cliente httpx, contexto TLS, pool vazio) e cada chamada do DBService abria
+uma conexão nova com requests.get/post. O servidor HTTP local (keep-alive)
+faz o papel do Supabase:
+
+1. Construção: ms por OpenAI(...) novo contra obter_cliente().
+2. Leitura REST: ms por requests.get (conexão nova) contra a sessão do DBService
+   (uma por thread).
+3. Reruns/s: script Streamlit (AppTest) que monta AIService + DBService e faz
+   uma leitura, como uma tela do app, nas duas formas.
+
+No servidor local não há TLS nem latência de rede; contra o Supabase real a
+conexão reaproveitada economiza também o handshake a cada chamada.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_servicos
+    python -m benchmarks.bench_servicos --reruns 200
+"""
+
+import argparse
+import tempfile
+import textwrap
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from openai import OpenAI
+from streamlit.testing.v1 import AppTest
+
+from core.estado import EstadoLocal, configurar_estado
+from services.ai_service import obter_cliente
+from services.db_service import _sessao_http
+
+_CHAVE = "sk-bench"
+_BASE_IA = "http://127.0.0.1:9/v1"     # nunca chamado: só a construção do cliente
+
+
+# ─── Servidor local (papel do Supabase) ───────────────────────────────────────
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"      # keep-alive
+    disable_nagle_algorithm = True     # cabeçalho e corpo sem o atraso do ACK
+
+    def do_GET(self):
+        corpo = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _servidor() -> tuple[ThreadingHTTPServer, str]:
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+# ─── Telas (uma por forma de montar os serviços) ──────────────────────────────
+
+_TELA_LEGADO = textwrap.dedent("""
+    import requests
+    import streamlit as st
+    from openai import OpenAI
+    from services.ai_service import AIService
+    from services.db_service import DBService
+
+    # Como antes: cliente e DBService novos por rerun, conexão nova por chamada
+    AIService()
+    OpenAI(base_url=st.secrets["OPENROUTER_BASE_URL"], api_key=st.secrets["OPENROUTER_API_KEY"],
+           timeout=120.0, max_retries=0)
+    db = DBService()
+    requests.get(f"{db.supabase_url}/rest/v1/analises", headers={"apikey": db.supabase_key})
+    st.write("ok")
+""")
+
+_TELA_ATUAL = textwrap.dedent("""
+    import streamlit as st
+    from services.ai_service import AIService
+    from services.db_service import obter_db
+
+    AIService()
+    db = obter_db()
+    db.http.get(f"{db.supabase_url}/rest/v1/analises", headers={"apikey": db.supabase_key})
+    st.write("ok")
+""")
+
+
+def _reruns_por_segundo(script: str, url: str, reruns: int) -> float:
+    app = AppTest.from_string(script, default_timeout=60)
+    app.secrets["OPENROUTER_API_KEY"] = _CHAVE
+    app.secrets["OPENROUTER_BASE_URL"] = _BASE_IA
+    app.secrets["supabase"] = {"url": url, "key": "bench"}
+    app.run()                                      # primeira execução: imports e caches
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+    inicio = time.perf_counter()
+    for _ in range(reruns):
+        app.run()
+    return reruns / (time.perf_counter() - inicio)
+
+
+def _ms_por_chamada(funcao, n: int) -> float:
+    funcao()
+    inicio = time.perf_counter()
+    for _ in range(n):
+        funcao()
+    return (time.perf_counter() - inicio) / n * 1000
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--reruns", type=int, default=100)
+    p.add_argument("--chamadas", type=int, default=300)
+    a = p.parse_args()
+
+    configurar_estado(EstadoLocal(Path(tempfile.mkdtemp(prefix="bench-servicos-")) / "estado.sqlite3"))
+    servidor, url = _servidor()
+    try:
+        print("Construção do cliente de IA (por rerun)")
+        novo = _ms_por_chamada(lambda: OpenAI(base_url=_BASE_IA, api_key=_CHAVE, timeout=120.0, max_retries=0),
+                               a.chamadas)
+        compartilhado = _ms_por_chamada(lambda: obter_cliente(_BASE_IA, _CHAVE), a.chamadas)
+        print(f"  OpenAI(...) novo      {novo:>8.3f} ms")
+        print(f"  obter_cliente()       {compartilhado:>8.3f} ms")
+
+        print("\nLeitura REST (servidor local com keep-alive)")
+        rota = f"{url}/rest/v1/analises"
+        avulsa = _ms_por_chamada(lambda: requests.get(rota), a.chamadas)
+        pool = _ms_por_chamada(lambda: _sessao_http().get(rota), a.chamadas)
+        print(f"  requests.get          {avulsa:>8.3f} ms   (conexão nova)")
+        print(f"  sessão do DBService   {pool:>8.3f} ms")
+
+        print(f"\nReruns por segundo (AppTest, {a.reruns} reruns)")
+        legado = _reruns_por_segundo(_TELA_LEGADO, url, a.reruns)
+        atual = _reruns_por_segundo(_TELA_ATUAL, url, a.reruns)
+        print(f"  serviços por rerun    {legado:>8.1f} reruns/s")
+        print(f"  serviços do processo  {atual:>8.1f} reruns/s   ({atual / legado:.2f}x)")
+    finally:
+        servidor.shutdown()
+        configurar_estado(None)
+
+
+if __name__ == "__main__":
+    main()
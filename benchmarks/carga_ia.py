@@ -0,0 +1,146 @@
+"""
+benchmarks/carga_ia.py
+Teste de carga do AIService contra o servidor mock (sem custo de API).
+
+Simula N analistas em paralelo, cada um rodando os passos 3, 4 e 5 com K PDFs
+sintéticos, por R rodadas (da 2ª em diante, o cache por arquivo deve
+responder). Mede o tempo de cada passo por analista e mostra as métricas por
+passo/modelo (core/metricas.py). Limitador, retries e hedging são os reais.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.carga_ia --analistas 6 --arquivos 3 --latencia 1.5 --taxa-429 0.05
+    python -m benchmarks.carga_ia --url http://127.0.0.1:8765/v1   # servidor já rodando
+"""
+
+import argparse
+import io
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from streamlit import config as st_config
+
+from benchmarks.servidor_mock import ConfigMock, iniciar_servidor
+from core.estado import EstadoLocal, configurar_estado
+from core.metricas import configurar_sink, resumo_metricas
+
+_PASSOS = ("passo_3_serasa", "passo_4_certidoes", "passo_5_contabil")
+
+
+def _configurar_secrets(url: str, rpm: float, concorrencia: int, hedging: bool) -> str:
+    """Secrets temporários apontando o AIService para o mock (o secrets.toml real não é lido)."""
+    fd, caminho = tempfile.mkstemp(suffix=".toml", prefix="secrets-carga-")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(
+            f'OPENROUTER_API_KEY = "mock"\n'
+            f'OPENROUTER_BASE_URL = "{url}"\n'
+            f"OPENROUTER_RPM = {rpm}\n"
+            f"OPENROUTER_CONCORRENCIA = {concorrencia}\n"
+            f"IA_HEDGING = {'true' if hedging else 'false'}\n"
+        )
+    st_config.set_option("secrets.files", [caminho])
+    return caminho
+
+
+def _pdf_sintetico(analista: int, indice: int) -> io.BytesIO:
+    """Conteúdo único por analista/arquivo (chaves de cache distintas), ~200 KB."""
+    f = io.BytesIO(b"%PDF-1.4\n" + f"analista {analista} arquivo {indice}\n".encode() + os.urandom(200_000))
+    f.name = f"doc_{analista}_{indice}.pdf"
+    return f
+
+
+def _analista(i: int, arquivos: int, rodadas: int, tempos: dict[str, list[float]], lock: threading.Lock) -> None:
+    from services.ai_service import AIService
+
+    ai = AIService()
+    ai.usuario = f"analista_{i}"
+    files = [_pdf_sintetico(i, j) for j in range(arquivos)]
+    chamadas = {
+        "passo_3_serasa": lambda: ai.mapear_serasa(files, "Empresa Mock", ""),
+        "passo_4_certidoes": lambda: ai.auditar_certidoes(files, "Empresa Mock", ""),
+        "passo_5_contabil": lambda: ai.auditar_contabil(files, "Empresa Mock", "", "15.000,00", "0"),
+    }
+    for rodada in range(rodadas):
+        for passo in _PASSOS:
+            inicio = time.perf_counter()
+            chamadas[passo]()
+            with lock:
+                tempos[f"{passo} (rodada {rodada + 1})"].append(time.perf_counter() - inicio)
+
+
+def _p95(valores: list[float]) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(0.95 * len(ordenados)) - 1))]
+
+
+def _args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Teste de carga do AIService contra o servidor mock.")
+    p.add_argument("--url", help="base_url de um mock já rodando (padrão: sobe um local)")
+    p.add_argument("--analistas", type=int, default=4)
+    p.add_argument("--arquivos", type=int, default=3, help="PDFs por passo, por analista")
+    p.add_argument("--rodadas", type=int, default=2)
+    p.add_argument("--latencia", type=float, default=1.0)
+    p.add_argument("--sigma", type=float, default=0.5)
+    p.add_argument("--taxa-429", type=float, default=0.0)
+    p.add_argument("--taxa-erro", type=float, default=0.0)
+    p.add_argument("--retry-after", type=float, default=1.0)
+    p.add_argument("--rpm", type=float, default=600)
+    p.add_argument("--concorrencia", type=int, default=8)
+    p.add_argument("--hedging", action="store_true")
+    return p.parse_args()
+
+
+def main() -> None:
+    a = _args()
+    url = a.url
+    if url is None:
+        _, url = iniciar_servidor(ConfigMock(a.latencia, a.sigma, a.taxa_429, a.taxa_erro, a.retry_after))
+    secrets = _configurar_secrets(url, a.rpm, a.concorrencia, a.hedging)
+    configurar_sink(None)  # chamadas ao mock não entram no histórico de consumo real
+    # Cache compartilhado descartável: resultados do mock não vão para o estado real
+    configurar_estado(EstadoLocal(os.path.join(tempfile.mkdtemp(prefix="estado-carga-"), "estado.sqlite3")))
+
+    # Saída legível: sem avisos de "bare mode" do Streamlit nem logs por chamada
+    import services.ai_service  # noqa: F401  (registra os loggers antes de silenciá-los)
+    for n in list(logging.root.manager.loggerDict):
+        if n.startswith("streamlit"):
+            logging.getLogger(n).setLevel(logging.ERROR)
+        elif n.startswith(("core", "services")):
+            logging.getLogger(n).setLevel(logging.WARNING)
+
+    tempos: dict[str, list[float]] = {f"{p} (rodada {r + 1})": [] for r in range(a.rodadas) for p in _PASSOS}
+    lock = threading.Lock()
+    print(f"{a.analistas} analista(s) × {a.arquivos} PDF(s) × {len(_PASSOS)} passos × {a.rodadas} rodada(s) → {url}")
+
+    inicio = time.perf_counter()
+    threads = [
+        threading.Thread(target=_analista, args=(i, a.arquivos, a.rodadas, tempos, lock))
+        for i in range(a.analistas)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = time.perf_counter() - inicio
+    os.remove(secrets)
+
+    print(f"\nTempo total: {total:.1f}s\n")
+    print(f"  {'passo':<34} {'média':>8} {'p95':>8} {'máx':>8}")
+    for nome, valores in tempos.items():
+        if valores:
+            print(f"  {nome:<34} {statistics.mean(valores):>7.2f}s {_p95(valores):>7.2f}s {max(valores):>7.2f}s")
+
+    print(f"\n  {'chamadas à IA por passo/modelo':<46} {'n':>4} {'falhas':>7} {'média':>8} {'p95':>8}")
+    for linha in sorted(resumo_metricas(), key=lambda linha: linha["passo"]):
+        rotulo = f"{linha['passo']} [{linha['modelo']}]"
+        print(
+            f"  {rotulo:<46} {linha['chamadas']:>4} {linha['falhas']:>7} "
+            f"{linha['latencia_media']:>7.2f}s {linha['latencia_p95']:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+benchmarks/servidor_mock.py
+Servidor local compatível com a API do OpenAI (POST /v1/chat/completions) para
+testes de carga e latência do AIService sem gastar créditos.
+
+O passo é identificado pelo nome do json_schema (response_format) ou, sem
+schema, pelo início do prompt em prompts/analise.yaml. A resposta é um JSON de
+exemplo gerado a partir do model pydantic do passo, ou o fixo informado em
+--respostas (arquivo JSON {"passo_3_serasa": {...}, ...}).
+
+Latência: lognormal (mediana e sigma configuráveis) até o primeiro token.
+Falhas: fração de 429 (com Retry-After) e de 500. Com "stream": true, a
+resposta vai em Server-Sent Events, em pedaços, com o uso no último evento
+(stream_options.include_usage).
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.servidor_mock --porta 8765 --latencia 2 --sigma 0.6 --taxa-429 0.05
+    # em .streamlit/secrets.toml:
+    #   OPENROUTER_BASE_URL = "http://127.0.0.1:8765/v1"
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from core.models import MODELOS_POR_PASSO, schema_saida
+from core.prompt_loader import listar_prompts
+
+# Valores plausíveis para campos que alimentam regras e gráficos
+_EXEMPLOS: dict[str, Any] = {
+    "empresa_documento": "",
+    "cnpj_documento": "",
+    "score_serasa": "750",
+    "risco_serasa": "baixo",
+    "aluguel": "R$ 15.000,00",
+    "iptu": "R$ 1.200,00",
+    "renda_media_oficial": "R$ 60.000,00",
+    "renda_media_atual": "R$ 65.000,00",
+    "periodos": ["2023", "2024"],
+}
+_VALOR_FINANCEIRO = ["R$ 1.000.000,00", "R$ 1.250.000,00"]
+
+# Caracteres por evento no streaming
+_TAMANHO_PEDACO = 64
+
+
+@dataclass
+class ConfigMock:
+    latencia_mediana: float = 1.0     # segundos
+    latencia_sigma: float = 0.5       # dispersão do lognormal (0 = fixa)
+    taxa_429: float = 0.0
+    taxa_erro: float = 0.0            # HTTP 500
+    retry_after: float = 1.0          # segundos, no cabeçalho do 429
+    respostas: dict[str, dict] = field(default_factory=dict)
+
+    def sortear_latencia(self) -> float:
+        if self.latencia_mediana <= 0:
+            return 0.0
+        if self.latencia_sigma <= 0:
+            return self.latencia_mediana
+        return random.lognormvariate(math.log(self.latencia_mediana), self.latencia_sigma)
+
+
+def resposta_exemplo(passo: str | None) -> dict[str, Any]:
+    """JSON de exemplo que valida no model do passo ({} para passo desconhecido)."""
+    modelo = MODELOS_POR_PASSO.get(passo)
+    if modelo is None:
+        return {}
+    dados = {}
+    for nome, prop in schema_saida(modelo)["properties"].items():
+        if nome in _EXEMPLOS:
+            dados[nome] = _EXEMPLOS[nome]
+        elif prop.get("type") == "array":
+            dados[nome] = list(_VALOR_FINANCEIRO)
+        else:
+            dados[nome] = f"[mock] {nome}"
+    return dados
+
+
+def _assinaturas_prompts() -> list[tuple[str, str]]:
+    """(trecho inicial fixo, chave) de cada prompt do YAML, do mais longo ao mais curto."""
+    assinaturas = []
+    for chave, template in listar_prompts().items():
+        trecho = template.split("{", 1)[0].strip()[:80]
+        if trecho:
+            assinaturas.append((trecho, chave))
+    return sorted(assinaturas, key=lambda a: -len(a[0]))
+
+
+def identificar_passo(corpo: dict[str, Any], assinaturas: list[tuple[str, str]]) -> str | None:
+    nome = ((corpo.get("response_format") or {}).get("json_schema") or {}).get("name")
+    if nome:
+        return nome
+    textos = []
+    for msg in corpo.get("messages", []):
+        conteudo = msg.get("content")
+        if isinstance(conteudo, str):
+            textos.append(conteudo)
+        else:
+            textos.extend(p.get("text", "") for p in conteudo or [] if p.get("type") == "text")
+    texto = "\n".join(textos)
+    return next((chave for trecho, chave in assinaturas if trecho in texto), None)
+
+
+def _criar_handler(config: ConfigMock):
+    assinaturas = _assinaturas_prompts()
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):  # silencioso: o volume de requisições polui a saída
+            pass
+
+        def _json(self, status: int, dados: dict, cabecalhos: dict[str, str] | None = None) -> None:
+            corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            for k, v in (cabecalhos or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def _evento(self, dados: dict) -> None:
+            self.wfile.write(f"data: {json.dumps(dados, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+        def _stream(self, corpo: dict, base: dict, conteudo: str, uso: dict) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")   # sem Content-Length: o fim do corpo é o fechamento
+            self.end_headers()
+            self.close_connection = True
+            base = {**base, "object": "chat.completion.chunk"}
+            for i in range(0, len(conteudo), _TAMANHO_PEDACO):
+                delta = {"content": conteudo[i:i + _TAMANHO_PEDACO]}
+                if i == 0:
+                    delta["role"] = "assistant"
+                self._evento({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+            self._evento({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            if (corpo.get("stream_options") or {}).get("include_usage"):
+                self._evento({**base, "choices": [], "usage": uso})
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+        def do_POST(self):
+            bruto = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._json(404, {"error": {"message": f"rota desconhecida: {self.path}"}})
+                return
+            try:
+                corpo = json.loads(bruto)
+            except ValueError:
+                self._json(400, {"error": {"message": "JSON inválido"}})
+                return
+
+            time.sleep(config.sortear_latencia())
+
+            sorteio = random.random()
+            if sorteio < config.taxa_429:
+                self._json(
+                    429, {"error": {"message": "mock: rate limit", "code": 429}},
+                    {"Retry-After": f"{config.retry_after:g}"},
+                )
+                return
+            if sorteio < config.taxa_429 + config.taxa_erro:
+                self._json(500, {"error": {"message": "mock: erro interno", "code": 500}})
+                return
+
+            passo = identificar_passo(corpo, assinaturas)
+            conteudo = json.dumps(config.respostas.get(passo) or resposta_exemplo(passo), ensure_ascii=False)
+            base = {
+                "id": f"mock-{uuid.uuid4().hex[:12]}",
+                "created": int(time.time()),
+                "model": corpo.get("model", "mock"),
+            }
+            uso = {
+                "prompt_tokens": len(bruto) // 4,
+                "completion_tokens": len(conteudo) // 4,
+                "total_tokens": (len(bruto) + len(conteudo)) // 4,
+                "cost": 0.0,
+            }
+            if corpo.get("stream"):
+                self._stream(corpo, base, conteudo, uso)
+                return
+            self._json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": conteudo},
+                }],
+                "usage": uso,
+            })
+
+    return _Handler
+
+
+def iniciar_servidor(config: ConfigMock, host: str = "127.0.0.1", porta: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Sobe o servidor numa thread daemon; devolve (servidor, base_url). porta=0 → livre."""
+    servidor = ThreadingHTTPServer((host, porta), _criar_handler(config))
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="servidor-mock-ia", daemon=True).start()
+    return servidor, f"http://{host}:{servidor.server_address[1]}/v1"
+
+
+def _args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Servidor OpenAI-compatível de teste (sem custo).")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--porta", type=int, default=8765)
+    p.add_argument("--latencia", type=float, default=1.0, help="mediana da latência, em segundos")
+    p.add_argument("--sigma", type=float, default=0.5, help="dispersão lognormal (0 = latência fixa)")
+    p.add_argument("--taxa-429", type=float, default=0.0, help="fração de respostas 429")
+    p.add_argument("--taxa-erro", type=float, default=0.0, help="fração de respostas 500")
+    p.add_argument("--retry-after", type=float, default=1.0, help="Retry-After dos 429, em segundos")
+    p.add_argument("--respostas", help="arquivo JSON com respostas fixas por passo")
+    return p.parse_args()
+
+
+def main() -> None:
+    a = _args()
+    respostas = {}
+    if a.respostas:
+        with open(a.respostas, encoding="utf-8") as f:
+            respostas = json.load(f)
+    config = ConfigMock(a.latencia, a.sigma, a.taxa_429, a.taxa_erro, a.retry_after, respostas)
+    servidor = ThreadingHTTPServer((a.host, a.porta), _criar_handler(config))
+    print(f"Servidor mock em http://{a.host}:{a.porta}/v1  (Ctrl+C para sair)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
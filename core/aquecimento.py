@@ -0,0 +1,64 @@
+"""
+core/aquecimento.py
+Importa os módulos pesados em segundo plano enquanto o analista faz login.
+
+app.py só importa cada menu e cada passo quando ele é exibido, então a
+tela de login não espera openai, pandas, plotly, fpdf2 e gspread. Para a
+primeira tela depois do login também não pagar esse custo, aquecer() importa
+esses módulos numa thread daemon, uma vez por processo, enquanto a senha é
+digitada. Uma falha aqui só vai para o log; o import de verdade, no script,
+é que mostra o erro ao usuário. AQUECER_IMPORTS=0 no ambiente desliga
+(benchmarks, desenvolvimento com recarga automática).
+
+Uso:
+    from core.aquecimento import aquecer
+    aquecer()      # depois de desenhar a tela de login
+"""
+
+import importlib
+import os
+import threading
+import time
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Na ordem em que costumam ser usados logo após o login ("Nova Análise", passo 0)
+MODULOS = (
+    "services.db_service",
+    "views.components.rascunho",
+    "views.components.prefetch",
+    "views.components.dependencias",
+    "views.steps.passo_0",
+    "services.ai_service",
+    "views.dashboard",
+    "views.historico",
+    "services.pdf_service",
+)
+
+_iniciado = False
+_lock = threading.Lock()
+
+
+def _importar(modulos: tuple[str, ...]) -> None:
+    inicio = time.perf_counter()
+    for nome in modulos:
+        try:
+            importlib.import_module(nome)
+        except Exception as e:
+            logger.warning("Aquecimento: falha ao importar %s: %s", nome, e)
+    logger.info("Aquecimento: %d módulos importados em %.2fs.", len(modulos), time.perf_counter() - inicio)
+
+
+def aquecer(modulos: tuple[str, ...] = MODULOS) -> bool:
+    """Dispara o aquecimento (só na primeira chamada do processo). True se disparou agora."""
+    global _iniciado
+    if os.environ.get("AQUECER_IMPORTS", "1") == "0":
+        return False
+    with _lock:
+        if _iniciado:
+            return False
+        _iniciado = True
+    threading.Thread(target=_importar, args=(modulos,), name="aquecimento-imports", daemon=True).start()
+    return True
@@ -0,0 +1,104 @@
+"""
+core/blobs.py
+Armazém de PDFs endereçado por conteúdo (SHA-256).
+
+Cada arquivo é gravado uma única vez em <raiz>/<ab>/<cd>/<sha256> (os dois
+primeiros pares do hash viram diretórios para não acumular milhares de
+arquivos numa pasta só). O mesmo PDF enviado em outra análise, por outro
+analista ou de novo após um reinício não ocupa espaço extra: o digest já
+existe e a gravação é pulada. A análise guarda só os digests (ao lado de
+checklist_docs), e qualquer reprocessamento posterior reabre os PDFs daqui.
+
+Gravação atômica e em blocos (core/corpo.py): o hash é calculado antes, um
+PDF repetido nem chega a ser copiado, e o conteúdo novo vai para um arquivo
+temporário na mesma pasta + os.replace, então um leitor nunca vê um blob
+pela metade. A raiz padrão é .dados/blobs; BLOBS_DIR no ambiente troca o
+caminho.
+
+Uso:
+    from core.blobs import obter_blobs
+
+    blobs = obter_blobs()
+    digest = blobs.guardar(uploaded_file)          # idempotente
+    pdf = blobs.abrir(digest, nome="serasa.pdf")   # BytesIO com .name, ou None
+"""
+
+import io
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO
+
+from core.corpo import hash_arquivo, ler_blocos
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_RAIZ_PADRAO = Path(__file__).parent.parent / ".dados" / "blobs"
+
+
+class ArmazemBlobs:
+    """Blobs imutáveis em disco, chaveados pelo SHA-256 do conteúdo. Thread-safe."""
+
+    def __init__(self, raiz: Path | str):
+        self.raiz = Path(raiz)
+        self.raiz.mkdir(parents=True, exist_ok=True)
+
+    def caminho(self, digest: str) -> Path:
+        return self.raiz / digest[:2] / digest[2:4] / digest
+
+    def existe(self, digest: str) -> bool:
+        return self.caminho(digest).is_file()
+
+    def guardar(self, arquivo: IO[bytes] | bytes) -> str:
+        """Grava o conteúdo (se ainda não existir) e devolve o digest."""
+        digest = getattr(arquivo, "sha256", None) or hash_arquivo(arquivo)
+        destino = self.caminho(digest)
+        if destino.is_file():
+            return digest
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=destino.parent, prefix=".tmp-")
+        gravados = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for dados in ler_blocos(arquivo):
+                    gravados += f.write(dados)
+            os.replace(temporario, destino)      # concorrentes gravam o mesmo conteúdo
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+        logger.info("Blob %s gravado (%d bytes).", digest[:12], gravados)
+        return digest
+
+    def ler(self, digest: str) -> bytes | None:
+        try:
+            return self.caminho(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def abrir(self, digest: str, nome: str | None = None) -> io.BytesIO | None:
+        """BytesIO do blob com `.name` (como um upload) ou None se não existir."""
+        dados = self.ler(digest)
+        if dados is None:
+            logger.warning("Blob %s não encontrado.", digest[:12])
+            return None
+        arquivo = io.BytesIO(dados)
+        arquivo.name = nome or digest
+        return arquivo
+
+
+_blobs: ArmazemBlobs | None = None
+_lock_blobs = threading.Lock()
+
+
+def obter_blobs(raiz: Path | str | None = None) -> ArmazemBlobs:
+    """Armazém único do processo; a raiz vale na primeira chamada."""
+    global _blobs
+    with _lock_blobs:
+        if _blobs is None:
+            if raiz is None:
+                raiz = os.environ.get("BLOBS_DIR") or _RAIZ_PADRAO
+            _blobs = ArmazemBlobs(raiz)
+            logger.info("Blobs de PDFs em %s.", _blobs.raiz)
+        return _blobs
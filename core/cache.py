@@ -2,8 +2,18 @@
 core/cache.py
 Cache de análises baseado em hash SHA-256 do conteúdo dos PDFs.
 
-O cache vive em st.session_state['_analise_cache'] durante a sessão do usuário.
-Chave: "<nome_do_passo>:<hash1>:<hash2>:..." (hash de cada arquivo + kwargs extras)
+Dois níveis: o dict em st.session_state['_analise_cache'] durante a sessão
+do usuário e, atrás dele, o estado compartilhado (core/estado.py), comum a
+todas as sessões, processos e réplicas. Um PDF já analisado em outra sessão
+ou réplica responde do compartilhado e passa a valer também na sessão.
+Fora do script Streamlit (tarefas em segundo plano, core/tarefas.py), o dict
+da sessão é capturado com cache_da_sessao() e ativado com usar_cache().
+clear_cache() vale só para a sessão: esvazia o dict e, dali em diante, a
+sessão ignora resultados compartilhados gravados antes da limpeza (os dos
+outros usuários continuam valendo para eles). Descartar o compartilhado de
+todos, em todas as réplicas, é manutenção: invalidar_cache_compartilhado().
+Chave: "<nome_do_passo>:v=<versão do prompt>:<hash1>:<hash2>:..." (hash de cada
+arquivo + kwargs extras). Editar o prompt do passo muda a versão e invalida o cache.
 Valor: dict resultado da IA
 
 Uso:
@@ -16,33 +26,71 @@ Uso:
     result = ... # chamada real à IA
     set_cached(key, result)
     return result
+
+    cache = cache_da_sessao()              # na thread do script
+    with usar_cache(cache):                # na tarefa de fundo
+        ...
 """
 
-import hashlib
-from typing import IO
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import IO, Iterator
 
 import streamlit as st
 
+from core.corpo import hash_arquivo
+from core.estado import CacheCompartilhado, obter_estado
 from core.logger import get_logger
+from core.prompt_loader import versao_prompt
 
 logger = get_logger(__name__)
 
 _SESSION_KEY = "_analise_cache"
 
+# No dict da sessão: momento do último clear_cache() (compartilhado anterior é ignorado)
+_LIMPO_EM = "__limpo_em__"
+
+# Resultados de IA no estado compartilhado: a chave já muda com o conteúdo e
+# a versão do prompt, o TTL só limita o tamanho do armazém
+_ESPACO_COMPARTILHADO = "analises"
+_TTL_COMPARTILHADO = 30 * 24 * 3600
+
+# Cache ativo fora do script (None = st.session_state da sessão atual)
+_cache_ativo: ContextVar[dict | None] = ContextVar("cache_analises", default=None)
+
+
+def cache_da_sessao() -> dict:
+    """Dict de cache da sessão atual (criado se preciso), para usar fora do script."""
+    if _SESSION_KEY not in st.session_state:
+        st.session_state[_SESSION_KEY] = {}
+    return st.session_state[_SESSION_KEY]
+
+
+@contextmanager
+def usar_cache(cache: dict) -> Iterator[None]:
+    """get_cached/set_cached do bloco usam `cache` em vez do session_state."""
+    token = _cache_ativo.set(cache)
+    try:
+        yield
+    finally:
+        _cache_ativo.reset(token)
+
+
+def _compartilhado() -> CacheCompartilhado:
+    return CacheCompartilhado(obter_estado(), _ESPACO_COMPARTILHADO, _TTL_COMPARTILHADO)
+
 
 def _file_hash(f: IO[bytes]) -> str:
-    """Lê o arquivo do início e retorna o SHA-256 hex digest."""
-    pos = f.tell()
-    f.seek(0)
-    digest = hashlib.sha256(f.read()).hexdigest()
-    f.seek(pos)
-    return digest
+    """SHA-256 hex do arquivo inteiro, lido em blocos (reaproveita `.sha256`, se houver)."""
+    return getattr(f, "sha256", None) or hash_arquivo(f)
 
 
 def build_cache_key(passo: str, files: list[IO[bytes]], **kwargs: str) -> str:
     """
-    Constrói chave de cache combinando nome do passo, hashes dos arquivos
-    e quaisquer kwargs adicionais (empresa, cnpj, aluguel, etc).
+    Constrói chave de cache combinando nome do passo, versão do prompt do
+    passo (se houver), hashes dos arquivos e quaisquer kwargs adicionais
+    (empresa, cnpj, aluguel, etc).
 
     Args:
         passo: identificador do passo (ex: "passo_3_serasa").
@@ -53,6 +101,9 @@ def build_cache_key(passo: str, files: list[IO[bytes]], **kwargs: str) -> str:
         String única para identificar esta combinação de inputs.
     """
     parts = [passo]
+    versao = versao_prompt(passo)
+    if versao:
+        parts.append(f"v={versao}")
     for f in files:
         parts.append(_file_hash(f))
     for k, v in sorted(kwargs.items()):
@@ -62,26 +113,61 @@ def build_cache_key(passo: str, files: list[IO[bytes]], **kwargs: str) -> str:
 
 def get_cached(key: str) -> dict | None:
     """
-    Retorna resultado cached para a chave, ou None se não existir.
+    Retorna resultado cached para a chave (sessão, depois compartilhado), ou
+    None se não existir.
     """
-    cache: dict = st.session_state.get(_SESSION_KEY, {})
+    cache = _cache_ativo.get()
+    if cache is None:
+        cache = cache_da_sessao()
     result = cache.get(key)
     if result is not None:
         logger.info("Cache hit: %s", key[:60])
+        return result
+    registro = _compartilhado().obter(key)
+    if not registro:
+        return None
+    # {"em": gravado em, "valor": resultado}; entradas sem envelope contam como antigas
+    gravado_em, result = (registro["em"], registro["valor"]) if "valor" in registro else (0.0, registro)
+    if gravado_em < cache.get(_LIMPO_EM, 0.0):
+        return None
+    cache[key] = result
+    logger.info("Cache hit (compartilhado): %s", key[:60])
     return result
 
 
 def set_cached(key: str, value: dict) -> None:
     """
-    Persiste resultado no cache da sessão.
+    Persiste resultado no cache da sessão e no compartilhado.
     """
-    if _SESSION_KEY not in st.session_state:
-        st.session_state[_SESSION_KEY] = {}
-    st.session_state[_SESSION_KEY][key] = value
+    cache = _cache_ativo.get()
+    if cache is None:
+        cache = cache_da_sessao()
+    cache[key] = value
+    _compartilhado().definir(key, {"em": time.time(), "valor": value})
     logger.debug("Cache set: %s", key[:60])
 
 
 def clear_cache() -> None:
-    """Limpa todo o cache da sessão atual."""
-    st.session_state[_SESSION_KEY] = {}
-    logger.info("Cache de análises limpo.")
+    """
+    Limpa o cache da sessão atual (no mesmo dict: tarefas em andamento
+    continuam ligadas a ele). A sessão passa a ignorar o que já estava no
+    compartilhado; as demais sessões não são afetadas.
+    """
+    cache = _cache_ativo.get()
+    if cache is None:
+        cache = cache_da_sessao()
+    cache.clear()
+    cache[_LIMPO_EM] = time.time()
+    logger.info("Cache de análises da sessão limpo.")
+
+
+def invalidar_cache_compartilhado() -> None:
+    """
+    Manutenção: descarta os resultados de IA compartilhados de todos os
+    usuários, em todas as réplicas (ex.: depois de corrigir um modelo).
+    Não é chamado pela interface.
+
+        python -c "from core.cache import invalidar_cache_compartilhado; invalidar_cache_compartilhado()"
+    """
+    _compartilhado().invalidar()
+    logger.warning("Cache compartilhado de análises invalidado para todos os usuários.")
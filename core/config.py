@@ -1,3 +1,21 @@
+"""
+core/config.py
+Cores oficiais e folha de estilo do app.
+
+A folha de estilo (tema escuro, mais as sobreposições do modo claro) é montada
+e minificada uma vez, na importação. Cada rerun reenvia o mesmo elemento,
+byte a byte idêntico ao anterior: acima de global.minCachedMessageSize
+(10 KB), o Streamlit manda ao navegador só o hash de uma mensagem que ele já
+tem, então o CSS trafega uma vez por sessão e tema
+(benchmarks/bench_estilo.py).
+
+Uso:
+    from core.config import aplicar_estilo, COR_PRIMARIA
+    aplicar_estilo(tema_claro=False)     # no início de cada execução do script
+"""
+
+import re
+
 import streamlit as st
 
 # --- CORES OFICIAIS ---
@@ -5,14 +23,10 @@ COR_PRIMARIA = "#F47920"     # Laranja Paulo Bio
 COR_SECUNDARIA = "#2C3E50"   # Azul Marinho / Chumbo
 COR_TERCIARIA = "#7F8C8D"    # Cinza
 
-def aplicar_estilo():
-    """Injeta o CSS Neo-Brutalista para visual Premium de Auditoria."""
-    st.markdown(
-        '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/bootstrap-icons.css">',
-        unsafe_allow_html=True
-    )
-    st.markdown(f"""
-    <style>
+_ICONES = '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.3/font/bootstrap-icons.css">'
+
+# Neo-Brutalista, visual Premium de Auditoria (tema escuro)
+_CSS_BASE = f"""
         /* ═══════════════════════════════════════════════════
            FONTES — Space Grotesk (Títulos) + Inter (Corpo)
         ═══════════════════════════════════════════════════ */
@@ -741,5 +755,122 @@ def aplicar_estilo():
         [data-theme="light"] [data-testid="stFileUploadDropzone"] small {{
             color: #555555 !important;
         }}
-    </style>
-    """, unsafe_allow_html=True)
+"""
+
+# Modo claro: sobrepõe o tema escuro com !important (vem depois na folha)
+_CSS_CLARO = """
+    /* Modo Claro - Alta Especificidade Total */
+
+    /* Fundo principal e sidebar */
+    section.main, div.block-container, div.stApp {
+        background-color: #F5F6FA !important;
+    }
+    section[data-testid="stSidebar"], div[data-testid="stSidebarContent"] {
+        background-color: #FFFFFF !important;
+    }
+
+    /* Forçar todos os textos a ficarem Pretos */
+    h1, h2, h3, h4, h5, h6,
+    .stMarkdown h1, .stMarkdown h2, .stMarkdown h3, .stMarkdown h4, .stMarkdown h5, .stMarkdown h6,
+    p, span, label, div, small, li, blockquote {
+        color: #000000 !important;
+        -webkit-text-fill-color: #000000 !important;
+    }
+
+    /* Exceto botões que devem conter sua cor de texto nativa (geralmente branco ou preto dependendo do fundo) */
+    .stButton>button div, .stButton>button span, .stButton>button p {
+        color: #000000 !important;
+        -webkit-text-fill-color: #000000 !important;
+    }
+
+    /* Inputs, Textareas e SelectBoxes (Fundo CINZA e Borda LARANJA) */
+    div[data-baseweb="input"] > div,
+    div[data-baseweb="textarea"] > div,
+    div[data-baseweb="select"] > div,
+    div[data-baseweb="base-input"] > div {
+        background-color: #E2E8F0 !important; /* Cinza claro estilo campo */
+        border: 1px solid #F47920 !important; /* Borda laranja */
+        border-radius: 4px !important;
+    }
+
+    /* O texto digitado dentro do input */
+    div[data-baseweb="input"] input,
+    div[data-baseweb="textarea"] textarea,
+    div[data-baseweb="base-input"] input {
+        color: #000000 !important;
+        -webkit-text-fill-color: #000000 !important;
+        background-color: transparent !important;
+    }
+
+    /* File Uploader (Dropzone) - CINZA e BORDA LARANJA */
+    [data-testid="stFileUploadDropzone"] {
+        background-color: #D1D5DB !important; /* Cinza um pouco mais forte para destaque */
+        border: 2px dashed #F47920 !important;
+        border-radius: 4px !important;
+    }
+    [data-testid="stFileUploadDropzone"] div,
+    [data-testid="stFileUploadDropzone"] span,
+    [data-testid="stFileUploadDropzone"] p {
+        color: #000000 !important;
+        -webkit-text-fill-color: #000000 !important;
+    }
+
+    /* Ajuste para o widget de upload (texto de arquivos selecionados) */
+    div[data-testid="stFileUploaderFileData"] span {
+        color: #000000 !important;
+    }
+
+    /* Linhas Divisórias e Filetes Verticais */
+    hr { border-color: #F47920 !important; }
+    div[data-testid="stVerticalBlockBorderWrapper"] > div {
+        background-color: #FFFFFF !important;
+        border: 1px solid #F47920 !important;
+    }
+
+    /* Stepper e Barras */
+    .ctx-bar {
+        background-color: #FFFFFF !important;
+        border-bottom: 2px solid #F47920 !important;
+    }
+    .ctx-val {
+        color: #000000 !important;
+    }
+    .step-circle.active {
+        background-color: #FFFFFF !important;
+        color: #F47920 !important;
+        border: 2px solid #F47920 !important;
+    }
+    .step-label.active {
+        color: #000000 !important;
+        font-weight: 700 !important;
+    }
+    .step-label.pending {
+        color: #666666 !important;
+    }
+"""
+
+
+def _minificar(css: str) -> str:
+    """
+    Tira comentários e espaços supérfluos. O espaço antes de ':' fica (em
+    seletor, "div :hover" é descendente).
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css).replace(" !important", "!important")
+    return css.replace(";}", "}").strip()
+
+
+def _montar(tema_claro: bool) -> str:
+    css = _CSS_BASE + (_CSS_CLARO if tema_claro else "")
+    return f"<style>{_minificar(css)}</style>{_ICONES}"
+
+
+# Uma folha pronta por tema, montada uma vez por processo
+_ESTILOS = {tema_claro: _montar(tema_claro) for tema_claro in (False, True)}
+
+
+def aplicar_estilo(tema_claro: bool = False):
+    """Injeta a folha de estilo pré-montada do tema (um único elemento)."""
+    st.markdown(_ESTILOS[tema_claro], unsafe_allow_html=True)
@@ -0,0 +1,114 @@
+"""
+core/consolidacao.py
+Etapa "reduce" das extrações por arquivo (Serasa, Certidões, Contábil).
+
+Cada PDF é extraído isoladamente (cache por digest do próprio arquivo); aqui os
+resultados individuais são combinados localmente, sem chamar a IA. Só a
+análise textual do contábil, que cruza períodos, passa por uma consolidação
+de texto (ver AIService.auditar_contabil).
+
+Uso:
+    from core.consolidacao import consolidar_serasa, consolidar_contabil
+    res = consolidar_serasa(resultados, nomes_arquivos)
+"""
+
+import re
+from typing import Any
+
+from core.models import CAMPOS_FINANCEIROS
+
+_VAZIOS = {"", "-", "N/D", "ND", "N/A", "NÃO INFORMADO", "NAO INFORMADO"}
+_RE_ANO = re.compile(r'(19|20)\d{2}')
+
+
+def _vazio(valor: Any) -> bool:
+    return str(valor if valor is not None else "").strip().upper() in _VAZIOS
+
+
+def _primeiro(resultados: list[dict], campo: str) -> str:
+    for r in resultados:
+        if not _vazio(r.get(campo)):
+            return str(r[campo])
+    return ""
+
+
+def _identificacao(resultados: list[dict]) -> dict[str, str]:
+    # Identificação do primeiro documento que a traga (ordem de upload)
+    for r in resultados:
+        if not _vazio(r.get("cnpj_documento")) or not _vazio(r.get("empresa_documento")):
+            return {
+                "empresa_documento": str(r.get("empresa_documento", "")),
+                "cnpj_documento": str(r.get("cnpj_documento", "")),
+            }
+    return {"empresa_documento": "", "cnpj_documento": ""}
+
+
+def _juntar_textos(resultados: list[dict], nomes: list[str], campo: str) -> str:
+    textos = [(n, str(r.get(campo, "")).strip()) for r, n in zip(resultados, nomes)]
+    textos = [(n, t) for n, t in textos if not _vazio(t)]
+    if len(textos) == 1:
+        return textos[0][1]
+    return "\n\n".join(f"[{n}] {t}" for n, t in textos)
+
+
+def consolidar_serasa(resultados: list[dict], nomes: list[str]) -> dict[str, Any]:
+    """Score/risco do primeiro relatório que os traga; apontamentos de todos, por arquivo."""
+    if len(resultados) == 1:
+        return dict(resultados[0])
+    return {
+        **_identificacao(resultados),
+        "score_serasa": _primeiro(resultados, "score_serasa"),
+        "risco_serasa": _primeiro(resultados, "risco_serasa"),
+        "mapeamento_dividas": _juntar_textos(resultados, nomes, "mapeamento_dividas"),
+    }
+
+
+def consolidar_certidoes(resultados: list[dict], nomes: list[str]) -> dict[str, Any]:
+    """Resumo de cada certidão, identificado pelo nome do arquivo."""
+    if len(resultados) == 1:
+        return dict(resultados[0])
+    return {
+        **_identificacao(resultados),
+        "resumo_certidoes": _juntar_textos(resultados, nomes, "resumo_certidoes"),
+    }
+
+
+def _ordem_periodo(item: tuple[int, str]) -> tuple[int, int]:
+    ordem, periodo = item
+    ano = _RE_ANO.search(periodo)
+    return (int(ano.group()) if ano else 9999, ordem)
+
+
+def consolidar_contabil(resultados: list[dict], nomes: list[str]) -> dict[str, Any]:
+    """
+    Une as tabelas por período (ordem cronológica). Para cada período/campo vale
+    o primeiro valor preenchido entre os arquivos. `analise_executiva` recebe as
+    análises individuais — com mais de um arquivo, a consolidação textual final
+    é feita pela IA sobre este resultado.
+    """
+    if len(resultados) == 1:
+        return dict(resultados[0])
+
+    por_periodo: dict[str, dict[str, str]] = {}
+    for r in resultados:
+        periodos = r.get("periodos") or []
+        for i, periodo in enumerate(periodos):
+            chave = str(periodo).strip()
+            if _vazio(chave):
+                continue
+            linha = por_periodo.setdefault(chave, {})
+            for campo in CAMPOS_FINANCEIROS:
+                valores = r.get(campo) or []
+                valor = valores[i] if i < len(valores) else ""
+                if _vazio(linha.get(campo)) and not _vazio(valor):
+                    linha[campo] = str(valor)
+
+    periodos = [p for _, p in sorted(enumerate(por_periodo), key=_ordem_periodo)]
+    consolidado: dict[str, Any] = {
+        **_identificacao(resultados),
+        "periodos": periodos,
+        "analise_executiva": _juntar_textos(resultados, nomes, "analise_executiva"),
+    }
+    for campo in CAMPOS_FINANCEIROS:
+        consolidado[campo] = [por_periodo[p].get(campo, "N/D") for p in periodos]
+    return consolidado
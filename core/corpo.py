@@ -0,0 +1,167 @@
+"""
+core/corpo.py
+Corpo das requisições de IA gerado em blocos, com memória limitada.
+
+Com f.read() + base64 + json.dumps, cada PDF chegava a existir quatro vezes
+na memória durante a chamada (bytes lidos, string base64, JSON do corpo e a
+cópia do cliente HTTP). Aqui o PDF entra nas mensagens como AnexoPDF, uma
+referência ao arquivo sem o conteúdo, e CorpoJSON serializa só o esqueleto
+da requisição (instruções, dados, schema). No envio, o esqueleto sai em
+pedaços e, no lugar de cada anexo, o arquivo é lido e codificado em base64
+bloco a bloco. O tamanho do base64 é conhecido de antemão, então o
+Content-Length vai exato e o corpo é gerado de novo a cada tentativa.
+
+O pico por requisição passa a ser um bloco (BLOCO bytes), não o arquivo.
+hash_arquivo() usa a mesma leitura em blocos para o SHA-256 (chaves de cache
+e armazém de blobs).
+
+Uso:
+    from core.corpo import AnexoPDF, CorpoJSON
+
+    parte = {"type": "file", "file": {"filename": f.name, "file_data": AnexoPDF(f)}}
+    corpo = CorpoJSON({"model": modelo, "messages": [...]})
+    corpo.tamanho            # bytes exatos do corpo
+    for pedaco in corpo:     # bytes, bloco a bloco
+        ...
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import uuid
+from typing import IO, Iterator
+
+# Múltiplo de 3: o base64 de cada bloco não tem padding e os blocos concatenam
+BLOCO = 3 * 256 * 1024
+
+_PREFIXO_PDF = b"data:application/pdf;base64,"
+
+Conteudo = IO[bytes] | bytes | bytearray | memoryview
+
+
+def tamanho_arquivo(arquivo: Conteudo) -> int:
+    """Tamanho em bytes sem ler o conteúdo (a posição do arquivo é preservada)."""
+    if isinstance(arquivo, (bytes, bytearray, memoryview)):
+        return memoryview(arquivo).nbytes
+    getbuffer = getattr(arquivo, "getbuffer", None)
+    if getbuffer is not None:
+        with getbuffer() as visao:
+            return visao.nbytes
+    pos = arquivo.tell()
+    fim = arquivo.seek(0, os.SEEK_END)
+    arquivo.seek(pos)
+    return fim
+
+
+def ler_blocos(arquivo: Conteudo, bloco: int = BLOCO) -> Iterator[bytes]:
+    """
+    Conteúdo do início ao fim, em blocos de até `bloco` bytes, sem alterar a
+    posição do arquivo. BytesIO (e o UploadedFile do Streamlit) é lido pela
+    memória que já ocupa, sem seek: duas leituras simultâneas do mesmo
+    arquivo (hedging) não interferem uma na outra.
+    """
+    getbuffer = getattr(arquivo, "getbuffer", None)
+    if getbuffer is not None or isinstance(arquivo, (bytes, bytearray, memoryview)):
+        with getbuffer() if getbuffer is not None else memoryview(arquivo) as visao:
+            for inicio in range(0, visao.nbytes, bloco):
+                yield visao[inicio:inicio + bloco].tobytes()
+        return
+    pos = arquivo.tell()
+    lidos = 0
+    try:
+        while True:
+            arquivo.seek(lidos)
+            dados = arquivo.read(bloco)
+            if not dados:
+                return
+            lidos += len(dados)
+            yield dados
+    finally:
+        arquivo.seek(pos)
+
+
+def hash_arquivo(arquivo: Conteudo) -> str:
+    """SHA-256 hex do conteúdo, lido em blocos."""
+    digest = hashlib.sha256()
+    for dados in ler_blocos(arquivo):
+        digest.update(dados)
+    return digest.hexdigest()
+
+
+def tamanho_base64(n: int) -> int:
+    return 4 * ((n + 2) // 3)
+
+
+def base64_blocos(arquivo: Conteudo) -> Iterator[bytes]:
+    """Base64 do conteúdo em blocos; concatenados, iguais a b64encode(tudo)."""
+    resto = b""
+    for dados in ler_blocos(arquivo):
+        if resto:
+            dados = resto + dados
+        corte = len(dados) - len(dados) % 3
+        resto = dados[corte:]
+        if corte:
+            yield base64.b64encode(dados[:corte])
+    if resto:
+        yield base64.b64encode(resto)
+
+
+class AnexoPDF:
+    """PDF nas mensagens da requisição; vira data URI base64 só durante o envio."""
+
+    __slots__ = ("arquivo", "tamanho")
+
+    def __init__(self, arquivo: Conteudo):
+        self.arquivo = arquivo
+        self.tamanho = tamanho_arquivo(arquivo)
+
+    @property
+    def tamanho_codificado(self) -> int:
+        return len(_PREFIXO_PDF) + tamanho_base64(self.tamanho)
+
+    def blocos(self) -> Iterator[bytes]:
+        yield _PREFIXO_PDF
+        yield from base64_blocos(self.arquivo)
+
+
+class CorpoJSON:
+    """
+    Corpo JSON com AnexoPDF em qualquer ponto da estrutura. Iterar gera os
+    bytes do corpo em blocos; pode ser iterado mais de uma vez (nova
+    tentativa, hedging), relendo os arquivos.
+    """
+
+    def __init__(self, valor: dict):
+        marca = uuid.uuid4().hex
+        anexos: list[AnexoPDF] = []
+
+        def _marcar(obj):
+            if isinstance(obj, AnexoPDF):
+                anexos.append(obj)
+                return f"{marca}:{len(anexos) - 1}"
+            raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
+
+        esqueleto = json.dumps(valor, ensure_ascii=False, default=_marcar)
+        # Trechos de texto e índices de anexo se alternam; as aspas do valor
+        # ficam nos trechos, em volta do base64
+        pedacos = re.split(f'"{marca}:(\\d+)"', esqueleto)
+        self._partes: list[bytes | AnexoPDF] = []
+        for i, pedaco in enumerate(pedacos):
+            if i % 2:
+                self._partes.append(anexos[int(pedaco)])
+            else:
+                aspas_antes = '"' if i > 0 else ""
+                aspas_depois = '"' if i < len(pedacos) - 1 else ""
+                self._partes.append(f"{aspas_antes}{pedaco}{aspas_depois}".encode("utf-8"))
+        self.anexos = anexos
+        self.bytes_base64 = sum(a.tamanho_codificado for a in anexos)
+        self.tamanho = self.bytes_base64 + sum(len(p) for p in self._partes if isinstance(p, bytes))
+
+    def __iter__(self) -> Iterator[bytes]:
+        for parte in self._partes:
+            if isinstance(parte, AnexoPDF):
+                yield from parte.blocos()
+            elif parte:
+                yield parte
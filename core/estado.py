@@ -0,0 +1,246 @@
+"""
+core/estado.py
+Estado compartilhado entre sessões, processos e réplicas do app.
+
+Caches que viviam só na sessão (resultados de IA) ou só no processo deixam
+cada réplica atrás do balanceador com o próprio cache frio. Aqui fica um
+armazém chave → texto com TTL, comum a todas, e CacheCompartilhado por cima
+(JSON, espaço de nomes, TTL padrão).
+
+Invalidação consistente por geração: cada espaço tem um contador no próprio
+armazém e as chaves gravadas levam a geração atual. invalidar() incrementa
+o contador (operação atômica no SQLite e no Redis), e a próxima leitura de
+qualquer réplica já procura na geração nova. Nada antigo é servido, sem
+precisar apagar chave por chave; as entradas órfãs saem pelo TTL.
+
+Backends (mesma interface: ler, gravar, apagar, geracao, invalidar):
+    EstadoLocal — SQLite com trava de arquivo; vale para vários processos no
+                  mesmo host. Padrão .dados/estado.sqlite3; ESTADO_DB troca o
+                  caminho.
+    EstadoRedis — qualquer cliente compatível com Redis (get, set com ex,
+                  delete, incr). ESTADO_URL=redis://... usa o pacote `redis`,
+                  se instalado; sem ele, fica o local (com aviso).
+
+Uso:
+    from core.estado import CacheCompartilhado, obter_estado
+
+    configs = CacheCompartilhado(obter_estado(), "config_usuario", ttl=300)
+    cfg = configs.obter(email)               # None se ausente/expirado
+    configs.definir(email, {"nome_empresa": "..."})
+    configs.invalidar()                      # todas as réplicas, de uma vez
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Protocol
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_CAMINHO_PADRAO = Path(__file__).parent.parent / ".dados" / "estado.sqlite3"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS estado (
+    chave    TEXT PRIMARY KEY,
+    valor    TEXT NOT NULL,
+    expira_em REAL
+);
+CREATE TABLE IF NOT EXISTS geracoes (
+    espaco  TEXT PRIMARY KEY,
+    geracao INTEGER NOT NULL
+);
+"""
+
+# A cada tantas gravações, o EstadoLocal apaga as entradas expiradas
+_LIMPEZA_A_CADA = 200
+
+
+class EstadoCompartilhado(Protocol):
+    def ler(self, chave: str) -> str | None: ...
+    def gravar(self, chave: str, valor: str, ttl: float | None = None) -> None: ...
+    def apagar(self, chave: str) -> None: ...
+    def geracao(self, espaco: str) -> int: ...
+    def invalidar(self, espaco: str) -> int: ...
+
+
+class EstadoLocal:
+    """Armazém SQLite (WAL); processos do mesmo host compartilham o arquivo. Thread-safe."""
+
+    def __init__(self, caminho: Path | str):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._gravacoes = 0
+        con = self._conectar()
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_ESQUEMA)
+        finally:
+            con.close()
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=30.0, isolation_level=None)
+
+    def ler(self, chave: str) -> str | None:
+        con = self._conectar()
+        try:
+            linha = con.execute(
+                "SELECT valor FROM estado WHERE chave = ? AND (expira_em IS NULL OR expira_em > ?)",
+                (chave, time.time()),
+            ).fetchone()
+        finally:
+            con.close()
+        return linha[0] if linha else None
+
+    def gravar(self, chave: str, valor: str, ttl: float | None = None) -> None:
+        agora = time.time()
+        expira_em = agora + ttl if ttl else None
+        con = self._conectar()
+        try:
+            con.execute(
+                "INSERT INTO estado (chave, valor, expira_em) VALUES (?, ?, ?) "
+                "ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor, expira_em = excluded.expira_em",
+                (chave, valor, expira_em),
+            )
+            self._gravacoes += 1
+            if self._gravacoes % _LIMPEZA_A_CADA == 0:
+                con.execute("DELETE FROM estado WHERE expira_em IS NOT NULL AND expira_em <= ?", (agora,))
+        finally:
+            con.close()
+
+    def apagar(self, chave: str) -> None:
+        con = self._conectar()
+        try:
+            con.execute("DELETE FROM estado WHERE chave = ?", (chave,))
+        finally:
+            con.close()
+
+    def geracao(self, espaco: str) -> int:
+        con = self._conectar()
+        try:
+            linha = con.execute("SELECT geracao FROM geracoes WHERE espaco = ?", (espaco,)).fetchone()
+        finally:
+            con.close()
+        return linha[0] if linha else 0
+
+    def invalidar(self, espaco: str) -> int:
+        con = self._conectar()
+        try:
+            linha = con.execute(
+                "INSERT INTO geracoes (espaco, geracao) VALUES (?, 1) "
+                "ON CONFLICT (espaco) DO UPDATE SET geracao = geracao + 1 RETURNING geracao",
+                (espaco,),
+            ).fetchone()
+        finally:
+            con.close()
+        return linha[0]
+
+
+class EstadoRedis:
+    """Armazém sobre um cliente compatível com Redis (redis-py ou equivalente)."""
+
+    def __init__(self, cliente, prefixo: str = "paulobio:"):
+        self.cliente = cliente
+        self.prefixo = prefixo
+
+    def ler(self, chave: str) -> str | None:
+        valor = self.cliente.get(self.prefixo + chave)
+        return valor.decode("utf-8") if isinstance(valor, bytes) else valor
+
+    def gravar(self, chave: str, valor: str, ttl: float | None = None) -> None:
+        self.cliente.set(self.prefixo + chave, valor, ex=max(1, int(ttl)) if ttl else None)
+
+    def apagar(self, chave: str) -> None:
+        self.cliente.delete(self.prefixo + chave)
+
+    def geracao(self, espaco: str) -> int:
+        return int(self.ler(f"geracao:{espaco}") or 0)
+
+    def invalidar(self, espaco: str) -> int:
+        return int(self.cliente.incr(f"{self.prefixo}geracao:{espaco}"))
+
+
+class CacheCompartilhado:
+    """
+    Valores JSON num espaço de nomes do armazém. Falhas do armazém nunca
+    quebram quem chama: leitura vira miss e gravação é descartada (com log).
+    """
+
+    def __init__(self, estado: EstadoCompartilhado, espaco: str, ttl: float | None = None):
+        self.estado = estado
+        self.espaco = espaco
+        self.ttl = ttl
+
+    def _chave(self, chave: str) -> str:
+        return f"{self.espaco}:{self.estado.geracao(self.espaco)}:{chave}"
+
+    def obter(self, chave: str) -> Any | None:
+        try:
+            bruto = self.estado.ler(self._chave(chave))
+            return json.loads(bruto) if bruto is not None else None
+        except Exception as e:
+            logger.warning("Estado compartilhado indisponível na leitura de %s: %s", self.espaco, e)
+            return None
+
+    def definir(self, chave: str, valor: Any, ttl: float | None = None) -> None:
+        try:
+            bruto = json.dumps(valor, ensure_ascii=False, default=str)
+            self.estado.gravar(self._chave(chave), bruto, ttl if ttl is not None else self.ttl)
+        except Exception as e:
+            logger.warning("Estado compartilhado indisponível na gravação de %s: %s", self.espaco, e)
+
+    def remover(self, chave: str) -> None:
+        try:
+            self.estado.apagar(self._chave(chave))
+        except Exception as e:
+            logger.warning("Estado compartilhado indisponível ao remover de %s: %s", self.espaco, e)
+
+    def invalidar(self) -> None:
+        """Descarta todo o espaço, em todas as réplicas."""
+        try:
+            geracao = self.estado.invalidar(self.espaco)
+            logger.info("Cache compartilhado %s invalidado (geração %d).", self.espaco, geracao)
+        except Exception as e:
+            logger.warning("Estado compartilhado indisponível ao invalidar %s: %s", self.espaco, e)
+
+
+_estado: EstadoCompartilhado | None = None
+_lock_estado = threading.Lock()
+
+
+def _redis(url: str) -> EstadoRedis | None:
+    try:
+        import redis
+    except ImportError:
+        logger.warning("ESTADO_URL aponta para Redis, mas o pacote `redis` não está instalado; usando SQLite local.")
+        return None
+    return EstadoRedis(redis.Redis.from_url(url, socket_timeout=2.0))
+
+
+def configurar_estado(estado: EstadoCompartilhado | None) -> None:
+    """Troca o armazém do processo (testes, benchmarks); None volta ao padrão do ambiente."""
+    global _estado
+    with _lock_estado:
+        _estado = estado
+
+
+def obter_estado(caminho: Path | str | None = None) -> EstadoCompartilhado:
+    """Armazém único do processo; ESTADO_URL (Redis) ou o SQLite local."""
+    global _estado
+    with _lock_estado:
+        if _estado is None:
+            url = os.environ.get("ESTADO_URL", "")
+            if caminho is None and url.startswith(("redis://", "rediss://")):
+                _estado = _redis(url)
+                if _estado is not None:
+                    logger.info("Estado compartilhado no Redis (%s).", url.split("@")[-1])
+            if _estado is None:
+                if caminho is None:
+                    caminho = os.environ.get("ESTADO_DB") or _CAMINHO_PADRAO
+                _estado = EstadoLocal(caminho)
+                logger.info("Estado compartilhado em %s.", _estado.caminho)
+        return _estado
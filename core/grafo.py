@@ -0,0 +1,236 @@
+"""
+core/grafo.py
+Grafo de dependências (DAG) dos passos de IA da análise.
+
+Cada passo declara os campos de `dados` que lê (entradas) e os que escreve
+(saídas); as arestas saem daí — passo_6 depende do Serasa (score_serasa), do
+contábil (periodos, receita_bruta...) e da ficha (ref_locaticias) porque lê
+esses campos. Ao executar um passo guarda-se a impressão das entradas usadas;
+quando um campo muda (o analista corrige o CNPJ, o aluguel, o score),
+invalidados() aponta os passos cuja impressão não bate mais e os que
+dependem deles, e reexecutar() roda só esses, camada a camada — passos
+independentes da mesma camada em paralelo. Um dependente cujas entradas não
+mudaram depois de rodar os de cima é reaproveitado sem chamar a IA; os PDFs
+que não mudaram saem do cache (core/cache.py).
+
+Uso:
+    from core.grafo import GRAFO
+
+    impressoes[passo] = GRAFO.no(passo).impressao(dados)     # ao executar
+    passos = GRAFO.invalidados(dados, impressoes)             # a cada rerun
+    r = GRAFO.reexecutar(passos, dados, impressoes, executar)
+    dados.update(r.saidas); impressoes.update(r.impressoes)
+"""
+
+import hashlib
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Mapping
+
+from core.logger import get_logger
+from core.models import (
+    CAMPOS_FINANCEIROS,
+    CertidoesModel,
+    ContabilModel,
+    ContratoModel,
+    FiadorModel,
+    PatrimonioSociosModel,
+    PropostaModel,
+    ReferenciasModel,
+    SerasaModel,
+)
+from core.progresso import despachar, submeter
+
+logger = get_logger(__name__)
+
+# Passos de uma mesma camada rodando ao mesmo tempo (cada um já paraleliza os PDFs)
+_MAX_PASSOS_PARALELOS = 3
+
+# Espera pelos passos da camada repassando o progresso à thread dona (s)
+_INTERVALO_PROGRESSO = 0.2
+
+
+@dataclass(frozen=True)
+class NoPasso:
+    passo: str
+    titulo: str
+    metodo: str                           # método do AIService; recebe (arquivos, *argumentos)
+    entradas: tuple[str, ...] = ()        # campos de `dados` que influenciam o resultado
+    saidas: tuple[str, ...] = ()          # campos de `dados` que o passo preenche
+    parametros: tuple[str, ...] | None = ()  # argumentos do método; None = o dict `dados` inteiro
+
+    def argumentos(self, dados: Mapping[str, Any]) -> tuple:
+        if self.parametros is None:
+            return (dict(dados),)
+        return tuple(dados.get(c) or "" for c in self.parametros)
+
+    def impressao(self, dados: Mapping[str, Any]) -> str:
+        """Hash dos valores atuais das entradas (muda se qualquer uma mudar)."""
+        valores = [dados.get(c, "") for c in self.entradas]
+        corpo = json.dumps(valores, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(corpo.encode()).hexdigest()[:16]
+
+
+@dataclass
+class Reexecucao:
+    saidas: dict[str, Any] = field(default_factory=dict)        # campos atualizados
+    impressoes: dict[str, str] = field(default_factory=dict)    # passo → impressão usada
+    executados: list[str] = field(default_factory=list)
+    reaproveitados: list[str] = field(default_factory=list)     # entradas iguais após os de cima
+    falhas: list[str] = field(default_factory=list)
+
+
+class GrafoPassos:
+    """DAG de NoPasso; as arestas ligam quem escreve um campo a quem o lê."""
+
+    def __init__(self, nos: Iterable[NoPasso]):
+        self._nos: dict[str, NoPasso] = {}
+        for no in nos:
+            if no.passo in self._nos:
+                raise ValueError(f"Passo duplicado no grafo: {no.passo}")
+            self._nos[no.passo] = no
+        self._acima: dict[str, set[str]] = {
+            p: {q for q, outro in self._nos.items() if q != p and set(outro.saidas) & set(no.entradas)}
+            for p, no in self._nos.items()
+        }
+        self._ordem = self._ordenar()
+
+    def _ordenar(self) -> list[str]:
+        """Ordem topológica estável (ordem de declaração entre independentes)."""
+        ordem: list[str] = []
+        restantes = list(self._nos)
+        while restantes:
+            livres = [p for p in restantes if self._acima[p] <= set(ordem)]
+            if not livres:
+                raise ValueError(f"Ciclo de dependências entre os passos: {', '.join(restantes)}")
+            ordem += livres
+            restantes = [p for p in restantes if p not in livres]
+        return ordem
+
+    def __contains__(self, passo: str) -> bool:
+        return passo in self._nos
+
+    def no(self, passo: str) -> NoPasso:
+        return self._nos[passo]
+
+    def dependencias(self, passo: str) -> set[str]:
+        """Passos acima de `passo` (que escrevem suas entradas), direta ou indiretamente."""
+        acima: set[str] = set()
+        fronteira = [passo]
+        while fronteira:
+            for q in self._acima[fronteira.pop()]:
+                if q not in acima:
+                    acima.add(q)
+                    fronteira.append(q)
+        return acima
+
+    def dependentes(self, passo: str) -> set[str]:
+        """Passos abaixo de `passo` (que leem o que ele escreve), direta ou indiretamente."""
+        return {p for p in self._nos if passo in self.dependencias(p)}
+
+    def invalidados(self, dados: Mapping[str, Any], impressoes: Mapping[str, str]) -> list[str]:
+        """
+        Passos já executados (com impressão registrada) cujas entradas mudaram,
+        mais os executados que dependem deles, em ordem topológica.
+        """
+        diretos = {p for p, imp in impressoes.items() if p in self._nos and self._nos[p].impressao(dados) != imp}
+        afetados = set(diretos)
+        for p in diretos:
+            afetados |= self.dependentes(p) & set(impressoes)
+        return [p for p in self._ordem if p in afetados]
+
+    def camadas(self, passos: Iterable[str]) -> list[list[str]]:
+        """Agrupa `passos` em camadas: cada uma só depende das anteriores."""
+        pendentes = set(passos)
+        camadas: list[list[str]] = []
+        while pendentes:
+            camada = [
+                p for p in self._ordem
+                if p in pendentes and not (self.dependencias(p) & pendentes)
+            ]
+            camadas.append(camada)
+            pendentes -= set(camada)
+        return camadas
+
+    def reexecutar(
+        self,
+        passos: Iterable[str],
+        dados: Mapping[str, Any],
+        impressoes: Mapping[str, str],
+        executar: Callable[[NoPasso, dict[str, Any]], dict],
+    ) -> Reexecucao:
+        """
+        Roda `passos` camada a camada com `executar(no, dados)`; cada camada vê
+        as saídas das anteriores. Um passo cujas entradas voltaram a bater com
+        a impressão registrada é reaproveitado sem rodar. Falha (exceção ou
+        resultado vazio) mantém as saídas antigas do passo.
+        """
+        atual = dict(dados)
+        r = Reexecucao()
+        for camada in self.camadas(passos):
+            rodar = []
+            for p in camada:
+                if self._nos[p].impressao(atual) == impressoes.get(p):
+                    r.reaproveitados.append(p)
+                else:
+                    rodar.append(p)
+            if not rodar:
+                continue
+            impressoes_usadas = {p: self._nos[p].impressao(atual) for p in rodar}
+            with ThreadPoolExecutor(max_workers=min(_MAX_PASSOS_PARALELOS, len(rodar))) as pool:
+                futuros = {p: submeter(pool, executar, self._nos[p], dict(atual)) for p in rodar}
+                aguardando = set(futuros.values())
+                while aguardando:
+                    _, aguardando = wait(aguardando, timeout=_INTERVALO_PROGRESSO, return_when=FIRST_COMPLETED)
+                    despachar()
+            for p, futuro in futuros.items():
+                try:
+                    saida = futuro.result()
+                except Exception:
+                    logger.exception("Reexecução de %s falhou.", p)
+                    saida = None
+                if not saida:
+                    r.falhas.append(p)
+                    continue
+                atual.update(saida)
+                r.saidas.update(saida)
+                r.impressoes[p] = impressoes_usadas[p]
+                r.executados.append(p)
+        logger.info(
+            "Reexecução: %d passo(s) executado(s), %d reaproveitado(s), %d falha(s).",
+            len(r.executados), len(r.reaproveitados), len(r.falhas),
+        )
+        return r
+
+
+def _campos(*modelos) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(c for m in modelos for c in m.model_fields))
+
+
+# Entradas de passo_6 = tudo que analisar_patrimonio_socios lê de `dados`
+_ENTRADAS_PATRIMONIO: tuple[str, ...] = tuple(dict.fromkeys((
+    "empresa", "data_abertura", "capital_social", "aluguel",
+    "score_serasa", "risco_serasa", "mapeamento_dividas", "ref_locaticias",
+    "periodos", *CAMPOS_FINANCEIROS, "analise_executiva",
+)))
+
+# Passos 0, 1 e referências só leem os PDFs: são fontes do grafo e nunca
+# ficam desatualizados. aluguel/iptu não entram no passo 5 — a extração
+# contábil não depende deles (o comprometimento é calculado na tela).
+GRAFO = GrafoPassos((
+    NoPasso("passo_0_contrato", "Contrato Social", "extrair_contrato", saidas=_campos(ContratoModel)),
+    NoPasso("passo_1_proposta", "Proposta", "extrair_proposta", saidas=_campos(PropostaModel)),
+    NoPasso("passo_2_referencias", "Referências", "extrair_referencias", saidas=_campos(ReferenciasModel)),
+    NoPasso("passo_2_fiador", "Fiador", "analisar_fiador",
+            entradas=("aluguel",), saidas=_campos(FiadorModel), parametros=("aluguel",)),
+    NoPasso("passo_3_serasa", "Serasa", "mapear_serasa",
+            entradas=("empresa", "cnpj"), saidas=_campos(SerasaModel), parametros=("empresa", "cnpj")),
+    NoPasso("passo_4_certidoes", "Certidões", "auditar_certidoes",
+            entradas=("empresa", "cnpj"), saidas=_campos(CertidoesModel), parametros=("empresa", "cnpj")),
+    NoPasso("passo_5_contabil", "Contábil", "auditar_contabil",
+            entradas=("empresa", "cnpj"), saidas=_campos(ContabilModel),
+            parametros=("empresa", "cnpj", "aluguel", "iptu")),
+    NoPasso("passo_6_patrimonio", "IR Sócios", "analisar_patrimonio_socios",
+            entradas=_ENTRADAS_PATRIMONIO, saidas=_campos(PatrimonioSociosModel), parametros=None),
+))
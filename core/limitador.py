@@ -0,0 +1,213 @@
+"""
+core/limitador.py
+Limitador de requisições compartilhado pelo processo (todas as sessões Streamlit).
+
+A chave do OpenRouter é única para todos os analistas; sem coordenação, passos
+rodando ao mesmo tempo estouram o limite do provedor (HTTP 429). O Limitador
+combina:
+  - token bucket (requisições/minuto, com rajada),
+  - semáforo de concorrência (requisições em voo),
+  - fila justa por usuário (round-robin: quem envia 10 PDFs não trava os demais),
+  - pausa global quando o provedor responde 429 com Retry-After.
+
+Uso:
+    from core.limitador import obter_limitador
+    limitador = obter_limitador("openrouter", rpm=60, concorrencia=8)
+    with limitador.slot(usuario="ana@paulobio.com.br"):
+        client.chat.completions.create(...)
+    limitador.pausar(retry_after)   # após um 429
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Iterator, Mapping
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+RPM_PADRAO = 60
+CONCORRENCIA_PADRAO = 8
+ESPERA_MAXIMA_PADRAO = 300.0
+
+
+class FilaEsgotada(TimeoutError):
+    """A requisição não conseguiu vaga dentro do tempo máximo de espera."""
+
+
+class Limitador:
+    """
+    Token bucket + semáforo com fila justa por usuário. Thread-safe.
+    `relogio` é injetável para testes (padrão: time.monotonic).
+    """
+
+    def __init__(
+        self,
+        rpm: float = RPM_PADRAO,
+        concorrencia: int = CONCORRENCIA_PADRAO,
+        rajada: int | None = None,
+        relogio: Callable[[], float] = time.monotonic,
+    ):
+        if rpm <= 0 or concorrencia <= 0:
+            raise ValueError("rpm e concorrencia devem ser positivos.")
+        self.taxa = rpm / 60.0                       # tokens por segundo
+        self.capacidade = float(rajada or max(1, min(concorrencia, int(rpm))))
+        self.concorrencia = concorrencia
+        self._relogio = relogio
+        self._tokens = self.capacidade
+        self._ultimo = relogio()
+        self._em_voo = 0
+        self._pausado_ate = 0.0
+        self._cond = threading.Condition()
+        self._filas: dict[str, deque] = {}
+        self._ordem: deque[str] = deque()            # usuários com pedidos, em round-robin
+
+    # ─── estado interno (sempre com self._cond adquirido) ─────────────────────
+
+    def _reabastecer(self, agora: float) -> None:
+        if agora <= self._ultimo:
+            return
+        self._tokens = min(self.capacidade, self._tokens + (agora - self._ultimo) * self.taxa)
+        self._ultimo = agora
+
+    def _vez_de(self, ticket: object) -> bool:
+        return bool(self._ordem) and self._filas[self._ordem[0]][0] is ticket
+
+    def _espera_necessaria(self, agora: float) -> float | None:
+        """0 = pode liberar já; >0 = segundos até haver token; None = aguardar liberação."""
+        if agora < self._pausado_ate:
+            return self._pausado_ate - agora
+        if self._em_voo >= self.concorrencia:
+            return None
+        if self._tokens < 1.0:
+            return (1.0 - self._tokens) / self.taxa
+        return 0.0
+
+    def _conceder(self, usuario: str) -> None:
+        self._filas[usuario].popleft()
+        self._ordem.popleft()
+        if self._filas[usuario]:
+            self._ordem.append(usuario)              # volta para o fim da rodada
+        else:
+            del self._filas[usuario]
+        self._tokens -= 1.0
+        self._em_voo += 1
+
+    def _desistir(self, usuario: str, ticket: object) -> None:
+        fila = self._filas[usuario]
+        fila.remove(ticket)
+        if not fila:
+            del self._filas[usuario]
+            self._ordem.remove(usuario)
+
+    # ─── API pública ──────────────────────────────────────────────────────────
+
+    def adquirir(self, usuario: str = "", timeout: float | None = ESPERA_MAXIMA_PADRAO) -> None:
+        """Bloqueia até a vez de `usuario` com token e vaga livres. Levanta FilaEsgotada."""
+        ticket = object()
+        inicio = self._relogio()
+        with self._cond:
+            if usuario not in self._filas:
+                self._filas[usuario] = deque()
+                self._ordem.append(usuario)
+            self._filas[usuario].append(ticket)
+
+            while True:
+                agora = self._relogio()
+                self._reabastecer(agora)
+                espera = self._espera_necessaria(agora) if self._vez_de(ticket) else None
+                if espera == 0.0:
+                    self._conceder(usuario)
+                    self._cond.notify_all()
+                    break
+                if timeout is not None:
+                    restante = timeout - (agora - inicio)
+                    if restante <= 0:
+                        self._desistir(usuario, ticket)
+                        self._cond.notify_all()
+                        raise FilaEsgotada(f"Sem vaga para requisição à IA após {timeout:.0f}s.")
+                    espera = restante if espera is None else min(espera, restante)
+                self._cond.wait(espera)
+
+        espera_total = self._relogio() - inicio
+        if espera_total > 1.0:
+            logger.info("Requisição de '%s' aguardou %.1fs na fila da IA.", usuario or "anônimo", espera_total)
+
+    def liberar(self) -> None:
+        with self._cond:
+            self._em_voo -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, usuario: str = "", timeout: float | None = ESPERA_MAXIMA_PADRAO) -> Iterator[None]:
+        self.adquirir(usuario, timeout)
+        try:
+            yield
+        finally:
+            self.liberar()
+
+    def pausar(self, segundos: float) -> None:
+        """
+        Suspende novas liberações por `segundos` (Retry-After do provedor) e
+        limita o bucket a um token: a retomada sonda o provedor com uma única
+        requisição em vez de voltar em rajada.
+        """
+        with self._cond:
+            agora = self._relogio()
+            self._pausado_ate = max(self._pausado_ate, agora + max(0.0, segundos))
+            self._tokens = min(self._tokens, 1.0)
+            self._ultimo = max(self._ultimo, self._pausado_ate)
+            self._cond.notify_all()
+        logger.warning("Limite do provedor atingido — pausando requisições por %.1fs.", segundos)
+
+    @property
+    def em_voo(self) -> int:
+        with self._cond:
+            return self._em_voo
+
+    @property
+    def na_fila(self) -> int:
+        with self._cond:
+            return sum(len(f) for f in self._filas.values())
+
+
+def retry_after(headers: Mapping[str, str] | None) -> float | None:
+    """
+    Segundos indicados pelo provedor em `retry-after-ms` / `retry-after`
+    (número ou data HTTP). None quando ausente ou inválido.
+    """
+    if not headers:
+        return None
+    valor = headers.get("retry-after-ms")
+    if valor is not None:
+        try:
+            return max(0.0, float(valor) / 1000.0)
+        except ValueError:
+            pass
+    valor = headers.get("retry-after")
+    if valor is None:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_limitadores: dict[str, Limitador] = {}
+_lock_registro = threading.Lock()
+
+
+def obter_limitador(nome: str, rpm: float = RPM_PADRAO, concorrencia: int = CONCORRENCIA_PADRAO) -> Limitador:
+    """Limitador único por `nome` no processo; os parâmetros valem na primeira chamada."""
+    with _lock_registro:
+        if nome not in _limitadores:
+            _limitadores[nome] = Limitador(rpm=rpm, concorrencia=concorrencia)
+            logger.info("Limitador '%s' criado: %s req/min, %d simultâneas.", nome, rpm, concorrencia)
+        return _limitadores[nome]
@@ -0,0 +1,331 @@
+"""
+core/metricas.py
+Métricas das chamadas à IA por passo e modelo: latência, tokens, custo,
+tamanho do payload e acertos de cache.
+
+Dois destinos:
+  - agregado em memória, compartilhado pelo processo (p95 para o hedging e
+    resumo rápido da instância atual);
+  - arquivos JSONL locais (um evento por linha, um arquivo por dia), que
+    sobrevivem a restarts e alimentam a visão "Consumo da IA" em Configurações.
+O caminho-base padrão é logs/metricas_ia.jsonl e os eventos vão para
+logs/metricas_ia-AAAA-MM-DD.jsonl; METRICAS_IA_ARQUIVO no ambiente troca o
+caminho-base ("" desliga). Arquivos com mais de METRICAS_IA_RETENCAO_DIAS
+(padrão 90) são apagados na virada do dia. A leitura só abre os dias dentro
+do período pedido, e os dias já fechados ficam em memória depois do
+primeiro parse: a cada rerun, só o arquivo de hoje é relido.
+
+Uso:
+    from core.metricas import registrar_chamada, registrar_cache, resumo_metricas
+    registrar_chamada("passo_3_serasa", "google/gemini-2.5-flash", 4.2,
+                      tokens_entrada=1800, tokens_saida=350, custo=0.0012,
+                      bytes_requisicao=1_400_000, bytes_base64=1_390_000)
+    registrar_cache("passo_3_serasa", acerto=True)
+    df = resumo_historico(dias=30)
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Latências recentes mantidas por passo/modelo (para média e percentis)
+_JANELA_LATENCIAS = 200
+
+_ARQUIVO_PADRAO = Path(__file__).parent.parent / "logs" / "metricas_ia.jsonl"
+_RETENCAO_DIAS = int(os.environ.get("METRICAS_IA_RETENCAO_DIAS", "90"))
+
+
+def _caminho_sink_inicial() -> Path | None:
+    valor = os.environ.get("METRICAS_IA_ARQUIVO")
+    if valor is None:
+        return _ARQUIVO_PADRAO
+    return Path(valor) if valor else None
+
+
+@dataclass
+class _Agregado:
+    chamadas: int = 0
+    falhas: int = 0
+    tokens_entrada: int = 0
+    tokens_saida: int = 0
+    custo: float = 0.0
+    bytes_requisicao: int = 0
+    bytes_base64: int = 0
+    latencias: deque = field(default_factory=lambda: deque(maxlen=_JANELA_LATENCIAS))
+
+
+_agregados: dict[tuple[str, str], _Agregado] = {}
+_cache: dict[str, list[int]] = {}        # passo → [acertos, faltas]
+_lock = threading.Lock()
+_sink: Path | None = _caminho_sink_inicial()
+_sink_falhou = False
+_dia_gravado: date | None = None
+# arquivo → ((mtime_ns, tamanho), eventos): dias fechados não são relidos
+_lidos: dict[Path, tuple[tuple[int, int], list[dict[str, Any]]]] = {}
+
+
+def configurar_sink(caminho: Path | str | None) -> None:
+    """Troca o arquivo JSONL de eventos (None desliga)."""
+    global _sink, _sink_falhou, _dia_gravado
+    with _lock:
+        _sink = Path(caminho) if caminho else None
+        _sink_falhou = False
+        _dia_gravado = None
+        _lidos.clear()
+
+
+def _arquivo_do_dia(base: Path, dia: date) -> Path:
+    return base.with_name(f"{base.stem}-{dia.isoformat()}{base.suffix}")
+
+
+def _arquivos_diarios(base: Path) -> list[tuple[date, Path]]:
+    """Arquivos diários do caminho-base, do mais antigo ao mais recente."""
+    arquivos = []
+    for caminho in base.parent.glob(f"{base.stem}-????-??-??{base.suffix}"):
+        try:
+            dia = date.fromisoformat(caminho.stem[len(base.stem) + 1:])
+        except ValueError:
+            continue
+        arquivos.append((dia, caminho))
+    return sorted(arquivos)
+
+
+def _aplicar_retencao(base: Path, hoje: date) -> None:
+    limite = hoje - timedelta(days=_RETENCAO_DIAS)
+    for dia, caminho in _arquivos_diarios(base):
+        if dia < limite:
+            caminho.unlink(missing_ok=True)
+            logger.info("Métricas de %s apagadas (retenção de %d dias).", dia, _RETENCAO_DIAS)
+
+
+def _gravar(evento: dict[str, Any]) -> None:
+    """Acrescenta o evento ao JSONL. Falha de disco não interrompe a análise (loga uma vez)."""
+    global _sink_falhou, _dia_gravado
+    agora = datetime.now()
+    evento = {"ts": agora.isoformat(timespec="seconds"), **evento}
+    linha = json.dumps(evento, ensure_ascii=False) + "\n"
+    with _lock:
+        if _sink is None:
+            return
+        try:
+            _sink.parent.mkdir(parents=True, exist_ok=True)
+            if _dia_gravado != agora.date():
+                _dia_gravado = agora.date()
+                _aplicar_retencao(_sink, _dia_gravado)
+            with open(_arquivo_do_dia(_sink, agora.date()), "a", encoding="utf-8") as f:
+                f.write(linha)
+        except OSError as e:
+            if not _sink_falhou:
+                logger.warning("Não foi possível gravar métricas em %s: %s", _sink, e)
+                _sink_falhou = True
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    """Percentil por vizinho mais próximo; 0.0 sem amostras."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[idx]
+
+
+def registrar_chamada(
+    passo: str | None,
+    modelo: str,
+    latencia: float,
+    tokens_entrada: int = 0,
+    tokens_saida: int = 0,
+    custo: float | None = None,
+    sucesso: bool = True,
+    bytes_requisicao: int = 0,
+    bytes_base64: int = 0,
+    usuario: str = "",
+    primeiro_token: float | None = None,
+) -> None:
+    """
+    Registra uma chamada: latência em segundos (total e até o primeiro token
+    do streaming), custo em USD (se o provedor informar), bytes do corpo da
+    requisição e quanto disso é PDF em base64.
+    """
+    chave = (passo or "-", modelo)
+    with _lock:
+        ag = _agregados.setdefault(chave, _Agregado())
+        ag.chamadas += 1
+        ag.falhas += 0 if sucesso else 1
+        ag.tokens_entrada += tokens_entrada
+        ag.tokens_saida += tokens_saida
+        ag.custo += custo or 0.0
+        ag.bytes_requisicao += bytes_requisicao
+        ag.bytes_base64 += bytes_base64
+        if sucesso:
+            # Timeouts/erros ficam fora da janela: distorceriam o p95 usado no hedging
+            ag.latencias.append(latencia)
+
+    logger.info(
+        "IA %s [%s]: %.2fs (1º token %s), %d KB enviados (%d KB base64), %d+%d tokens, custo %s%s",
+        chave[0], modelo, latencia,
+        f"{primeiro_token:.2f}s" if primeiro_token is not None else "n/d",
+        bytes_requisicao // 1024, bytes_base64 // 1024,
+        tokens_entrada, tokens_saida,
+        f"US$ {custo:.5f}" if custo is not None else "n/d",
+        "" if sucesso else " (falha)",
+    )
+    _gravar({
+        "tipo": "chamada", "passo": chave[0], "modelo": modelo, "usuario": usuario,
+        "latencia": round(latencia, 3), "sucesso": sucesso,
+        "primeiro_token": round(primeiro_token, 3) if primeiro_token is not None else None,
+        "tokens_entrada": tokens_entrada, "tokens_saida": tokens_saida, "custo": custo,
+        "bytes_requisicao": bytes_requisicao, "bytes_base64": bytes_base64,
+    })
+
+
+def registrar_cache(passo: str, acerto: bool, usuario: str = "") -> None:
+    """Registra uma consulta ao cache de análises (acerto = resultado reaproveitado)."""
+    with _lock:
+        contagem = _cache.setdefault(passo, [0, 0])
+        contagem[0 if acerto else 1] += 1
+    logger.debug("Cache %s: %s", passo, "acerto" if acerto else "falta")
+    _gravar({"tipo": "cache", "passo": passo, "usuario": usuario, "acerto": acerto})
+
+
+def latencia_percentil(passo: str | None, modelo: str, p: float = 95, minimo_amostras: int = 1) -> float | None:
+    """Percentil `p` das latências recentes (chamadas com sucesso); None com menos de `minimo_amostras`."""
+    with _lock:
+        ag = _agregados.get((passo or "-", modelo))
+        amostras = list(ag.latencias) if ag else []
+    return _percentil(amostras, p) if amostras and len(amostras) >= minimo_amostras else None
+
+
+def resumo_metricas() -> list[dict[str, Any]]:
+    """Uma linha por passo/modelo desta instância, ordenada por custo total (maior primeiro)."""
+    with _lock:
+        itens = [(chave, ag, list(ag.latencias)) for chave, ag in _agregados.items()]
+        cache = {p: tuple(c) for p, c in _cache.items()}
+
+    linhas = []
+    for (passo, modelo), ag, lat in itens:
+        acertos, faltas = cache.get(passo, (0, 0))
+        linhas.append({
+            "passo": passo,
+            "modelo": modelo,
+            "chamadas": ag.chamadas,
+            "falhas": ag.falhas,
+            "latencia_media": sum(lat) / len(lat) if lat else 0.0,
+            "latencia_p95": _percentil(lat, 95),
+            "tokens_entrada": ag.tokens_entrada,
+            "tokens_saida": ag.tokens_saida,
+            "custo_total": ag.custo,
+            "bytes_requisicao": ag.bytes_requisicao,
+            "bytes_base64": ag.bytes_base64,
+            "cache_acertos": acertos,
+            "cache_faltas": faltas,
+        })
+    return sorted(linhas, key=lambda linha: (-linha["custo_total"], linha["passo"]))
+
+
+def _ler_arquivo(caminho: Path) -> list[dict[str, Any]]:
+    """Eventos de um arquivo; reaproveita o parse anterior se ele não mudou."""
+    try:
+        info = caminho.stat()
+    except FileNotFoundError:
+        return []
+    versao = (info.st_mtime_ns, info.st_size)
+    with _lock:
+        lido = _lidos.get(caminho)
+    if lido is not None and lido[0] == versao:
+        return lido[1]
+    eventos = []
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            try:
+                eventos.append(json.loads(linha))
+            except ValueError:
+                continue
+    with _lock:
+        _lidos[caminho] = (versao, eventos)
+    return eventos
+
+
+def ler_eventos(dias: int | None = None) -> list[dict[str, Any]]:
+    """
+    Eventos gravados (dos últimos `dias`, se informado). Só abre os arquivos
+    diários do período; linhas corrompidas são ignoradas.
+    """
+    with _lock:
+        base = _sink
+    if base is None or not base.parent.exists():
+        return []
+    agora = datetime.now()
+    corte = (agora - timedelta(days=dias)).isoformat(timespec="seconds") if dias else ""
+    primeiro_dia = (agora - timedelta(days=dias)).date() if dias else date.min
+
+    arquivos = [caminho for dia, caminho in _arquivos_diarios(base) if dia >= primeiro_dia]
+    # Arquivo único de antes da divisão por dia: só se foi alterado dentro do período
+    if base.exists() and datetime.fromtimestamp(base.stat().st_mtime).date() >= primeiro_dia:
+        arquivos.insert(0, base)
+
+    eventos = []
+    for caminho in arquivos:
+        eventos.extend(e for e in _ler_arquivo(caminho) if e.get("ts", "") >= corte)
+    return eventos
+
+
+def resumo_historico(dias: int | None = 30):
+    """
+    Agrega os eventos do JSONL por passo/modelo (pd.DataFrame): chamadas,
+    falhas, latência média/p95, tokens, custo, MB enviados e taxa de acerto
+    do cache do passo. DataFrame vazio sem eventos.
+    """
+    import pandas as pd
+
+    eventos = pd.DataFrame(ler_eventos(dias))
+    colunas = [
+        "passo", "modelo", "chamadas", "falhas", "latencia_media", "latencia_p95",
+        "tokens_entrada", "tokens_saida", "custo_total", "mb_enviados", "mb_base64", "cache_acerto_pct",
+    ]
+    if eventos.empty or "tipo" not in eventos:
+        return pd.DataFrame(columns=colunas)
+
+    chamadas = eventos[eventos["tipo"] == "chamada"]
+    if chamadas.empty:
+        return pd.DataFrame(columns=colunas)
+    sucesso = chamadas[chamadas["sucesso"].astype(bool)]
+    grupos = chamadas.groupby(["passo", "modelo"])
+    resumo = pd.DataFrame({
+        "chamadas": grupos.size(),
+        "falhas": grupos["sucesso"].apply(lambda s: int((~s.astype(bool)).sum())),
+        "tokens_entrada": grupos["tokens_entrada"].sum(),
+        "tokens_saida": grupos["tokens_saida"].sum(),
+        "custo_total": grupos["custo"].sum(min_count=1).fillna(0.0),
+        "mb_enviados": grupos["bytes_requisicao"].sum() / 1e6,
+        "mb_base64": grupos["bytes_base64"].sum() / 1e6,
+    })
+    lat = sucesso.groupby(["passo", "modelo"])["latencia"]
+    resumo["latencia_media"] = lat.mean()
+    resumo["latencia_p95"] = lat.quantile(0.95)
+    resumo = resumo.reset_index()
+
+    cache = eventos[eventos["tipo"] == "cache"]
+    if not cache.empty:
+        taxa = cache.groupby("passo")["acerto"].apply(lambda s: 100.0 * s.astype(bool).mean())
+        resumo["cache_acerto_pct"] = resumo["passo"].map(taxa)
+    else:
+        resumo["cache_acerto_pct"] = float("nan")
+
+    return resumo[colunas].sort_values("custo_total", ascending=False, ignore_index=True)
+
+
+def limpar_metricas() -> None:
+    """Zera o agregado em memória (o JSONL não é alterado)."""
+    with _lock:
+        _agregados.clear()
+        _cache.clear()
@@ -8,8 +8,15 @@ Uso:
     empresa = resultado.empresa  # tipado, com fallback seguro
 """
 
+import functools
+import json
+from dataclasses import dataclass
 from typing import Any
-from pydantic import BaseModel, Field, field_validator
+
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+
+from utils.moeda import parse_moeda
 
 
 class BaseAnaliseModel(BaseModel):
@@ -35,6 +42,16 @@ class BaseAnaliseModel(BaseModel):
             return cls(**campos_validos)
 
 
+class IdentificacaoDocumentoModel(BaseAnaliseModel):
+    """
+    Empresa/CNPJ como aparecem no próprio documento. A comparação com os dados
+    da análise (alertas de divergência) é feita localmente em core/regras.py,
+    para que o resultado da IA dependa só do conteúdo dos PDFs.
+    """
+    empresa_documento: str = ""
+    cnpj_documento: str = ""
+
+
 # ─── Passo 0 — Contrato Social ────────────────────────────────────────────────
 
 class ContratoModel(BaseAnaliseModel):
@@ -66,23 +83,35 @@ class PropostaModel(BaseAnaliseModel):
 
 # ─── Passo 2 — Fiadores (IRPF) ───────────────────────────────────────────────
 
-class FiadorModel(BaseAnaliseModel):
+class FiadorExtracaoModel(BaseAnaliseModel):
+    """Fatos do IRPF do fiador — independem do aluguel pretendido."""
     rend_tributaveis: str = ""
     rend_nao_tributaveis: str = ""
     renda_media_oficial: str = ""
     renda_media_atual: str = ""
     patrimonio_declarado: str = ""
-    aluguel_pretendido: str = ""
     dividas: str = ""
     onus: str = ""
     segmentacao_patrimonio: str = ""
+    analise_fiador: str = ""
+
+
+class FiadorModel(FiadorExtracaoModel):
+    aluguel_pretendido: str = ""
     conclusao_fiador: str = ""
 
 
+# ─── Passo 2 — Ficha Cadastral (Referências) ─────────────────────────────────
+
+class ReferenciasModel(BaseAnaliseModel):
+    ref_locaticias: str = ""
+    ref_comerciais: str = ""
+    ref_bancarias: str = ""
+
+
 # ─── Passo 3 — Serasa ────────────────────────────────────────────────────────
 
-class SerasaModel(BaseAnaliseModel):
-    alerta_divergencia_serasa: str = ""
+class SerasaExtracaoModel(IdentificacaoDocumentoModel):
     score_serasa: str = ""
     risco_serasa: str = ""
     mapeamento_dividas: str = ""
@@ -94,23 +123,146 @@ class SerasaModel(BaseAnaliseModel):
         return v.lower().strip() if v else ""
 
 
+class SerasaModel(SerasaExtracaoModel):
+    alerta_divergencia_serasa: str = ""
+
+
 # ─── Passo 4 — Certidões ─────────────────────────────────────────────────────
 
-class CertidoesModel(BaseAnaliseModel):
-    alerta_divergencia_certidoes: str = ""
+class CertidoesExtracaoModel(IdentificacaoDocumentoModel):
     resumo_certidoes: str = ""
 
 
+class CertidoesModel(CertidoesExtracaoModel):
+    alerta_divergencia_certidoes: str = ""
+
+
 # ─── Passo 5 — Auditoria Contábil ────────────────────────────────────────────
 
-class ContabilModel(BaseAnaliseModel):
+# Linhas numéricas da tabela por período (mesma ordem das chaves do passo 5)
+CAMPOS_FINANCEIROS: tuple[str, ...] = (
+    "receita_bruta", "resultado", "patrimonio_liquido",
+    "ativo_circulante", "ativo_nao_circulante",
+    "passivo_circulante", "passivo_nao_circulante", "imobilizado",
+)
+
+
+def _como_lista(valor: Any) -> list:
+    if isinstance(valor, (list, tuple)):
+        return list(valor)
+    return [valor] if valor not in (None, "") else []
+
+
+@dataclass(frozen=True, eq=False)
+class TabelaFinanceira:
+    """
+    Tabela período × indicador já convertida para float (NaN = ausente).
+    `valores` tem shape (len(CAMPOS_FINANCEIROS), len(periodos)) e é somente leitura.
+    """
+    periodos: tuple[str, ...]
+    valores: np.ndarray
+
+    @classmethod
+    def de_dados(cls, dados: dict[str, Any]) -> "TabelaFinanceira":
+        """Monta a tabela a partir das listas de strings da IA ("R$ ...", "-")."""
+        periodos = [str(p) for p in _como_lista(dados.get("periodos"))]
+        linhas = [_como_lista(dados.get(campo)) for campo in CAMPOS_FINANCEIROS]
+        n = max([len(periodos), *map(len, linhas)])
+        periodos += ["-"] * (n - len(periodos))
+
+        valores = np.full((len(CAMPOS_FINANCEIROS), n), np.nan)
+        for i, linha in enumerate(linhas):
+            valores[i, :len(linha)] = [parse_moeda(v, padrao=np.nan) for v in linha]
+        valores.setflags(write=False)
+        return cls(tuple(periodos), valores)
+
+    def linha(self, campo: str) -> np.ndarray:
+        return self.valores[CAMPOS_FINANCEIROS.index(campo)]
+
+    @property
+    def receita_bruta(self) -> np.ndarray:
+        return self.linha("receita_bruta")
+
+    @property
+    def resultado(self) -> np.ndarray:
+        return self.linha("resultado")
+
+    # ── Indicadores derivados (vetorizados por período) ──────────────
+
+    @property
+    def margem(self) -> np.ndarray:
+        """Margem líquida (%) = resultado / receita bruta."""
+        return _razao(self.resultado, self.receita_bruta) * 100
+
+    @property
+    def liquidez(self) -> np.ndarray:
+        """Liquidez corrente = ativo circulante / passivo circulante."""
+        return _razao(self.linha("ativo_circulante"), self.linha("passivo_circulante"))
+
+    def comprometimento(self, aluguel: float, meses: int = 1) -> np.ndarray:
+        """% da receita (dividida em `meses`) consumida pelo aluguel."""
+        return _razao(np.full(len(self.periodos), float(aluguel)), self.receita_bruta / meses) * 100
+
+    def ultimo_indice(self, campo: str = "receita_bruta") -> int | None:
+        """Índice do período mais recente com valor preenchido no campo."""
+        preenchidos = np.flatnonzero(~np.isnan(self.linha(campo)))
+        return int(preenchidos[-1]) if preenchidos.size else None
+
+
+def _razao(numerador: np.ndarray, denominador: np.ndarray) -> np.ndarray:
+    """Divisão elemento a elemento; denominador <= 0 ou ausente vira NaN."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominador > 0, numerador / denominador, np.nan)
+
+
+@functools.lru_cache(maxsize=256)
+def _tabela_cache(chave: tuple) -> TabelaFinanceira:
+    return TabelaFinanceira.de_dados(dict(chave))
+
+
+def tabela_financeira(dados: dict[str, Any]) -> TabelaFinanceira:
+    """
+    TabelaFinanceira dos dados da análise, convertida uma única vez por conteúdo
+    (reruns do Streamlit, PDF e passo 6 reaproveitam a mesma tabela).
+    """
+    chave = tuple(
+        (campo, tuple(map(str, _como_lista(dados.get(campo)))))
+        for campo in ("periodos", *CAMPOS_FINANCEIROS)
+    )
+    return _tabela_cache(chave)
+
+
+class ContabilExtracaoModel(IdentificacaoDocumentoModel):
     periodos: list[str] = Field(default_factory=list)
     receita_bruta: list[str] = Field(default_factory=list)
     resultado: list[str] = Field(default_factory=list)
+    patrimonio_liquido: list[str] = Field(default_factory=list)
+    ativo_circulante: list[str] = Field(default_factory=list)
+    ativo_nao_circulante: list[str] = Field(default_factory=list)
+    passivo_circulante: list[str] = Field(default_factory=list)
+    passivo_nao_circulante: list[str] = Field(default_factory=list)
+    imobilizado: list[str] = Field(default_factory=list)
     analise_executiva: str = ""
+
+    _tabela: TabelaFinanceira = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._tabela = tabela_financeira(self.__dict__)
+
+    @property
+    def tabela(self) -> TabelaFinanceira:
+        return self._tabela
+
+
+class ContabilModel(ContabilExtracaoModel):
     alerta_divergencia_contabil: str = ""
 
 
+class ConsolidacaoContabilModel(BaseAnaliseModel):
+    """Análise reescrita sobre a tabela unificada de vários demonstrativos."""
+    analise_executiva: str = ""
+
+
 # ─── Passo 6 — IR dos Sócios + Parecer Final ─────────────────────────────────
 
 class PatrimonioSociosModel(BaseAnaliseModel):
@@ -118,6 +270,53 @@ class PatrimonioSociosModel(BaseAnaliseModel):
     parecer_final: str = ""
 
 
+# ─── Saída estruturada (JSON Schema por passo) ────────────────────────────────
+
+MODELOS_POR_PASSO: dict[str, type[BaseAnaliseModel]] = {
+    "passo_0_contrato": ContratoModel,
+    "passo_1_proposta": PropostaModel,
+    # Passos com parâmetros da análise usam o model de extração (só conteúdo
+    # do documento); alertas e comparações são aplicados por core/regras.py
+    "passo_2_fiador": FiadorExtracaoModel,
+    "passo_2_referencias": ReferenciasModel,
+    "passo_3_serasa": SerasaExtracaoModel,
+    "passo_4_certidoes": CertidoesExtracaoModel,
+    "passo_5_contabil": ContabilExtracaoModel,
+    "passo_5_consolidacao": ConsolidacaoContabilModel,
+    "passo_6_patrimonio": PatrimonioSociosModel,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def schema_saida(modelo: type[BaseAnaliseModel]) -> dict[str, Any]:
+    """
+    JSON Schema estrito (response_format) dos campos declarados do model:
+    todos obrigatórios, sem campos extras, sem defaults/títulos.
+    """
+    propriedades = {}
+    for nome, prop in modelo.model_json_schema()["properties"].items():
+        prop = {k: v for k, v in prop.items() if k not in ("default", "title")}
+        propriedades[nome] = prop
+    return {
+        "type": "object",
+        "properties": propriedades,
+        "required": list(propriedades),
+        "additionalProperties": False,
+    }
+
+
+def validar_saida(modelo: type[BaseAnaliseModel], texto: str) -> dict[str, Any]:
+    """
+    Converte a resposta da IA (JSON puro, via response_format) em dict validado.
+    Lança json.JSONDecodeError ou pydantic.ValidationError — quem chama decide
+    se tenta o reparo.
+    """
+    dados = json.loads(texto)
+    if not isinstance(dados, dict):
+        raise json.JSONDecodeError("JSON raiz não é um objeto", texto, 0)
+    return modelo.model_validate(dados).model_dump()
+
+
 # ─── Model consolidado de toda a análise ─────────────────────────────────────
 
 class AnaliseCompleta(BaseAnaliseModel):
@@ -0,0 +1,54 @@
+"""
+core/prefetch.py
+Pré-busca especulativa dos passos de IA.
+
+Os PDFs do Serasa, das certidões e contábeis podem ser enviados já no
+Passo 0. Assim que os campos de que o passo depende estão preenchidos
+(empresa/CNPJ, vindos do contrato social), a extração é disparada em segundo
+plano (core/tarefas.py) — quando o analista chega ao passo, o resultado já
+está pronto. A assinatura (PDFs + entradas do passo no grafo, core/grafo.py)
+evita reenviar o mesmo trabalho a cada rerun e dispara de novo só se algo mudar.
+
+Uso:
+    from core.prefetch import passos_prontos
+    for no, assinatura in passos_prontos(dados, docs_por_passo, enviados):
+        enviar_passo(no.passo, no.metodo, docs_por_passo[no.passo], *no.argumentos(dados))
+        enviados[no.passo] = assinatura
+"""
+
+from typing import IO, Any, Mapping
+
+from core.cache import build_cache_key
+from core.grafo import GRAFO, NoPasso
+
+# Passos com extração só dos PDFs; as entradas (empresa/CNPJ, para o alerta
+# de divergência) precisam estar preenchidas antes de disparar
+PASSOS_PREFETCH: tuple[str, ...] = ("passo_3_serasa", "passo_4_certidoes", "passo_5_contabil")
+
+
+def assinatura(no: NoPasso, arquivos: list[IO[bytes]], dados: Mapping[str, Any]) -> str:
+    """Identidade das entradas do passo: conteúdo dos PDFs + campos que ele lê."""
+    return build_cache_key(f"prefetch:{no.passo}", arquivos, entradas=no.impressao(dados))
+
+
+def passos_prontos(
+    dados: Mapping[str, Any],
+    docs: Mapping[str, list[IO[bytes]]],
+    enviados: Mapping[str, str],
+) -> list[tuple[NoPasso, str]]:
+    """
+    Passos com PDFs antecipados e entradas preenchidas cuja assinatura ainda
+    não foi enviada, com a assinatura atual de cada um.
+    """
+    prontos = []
+    for passo in PASSOS_PREFETCH:
+        no = GRAFO.no(passo)
+        arquivos = docs.get(passo)
+        if not arquivos:
+            continue
+        if any(not str(dados.get(c) or "").strip() for c in no.entradas):
+            continue
+        atual = assinatura(no, arquivos, dados)
+        if enviados.get(passo) != atual:
+            prontos.append((no, atual))
+    return prontos
@@ -0,0 +1,219 @@
+"""
+core/progresso.py
+Progresso real das chamadas à IA, alimentado por eventos do pipeline
+(hash dos PDFs, cache, fila do limitador, envio, primeiro token, recebimento,
+validação) em vez de etapas simuladas com sleep.
+
+O AIService chama reportar() de qualquer thread; o Progresso ativo no contexto
+(contextvar) acumula o estado de cada unidade (um PDF ou uma chamada só de
+texto) e só entrega atualizações na thread que o criou — a do script
+Streamlit, única que pode usar st.*. Threads de trabalho recebem o contexto
+via submeter(); a thread principal descarrega o que chegou com despachar()
+enquanto espera.
+
+Uso:
+    from core.progresso import Progresso, acompanhar, reportar
+
+    def desenhar(estado):
+        barra.progress(estado.fracao, text=estado.mensagem)
+
+    with acompanhar(Progresso(desenhar)):
+        ai.mapear_serasa(files, empresa, cnpj)
+
+    # dentro do AIService
+    reportar("envio", bytes=1_400_000, modelo="google/gemini-2.5-flash")
+"""
+
+import math
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+# Fração de uma unidade ao atingir cada etapa (a barra nunca volta atrás)
+_FRACAO_ETAPA: dict[str, float] = {
+    "hash": 0.02,
+    "cache": 0.05,
+    "preparando": 0.08,
+    "fila": 0.10,
+    "envio": 0.20,
+    "primeiro_token": 0.50,
+    "recebendo": 0.50,
+    "interpretando": 0.92,
+    "reparo": 0.94,
+    "concluido": 1.0,
+}
+
+# Caracteres de resposta em que o recebimento chega a ~63% do trecho 0.5 → 0.9
+_CARACTERES_TIPICOS = 3000
+
+# Intervalo mínimo entre redesenhos (eventos de streaming chegam a cada poucos ms)
+_INTERVALO_REDESENHO = 0.1
+
+
+def _mb(n: int) -> str:
+    return f"{n / 1e6:.1f} MB" if n >= 1e6 else f"{max(1, n // 1024)} KB"
+
+
+def _mensagem(etapa: str, dados: dict[str, Any]) -> str:
+    arquivo = f" {dados['unidade']}" if dados.get("unidade") else ""
+    if etapa == "hash":
+        return f"🔐 Calculando assinatura de {dados.get('arquivos', 0)} arquivo(s)..."
+    if etapa == "cache":
+        return f"♻️ {dados.get('acertos', 0)} de {dados.get('total', 0)} arquivo(s) no cache"
+    if etapa == "preparando":
+        return f"📦 Preparando{arquivo} ({_mb(dados.get('bytes', 0))})..."
+    if etapa == "fila":
+        return "⏳ Aguardando vaga na fila da IA..."
+    if etapa == "envio":
+        return f"📤 Enviando {_mb(dados.get('bytes', 0))} para {dados.get('modelo', 'a IA')}..."
+    if etapa == "tentativa":
+        return f"🔁 {dados.get('motivo', 'Falha transitória')} — nova tentativa em {dados.get('espera', 0):.0f}s..."
+    if etapa in ("primeiro_token", "recebendo"):
+        return f"🧠 IA respondendo{arquivo} ({dados.get('caracteres', 0)} caracteres)..."
+    if etapa == "interpretando":
+        return f"🔎 Validando resposta{arquivo}..."
+    if etapa == "reparo":
+        return f"🛠️ Corrigindo formato da resposta{arquivo}..."
+    if etapa == "concluido":
+        return f"✅ Concluído{arquivo}"
+    return etapa
+
+
+@dataclass(frozen=True)
+class EstadoProgresso:
+    fracao: float                 # 0.0 a 1.0, média das unidades
+    mensagem: str                 # descrição do evento mais recente
+    unidades: int
+    concluidas: int
+    etapa: str
+
+
+class Progresso:
+    """
+    Estado agregado dos eventos de uma operação. `ao_atualizar` é chamado
+    apenas na thread que criou o Progresso, no máximo a cada 100 ms (ou logo
+    que uma etapa muda). Thread-safe.
+    """
+
+    def __init__(self, ao_atualizar: Callable[[EstadoProgresso], None],
+                 intervalo: float = _INTERVALO_REDESENHO):
+        self._ao_atualizar = ao_atualizar
+        self._intervalo = intervalo
+        self._dono = threading.get_ident()
+        self._lock = threading.Lock()
+        self._fracoes: dict[str, float] = {}
+        self._mensagem = ""
+        self._etapa = ""
+        self._sujo = False
+        self._mudou_etapa = False
+        self._ultimo_desenho = float("-inf")
+        self._encerrado = False
+
+    def declarar_unidades(self, unidades: list[str]) -> None:
+        """Declara as unidades da operação (ex.: nomes dos PDFs) para a fração ser proporcional."""
+        with self._lock:
+            for u in unidades:
+                self._fracoes.setdefault(u, 0.0)
+
+    def registrar(self, etapa: str, dados: dict[str, Any]) -> None:
+        with self._lock:
+            if self._encerrado:
+                return          # ex.: requisição perdedora do hedge terminando depois
+            unidade = dados.get("unidade")
+            if unidade is not None:
+                fracao = _FRACAO_ETAPA.get(etapa)
+                if etapa == "recebendo":
+                    fracao = 0.5 + 0.4 * (1 - math.exp(-dados.get("caracteres", 0) / _CARACTERES_TIPICOS))
+                if fracao is not None:
+                    self._fracoes[unidade] = max(self._fracoes.get(unidade, 0.0), fracao)
+            self._mudou_etapa |= etapa != self._etapa
+            self._etapa = etapa
+            self._mensagem = _mensagem(etapa, dados)
+            self._sujo = True
+        self.despachar()
+
+    def estado(self) -> EstadoProgresso:
+        with self._lock:
+            fracoes = list(self._fracoes.values())
+            return EstadoProgresso(
+                fracao=sum(fracoes) / len(fracoes) if fracoes else 0.0,
+                mensagem=self._mensagem,
+                unidades=len(fracoes),
+                concluidas=sum(1 for f in fracoes if f >= 1.0),
+                etapa=self._etapa,
+            )
+
+    def despachar(self, forcar: bool = False) -> None:
+        """Entrega o estado pendente a `ao_atualizar` (no-op fora da thread dona)."""
+        if threading.get_ident() != self._dono:
+            return
+        agora = time.monotonic()
+        with self._lock:
+            if not self._sujo or self._encerrado:
+                return
+            if not (forcar or self._mudou_etapa or agora - self._ultimo_desenho >= self._intervalo):
+                return
+            self._sujo = self._mudou_etapa = False
+            self._ultimo_desenho = agora
+        self._ao_atualizar(self.estado())
+
+    def encerrar(self) -> None:
+        with self._lock:
+            self._encerrado = True
+
+
+_progresso: ContextVar[Progresso | None] = ContextVar("progresso_ia", default=None)
+_unidade: ContextVar[str | None] = ContextVar("progresso_unidade", default=None)
+
+
+@contextmanager
+def acompanhar(progresso: Progresso) -> Iterator[Progresso]:
+    """Ativa `progresso` para os eventos reportados dentro do bloco."""
+    token = _progresso.set(progresso)
+    try:
+        yield progresso
+    finally:
+        _progresso.reset(token)
+        progresso.despachar(forcar=True)
+        progresso.encerrar()
+
+
+@contextmanager
+def unidade(nome: str) -> Iterator[None]:
+    """Eventos do bloco contam para a unidade `nome` (um PDF ou uma chamada de texto)."""
+    token = _unidade.set(nome)
+    try:
+        yield
+    finally:
+        _unidade.reset(token)
+
+
+def declarar_unidades(unidades: list[str]) -> None:
+    """Declara no Progresso ativo as unidades que a operação vai processar."""
+    progresso = _progresso.get()
+    if progresso is not None:
+        progresso.declarar_unidades(unidades)
+
+
+def reportar(etapa: str, **dados: Any) -> None:
+    """Registra um evento no Progresso ativo (sem efeito se não houver)."""
+    progresso = _progresso.get()
+    if progresso is not None:
+        dados.setdefault("unidade", _unidade.get())
+        progresso.registrar(etapa, dados)
+
+
+def despachar() -> None:
+    """Chamado pela thread principal enquanto espera threads de trabalho."""
+    progresso = _progresso.get()
+    if progresso is not None:
+        progresso.despachar()
+
+
+def submeter(pool: Executor, fn: Callable[..., Any], *args: Any) -> Future:
+    """pool.submit levando o contexto atual (Progresso e unidade) para a thread de trabalho."""
+    return pool.submit(copy_context().run, fn, *args)
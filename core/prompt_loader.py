@@ -1,15 +1,35 @@
 """
 core/prompt_loader.py
-Carrega prompts de IA do arquivo YAML e interpola variáveis.
+Registro dos prompts de IA (prompts/analise.yaml): templates pré-compilados,
+recarga a quente e versão por prompt.
+Também resolve o modelo de cada passo (seções `modelos:` e `modelos_reserva:`).
+
+Um prompt é um texto único (só instruções fixas) ou um mapeamento
+{instrucoes, dados}: as instruções não levam variáveis e formam o prefixo
+estável da requisição; os dados interpolados vão por último.
+
+Na carga, cada template é compilado (placeholders validados: nomes simples,
+sem variáveis nas instruções). O arquivo é reconsultado por mtime no máximo
+uma vez por segundo — editar o YAML vale sem reiniciar; um YAML inválido é
+rejeitado e o registro anterior continua em uso. A versão (hash do texto) de
+cada prompt entra na chave de cache (core/cache.build_cache_key).
 
 Uso:
-    from core.prompt_loader import get_prompt
+    from core.prompt_loader import get_prompt, get_prompt_partes, get_modelo
     prompt = get_prompt("passo_0_contrato")
-    prompt = get_prompt("passo_2_fiador", aluguel="5.000,00")
+    partes = get_prompt_partes("passo_5_consolidacao", tabela=..., analises=...)
+    partes.instrucoes, partes.dados
+    versao_prompt("passo_3_serasa")      # "3f1c0a9b2e7d"
 """
 
-import functools
+import hashlib
+import os
+import string
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Mapping, NamedTuple
 
 import yaml
 
@@ -19,47 +39,225 @@ logger = get_logger(__name__)
 
 _PROMPTS_PATH = Path(__file__).parent.parent / "prompts" / "analise.yaml"
 
+# Usado quando o YAML não define `modelos.padrao`
+MODELO_PADRAO = "google/gemini-2.5-flash"
+
+# Intervalo mínimo entre consultas de mtime do YAML (segundos)
+_INTERVALO_RECARGA = 1.0
+
+
+class PromptErro(ValueError):
+    """Template inválido no YAML ou variável ausente ao montar um prompt."""
+
+
+class PromptPartes(NamedTuple):
+    """Prompt dividido em prefixo fixo (`instrucoes`) e conteúdo variável (`dados`)."""
+    instrucoes: str
+    dados: str = ""
+
+    @property
+    def texto(self) -> str:
+        return f"{self.instrucoes}\n\n{self.dados}" if self.dados else self.instrucoes
+
+
+class _Template:
+    """Template compilado: trechos literais e nomes de variáveis alternados."""
+
+    __slots__ = ("partes", "campos")
+
+    def __init__(self, texto: str, origem: str):
+        partes: list[tuple[str, str | None]] = []
+        try:
+            for literal, campo, spec, conversao in string.Formatter().parse(texto):
+                if campo is not None and (not campo.isidentifier() or spec or conversao):
+                    raise PromptErro(f"{origem}: placeholder inválido '{{{campo}}}' (use {{nome}}).")
+                partes.append((literal, campo))
+        except ValueError as e:
+            if isinstance(e, PromptErro):
+                raise
+            raise PromptErro(f"{origem}: chaves desbalanceadas ({e}). Escape '{{' como '{{{{'.") from e
+        self.partes = tuple(partes)
+        self.campos = frozenset(c for _, c in partes if c)
+
+    def render(self, valores: Mapping[str, Any], origem: str) -> str:
+        ausentes = self.campos - valores.keys()
+        if ausentes:
+            raise PromptErro(f"{origem}: variável(is) ausente(s): {', '.join(sorted(ausentes))}.")
+        return "".join(
+            literal + (str(valores[campo]) if campo else "") for literal, campo in self.partes
+        ).strip()
+
+
+@dataclass(frozen=True)
+class _Prompt:
+    instrucoes: str          # já renderizadas: não têm variáveis
+    dados: _Template
+    versao: str
+
+
+def _compilar(chave: str, entrada: Any) -> _Prompt | None:
+    """Compila uma entrada do YAML; None se não for um prompt (ex.: seção `modelos:`)."""
+    if isinstance(entrada, str):
+        instrucoes, dados = entrada, ""
+    elif isinstance(entrada, dict) and isinstance(entrada.get("instrucoes"), str):
+        instrucoes, dados = entrada["instrucoes"], entrada.get("dados") or ""
+    else:
+        return None
+
+    tpl_instrucoes = _Template(instrucoes, f"{chave}.instrucoes")
+    if tpl_instrucoes.campos:
+        raise PromptErro(
+            f"{chave}: instruções não podem ter variáveis ({', '.join(sorted(tpl_instrucoes.campos))}); "
+            "use o formato {instrucoes, dados} e mova-as para `dados`."
+        )
+    versao = hashlib.sha256(f"{instrucoes}\0{dados}".encode("utf-8")).hexdigest()[:12]
+    return _Prompt(tpl_instrucoes.render({}, chave), _Template(dados, f"{chave}.dados"), versao)
+
+
+class RegistroPrompts:
+    """Prompts compilados de um arquivo YAML, recarregados quando o mtime muda."""
+
+    def __init__(self, caminho: Path, intervalo: float = _INTERVALO_RECARGA):
+        self.caminho = Path(caminho)
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        self._verificado = float("-inf")
+        self._ausente = False
+        self._yaml: dict[str, Any] = {}
+        self._prompts: dict[str, _Prompt] = {}
+
+    def _carregar(self, mtime: float | None) -> None:
+        try:
+            with open(self.caminho, encoding="utf-8") as f:
+                dados = yaml.safe_load(f) or {}
+            prompts = {}
+            for chave, entrada in dados.items():
+                compilado = _compilar(chave, entrada)
+                if compilado is not None:
+                    prompts[chave] = compilado
+        except (OSError, yaml.YAMLError, PromptErro) as e:
+            # Mantém o registro anterior: um erro de edição não derruba as análises.
+            # Só tenta de novo quando o arquivo mudar outra vez.
+            logger.error("Prompts em %s rejeitados: %s", self.caminho, e)
+            self._mtime = mtime
+            return
+
+        if self._mtime is None:
+            logger.debug("Prompts carregados de %s (%d prompts).", self.caminho, len(prompts))
+        else:
+            logger.info("Prompts recarregados de %s (%d prompts).", self.caminho, len(prompts))
+        self._yaml, self._prompts, self._mtime = dados, prompts, mtime
 
-@functools.lru_cache(maxsize=1)
-def _load_yaml() -> dict[str, str]:
-    """Carrega o YAML uma única vez e mantém em cache."""
-    try:
-        with open(_PROMPTS_PATH, encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-        logger.debug("Prompts carregados de %s (%d chaves).", _PROMPTS_PATH, len(data))
-        return data
-    except FileNotFoundError:
-        logger.error("Arquivo de prompts não encontrado: %s", _PROMPTS_PATH)
-        return {}
-    except yaml.YAMLError as e:
-        logger.error("Erro ao parsear YAML de prompts: %s", e)
-        return {}
+    def _atualizar(self) -> None:
+        if time.monotonic() - self._verificado < self.intervalo:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            if agora - self._verificado < self.intervalo:
+                return
+            self._verificado = agora
+            try:
+                mtime = os.stat(self.caminho).st_mtime
+            except OSError:
+                if not self._ausente:
+                    logger.error("Arquivo de prompts não encontrado: %s", self.caminho)
+                    self._ausente = True
+                return
+            self._ausente = False
+            if mtime != self._mtime:
+                self._carregar(mtime)
 
+    def yaml(self) -> dict[str, Any]:
+        self._atualizar()
+        return self._yaml
 
-def get_prompt(key: str, **kwargs: str) -> str:
+    def prompt(self, chave: str) -> _Prompt | None:
+        self._atualizar()
+        return self._prompts.get(chave)
+
+    def chaves(self) -> list[str]:
+        self._atualizar()
+        return list(self._prompts)
+
+
+_registro = RegistroPrompts(_PROMPTS_PATH)
+
+
+def get_prompt_partes(key: str, **kwargs: Any) -> PromptPartes:
+    """
+    Retorna o prompt `key` em duas partes: instruções fixas e dados
+    interpolados com `kwargs`. Chave inexistente → partes vazias (loga erro).
+    Levanta PromptErro se faltar alguma variável dos dados.
     """
-    Retorna o prompt identificado por `key`, com variáveis interpoladas.
+    prompt = _registro.prompt(key)
+    if prompt is None:
+        logger.error("Prompt '%s' não encontrado no YAML.", key)
+        return PromptPartes("")
+    return PromptPartes(prompt.instrucoes, prompt.dados.render(kwargs, key))
+
+
+def get_prompt(key: str, **kwargs: Any) -> str:
+    """
+    Retorna o prompt identificado por `key`, com variáveis interpoladas,
+    como texto único (instruções seguidas dos dados).
 
     Args:
         key: chave do prompt no YAML (ex: "passo_0_contrato").
-        **kwargs: variáveis para substituir via str.format_map.
+        **kwargs: variáveis do template.
 
     Returns:
         String do prompt com variáveis substituídas.
         Em caso de chave inexistente, retorna string vazia e loga erro.
+
+    Raises:
+        PromptErro: alguma variável do template não foi informada.
     """
-    prompts = _load_yaml()
-    template = prompts.get(key)
+    return get_prompt_partes(key, **kwargs).texto
 
-    if template is None:
-        logger.error("Prompt '%s' não encontrado no YAML.", key)
-        return ""
 
-    if not kwargs:
-        return template.strip()
+def versao_prompt(key: str) -> str | None:
+    """Hash curto do texto do prompt (muda a cada edição); None se não for um prompt."""
+    prompt = _registro.prompt(key)
+    return prompt.versao if prompt else None
 
-    try:
-        return template.format_map(kwargs).strip()
-    except KeyError as e:
-        logger.error("Variável %s ausente ao interpolar prompt '%s'.", e, key)
-        return template.strip()
+
+def variaveis_prompt(key: str) -> frozenset[str]:
+    """Variáveis esperadas pelos dados do prompt."""
+    prompt = _registro.prompt(key)
+    return prompt.dados.campos if prompt else frozenset()
+
+
+def listar_prompts() -> dict[str, str]:
+    """Instruções (já sem o escape {{ }}) de cada prompt — exclui as seções de configuração."""
+    return {k: p.instrucoes for k in _registro.chaves() if (p := _registro.prompt(k))}
+
+
+def get_modelo(passo: str | None, sobrescritas: Mapping[str, str] | None = None) -> str:
+    """
+    Modelo a usar no passo. Prioridade: sobrescrita do passo (secrets) →
+    `modelos.<passo>` do YAML → sobrescrita `padrao` → `modelos.padrao` → MODELO_PADRAO.
+    """
+    modelos = _registro.yaml().get("modelos") or {}
+    sobrescritas = sobrescritas or {}
+    return (
+        (passo and (sobrescritas.get(passo) or modelos.get(passo)))
+        or sobrescritas.get("padrao")
+        or modelos.get("padrao")
+        or MODELO_PADRAO
+    )
+
+
+def get_modelo_reserva(passo: str | None, sobrescritas: Mapping[str, str] | None = None) -> str | None:
+    """
+    Modelo alternativo do passo (hedging e fallback em timeout), mesma
+    prioridade de get_modelo sobre `modelos_reserva:`. None = sem reserva.
+    """
+    reservas = _registro.yaml().get("modelos_reserva") or {}
+    sobrescritas = sobrescritas or {}
+    return (
+        (passo and (sobrescritas.get(passo) or reservas.get(passo)))
+        or sobrescritas.get("padrao")
+        or reservas.get("padrao")
+        or None
+    )
@@ -0,0 +1,201 @@
+"""
+core/rascunhos.py
+Rascunho da análise em andamento com gravação incremental.
+
+O estado da "Nova Análise" (campos de `dados`, passo atual, id da análise,
+digests dos PDFs...) vive só na memória da sessão: um timeout ou reinício
+do servidor perdia resultados de IA já pagos. Autosave compara o estado a
+cada rerun com o último gravado e envia ao armazém só os campos que
+mudaram (e apaga os que sumiram), numa thread de gravação — o rerun não
+espera o disco nem a rede. No login, carregar() devolve o rascunho salvo.
+
+Armazéns (mesma interface: ler_rascunho, gravar_rascunho):
+    RascunhosLocal — SQLite local, um registro por usuário + campo. Padrão
+                     .dados/rascunhos.sqlite3; RASCUNHOS_DB troca o caminho.
+    DBService      — tabela `rascunhos` do Supabase (services/db_service.py).
+
+Uso:
+    from core.rascunhos import Autosave, obter_rascunhos_local
+
+    autosave = Autosave(obter_rascunhos_local(), "ana@...")
+    estado = autosave.carregar()                 # {} se não houver rascunho
+    autosave.salvar({"step": 3, "dados.empresa": "ACME", ...})
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Mapping, Protocol
+
+from core.logger import get_logger
+
+logger = get_logger(__name__)
+
+_CAMINHO_PADRAO = Path(__file__).parent.parent / ".dados" / "rascunhos.sqlite3"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS rascunhos (
+    usuario       TEXT NOT NULL,
+    campo         TEXT NOT NULL,
+    valor         TEXT NOT NULL,
+    atualizado_em REAL NOT NULL,
+    PRIMARY KEY (usuario, campo)
+);
+"""
+
+# Gravações em ordem de chegada, fora da thread do script
+_gravador = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rascunho")
+
+
+class ArmazemRascunhos(Protocol):
+    def ler_rascunho(self, usuario: str) -> dict[str, str]: ...
+    def gravar_rascunho(self, usuario: str, campos: Mapping[str, str], removidos: list[str]) -> bool: ...
+
+
+def serializar(valor: Any) -> str:
+    """JSON estável do valor (a comparação entre reruns é por esse texto)."""
+    return json.dumps(valor, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class RascunhosLocal:
+    """Armazém SQLite: um registro por (usuário, campo). Thread-safe."""
+
+    def __init__(self, caminho: Path | str):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        con = self._conectar()
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_ESQUEMA)
+        finally:
+            con.close()
+
+    def _conectar(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.caminho, timeout=30.0, isolation_level=None)
+
+    def ler_rascunho(self, usuario: str) -> dict[str, str]:
+        con = self._conectar()
+        try:
+            linhas = con.execute("SELECT campo, valor FROM rascunhos WHERE usuario = ?", (usuario,)).fetchall()
+        finally:
+            con.close()
+        return dict(linhas)
+
+    def gravar_rascunho(self, usuario: str, campos: Mapping[str, str], removidos: list[str]) -> bool:
+        agora = time.time()
+        con = self._conectar()
+        try:
+            con.execute("BEGIN")
+            con.executemany(
+                "INSERT INTO rascunhos (usuario, campo, valor, atualizado_em) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (usuario, campo) DO UPDATE SET valor = excluded.valor, atualizado_em = excluded.atualizado_em",
+                [(usuario, c, v, agora) for c, v in campos.items()],
+            )
+            con.executemany(
+                "DELETE FROM rascunhos WHERE usuario = ? AND campo = ?", [(usuario, c) for c in removidos]
+            )
+            con.execute("COMMIT")
+        except sqlite3.Error:
+            con.execute("ROLLBACK")
+            logger.exception("Falha ao gravar rascunho de %s.", usuario)
+            return False
+        finally:
+            con.close()
+        return True
+
+
+class Autosave:
+    """
+    Sincroniza o estado achatado ({campo: valor}) de um usuário com o armazém,
+    gravando só a diferença desde a última gravação. Falha de gravação deixa
+    os campos pendentes para a próxima chamada.
+    """
+
+    def __init__(self, armazem: ArmazemRascunhos, usuario: str):
+        self.armazem = armazem
+        self.usuario = usuario
+        self._lock = threading.Lock()
+        self._gravado: dict[str, str] = {}      # campo → JSON já no armazém
+        self._ultima: Future | None = None
+
+    def carregar(self) -> dict[str, Any]:
+        """Rascunho salvo do usuário ({} se não houver); vira a base das próximas diferenças."""
+        try:
+            brutos = self.armazem.ler_rascunho(self.usuario)
+        except Exception:
+            logger.exception("Falha ao ler rascunho de %s.", self.usuario)
+            return {}
+        estado = {}
+        for campo, valor in brutos.items():
+            try:
+                estado[campo] = json.loads(valor)
+            except ValueError:
+                logger.warning("Campo %s do rascunho de %s ilegível; ignorado.", campo, self.usuario)
+                continue
+        with self._lock:
+            self._gravado = {c: brutos[c] for c in estado}
+        return estado
+
+    def diferenca(self, estado: Mapping[str, Any]) -> tuple[dict[str, str], list[str]]:
+        """(campos novos ou alterados → JSON, campos removidos) em relação ao gravado."""
+        atual = {c: serializar(v) for c, v in estado.items()}
+        with self._lock:
+            alterados = {c: v for c, v in atual.items() if self._gravado.get(c) != v}
+            removidos = [c for c in self._gravado if c not in atual]
+        return alterados, removidos
+
+    def salvar(self, estado: Mapping[str, Any]) -> int:
+        """Agenda a gravação do que mudou; devolve quantos campos serão gravados ou apagados."""
+        alterados, removidos = self.diferenca(estado)
+        if not alterados and not removidos:
+            return 0
+        with self._lock:
+            anteriores = {c: self._gravado.get(c) for c in [*alterados, *removidos]}
+            self._gravado.update(alterados)
+            for c in removidos:
+                self._gravado.pop(c, None)
+        self._ultima = _gravador.submit(self._gravar, alterados, removidos, anteriores)
+        return len(alterados) + len(removidos)
+
+    def _gravar(self, alterados: dict[str, str], removidos: list[str], anteriores: dict[str, str | None]) -> None:
+        try:
+            ok = self.armazem.gravar_rascunho(self.usuario, alterados, removidos)
+        except Exception:
+            logger.exception("Falha ao gravar rascunho de %s.", self.usuario)
+            ok = False
+        if ok:
+            return
+        # Devolve os campos ao estado anterior: a próxima diferença os inclui de novo
+        with self._lock:
+            for campo, valor in anteriores.items():
+                if self._gravado.get(campo) != alterados.get(campo):
+                    continue        # já mudou de novo depois desta gravação
+                if valor is None:
+                    self._gravado.pop(campo, None)
+                else:
+                    self._gravado[campo] = valor
+
+    def aguardar(self, timeout: float | None = None) -> None:
+        """Bloqueia até a última gravação agendada terminar (testes e encerramento)."""
+        if self._ultima is not None:
+            self._ultima.result(timeout)
+
+
+_local: RascunhosLocal | None = None
+_lock_local = threading.Lock()
+
+
+def obter_rascunhos_local(caminho: Path | str | None = None) -> RascunhosLocal:
+    """Armazém local único do processo; o caminho vale na primeira chamada."""
+    global _local
+    with _lock_local:
+        if _local is None:
+            if caminho is None:
+                caminho = os.environ.get("RASCUNHOS_DB") or _CAMINHO_PADRAO
+            _local = RascunhosLocal(caminho)
+            logger.info("Rascunhos locais em %s.", _local.caminho)
+        return _local
@@ -0,0 +1,103 @@
+"""
+core/regras.py
+Regras locais aplicadas sobre o resultado da IA — sem nova chamada ao modelo.
+
+A IA extrai apenas fatos do documento (cache por conteúdo dos PDFs). Tudo que
+depende de parâmetros da análise (aluguel pretendido, empresa/CNPJ informados)
+é calculado aqui, então alterar esses parâmetros não reenvia os arquivos.
+
+Uso:
+    from core.regras import aplicar_regras_fiador, aplicar_divergencia
+    res = aplicar_regras_fiador(extraido, aluguel="15.000,00")
+    res = aplicar_divergencia(extraido, "alerta_divergencia_serasa", empresa, cnpj)
+"""
+
+import re
+import unicodedata
+from typing import Any
+
+from utils.formatters import formatar_moeda_br
+from utils.moeda import parse_moeda
+
+# Renda mensal mínima do fiador, em múltiplos do aluguel
+MULTIPLO_MINIMO_FIADOR = 3.0
+
+_RE_NAO_DIGITO = re.compile(r'\D')
+_RE_NAO_ALFANUM = re.compile(r'[^A-Z0-9 ]')
+_SUFIXOS_SOCIETARIOS = {"LTDA", "ME", "EPP", "EIRELI", "SA", "S", "A", "SLU", "MEI"}
+
+
+def _normalizar_cnpj(cnpj: str) -> str:
+    return _RE_NAO_DIGITO.sub('', str(cnpj or ''))
+
+
+def _normalizar_nome(nome: str) -> str:
+    """Maiúsculas, sem acentos, pontuação e sufixos societários (LTDA, ME, S.A.)."""
+    sem_acento = unicodedata.normalize("NFKD", str(nome or "")).encode("ascii", "ignore").decode()
+    palavras = _RE_NAO_ALFANUM.sub(' ', sem_acento.upper()).split()
+    return " ".join(p for p in palavras if p not in _SUFIXOS_SOCIETARIOS)
+
+
+def verificar_divergencia(empresa_doc: str, cnpj_doc: str, empresa: str, cnpj: str) -> str:
+    """
+    Compara a identificação do documento com a da análise.
+    CNPJ tem prioridade; sem CNPJ dos dois lados, compara a razão social.
+    Retorna o texto do alerta ou "" quando não há divergência.
+    """
+    cnpj_d, cnpj_a = _normalizar_cnpj(cnpj_doc), _normalizar_cnpj(cnpj)
+    if cnpj_d and cnpj_a:
+        if cnpj_d != cnpj_a:
+            return (
+                f"O CNPJ do documento ({cnpj_doc}) não corresponde ao CNPJ da análise ({cnpj}). "
+                "Verifique se o documento pertence à empresa pretendente."
+            )
+        return ""
+
+    nome_d, nome_a = _normalizar_nome(empresa_doc), _normalizar_nome(empresa)
+    if nome_d and nome_a and nome_d not in nome_a and nome_a not in nome_d:
+        return (
+            f"A empresa do documento ({empresa_doc}) não corresponde à empresa da análise ({empresa}). "
+            "Verifique se o documento pertence à empresa pretendente."
+        )
+    return ""
+
+
+def aplicar_divergencia(extraido: dict[str, Any], campo_alerta: str, empresa: str, cnpj: str) -> dict[str, Any]:
+    """Devolve cópia de `extraido` com `campo_alerta` preenchido pela regra de divergência."""
+    resultado = dict(extraido)
+    resultado[campo_alerta] = verificar_divergencia(
+        extraido.get("empresa_documento", ""),
+        extraido.get("cnpj_documento", ""),
+        empresa,
+        cnpj,
+    )
+    return resultado
+
+
+def aplicar_regras_fiador(extraido: dict[str, Any], aluguel) -> dict[str, Any]:
+    """
+    Completa a extração do IRPF do fiador com a comparação renda × aluguel:
+    preenche `aluguel_pretendido` e monta `conclusao_fiador` a partir da
+    análise da IA + o veredito da regra dos 3x.
+    """
+    resultado = dict(extraido)
+    aluguel_val = parse_moeda(aluguel)
+    renda = parse_moeda(extraido.get("renda_media_oficial")) or parse_moeda(extraido.get("renda_media_atual"))
+
+    resultado["aluguel_pretendido"] = formatar_moeda_br(aluguel_val) if aluguel_val > 0 else str(aluguel or "")
+
+    if aluguel_val > 0 and renda > 0:
+        multiplo = renda / aluguel_val
+        multiplo_txt = f"{multiplo:.1f}".replace(".", ",")
+        atende = "ATENDE" if multiplo >= MULTIPLO_MINIMO_FIADOR else "NÃO ATENDE"
+        veredito = (
+            f"Renda média mensal de {formatar_moeda_br(renda)} equivale a {multiplo_txt}x "
+            f"o aluguel pretendido de {formatar_moeda_br(aluguel_val)} "
+            f"(mínimo exigido: {MULTIPLO_MINIMO_FIADOR:.0f}x) — {atende} ao critério de renda."
+        )
+    else:
+        veredito = "Não foi possível comparar a renda do fiador com o aluguel pretendido (valor ausente)."
+
+    analise = str(extraido.get("analise_fiador", "")).strip()
+    resultado["conclusao_fiador"] = f"{analise}\n\n{veredito}" if analise else veredito
+    return resultado
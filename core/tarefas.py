@@ -0,0 +1,314 @@
+"""
+core/tarefas.py
+Fila local de tarefas em segundo plano para os passos longos da IA.
+
+Cada passo roda numa thread do pool da fila, fora do script Streamlit: uma
+desconexão do navegador, um rerun ou a navegação para outro menu não perdem
+a chamada, e várias análises avançam em paralelo. O estado de cada tarefa
+(status, progresso, resultado, erro) fica numa tabela SQLite local, chaveada
+por análise + passo; a interface consulta o status (fragmento com run_every)
+e aplica o resultado quando a tarefa termina.
+
+O banco padrão é .dados/tarefas.sqlite3; TAREFAS_DB no ambiente troca o
+caminho. Vários processos (ou réplicas) podem abrir o mesmo arquivo: cada
+fila renova periodicamente o batimento das tarefas que criou e ainda não
+terminaram. Na abertura da fila, só as tarefas pendentes ou em andamento
+cujo batimento venceu (o processo dono morreu ou reiniciou) são marcadas
+como falha; o pid não serve para isso, porque se repete entre reinícios do
+contêiner.
+
+Uso:
+    from core.tarefas import obter_fila
+
+    fila = obter_fila()
+    tarefa_id = fila.submeter("a1b2c3", "passo_5_contabil", funcao, usuario="ana@...",
+                              assinatura="<hash das entradas>")
+    tarefa = fila.ultima("a1b2c3", "passo_5_contabil")
+    tarefa.status, tarefa.progresso, tarefa.mensagem, tarefa.resultado
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import Context
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from core.logger import get_logger
+from core.progresso import EstadoProgresso, Progresso, acompanhar
+
+logger = get_logger(__name__)
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+
+TRABALHADORES_PADRAO = 4
+
+# Tarefas finalizadas mais antigas que isso são removidas ao abrir a fila
+_RETENCAO_DIAS = 7
+
+# Gravações de progresso no banco (a interface consulta a cada ~1 s)
+_INTERVALO_PROGRESSO = 0.5
+
+_CAMINHO_PADRAO = Path(__file__).parent.parent / ".dados" / "tarefas.sqlite3"
+
+# Batimento das tarefas em aberto: renovado a cada _INTERVALO_BATIMENTO
+# segundos pela fila dona; vencido após _VALIDADE_BATIMENTO sem renovação
+_INTERVALO_BATIMENTO = 15.0
+_VALIDADE_BATIMENTO = 60.0
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tarefas (
+    id           TEXT PRIMARY KEY,
+    analise      TEXT NOT NULL,
+    passo        TEXT NOT NULL,
+    usuario      TEXT NOT NULL DEFAULT '',
+    status       TEXT NOT NULL,
+    progresso    REAL NOT NULL DEFAULT 0,
+    mensagem     TEXT NOT NULL DEFAULT '',
+    resultado    TEXT,
+    erro         TEXT,
+    pid          INTEGER NOT NULL,
+    execucao     TEXT NOT NULL DEFAULT '',
+    assinatura   TEXT NOT NULL DEFAULT '',
+    batimento    REAL NOT NULL DEFAULT 0,
+    criada_em    REAL NOT NULL,
+    iniciada_em  REAL,
+    concluida_em REAL
+);
+CREATE INDEX IF NOT EXISTS idx_tarefas_analise_passo ON tarefas (analise, passo, criada_em);
+"""
+
+# Colunas acrescentadas depois da primeira versão do esquema (bancos existentes)
+_COLUNAS_NOVAS = {
+    "execucao": "TEXT NOT NULL DEFAULT ''",
+    "assinatura": "TEXT NOT NULL DEFAULT ''",
+    "batimento": "REAL NOT NULL DEFAULT 0",
+}
+
+
+@dataclass(frozen=True)
+class Tarefa:
+    id: str
+    analise: str
+    passo: str
+    usuario: str
+    status: str
+    progresso: float              # 0.0 a 1.0
+    mensagem: str                 # último evento de progresso
+    resultado: dict | None        # retorno da função, quando concluída
+    erro: str | None
+    assinatura: str               # entradas com que foi submetida ("" = qualquer)
+    criada_em: float
+    iniciada_em: float | None
+    concluida_em: float | None
+
+    @property
+    def finalizada(self) -> bool:
+        return self.status in (CONCLUIDA, FALHOU)
+
+    @classmethod
+    def _de_linha(cls, linha: sqlite3.Row) -> "Tarefa":
+        return cls(
+            id=linha["id"],
+            analise=linha["analise"],
+            passo=linha["passo"],
+            usuario=linha["usuario"],
+            status=linha["status"],
+            progresso=linha["progresso"],
+            mensagem=linha["mensagem"],
+            resultado=json.loads(linha["resultado"]) if linha["resultado"] else None,
+            erro=linha["erro"],
+            assinatura=linha["assinatura"],
+            criada_em=linha["criada_em"],
+            iniciada_em=linha["iniciada_em"],
+            concluida_em=linha["concluida_em"],
+        )
+
+
+class FilaTarefas:
+    """Fila de tarefas com pool de threads e estado em SQLite. Thread-safe."""
+
+    def __init__(self, caminho: Path | str, trabalhadores: int = TRABALHADORES_PADRAO):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="tarefa-ia")
+        self._lock = threading.Lock()     # serializa submeter (evita tarefa duplicada por passo)
+        self._execucao = uuid.uuid4().hex  # identifica as tarefas desta fila no banco
+        self._parar = threading.Event()
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_ESQUEMA)
+            colunas = {linha["name"] for linha in con.execute("PRAGMA table_info(tarefas)")}
+            for coluna, tipo in _COLUNAS_NOVAS.items():
+                if coluna not in colunas:
+                    con.execute(f"ALTER TABLE tarefas ADD COLUMN {coluna} {tipo}")
+        self._recuperar_interrompidas()
+        self._limpar_antigas()
+        threading.Thread(target=self._bater, name="tarefa-ia-batimento", daemon=True).start()
+
+    def _conectar(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.caminho, timeout=30.0, isolation_level=None)
+        con.row_factory = sqlite3.Row
+        return con
+
+    def _executar_sql(self, sql: str, parametros: tuple = ()) -> int:
+        """Executa e devolve o número de linhas afetadas."""
+        con = self._conectar()
+        try:
+            return con.execute(sql, parametros).rowcount
+        finally:
+            con.close()
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> list[sqlite3.Row]:
+        con = self._conectar()
+        try:
+            return con.execute(sql, parametros).fetchall()
+        finally:
+            con.close()
+
+    def _recuperar_interrompidas(self) -> None:
+        agora = time.time()
+        mortas = self._executar_sql(
+            "UPDATE tarefas SET status = ?, erro = ?, concluida_em = ? WHERE status IN (?, ?) AND batimento < ?",
+            (FALHOU, "Interrompida: o servidor reiniciou antes do fim da análise.", agora,
+             PENDENTE, EXECUTANDO, agora - _VALIDADE_BATIMENTO),
+        )
+        if mortas:
+            logger.warning("%d tarefa(s) interrompida(s) por reinício marcadas como falha.", mortas)
+
+    def _bater(self) -> None:
+        """
+        Renova o batimento das tarefas em aberto desta fila até encerrar() e
+        marca como falha as de processos que pararam de renovar.
+        """
+        while not self._parar.wait(_INTERVALO_BATIMENTO):
+            try:
+                self._executar_sql(
+                    "UPDATE tarefas SET batimento = ? WHERE execucao = ? AND status IN (?, ?)",
+                    (time.time(), self._execucao, PENDENTE, EXECUTANDO),
+                )
+                self._recuperar_interrompidas()
+            except sqlite3.Error:
+                logger.exception("Falha ao renovar o batimento das tarefas.")
+
+    def _limpar_antigas(self) -> None:
+        corte = time.time() - _RETENCAO_DIAS * 86400
+        self._executar_sql(
+            "DELETE FROM tarefas WHERE status IN (?, ?) AND criada_em < ?", (CONCLUIDA, FALHOU, corte)
+        )
+
+    # ─── execução ─────────────────────────────────────────────────────────────
+
+    def _gravar_progresso(self, tarefa_id: str, estado: EstadoProgresso) -> None:
+        self._executar_sql(
+            "UPDATE tarefas SET progresso = ?, mensagem = ? WHERE id = ?",
+            (min(0.99, estado.fracao), estado.mensagem, tarefa_id),
+        )
+
+    def _rodar(self, tarefa_id: str, passo: str, funcao: Callable[[], dict]) -> None:
+        inicio = time.time()
+        # Só roda se ainda estiver pendente (outra fila pode tê-la dado como interrompida)
+        if not self._executar_sql(
+            "UPDATE tarefas SET status = ?, iniciada_em = ? WHERE id = ? AND status = ?",
+            (EXECUTANDO, inicio, tarefa_id, PENDENTE),
+        ):
+            logger.warning("Tarefa %s (%s) não está mais pendente; ignorada.", tarefa_id, passo)
+            return
+        progresso = Progresso(lambda e: self._gravar_progresso(tarefa_id, e), intervalo=_INTERVALO_PROGRESSO)
+        try:
+            with acompanhar(progresso):
+                resultado = funcao()
+            corpo = json.dumps(resultado or {}, ensure_ascii=False, default=str)
+        except Exception as e:
+            logger.exception("Tarefa %s (%s) falhou.", tarefa_id, passo)
+            self._executar_sql(
+                "UPDATE tarefas SET status = ?, erro = ?, concluida_em = ? WHERE id = ? AND status = ?",
+                (FALHOU, str(e) or e.__class__.__name__, time.time(), tarefa_id, EXECUTANDO),
+            )
+            return
+        # Um status final já gravado (tarefa dada como interrompida) não é sobrescrito
+        if not self._executar_sql(
+            "UPDATE tarefas SET status = ?, resultado = ?, progresso = 1, concluida_em = ? "
+            "WHERE id = ? AND status = ?",
+            (CONCLUIDA, corpo, time.time(), tarefa_id, EXECUTANDO),
+        ):
+            logger.warning("Tarefa %s (%s) terminou depois de marcada como falha; resultado descartado.",
+                           tarefa_id, passo)
+            return
+        logger.info("Tarefa %s (%s) concluída em %.1fs.", tarefa_id, passo, time.time() - inicio)
+
+    # ─── API pública ──────────────────────────────────────────────────────────
+
+    def submeter(self, analise: str, passo: str, funcao: Callable[[], dict], usuario: str = "",
+                 assinatura: str = "") -> str:
+        """
+        Enfileira `funcao` (sem argumentos, devolve um dict serializável em
+        JSON) como o passo `passo` da análise `analise`. Se esse passo já tem
+        tarefa pendente ou em execução com a mesma `assinatura` (hash das
+        entradas), devolve o id dela em vez de duplicar. Com entradas
+        diferentes, a nova tarefa passa a ser a última do passo; a anterior
+        termina em segundo plano e não é aplicada.
+        """
+        with self._lock:
+            atual = self.ultima(analise, passo)
+            if atual is not None and not atual.finalizada:
+                if atual.assinatura == assinatura:
+                    return atual.id
+                logger.info("Tarefa %s (%s) substituída: entradas diferentes.", atual.id, passo)
+            tarefa_id = uuid.uuid4().hex
+            agora = time.time()
+            self._executar_sql(
+                "INSERT INTO tarefas (id, analise, passo, usuario, status, pid, execucao, assinatura, "
+                "batimento, criada_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (tarefa_id, analise, passo, usuario, PENDENTE, os.getpid(), self._execucao, assinatura,
+                 agora, agora),
+            )
+        # Contexto vazio: a tarefa não herda o Progresso nem o cache de quem submeteu
+        self._pool.submit(Context().run, self._rodar, tarefa_id, passo, funcao)
+        logger.info("Tarefa %s enfileirada: %s da análise %s.", tarefa_id, passo, analise)
+        return tarefa_id
+
+    def obter(self, tarefa_id: str) -> Tarefa | None:
+        linhas = self._consultar("SELECT * FROM tarefas WHERE id = ?", (tarefa_id,))
+        return Tarefa._de_linha(linhas[0]) if linhas else None
+
+    def ultima(self, analise: str, passo: str) -> Tarefa | None:
+        """Tarefa mais recente do passo na análise (None se nunca houve)."""
+        linhas = self._consultar(
+            "SELECT * FROM tarefas WHERE analise = ? AND passo = ? ORDER BY criada_em DESC, rowid DESC LIMIT 1",
+            (analise, passo),
+        )
+        return Tarefa._de_linha(linhas[0]) if linhas else None
+
+    def da_analise(self, analise: str) -> list[Tarefa]:
+        """Todas as tarefas da análise, da mais antiga à mais recente."""
+        linhas = self._consultar("SELECT * FROM tarefas WHERE analise = ? ORDER BY criada_em", (analise,))
+        return [Tarefa._de_linha(linha) for linha in linhas]
+
+    def encerrar(self, esperar: bool = True) -> None:
+        self._pool.shutdown(wait=esperar)
+        self._parar.set()
+
+
+_fila: FilaTarefas | None = None
+_lock_fila = threading.Lock()
+
+
+def obter_fila(caminho: Path | str | None = None, trabalhadores: int = TRABALHADORES_PADRAO) -> FilaTarefas:
+    """Fila única do processo; os parâmetros valem na primeira chamada."""
+    global _fila
+    with _lock_fila:
+        if _fila is None:
+            if caminho is None:
+                caminho = os.environ.get("TAREFAS_DB") or _CAMINHO_PADRAO
+            _fila = FilaTarefas(caminho, trabalhadores)
+            logger.info("Fila de tarefas em %s (%d trabalhadores).", _fila.caminho, trabalhadores)
+        return _fila
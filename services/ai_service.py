@@ -1,135 +1,608 @@
-import base64
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
 import streamlit as st
-from openai import OpenAI
+from openai import (
+    APIConnectionError, APIStatusError, APITimeoutError, BadRequestError, OpenAI, RateLimitError, Stream,
+)
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from pydantic import ValidationError
 from utils.formatters import extrair_json_seguro
 from core.logger import get_logger
-from core.prompt_loader import get_prompt
+from core.prompt_loader import PromptPartes, get_modelo, get_modelo_reserva, get_prompt_partes
+from core.metricas import latencia_percentil, registrar_cache, registrar_chamada
 from core.cache import build_cache_key, get_cached, set_cached
+from core.corpo import AnexoPDF, CorpoJSON
+from core.limitador import CONCORRENCIA_PADRAO, RPM_PADRAO, obter_limitador, retry_after
+from core.progresso import declarar_unidades, despachar, reportar, submeter, unidade
+from core.regras import aplicar_divergencia, aplicar_regras_fiador
+from core.consolidacao import consolidar_certidoes, consolidar_contabil, consolidar_serasa
+from core.models import CAMPOS_FINANCEIROS, MODELOS_POR_PASSO, TabelaFinanceira, schema_saida, tabela_financeira, validar_saida
+from core.grafo import GRAFO
 
 logger = get_logger(__name__)
 
+_BASE_URL_PADRAO = "https://openrouter.ai/api/v1"
+
+# Extrações por arquivo simultâneas (map-reduce dos passos 3, 4 e 5)
+_MAX_CHAMADAS_PARALELAS = 4
+
+# Enquanto espera threads de trabalho, a thread principal redesenha o progresso
+# neste intervalo (a espera termina assim que uma chamada conclui)
+_INTERVALO_PROGRESSO = 0.2
+
+# Novas tentativas após 429/5xx/falha de conexão. O retry interno do SDK fica
+# desligado (max_retries=0) para toda tentativa passar pelo limitador.
+_MAX_TENTATIVAS = 4
+_BACKOFF_BASE = 2.0
+_BACKOFF_MAXIMO = 60.0
+
+
+# Hedging: após o p95 de latência do modelo principal sem resposta, dispara a
+# mesma requisição no modelo reserva e fica com o primeiro JSON válido.
+# Sem histórico suficiente, usa o atraso padrão.
+_HEDGE_AMOSTRAS_MINIMAS = 5
+_HEDGE_ATRASO_PADRAO = 30.0
+_HEDGE_ATRASO_MINIMO = 3.0
+
+# Pool próprio: a requisição perdedora termina em segundo plano, sem prender o passo
+_POOL_HEDGE = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge-ia")
+
+
+def _json_valido(texto: str) -> bool:
+    try:
+        return isinstance(json.loads(texto), dict)
+    except (TypeError, ValueError):
+        return False
+
+
+def _mensagens(prompt: PromptPartes, anexos: list[dict]) -> list[dict]:
+    """
+    Ordem pensada para o cache de prompt do provedor: instruções fixas do passo
+    (prefixo estável, com cache_control para quem exige marcação explícita),
+    depois os PDFs e, por último, os dados variáveis. O schema vai em
+    response_format, também fixo por passo.
+    """
+    sistema = {
+        "role": "system",
+        "content": [{"type": "text", "text": prompt.instrucoes, "cache_control": {"type": "ephemeral"}}],
+    }
+    conteudo = list(anexos)
+    if prompt.dados:
+        conteudo.append({"type": "text", "text": prompt.dados})
+    if not conteudo:
+        return [{**sistema, "role": "user"}]
+    return [sistema, {"role": "user", "content": conteudo}]
+
+
+def _rotulo(passo: str | None, files) -> str:
+    """Unidade de progresso: o PDF, quando a chamada tem um só; senão, o passo."""
+    return files[0].name if files and len(files) == 1 else (passo or "ia")
+
+
+def _backoff(tentativa: int) -> float:
+    """Espera exponencial com jitter completo (tentativa 0 → até 2s)."""
+    return random.uniform(0, min(_BACKOFF_MAXIMO, _BACKOFF_BASE * 2 ** tentativa))
+
+
+def _formatar_indicadores(tabela: TabelaFinanceira, idx: int | None) -> str:
+    """Resumo dos indicadores calculados localmente para o prompt do parecer."""
+    if idx is None:
+        return "não calculados"
+    margem = tabela.margem[idx]
+    liquidez = tabela.liquidez[idx]
+    partes = []
+    if not math.isnan(margem):
+        partes.append(f"Margem Líquida: {margem:.1f}%".replace(".", ","))
+    if not math.isnan(liquidez):
+        partes.append(f"Liquidez Corrente: {liquidez:.2f}".replace(".", ","))
+    return " | ".join(partes) or "não calculados"
+
+
+# Mensagens ao usuário guardadas em vez de exibidas (tarefas fora do script)
+_mensagens_guardadas: ContextVar[list[tuple[str, str]] | None] = ContextVar("mensagens_ia", default=None)
+
+
+@contextmanager
+def guardar_mensagens() -> Iterator[list[tuple[str, str]]]:
+    """
+    Dentro do bloco, avisos/erros/infos do AIService vão para a lista
+    devolvida — (nível do st.*, texto) — em vez de chamar st.* (que só
+    funciona na thread do script).
+    """
+    guardadas: list[tuple[str, str]] = []
+    token = _mensagens_guardadas.set(guardadas)
+    try:
+        yield guardadas
+    finally:
+        _mensagens_guardadas.reset(token)
+
+
+class FalhaIA(Exception):
+    """Falha de chamada/arquivo com mensagem pronta para exibir ao usuário."""
+
+
+# Um cliente OpenAI (e seu pool de conexões httpx, thread-safe) por
+# (base_url, chave) no processo: sessões e reruns reaproveitam conexões abertas
+_clientes: dict[tuple[str, str], OpenAI] = {}
+_lock_clientes = threading.Lock()
+
+
+def obter_cliente(base_url: str, api_key: str) -> OpenAI:
+    """Cliente único do processo para o provedor; criado na primeira chamada."""
+    with _lock_clientes:
+        cliente = _clientes.get((base_url, api_key))
+        if cliente is None:
+            cliente = _clientes[(base_url, api_key)] = OpenAI(
+                base_url=base_url, api_key=api_key, timeout=120.0, max_retries=0,
+            )
+            logger.info("Cliente de IA criado para %s.", base_url)
+        return cliente
+
 
 class AIService:
     def __init__(self):
         self.api_key = st.secrets["OPENROUTER_API_KEY"]
-        self.client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
-            api_key=self.api_key,
-            timeout=120.0,
+        # Cliente compartilhado do processo; o AIService em si é leve e por
+        # sessão (usuário e config do usuário abaixo).
+        # base_url sobrescrevível para testes offline (benchmarks/servidor_mock.py)
+        self.client = obter_cliente(st.secrets.get("OPENROUTER_BASE_URL", _BASE_URL_PADRAO), self.api_key)
+        # Roteamento por passo: seções `modelos:`/`modelos_reserva:` do YAML,
+        # sobrescritas por [modelos]/[modelos_reserva] nos secrets
+        self._modelos = dict(st.secrets.get("modelos", {}))
+        self._reservas = dict(st.secrets.get("modelos_reserva", {}))
+        self._hedging = bool(st.secrets.get("IA_HEDGING", False))
+        # Lidos aqui (thread principal): _executar e as tarefas de fundo rodam
+        # em threads sem contexto Streamlit
+        self.usuario = st.session_state.get("email_usuario") or ""
+        self.config_usuario = dict(st.session_state.get("config_usuario") or {})
+        self.limitador = obter_limitador(
+            "openrouter",
+            rpm=float(st.secrets.get("OPENROUTER_RPM", RPM_PADRAO)),
+            concorrencia=int(st.secrets.get("OPENROUTER_CONCORRENCIA", CONCORRENCIA_PADRAO)),
         )
-        self.model = "google/gemini-2.5-flash"
 
-    def _generate_content(self, prompt, files=None):
-        parts = []
-        if files:
-            for f in files:
-                f.seek(0)
-                content = f.read()
-
-                if not content:
-                    logger.warning("Arquivo %s está vazio — ignorado.", f.name)
-                    st.warning(f"Arquivo {f.name} está vazio.")
-                    continue
+    def _avisar(self, nivel: str, mensagem: str) -> None:
+        """st.info/st.warning/st.error — ou guarda a mensagem, dentro de guardar_mensagens()."""
+        guardadas = _mensagens_guardadas.get()
+        if guardadas is not None:
+            guardadas.append((nivel, mensagem))
+        else:
+            getattr(st, nivel)(mensagem)
 
-                if len(content) > 20 * 1024 * 1024:
-                    logger.warning("Arquivo %s excede 20MB (%d bytes) — ignorado.", f.name, len(content))
-                    st.warning(f"Arquivo {f.name} excede 20MB. Ignorando.")
-                    continue
+    def _response_format(self, passo: str | None) -> dict | None:
+        """response_format json_schema do passo (None = sem saída estruturada)."""
+        modelo = MODELOS_POR_PASSO.get(passo)
+        if modelo is None:
+            return None
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": passo, "strict": True, "schema": schema_saida(modelo)},
+        }
+
+    def modelo(self, passo: str | None) -> str:
+        return get_modelo(passo, self._modelos)
+
+    def modelo_reserva(self, passo: str | None) -> str | None:
+        reserva = get_modelo_reserva(passo, self._reservas)
+        return reserva if reserva != self.modelo(passo) else None
+
+    def _chamar(self, passo: str | None, modelo: str, **kwargs) -> str:
+        """
+        Uma requisição em streaming, já com vaga no limitador; devolve o texto
+        da resposta. Reporta envio, primeiro token e recebimento ao progresso e
+        registra latência (total e até o 1º token), payload, tokens e custo.
+        """
+        corpo = CorpoJSON({
+            "model": modelo,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+            "usage": {"include": True},   # OpenRouter devolve o custo em usage
+            **kwargs,
+        })
+        medidas = {"bytes_requisicao": corpo.tamanho, "bytes_base64": corpo.bytes_base64, "usuario": self.usuario}
+        reportar("envio", bytes=corpo.tamanho, modelo=modelo)
+        inicio = time.perf_counter()
+        primeiro_token = None
+        partes: list[str] = []
+        recebidos = 0
+        uso = None
+        try:
+            # Mesmo endpoint de chat.completions.create, mas com o corpo gerado
+            # em blocos (core/corpo.py) em vez de serializado inteiro na memória
+            stream = self.client.post(
+                "/chat/completions",
+                cast_to=ChatCompletion,
+                content=iter(corpo),
+                options={"headers": {"Content-Type": "application/json", "Content-Length": str(corpo.tamanho)}},
+                stream=True,
+                stream_cls=Stream[ChatCompletionChunk],
+            )
+            for chunk in stream:
+                uso = chunk.usage or uso
+                for escolha in chunk.choices:
+                    delta = escolha.delta.content if escolha.delta else None
+                    if not delta:
+                        continue
+                    recebidos += len(delta)
+                    partes.append(delta)
+                    if primeiro_token is None:
+                        primeiro_token = time.perf_counter() - inicio
+                        reportar("primeiro_token", caracteres=recebidos, modelo=modelo)
+                    else:
+                        reportar("recebendo", caracteres=recebidos)
+        except Exception:
+            registrar_chamada(
+                passo, modelo, time.perf_counter() - inicio, sucesso=False,
+                primeiro_token=primeiro_token, **medidas,
+            )
+            raise
+        registrar_chamada(
+            passo, modelo, time.perf_counter() - inicio,
+            tokens_entrada=getattr(uso, "prompt_tokens", 0) or 0,
+            tokens_saida=getattr(uso, "completion_tokens", 0) or 0,
+            custo=getattr(uso, "cost", None),
+            primeiro_token=primeiro_token,
+            **medidas,
+        )
+        return "".join(partes)
 
-                try:
-                    b64 = base64.standard_b64encode(content).decode("utf-8")
-                    parts.append({
-                        "type": "file",
-                        "file": {
-                            "filename": f.name,
-                            "file_data": f"data:application/pdf;base64,{b64}",
-                        },
-                    })
-                    logger.debug("Arquivo %s codificado (%d bytes).", f.name, len(content))
-                except Exception as e:
-                    logger.error("Falha ao processar arquivo %s: %s", f.name, e)
-                    st.warning(f"Não foi possível processar {f.name}: {e}")
+    def _criar(self, passo: str | None, modelo: str, reserva: str | None = None, **kwargs):
+        """
+        chat.completions.create sob o limitador do processo. Em 429 pausa todas
+        as requisições pelo Retry-After do provedor; 5xx e falhas de conexão
+        repetem só esta chamada, com backoff exponencial. Em timeout, a próxima
+        tentativa vai direto para `reserva` (se houver).
+        """
+        for tentativa in range(_MAX_TENTATIVAS):
+            ultima = tentativa == _MAX_TENTATIVAS - 1
+            reportar("fila")
+            try:
+                with self.limitador.slot(self.usuario):
+                    return self._chamar(passo, modelo, **kwargs)
+            except RateLimitError as e:
+                if ultima:
+                    raise
+                espera = retry_after(e.response.headers)
+                espera = espera if espera is not None else _backoff(tentativa)
+                reportar("tentativa", motivo="Limite do provedor", espera=espera)
+                self.limitador.pausar(espera)
+            except (APIStatusError, APIConnectionError) as e:
+                status = getattr(e, "status_code", None)
+                if ultima or (status is not None and status < 500):
+                    raise
+                if isinstance(e, APITimeoutError) and reserva and modelo != reserva:
+                    logger.warning("Timeout de %s em %s; repetindo com %s.", modelo, passo, reserva)
+                    modelo = reserva
                     continue
+                espera = _backoff(tentativa)
+                logger.warning("Falha transitória da IA (%s); nova tentativa em %.1fs.", status or "conexão", espera)
+                reportar("tentativa", motivo="Falha transitória da IA", espera=espera)
+                time.sleep(espera)
+
+    def _texto(self, passo: str | None, modelo: str, reserva: str | None,
+               messages: list[dict], response_format: dict | None) -> str:
+        """Uma chamada a `modelo`; devolve o texto da resposta ("" se vazia)."""
+        kwargs = {"response_format": response_format} if response_format else {}
+        try:
+            return self._criar(passo, modelo, reserva, messages=messages, **kwargs)
+        except BadRequestError as e:
+            if not response_format or "response_format" not in str(e):
+                raise
+            # Provedor sem suporte a json_schema: repete em modo texto livre
+            logger.warning("Modelo %s recusou response_format; repetindo sem schema.", modelo)
+            return self._criar(passo, modelo, reserva, messages=messages)
+
+    def _completar(self, messages: list[dict], response_format: dict | None, passo: str | None = None) -> str:
+        """Chamada ao modelo do passo, com hedging (se ativo) ou fallback em timeout."""
+        modelo, reserva = self.modelo(passo), self.modelo_reserva(passo)
+        if self._hedging and reserva:
+            return self._completar_com_hedge(passo, modelo, reserva, messages, response_format)
+        return self._texto(passo, modelo, reserva, messages, response_format)
+
+    def _atraso_hedge(self, passo: str | None, modelo: str) -> float:
+        p95 = latencia_percentil(passo, modelo, 95, minimo_amostras=_HEDGE_AMOSTRAS_MINIMAS)
+        return max(_HEDGE_ATRASO_MINIMO, p95 if p95 is not None else _HEDGE_ATRASO_PADRAO)
+
+    def _completar_com_hedge(self, passo: str | None, modelo: str, reserva: str,
+                             messages: list[dict], response_format: dict | None) -> str:
+        """
+        Dispara `modelo`; se não houver JSON válido até o atraso de hedge (ou se
+        ele falhar antes), dispara `reserva` em paralelo. Devolve o primeiro
+        JSON válido; se nenhum for válido, o primeiro texto recebido (segue
+        para o reparo em _interpretar); se ambos falharem, a falha do principal.
+        """
+        atraso = self._atraso_hedge(passo, modelo)
+        inicio = time.monotonic()
+        principal = submeter(_POOL_HEDGE, self._texto, passo, modelo, None, messages, response_format)
+        pendentes = {principal}
+        concluidos = []
+        hedge = None
+
+        while pendentes:
+            limite = _INTERVALO_PROGRESSO
+            if hedge is None:
+                limite = min(limite, max(0.0, atraso - (time.monotonic() - inicio)))
+            feitos, pendentes = wait(pendentes, timeout=limite, return_when=FIRST_COMPLETED)
+            despachar()
+            if not feitos and (hedge or time.monotonic() - inicio < atraso):
+                continue
+            for f in feitos:
+                if f.exception() is None and _json_valido(f.result()):
+                    if f is hedge:
+                        logger.info("Hedge em %s: %s respondeu antes de %s.", passo, reserva, modelo)
+                    return f.result()
+                concluidos.append(f)
+            if hedge is None:
+                if not feitos:
+                    motivo = f"sem resposta em {atraso:.1f}s"
+                else:
+                    motivo = "falhou" if principal.exception() is not None else "devolveu JSON inválido"
+                logger.info("Hedge em %s: %s %s; disparando %s.", passo, modelo, motivo, reserva)
+                hedge = submeter(_POOL_HEDGE, self._texto, passo, reserva, None, messages, response_format)
+                pendentes.add(hedge)
+
+        for f in concluidos:
+            if f.exception() is None:
+                return f.result()
+        return principal.result()
+
+    def _interpretar(self, text: str, passo: str | None, response_format: dict | None) -> dict:
+        """
+        json.loads + validação pelo model do passo. Se falhar, faz UM reparo
+        só com texto (sem reenviar os PDFs); por último, extração tolerante.
+        """
+        reportar("interpretando")
+        modelo = MODELOS_POR_PASSO.get(passo)
+        if modelo is None:
+            return extrair_json_seguro(text)
+        try:
+            return validar_saida(modelo, text)
+        except (json.JSONDecodeError, ValidationError) as e:
+            logger.warning("Resposta fora do schema em %s: %s — tentando reparo.", passo, str(e)[:300])
+            erro = str(e)[:1000]
+
+        reportar("reparo")
+        prompt_reparo = get_prompt_partes("reparo_json", erro=erro, resposta=text[:20000])
+        try:
+            reparado = self._completar(_mensagens(prompt_reparo, []), response_format, "reparo_json")
+            dados = validar_saida(modelo, reparado)
+            logger.info("Reparo de JSON bem-sucedido em %s.", passo)
+            return dados
+        except Exception as e:
+            logger.warning("Reparo de JSON falhou em %s: %s", passo, str(e)[:300])
+        return extrair_json_seguro(text)
+
+    def _executar(self, prompt: PromptPartes, files, passo, avisos: list[str]) -> dict:
+        """
+        Monta a requisição (instruções, PDFs como AnexoPDF, dados), chama o modelo e interpreta
+        a resposta. Não usa st.* — pode rodar em threads; avisos para o usuário
+        vão para `avisos` e falhas sobem como FalhaIA. Os eventos de progresso
+        contam para a unidade do PDF (ou do passo, se forem vários).
+        """
+        with unidade(_rotulo(passo, files)):
+            try:
+                return self._executar_unidade(prompt, files, passo, avisos)
+            finally:
+                reportar("concluido")
+
+    def _executar_unidade(self, prompt: PromptPartes, files, passo, avisos: list[str]) -> dict:
+        parts = []
+        for f in files or []:
+            try:
+                anexo = AnexoPDF(f)      # só o tamanho; o conteúdo é lido em blocos no envio
+            except Exception as e:
+                logger.error("Falha ao processar arquivo %s: %s", f.name, e)
+                avisos.append(f"Não foi possível processar {f.name}: {e}")
+                continue
+            reportar("preparando", bytes=anexo.tamanho)
 
-        if not parts:
+            if not anexo.tamanho:
+                logger.warning("Arquivo %s está vazio — ignorado.", f.name)
+                avisos.append(f"Arquivo {f.name} está vazio.")
+                continue
+
+            if anexo.tamanho > 20 * 1024 * 1024:
+                logger.warning("Arquivo %s excede 20MB (%d bytes) — ignorado.", f.name, anexo.tamanho)
+                avisos.append(f"Arquivo {f.name} excede 20MB. Ignorando.")
+                continue
+
+            parts.append({"type": "file", "file": {"filename": f.name, "file_data": anexo}})
+            logger.debug("Arquivo %s anexado (%d bytes).", f.name, anexo.tamanho)
+
+        # Sem arquivos = chamada só de texto (ex.: consolidação); com arquivos,
+        # ao menos um precisa ser válido
+        if files and not parts:
             logger.error("Nenhum arquivo válido para análise.")
-            st.error("Nenhum arquivo válido para análise.")
-            return {}
+            raise FalhaIA("Nenhum arquivo válido para análise.")
 
-        parts.append({"type": "text", "text": prompt})
+        messages = _mensagens(prompt, parts)
+        response_format = self._response_format(passo)
 
         try:
-            logger.info("Enviando requisição para modelo %s (%d partes).", self.model, len(parts))
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": parts}],
-            )
-            text = res.choices[0].message.content
+            logger.info("Enviando requisição para modelo %s (%d arquivo(s)).", self.modelo(passo), len(parts))
+            text = self._completar(messages, response_format, passo)
             if not text:
                 logger.warning("IA retornou resposta vazia.")
-                st.warning("A IA não retornou conteúdo.")
+                avisos.append("A IA não retornou conteúdo.")
                 return {}
             logger.info("Resposta recebida da IA (%d caracteres).", len(text))
-            return extrair_json_seguro(text)
+            return self._interpretar(text, passo, response_format)
         except Exception as e:
             erro_str = str(e)
             if "clipboard" in erro_str.lower() or "image" in erro_str.lower():
                 logger.error("Erro de formato de PDF na IA: %s", erro_str)
-                st.error("Erro ao processar PDF: formato incompatível. Verifique se os arquivos são PDFs válidos.")
-            else:
-                logger.error("Erro na chamada da IA: %s", erro_str)
-                st.error(f"Erro na IA: {erro_str}")
-            return {}
+                raise FalhaIA("Erro ao processar PDF: formato incompatível. Verifique se os arquivos são PDFs válidos.") from e
+            logger.error("Erro na chamada da IA: %s", erro_str)
+            raise FalhaIA(f"Erro na IA: {erro_str}") from e
 
-    def _cached_generate(self, passo: str, files: list, prompt: str, **cache_kwargs) -> dict:
+    def _generate_content(self, prompt: PromptPartes, files=None, passo=None):
+        avisos: list[str] = []
+        erro = None
+        try:
+            dados = self._executar(prompt, files, passo, avisos)
+        except FalhaIA as e:
+            dados, erro = {}, str(e)
+        for aviso in avisos:
+            self._avisar("warning", aviso)
+        if erro:
+            self._avisar("error", erro)
+        return dados
+
+    def _cached_generate(self, passo: str, files: list, prompt: PromptPartes, **cache_kwargs) -> dict:
         """Wrapper com cache: verifica hit antes de chamar a IA."""
+        rotulo = _rotulo(passo, files)
+        declarar_unidades([rotulo])
+        reportar("hash", arquivos=len(files), unidade=rotulo)
         key = build_cache_key(passo, files, **cache_kwargs)
         cached = get_cached(key)
+        registrar_cache(passo, cached is not None, self.usuario)
+        reportar("cache", acertos=int(cached is not None), total=1, unidade=rotulo)
         if cached is not None:
-            st.info("♻️ Resultado carregado do cache (mesmo PDF já analisado).")
+            reportar("concluido", unidade=rotulo)
+            self._avisar("info", "♻️ Resultado carregado do cache (mesmo PDF já analisado).")
             return cached
-        result = self._generate_content(prompt, files)
+        result = self._generate_content(prompt, files, passo=passo)
         if result:
             set_cached(key, result)
         return result
 
     def extrair_contrato(self, files):
-        prompt = get_prompt("passo_0_contrato")
+        prompt = get_prompt_partes("passo_0_contrato")
         return self._cached_generate("passo_0_contrato", files, prompt)
 
     def extrair_proposta(self, file):
-        prompt = get_prompt("passo_1_proposta")
+        prompt = get_prompt_partes("passo_1_proposta")
         return self._cached_generate("passo_1_proposta", [file], prompt)
 
+    # Passos 2 (fiador), 3, 4 e 5: a IA só extrai fatos do documento e o cache
+    # é chaveado apenas pelo conteúdo dos PDFs. Aluguel, empresa e CNPJ entram
+    # nas regras locais (core/regras.py) — mudar esses valores não reenvia os PDFs.
+
     def analisar_fiador(self, files, aluguel):
-        prompt = get_prompt("passo_2_fiador", aluguel=str(aluguel))
-        return self._cached_generate("passo_2_fiador", files, prompt, aluguel=str(aluguel))
+        prompt = get_prompt_partes("passo_2_fiador")
+        extraido = self._cached_generate("passo_2_fiador", files, prompt)
+        return aplicar_regras_fiador(extraido, aluguel) if extraido else extraido
 
     def extrair_referencias(self, file):
-        prompt = get_prompt("passo_2_referencias")
+        prompt = get_prompt_partes("passo_2_referencias")
         return self._cached_generate("passo_2_referencias", [file], prompt)
 
+    # Passos 3, 4 e 5 (map-reduce): cada PDF é extraído sozinho, com cache pelo
+    # digest do próprio arquivo e chamadas em paralelo; os resultados são
+    # combinados em core/consolidacao.py. Adicionar uma certidão só custa a nova.
+
+    def _extrair_por_arquivo(self, passo: str, files: list, prompt: PromptPartes) -> tuple[list[dict], list[str]]:
+        """
+        Map: devolve (resultados, nomes) dos arquivos extraídos com sucesso, na
+        ordem de upload. Cache e mensagens ficam na thread que chamou; as
+        threads do pool só executam as chamadas à IA.
+        """
+        declarar_unidades([f.name for f in files])
+        reportar("hash", arquivos=len(files))
+        chaves = [build_cache_key(passo, [f]) for f in files]
+        resultados: list[dict | None] = [get_cached(k) for k in chaves]
+        for r in resultados:
+            registrar_cache(passo, r is not None, self.usuario)
+        pendentes = [i for i, r in enumerate(resultados) if r is None]
+
+        em_cache = len(files) - len(pendentes)
+        reportar("cache", acertos=em_cache, total=len(files))
+        for i, r in enumerate(resultados):
+            if r is not None:
+                reportar("concluido", unidade=files[i].name)
+        if em_cache:
+            self._avisar("info", f"♻️ {em_cache} de {len(files)} arquivo(s) carregado(s) do cache.")
+
+        avisos: list[str] = []
+        erros: list[str] = []
+        if pendentes:
+            with ThreadPoolExecutor(max_workers=min(_MAX_CHAMADAS_PARALELAS, len(pendentes))) as pool:
+                futuros = {
+                    submeter(pool, self._executar, prompt, [files[i]], passo, avisos): i
+                    for i in pendentes
+                }
+                aguardando = set(futuros)
+                while aguardando:
+                    feitos, aguardando = wait(aguardando, timeout=_INTERVALO_PROGRESSO, return_when=FIRST_COMPLETED)
+                    despachar()
+                    for futuro in feitos:
+                        i = futuros[futuro]
+                        try:
+                            dados = futuro.result()
+                        except FalhaIA as e:
+                            erros.append(f"{files[i].name}: {e}")
+                            continue
+                        if dados:
+                            set_cached(chaves[i], dados)
+                            resultados[i] = dados
+
+        for aviso in avisos:
+            self._avisar("warning", aviso)
+        for erro in erros:
+            self._avisar("error", erro)
+
+        ok = [i for i, r in enumerate(resultados) if r]
+        return [resultados[i] for i in ok], [files[i].name for i in ok]
+
     def mapear_serasa(self, files, empresa, cnpj):
-        prompt = get_prompt("passo_3_serasa", empresa=str(empresa), cnpj=str(cnpj))
-        return self._cached_generate("passo_3_serasa", files, prompt, empresa=str(empresa), cnpj=str(cnpj))
+        resultados, nomes = self._extrair_por_arquivo("passo_3_serasa", files, get_prompt_partes("passo_3_serasa"))
+        if not resultados:
+            return {}
+        extraido = consolidar_serasa(resultados, nomes)
+        return aplicar_divergencia(extraido, "alerta_divergencia_serasa", empresa, cnpj)
 
     def auditar_certidoes(self, files, empresa, cnpj):
-        prompt = get_prompt("passo_4_certidoes", empresa=str(empresa), cnpj=str(cnpj))
-        return self._cached_generate("passo_4_certidoes", files, prompt, empresa=str(empresa), cnpj=str(cnpj))
+        resultados, nomes = self._extrair_por_arquivo("passo_4_certidoes", files, get_prompt_partes("passo_4_certidoes"))
+        if not resultados:
+            return {}
+        extraido = consolidar_certidoes(resultados, nomes)
+        return aplicar_divergencia(extraido, "alerta_divergencia_certidoes", empresa, cnpj)
 
     def auditar_contabil(self, files, empresa, cnpj, aluguel, iptu):
-        prompt = get_prompt(
-            "passo_5_contabil",
-            empresa=str(empresa),
-            cnpj=str(cnpj),
-            aluguel=str(aluguel),
-            iptu=str(iptu),
-        )
-        return self._cached_generate(
-            "passo_5_contabil", files, prompt,
-            empresa=str(empresa), cnpj=str(cnpj),
-            aluguel=str(aluguel), iptu=str(iptu),
+        # aluguel/iptu não influenciam a extração contábil; o comprometimento
+        # é calculado sobre a TabelaFinanceira (passo 5, PDF e passo 6)
+        if len(files) > 1:
+            declarar_unidades(["passo_5_consolidacao"])   # a barra já conta com a consolidação
+        resultados, nomes = self._extrair_por_arquivo("passo_5_contabil", files, get_prompt_partes("passo_5_contabil"))
+        if not resultados:
+            return {}
+        extraido = consolidar_contabil(resultados, nomes)
+        if len(resultados) > 1:
+            extraido["analise_executiva"] = self._consolidar_analise_contabil(extraido)
+        return aplicar_divergencia(extraido, "alerta_divergencia_contabil", empresa, cnpj)
+
+    def _consolidar_analise_contabil(self, consolidado: dict) -> str:
+        """Reescreve a análise sobre a tabela unificada — só texto, sem reenviar PDFs."""
+        tabela = {c: consolidado[c] for c in ("periodos", *CAMPOS_FINANCEIROS)}
+        prompt = get_prompt_partes(
+            "passo_5_consolidacao",
+            tabela=json.dumps(tabela, ensure_ascii=False, indent=1),
+            analises=consolidado["analise_executiva"],
         )
+        # Chave pelo conteúdo consolidado, não pelos PDFs enviados: um arquivo
+        # que falhou ou outra versão do prompt do passo 5 mudam a entrada
+        entradas = hashlib.sha256(prompt.dados.encode("utf-8")).hexdigest()
+        key = build_cache_key("passo_5_consolidacao", [], entradas=entradas)
+        cached = get_cached(key)
+        registrar_cache("passo_5_consolidacao", cached is not None, self.usuario)
+        if cached is not None:
+            reportar("concluido", unidade="passo_5_consolidacao")
+            return cached.get("analise_executiva", consolidado["analise_executiva"])
+
+        res = self._generate_content(prompt, None, passo="passo_5_consolidacao")
+        if not res.get("analise_executiva"):
+            return consolidado["analise_executiva"]
+        set_cached(key, res)
+        return res["analise_executiva"]
 
     def analisar_patrimonio_socios(self, files, d):
         _empresa      = d.get('empresa', 'não informado')
@@ -144,12 +617,16 @@ class AIService:
         _receitas     = d.get('receita_bruta', [])
         _resultados   = d.get('resultado', [])
         _analise_cont = d.get('analise_executiva', 'não informado')
-        _ult_resultado = _resultados[-1] if _resultados else 'não informado'
-        _ult_receita   = _receitas[-1] if _receitas else 'não informado'
-        _ult_periodo   = _periodos[-1] if _periodos else 'não informado'
+        # Último período com receita preenchida (ignora colunas "-" da IA)
+        _tabela = tabela_financeira(d)
+        _ult = _tabela.ultimo_indice()
+        _ult_resultado = _resultados[_ult] if _ult is not None and _ult < len(_resultados) else 'não informado'
+        _ult_receita   = _receitas[_ult] if _ult is not None and _ult < len(_receitas) else 'não informado'
+        _ult_periodo   = _tabela.periodos[_ult] if _ult is not None else 'não informado'
+        _indicadores   = _formatar_indicadores(_tabela, _ult)
 
         # Configurações personalizadas do analista (carregadas no login)
-        _config = st.session_state.get("config_usuario") or {}
+        _config = self.config_usuario
         _nome_empresa = _config.get("nome_empresa") or "Paulo Bio Imóveis"
         _cabecalho = _config.get("cabecalho_laudo", "").strip()
         _cabecalho_instrucao = (
@@ -157,7 +634,7 @@ class AIService:
             if _cabecalho else ""
         )
 
-        prompt = get_prompt(
+        prompt = get_prompt_partes(
             "passo_6_patrimonio",
             empresa=str(_empresa),
             data_abertura=str(_abertura),
@@ -174,11 +651,14 @@ class AIService:
             ult_resultado=str(_ult_resultado),
             ult_receita=str(_ult_receita),
             ult_periodo=str(_ult_periodo),
+            indicadores=_indicadores,
             nome_empresa=_nome_empresa,
             cabecalho_instrucao=_cabecalho_instrucao,
         )
+        # A chave cobre todas as entradas declaradas no grafo (core/grafo.py):
+        # mudar qualquer campo lido aqui gera um parecer novo, não um acerto antigo
         return self._cached_generate(
             "passo_6_patrimonio", files, prompt,
-            empresa=str(_empresa), aluguel=str(_aluguel),
-            score_serasa=str(_score), ult_periodo=str(_ult_periodo),
+            entradas=GRAFO.no("passo_6_patrimonio").impressao(d),
+            nome_empresa=_nome_empresa, cabecalho=_cabecalho,
         )
@@ -1,13 +1,46 @@
 import streamlit as st
 import json
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
+from core.estado import CacheCompartilhado, obter_estado
 from core.logger import get_logger
+from utils.moeda import parse_moeda
 
 logger = get_logger(__name__)
 
+# Cache de leitura no estado compartilhado (core/estado.py), comum às réplicas.
+# Listagem/contagem são invalidadas por geração a cada análise salva ou
+# excluída; a config do usuário é removida ao ser salva.
+_TTL_LISTAGEM = 60
+_TTL_CONFIG = 300
+
+# Conexões HTTP ao Supabase reaproveitadas (keep-alive, sem novo handshake
+# TLS por chamada). O requests.Session não garante uso concorrente seguro
+# (cookies e estado do adaptador), então cada thread — a do script do
+# Streamlit, cada worker da fila de tarefas — tem a sua própria sessão.
+_POOL_HTTP = 4
+_local_http = threading.local()
+
+
+def _criar_sessao_http() -> requests.Session:
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=_POOL_HTTP)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+
+def _sessao_http() -> requests.Session:
+    """Sessão HTTP da thread atual, criada no primeiro uso."""
+    sessao = getattr(_local_http, "sessao", None)
+    if sessao is None:
+        sessao = _local_http.sessao = _criar_sessao_http()
+    return sessao
+
 
 class DBService:
     def __init__(self):
@@ -24,11 +57,21 @@ class DBService:
         # GSheets Config (Legacy)
         self.gs_enabled = "gcp_service_account" in st.secrets
 
+        estado = obter_estado()
+        self._listagens = CacheCompartilhado(estado, "db_analises", _TTL_LISTAGEM)
+        self._configs = CacheCompartilhado(estado, "config_usuario", _TTL_CONFIG)
+
+    @property
+    def http(self) -> requests.Session:
+        """Sessão HTTP da thread que faz a chamada (ver _sessao_http)."""
+        return _sessao_http()
+
     def salvar_analise(self, dados, decisao):
         """Salva a análise tanto no Supabase quanto no Google Sheets."""
         sucesso_supabase = self._salvar_supabase_rest(dados, decisao)
         sucesso_gsheets = self._salvar_gsheets(dados, decisao) if self.gs_enabled else False
         if sucesso_supabase:
+            self._listagens.invalidar()
             self._registrar_auditoria(
                 acao="ANALISE_CRIADA",
                 entidade="Análise",
@@ -41,13 +84,8 @@ class DBService:
     def _salvar_supabase_rest(self, dados, decisao):
         """Implementação manual via API REST para evitar a dependência do pacote 'supabase'."""
         try:
-            # Limpeza robusta do R$ e formatação brasileira para float (ex: R$ 20.000,00 -> 20000.0)
-            al_raw = str(dados.get("aluguel", "0"))
-            al_clean = al_raw.replace('R$', '').replace(' ', '').replace('.', '').replace(',', '.')
-            try:
-                al_float = float(''.join(c for c in al_clean if c.isdigit() or c == '.'))
-            except (ValueError, TypeError):
-                al_float = 0.0
+            # Formatação brasileira para float (ex: R$ 20.000,00 -> 20000.0)
+            al_float = parse_moeda(dados.get("aluguel", "0"))
 
             headers = {
                 "apikey": self.supabase_key,
@@ -69,7 +107,7 @@ class DBService:
             }
             
             logger.info("Salvando análise no Supabase: empresa=%s status=%s", payload.get("empresa"), decisao)
-            response = requests.post(self.rest_url, headers=headers, json=payload)
+            response = self.http.post(self.rest_url, headers=headers, json=payload)
 
             if response.status_code in [200, 201]:
                 logger.info("Análise salva com sucesso no Supabase.")
@@ -88,6 +126,10 @@ class DBService:
         Busca análises do Supabase para o Histórico e Dashboard.
         Suporta paginação server-side via offset (PostgREST Range header).
         """
+        chave = f"lista:{limite}:{offset}"
+        cached = self._listagens.obter(chave)
+        if cached is not None:
+            return cached
         try:
             headers = {
                 "apikey": self.supabase_key,
@@ -97,13 +139,14 @@ class DBService:
                 "Prefer": "count=exact",
             }
             url = f"{self.rest_url}?select=*&order=created_at.desc&limit={limite}&offset={offset}"
-            res = requests.get(url, headers=headers)
+            res = self.http.get(url, headers=headers)
             if res.status_code == 200:
                 dados = res.json()
                 logger.info(
                     "Listagem Supabase: %d análises retornadas (offset=%d).",
                     len(dados), offset,
                 )
+                self._listagens.definir(chave, dados)
                 return dados
             logger.warning("Listagem Supabase retornou status %d.", res.status_code)
             return []
@@ -113,6 +156,9 @@ class DBService:
 
     def contar_analises(self) -> int:
         """Retorna o total de análises no banco (para paginação server-side)."""
+        cached = self._listagens.obter("contagem")
+        if cached is not None:
+            return cached
         try:
             headers = {
                 "apikey": self.supabase_key,
@@ -121,13 +167,14 @@ class DBService:
             }
             # HEAD request com Range header para obter apenas o count
             url = f"{self.rest_url}?select=id"
-            res = requests.get(url, headers=headers, params={"limit": "0"})
+            res = self.http.get(url, headers=headers, params={"limit": "0"})
             if res.status_code in [200, 206]:
                 # PostgREST retorna Content-Range: 0-0/TOTAL
                 content_range = res.headers.get("Content-Range", "")
                 if "/" in content_range:
                     total_str = content_range.split("/")[-1]
                     if total_str.isdigit():
+                        self._listagens.definir("contagem", int(total_str))
                         return int(total_str)
             return 0
         except Exception as e:
@@ -143,9 +190,10 @@ class DBService:
                 "Content-Type": "application/json",
             }
             url = f"{self.rest_url}?id=eq.{analise_id}"
-            res = requests.delete(url, headers=headers)
+            res = self.http.delete(url, headers=headers)
             if res.status_code in [200, 204]:
                 logger.info("Análise %s excluída com sucesso.", analise_id)
+                self._listagens.invalidar()
                 self._registrar_auditoria(
                     acao="ANALISE_EXCLUIDA",
                     entidade="Análise",
@@ -170,17 +218,22 @@ class DBService:
         }
         if not email:
             return defaults
+        cached = self._configs.obter(email)
+        if cached is not None:
+            return {**defaults, **cached}
         try:
             headers = {
                 "apikey": self.supabase_key,
                 "Authorization": f"Bearer {self.supabase_key}",
             }
             url = f"{self.supabase_url}/rest/v1/configuracoes_usuario?usuario_email=eq.{email}&select=nome_empresa,cabecalho_laudo,rodape_laudo"
-            res = requests.get(url, headers=headers, timeout=5)
+            res = self.http.get(url, headers=headers, timeout=5)
             if res.status_code == 200:
                 rows = res.json()
+                self._configs.definir(email, rows[0] if rows else {})
                 if rows:
                     return {**defaults, **rows[0]}
+                return defaults
             logger.warning("get_config_usuario: status %d", res.status_code)
         except Exception as e:
             logger.warning("get_config_usuario falhou (non-fatal): %s", e)
@@ -204,9 +257,10 @@ class DBService:
                 "rodape_laudo": config.get("rodape_laudo", ""),
             }
             url = f"{self.supabase_url}/rest/v1/configuracoes_usuario"
-            res = requests.post(url, headers=headers, json=payload, timeout=5)
+            res = self.http.post(url, headers=headers, json=payload, timeout=5)
             if res.status_code in [200, 201, 204]:
                 logger.info("Configurações salvas para %s", email)
+                self._configs.remover(email)
                 return True
             logger.error("salvar_config_usuario: status %d — %s", res.status_code, res.text)
             return False
@@ -214,6 +268,64 @@ class DBService:
             logger.error("salvar_config_usuario falhou: %s", e)
             return False
 
+    # ── Rascunho da análise em andamento (core/rascunhos.py) ──────────────────
+    # Tabela `rascunhos`: usuario_email, campo, valor (JSON em texto),
+    # atualizado_em; chave única (usuario_email, campo).
+
+    def ler_rascunho(self, usuario: str) -> dict:
+        """Campos do rascunho do usuário ({campo: JSON}); {} se não houver ou em erro."""
+        if not usuario:
+            return {}
+        try:
+            headers = {
+                "apikey": self.supabase_key,
+                "Authorization": f"Bearer {self.supabase_key}",
+            }
+            url = f"{self.supabase_url}/rest/v1/rascunhos"
+            params = {"usuario_email": f"eq.{usuario}", "select": "campo,valor"}
+            res = self.http.get(url, headers=headers, params=params, timeout=5)
+            if res.status_code == 200:
+                return {r["campo"]: r["valor"] for r in res.json()}
+            logger.warning("ler_rascunho: status %d", res.status_code)
+        except Exception as e:
+            logger.warning("ler_rascunho falhou (non-fatal): %s", e)
+        return {}
+
+    def gravar_rascunho(self, usuario: str, campos: dict, removidos: list) -> bool:
+        """Upsert dos campos alterados e remoção dos que sumiram do rascunho."""
+        if not usuario:
+            return False
+        try:
+            headers = {
+                "apikey": self.supabase_key,
+                "Authorization": f"Bearer {self.supabase_key}",
+                "Content-Type": "application/json",
+                "Prefer": "resolution=merge-duplicates,return=minimal",
+            }
+            url = f"{self.supabase_url}/rest/v1/rascunhos"
+            agora = datetime.utcnow().isoformat() + "Z"
+            if campos:
+                payload = [
+                    {"usuario_email": usuario, "campo": c, "valor": v, "atualizado_em": agora}
+                    for c, v in campos.items()
+                ]
+                res = self.http.post(url, headers=headers, params={"on_conflict": "usuario_email,campo"},
+                                    json=payload, timeout=5)
+                if res.status_code not in [200, 201, 204]:
+                    logger.error("gravar_rascunho: status %d — %s", res.status_code, res.text)
+                    return False
+            if removidos:
+                lista = ",".join(json.dumps(c) for c in removidos)
+                params = {"usuario_email": f"eq.{usuario}", "campo": f"in.({lista})"}
+                res = self.http.delete(url, headers=headers, params=params, timeout=5)
+                if res.status_code not in [200, 204]:
+                    logger.error("gravar_rascunho (remoção): status %d — %s", res.status_code, res.text)
+                    return False
+            return True
+        except Exception as e:
+            logger.error("gravar_rascunho falhou: %s", e)
+            return False
+
     def _registrar_auditoria(self, acao: str, entidade: str, entidade_id: str,
                               detalhe: str, meta: dict | None = None) -> None:
         """Grava um evento de auditoria na tabela audit_log do Supabase. Fire-and-forget."""
@@ -234,7 +346,7 @@ class DBService:
                 "timestamp": datetime.utcnow().isoformat() + "Z",
             }
             audit_url = f"{self.supabase_url}/rest/v1/audit_log"
-            requests.post(audit_url, headers=headers, json=payload, timeout=5)
+            self.http.post(audit_url, headers=headers, json=payload, timeout=5)
             logger.info("Auditoria registrada: %s %s %s", acao, entidade, entidade_id)
         except Exception as e:
             logger.warning("Falha ao registrar auditoria (non-fatal): %s", e)
@@ -258,3 +370,21 @@ class DBService:
             logger.error("Erro no Google Sheets: %s", e)
             st.error(f"Erro no GSheets: {e}")
             return False
+
+
+_instancias: dict[tuple[str, str], DBService] = {}
+_lock_instancias = threading.Lock()
+
+
+def obter_db() -> DBService:
+    """
+    DBService único do processo por projeto Supabase (url, chave), reaproveitado
+    por todas as sessões e reruns. Secrets trocados criam outra instância.
+    """
+    supabase = st.secrets["supabase"]
+    chave = (supabase["url"], supabase["key"])
+    with _lock_instancias:
+        if chave not in _instancias:
+            _instancias[chave] = DBService()
+            logger.info("DBService criado para %s.", chave[0])
+        return _instancias[chave]
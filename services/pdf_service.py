@@ -1,9 +1,27 @@
 from __future__ import annotations
+import copy
+import functools
+import io
+import os
+import tempfile
 from dataclasses import dataclass
 from datetime import datetime
+from pathlib import Path
 from typing import TypedDict
-from fpdf import FPDF
-from utils.formatters import formatar_moeda_br, limpa_pdf, safe_float, limpa_markdown
+import numpy as np
+from fontTools import ttLib
+from fontTools import subset as ftsubset
+from fpdf import FPDF, __version__ as _VERSAO_FPDF
+try:
+    from fpdf.fonts import SubsetMap, TTFFont
+except ImportError:  # internos do fpdf2 mudaram: _registrar_fonte usa add_font()
+    SubsetMap = TTFFont = None
+from core.logger import get_logger
+from core.models import tabela_financeira
+from utils.formatters import formatar_moeda_br, limpa_pdf, limpa_markdown
+from utils.moeda import parse_moeda
+
+logger = get_logger(__name__)
 
 
 # ---------------------------------------------------------------------------
@@ -103,7 +121,24 @@ class PDFConfig:
     YELLOW_B: int = 15
 
     # Tipografia
-    FONT: str = "Helvetica"
+    FONT: str = "Helvetica"            # fonte core (Latin-1) — fallback
+    # Fonte Unicode embutida (subset); sem os arquivos, cai para FONT + limpa_pdf
+    USAR_FONTE_UNICODE: bool = True
+    FONT_UNICODE: str = "DejaVuSans"
+    FONT_UNICODE_ARQUIVOS: tuple[tuple[str, str], ...] = (
+        ("", "DejaVuSans.ttf"),
+        ("B", "DejaVuSans-Bold.ttf"),
+        ("I", "DejaVuSans-Oblique.ttf"),
+    )
+    FONT_UNICODE_DIRS: tuple[str, ...] = (
+        "assets/fonts",
+        "/usr/share/fonts/truetype/dejavu",
+    )
+    # Faixas mantidas no subset-base (pontuação, moedas, setas, símbolos, ✓/✗)
+    FONT_UNICODE_FAIXAS: tuple[tuple[int, int], ...] = (
+        (0x0020, 0x007E), (0x00A0, 0x017F), (0x2000, 0x206F), (0x20A0, 0x20BF),
+        (0x2100, 0x214F), (0x2190, 0x22FF), (0x25A0, 0x27BF),
+    )
     FONT_SIZE_BODY: int = 10
     FONT_SIZE_SMALL: int = 8
     FONT_SIZE_TITLE_SECTION: int = 14
@@ -157,6 +192,73 @@ PASSOS_WORKFLOW: list[tuple[str, str]] = [
 ]
 
 
+# ---------------------------------------------------------------------------
+# Fonte Unicode — parse do TTF feito uma vez por processo
+# ---------------------------------------------------------------------------
+
+# Cópia do TTFFont em cache validada com o fpdf2 2.8.x; outra versão usa add_font()
+_FPDF_COMPATIVEL = _VERSAO_FPDF.startswith("2.8.")
+
+# Atributos internos do TTFFont que _registrar_fonte recria em cada documento
+# (estado do subset, do output e do shaping) ...
+_ATRIBUTOS_NOVOS = ("i", "ttfont", "_hbfont", "biggest_size_pt", "missing_glyphs", "subset", "color_font")
+# ... e os que copia (o output grava id/nome no descritor; cw é defaultdict)
+_ATRIBUTOS_COPIADOS = ("desc", "cw", "cmap", "glyph_ids")
+
+
+def _localizar_fonte(arquivo: str) -> Path | None:
+    for pasta in CFG.FONT_UNICODE_DIRS:
+        caminho = Path(pasta) / arquivo
+        if caminho.is_file():
+            return caminho
+    return None
+
+
+def _subset_base(caminho: str) -> Path:
+    """
+    Reduz o TTF às faixas de CFG.FONT_UNICODE_FAIXAS. O arquivo resultante fica
+    no diretório temporário, identificado por nome/tamanho/mtime da fonte
+    original, e é reaproveitado entre processos.
+    """
+    origem = Path(caminho)
+    info = origem.stat()
+    destino = Path(tempfile.gettempdir()) / "paulobio_fontes" / (
+        f"{origem.stem}-{info.st_size}-{int(info.st_mtime)}.ttf"
+    )
+    if destino.is_file():
+        return destino
+
+    opcoes = ftsubset.Options()
+    opcoes.notdef_outline = True
+    opcoes.drop_tables += ["FFTM"]
+    subsetter = ftsubset.Subsetter(opcoes)
+    subsetter.populate(unicodes=[
+        cp for inicio, fim in CFG.FONT_UNICODE_FAIXAS for cp in range(inicio, fim + 1)
+    ])
+    fonte = ttLib.TTFont(origem)
+    subsetter.subset(fonte)
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_suffix(f".{os.getpid()}.tmp.ttf")
+    fonte.save(temporario)
+    temporario.replace(destino)  # atômico: outro processo nunca lê arquivo parcial
+    return destino
+
+
+@functools.lru_cache(maxsize=8)
+def _fonte_ttf_base(caminho: str, estilo: str) -> tuple[TTFFont, bytes]:
+    """
+    Subset-base + parse do TTF (métricas, cmap, larguras) uma única vez por
+    processo. Retorna o objeto-modelo e os bytes do subset; cada documento
+    recebe uma cópia com estado próprio (ver PDFExecutivo._registrar_fonte).
+    """
+    base = _subset_base(caminho)
+    rascunho = FPDF()
+    rascunho.add_font(CFG.FONT_UNICODE, estilo, base)
+    modelo = rascunho.fonts[f"{CFG.FONT_UNICODE.lower()}{estilo}"]
+    return modelo, base.read_bytes()
+
+
 # ---------------------------------------------------------------------------
 # Classe principal
 # ---------------------------------------------------------------------------
@@ -178,6 +280,80 @@ class PDFExecutivo(FPDF):
         self.set_auto_page_break(auto=True, margin=25)
         self._section_counter: int = 0  # numeração contínua de seções
         self._rodape_customizado: str = rodape_customizado.strip()
+        self._fonte: str = CFG.FONT
+        self._cmap_unicode: dict[int, str] | None = None
+        if CFG.USAR_FONTE_UNICODE:
+            self._carregar_fonte_unicode()
+
+    # ------------------------------------------------------------------
+    # Fonte e texto
+    # ------------------------------------------------------------------
+
+    def _carregar_fonte_unicode(self) -> None:
+        """Registra a fonte TTF em todos os estilos; sem o regular, mantém Helvetica."""
+        regular = _localizar_fonte(CFG.FONT_UNICODE_ARQUIVOS[0][1])
+        if regular is None:
+            logger.warning("Fonte %s não encontrada; usando %s (Latin-1)", CFG.FONT_UNICODE, CFG.FONT)
+            return
+        try:
+            for estilo, arquivo in CFG.FONT_UNICODE_ARQUIVOS:
+                # Estilo sem arquivo próprio reaproveita o regular
+                self._registrar_fonte(estilo, _localizar_fonte(arquivo) or regular)
+        except Exception as exc:
+            logger.warning("Falha ao carregar fonte %s: %s; usando %s", CFG.FONT_UNICODE, exc, CFG.FONT)
+            for estilo, _ in CFG.FONT_UNICODE_ARQUIVOS:
+                self.fonts.pop(f"{CFG.FONT_UNICODE.lower()}{estilo}", None)
+            return
+        self._fonte = CFG.FONT_UNICODE
+        self._cmap_unicode = self.fonts[CFG.FONT_UNICODE.lower()].cmap
+
+    def _registrar_fonte(self, estilo: str, caminho: Path) -> None:
+        """
+        Equivalente a add_font(), mas reaproveitando o parse em cache do processo.
+        O subset é aplicado in-place no TTFont durante output(), então cada
+        documento ganha seu próprio TTFont (barato: carga lazy a partir dos bytes)
+        e seu próprio SubsetMap.
+
+        Nada mutável é compartilhado com o modelo nem com outros documentos
+        gerados em paralelo: o que o documento altera é recriado ou copiado
+        (_ATRIBUTOS_NOVOS, _ATRIBUTOS_COPIADOS); o restante são números e
+        textos. Depende de internos do fpdf2 2.8 (TTFFont, SubsetMap); com
+        outra versão, ou sem esses atributos, usa add_font() público, que
+        refaz o parse a cada documento.
+        """
+        if _FPDF_COMPATIVEL and SubsetMap is not None:
+            modelo, dados = _fonte_ttf_base(str(caminho), estilo)
+            atributos = (*_ATRIBUTOS_NOVOS, *_ATRIBUTOS_COPIADOS, "fontkey")
+            # color_font aponta para o TTFont do modelo: fonte colorida vai por add_font()
+            if all(hasattr(modelo, a) for a in atributos) and modelo.color_font is None:
+                fonte = copy.copy(modelo)
+                for atributo in _ATRIBUTOS_COPIADOS:
+                    setattr(fonte, atributo, copy.copy(getattr(modelo, atributo)))
+                fonte.i = len(self.fonts) + 1
+                fonte.ttfont = ttLib.TTFont(io.BytesIO(dados), recalcTimestamp=False, lazy=True)
+                fonte._hbfont = None
+                fonte.biggest_size_pt = 0
+                fonte.missing_glyphs = []
+                fonte.subset = SubsetMap(fonte)
+                fonte.color_font = None
+                self.fonts[fonte.fontkey] = fonte
+                return
+        logger.debug("fpdf2 sem os internos esperados; registrando %s via add_font()", caminho.name)
+        self.add_font(CFG.FONT_UNICODE, estilo, _subset_base(str(caminho)))
+
+    def _txt(self, texto) -> str:
+        """
+        Prepara o texto para escrita. Com a fonte Unicode o texto vai direto —
+        só removemos caracteres sem glifo na fonte (ex.: emojis). No modo
+        Helvetica, mantém a conversão Latin-1 de limpa_pdf.
+        """
+        if self._cmap_unicode is None:
+            return limpa_pdf(texto)
+        texto_str = str(texto).strip()
+        if texto_str.isascii():
+            return texto_str
+        cmap = self._cmap_unicode
+        return "".join(c for c in texto_str if ord(c) in cmap or c in "\n\t")
 
     # ------------------------------------------------------------------
     # Header / Footer (ABNT — rodapé padronizado)
@@ -195,19 +371,19 @@ class PDFExecutivo(FPDF):
         self.set_draw_color(200, 200, 200)
         self.line(CFG.MARGIN_LEFT, self.get_y(), 190, self.get_y())
         self.ln(2)
-        self.set_font(CFG.FONT, "I", CFG.FONT_SIZE_SMALL)
+        self.set_font(self._fonte, "I", CFG.FONT_SIZE_SMALL)
         self.set_text_color(CFG.GRAY_R, CFG.GRAY_G, CFG.GRAY_B)
         # Texto à esquerda: rodapé customizado ou padrão "Confidencial"
         texto_rodape = self._rodape_customizado if self._rodape_customizado else "Paulo Bio Imóveis - Confidencial"
         self.cell(
             CFG.CONTENT_WIDTH / 2, 5,
-            limpa_pdf(texto_rodape),
+            self._txt(texto_rodape),
             align="L",
         )
         # Texto à direita: página X de Y
         self.cell(
             CFG.CONTENT_WIDTH / 2, 5,
-            limpa_pdf(f"Página {self.page_no()} de {{nb}}"),
+            self._txt(f"Página {self.page_no()} de {{nb}}"),
             align="R",
         )
 
@@ -220,9 +396,9 @@ class PDFExecutivo(FPDF):
         self._section_counter += 1
         full_title = f"{self._section_counter}. {txt}"
         self.ln(8)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_TITLE_SECTION)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_TITLE_SECTION)
         self.set_text_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
-        self.cell(0, CFG.LINE_HEIGHT_SECTION, limpa_pdf(full_title), ln=1)
+        self.cell(0, CFG.LINE_HEIGHT_SECTION, self._txt(full_title), ln=1)
         self.set_draw_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
         self.line(CFG.MARGIN_LEFT, self.get_y(), 190, self.get_y())
         self.ln(4)
@@ -231,9 +407,9 @@ class PDFExecutivo(FPDF):
     def _section_title(self, txt: str) -> None:
         """Título de seção sem numeração (para sub-seções como checklist)."""
         self.ln(8)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_TITLE_SECTION)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_TITLE_SECTION)
         self.set_text_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
-        self.cell(0, CFG.LINE_HEIGHT_SECTION, limpa_pdf(txt), ln=1)
+        self.cell(0, CFG.LINE_HEIGHT_SECTION, self._txt(txt), ln=1)
         self.set_draw_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
         self.line(CFG.MARGIN_LEFT, self.get_y(), 190, self.get_y())
         self.ln(4)
@@ -243,12 +419,12 @@ class PDFExecutivo(FPDF):
         """Par label + valor em linha."""
         self.set_x(CFG.MARGIN_LEFT)
         self.set_text_color(0, 0, 0)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
         label_w = 55.0
-        self.cell(label_w, CFG.LINE_HEIGHT_BODY, limpa_pdf(label))
-        self.set_font(CFG.FONT, "", CFG.FONT_SIZE_BODY)
+        self.cell(label_w, CFG.LINE_HEIGHT_BODY, self._txt(label))
+        self.set_font(self._fonte, "", CFG.FONT_SIZE_BODY)
         value_w = 210.0 - CFG.MARGIN_LEFT - CFG.MARGIN_RIGHT - label_w
-        self.multi_cell(value_w, CFG.LINE_HEIGHT_BODY, limpa_pdf(str(value)), align="J")
+        self.multi_cell(value_w, CFG.LINE_HEIGHT_BODY, self._txt(str(value)), align="J")
 
     def _table_row_wrapped(self, label: str, value: str, label_w: float = 90.0, value_w: float = 80.0, zebra: bool = False) -> None:
         """Linha de tabela com word-wrap no valor — resolve overflow de texto."""
@@ -263,7 +439,7 @@ class PDFExecutivo(FPDF):
 
         # Calcular altura necessária para o valor (multi_cell)
         # Usamos um truque: medir quantas linhas o texto vai ocupar
-        text_clean = limpa_pdf(f" {value}")
+        text_clean = self._txt(f" {value}")
         # Largura efetiva do texto dentro da célula (margem interna de 1mm)
         effective_w = value_w - 2
         if effective_w <= 0:
@@ -273,8 +449,8 @@ class PDFExecutivo(FPDF):
 
         # Desenhar label (altura fixa = row_h)
         self.set_xy(x_start, y_start)
-        self.set_font(CFG.FONT, "", 9)
-        self.cell(label_w, row_h, limpa_pdf(f" {label}"), border=1, align="L", fill=True)
+        self.set_font(self._fonte, "", 9)
+        self.cell(label_w, row_h, self._txt(f" {label}"), border=1, align="L", fill=True)
 
         # Desenhar valor com multi_cell
         self.set_xy(x_start + label_w, y_start)
@@ -292,13 +468,13 @@ class PDFExecutivo(FPDF):
         self.set_draw_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
         self.rect(x, y, CFG.CARD_WIDTH, CFG.CARD_HEIGHT, "FD")
         self.set_xy(x + 2, y + 3)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_CARD_LABEL)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_CARD_LABEL)
         self.set_text_color(CFG.GRAY_R, CFG.GRAY_G, CFG.GRAY_B)
-        self.cell(50, 4, limpa_pdf(label), ln=1)
+        self.cell(50, 4, self._txt(label), ln=1)
         self.set_x(x + 2)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_CARD_VALUE)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_CARD_VALUE)
         self.set_text_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
-        self.cell(50, 8, limpa_pdf(value), ln=1)
+        self.cell(50, 8, self._txt(value), ln=1)
 
     def _draw_commitment_card(self, pct: float) -> None:
         """Card visual de comprometimento de renda com cor semafórica."""
@@ -321,15 +497,15 @@ class PDFExecutivo(FPDF):
         self.rect(CFG.MARGIN_LEFT, y, 4, 18, "F")
         # Texto
         self.set_xy(CFG.MARGIN_LEFT + 8, y + 2)
-        self.set_font(CFG.FONT, "B", 11)
+        self.set_font(self._fonte, "B", 11)
         self.set_text_color(r, g, b)
-        self.cell(40, 7, limpa_pdf(f"{pct:.1f}%"), align="L")
-        self.set_font(CFG.FONT, "B", 9)
+        self.cell(40, 7, self._txt(f"{pct:.1f}%"), align="L")
+        self.set_font(self._fonte, "B", 9)
         self.set_text_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
-        self.cell(30, 7, limpa_pdf(f"({status})"), align="L")
-        self.set_font(CFG.FONT, "", 9)
+        self.cell(30, 7, self._txt(f"({status})"), align="L")
+        self.set_font(self._fonte, "", 9)
         self.set_text_color(80, 80, 80)
-        self.cell(0, 7, limpa_pdf("Comprometimento do aluguel sobre a receita/renda mensal"), align="L")
+        self.cell(0, 7, self._txt("Comprometimento do aluguel sobre a receita/renda mensal"), align="L")
         self.set_y(y + 22)
 
     # ------------------------------------------------------------------
@@ -341,19 +517,19 @@ class PDFExecutivo(FPDF):
         self.add_page()
         self.ln(60)
 
-        self.set_font(CFG.FONT, "B", 11)
+        self.set_font(self._fonte, "B", 11)
         self.set_text_color(CFG.GRAY_R, CFG.GRAY_G, CFG.GRAY_B)
         self.cell(
             0, 5,
-            limpa_pdf(f"RELATÓRIO EXECUTIVO · {datetime.now().year}"),
+            self._txt(f"RELATÓRIO EXECUTIVO · {datetime.now().year}"),
             ln=1, align="C",
         )
 
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_TITLE_PAGE)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_TITLE_PAGE)
         self.set_text_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
         self.cell(
             0, 20,
-            limpa_pdf("Análise de Crédito e Risco"),
+            self._txt("Análise de Crédito e Risco"),
             ln=1, align="C",
         )
         self.ln(15)
@@ -366,20 +542,20 @@ class PDFExecutivo(FPDF):
         self.set_y(self.get_y() + 5)
 
         self.set_text_color(0, 0, 0)
-        self.set_font(CFG.FONT, "B", 15)
-        self.cell(0, 10, limpa_pdf(empresa_nome), ln=1, align="C")
+        self.set_font(self._fonte, "B", 15)
+        self.cell(0, 10, self._txt(empresa_nome), ln=1, align="C")
 
-        self.set_font(CFG.FONT, "", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "", CFG.FONT_SIZE_BODY)
         self.set_text_color(80, 80, 80)
-        self.multi_cell(0, 6, limpa_pdf(f"Imóvel: {imovel_nome}"), align="C")
+        self.multi_cell(0, 6, self._txt(f"Imóvel: {imovel_nome}"), align="C")
         self.ln(1)
 
         self.set_y(220)
-        self.set_font(CFG.FONT, "B", 12)
+        self.set_font(self._fonte, "B", 12)
         self.set_text_color(100, 100, 100)
         self.cell(
             0, 10,
-            limpa_pdf(f"Santo André - SP, {CFG.data_hoje_numerica()}"),
+            self._txt(f"Santo André - SP, {CFG.data_hoje_numerica()}"),
             ln=1, align="C",
         )
 
@@ -388,11 +564,11 @@ class PDFExecutivo(FPDF):
         self.add_page()
         self._section_title("Sumário Executivo")
 
-        self.set_font(CFG.FONT, "", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "", CFG.FONT_SIZE_BODY)
         self.set_text_color(80, 80, 80)
         self.multi_cell(
             0, 5,
-            limpa_pdf(
+            self._txt(
                 "Este relatório apresenta a análise de crédito e risco elaborada pela "
                 "Paulo Bio Imóveis, contemplando qualificação societária, auditoria de "
                 "fiadores, análise de crédito (Serasa), auditoria contábil/financeira e "
@@ -407,7 +583,7 @@ class PDFExecutivo(FPDF):
             ("Pretendente", str(dados.get("pretendente", dados.get("empresa", "-")))),
             ("CNPJ", str(dados.get("cnpj", "-"))),
             ("Imóvel", str(dados.get("imovel", "-"))),
-            ("Aluguel Mensal", formatar_moeda_br(safe_float(dados.get("aluguel", 0)))),
+            ("Aluguel Mensal", formatar_moeda_br(parse_moeda(dados.get("aluguel", 0)))),
             ("Score Serasa", str(dados.get("score_serasa", "-"))),
             ("Nível de Risco", str(dados.get("risco_serasa", "-"))),
             ("Veredito", decisao),
@@ -415,9 +591,9 @@ class PDFExecutivo(FPDF):
 
         self.set_fill_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
         self.set_text_color(255, 255, 255)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
-        self.cell(60, 8, limpa_pdf(" Indicador"), border=1, align="L", fill=True)
-        self.cell(110, 8, limpa_pdf(" Valor"), border=1, ln=1, align="L", fill=True)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
+        self.cell(60, 8, self._txt(" Indicador"), border=1, align="L", fill=True)
+        self.cell(110, 8, self._txt(" Valor"), border=1, ln=1, align="L", fill=True)
 
         self.set_text_color(0, 0, 0)
         for i, (label, valor) in enumerate(campos_resumo):
@@ -426,24 +602,24 @@ class PDFExecutivo(FPDF):
                 self.set_fill_color(CFG.LIGHT_BG_R, CFG.LIGHT_BG_G, CFG.LIGHT_BG_B)
             else:
                 self.set_fill_color(255, 255, 255)
-            self.set_font(CFG.FONT, "B", 9)
-            self.cell(60, 7, limpa_pdf(f" {label}"), border=1, align="L", fill=True)
+            self.set_font(self._fonte, "B", 9)
+            self.cell(60, 7, self._txt(f" {label}"), border=1, align="L", fill=True)
             # Veredito em cor primária
             if label == "Veredito":
-                self.set_font(CFG.FONT, "B", 9)
+                self.set_font(self._fonte, "B", 9)
                 self.set_text_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
             else:
-                self.set_font(CFG.FONT, "", 9)
+                self.set_font(self._fonte, "", 9)
                 self.set_text_color(0, 0, 0)
-            self.cell(110, 7, limpa_pdf(f" {valor}"), border=1, ln=1, align="L", fill=True)
+            self.cell(110, 7, self._txt(f" {valor}"), border=1, ln=1, align="L", fill=True)
             self.set_text_color(0, 0, 0)
 
         self.ln(5)
-        self.set_font(CFG.FONT, "I", CFG.FONT_SIZE_SMALL)
+        self.set_font(self._fonte, "I", CFG.FONT_SIZE_SMALL)
         self.set_text_color(CFG.GRAY_R, CFG.GRAY_G, CFG.GRAY_B)
         self.cell(
             0, 5,
-            limpa_pdf(f"Data de emissão: {CFG.data_hoje_ptbr()}"),
+            self._txt(f"Data de emissão: {CFG.data_hoje_ptbr()}"),
             ln=1,
         )
 
@@ -461,12 +637,12 @@ class PDFExecutivo(FPDF):
         self._draw_card(
             CFG.CARD_X_START, y_cards,
             "ALUGUEL MENSAL",
-            formatar_moeda_br(safe_float(dados.get("aluguel", 0))),
+            formatar_moeda_br(parse_moeda(dados.get("aluguel", 0))),
         )
         self._draw_card(
             CFG.CARD_X_START + CFG.CARD_WIDTH + CFG.CARD_GAP, y_cards,
             "IPTU (PARCELA)",
-            formatar_moeda_br(safe_float(dados.get("iptu", 0))),
+            formatar_moeda_br(parse_moeda(dados.get("iptu", 0))),
         )
         self._draw_card(
             CFG.CARD_X_START + (CFG.CARD_WIDTH + CFG.CARD_GAP) * 2, y_cards,
@@ -496,9 +672,9 @@ class PDFExecutivo(FPDF):
 
         if ref_loc or ref_com or ref_ban:
             self.ln(4)
-            self.set_font(CFG.FONT, "B", 11)
+            self.set_font(self._fonte, "B", 11)
             self.set_text_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
-            self.cell(0, CFG.LINE_HEIGHT_BODY, limpa_pdf("Referências Cadastrais"), ln=1)
+            self.cell(0, CFG.LINE_HEIGHT_BODY, self._txt("Referências Cadastrais"), ln=1)
             self.ln(2)
             self.set_text_color(0, 0, 0)
 
@@ -518,11 +694,11 @@ class PDFExecutivo(FPDF):
         # Cabeçalho da tabela
         self.set_fill_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
         self.set_text_color(255, 255, 255)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
         label_w = 90.0
         value_w = 80.0
-        self.cell(label_w, 8, limpa_pdf(" Indicador"), border=1, align="L", fill=True)
-        self.cell(value_w, 8, limpa_pdf(" Valor / Descrição"), border=1, ln=1, align="L", fill=True)
+        self.cell(label_w, 8, self._txt(" Indicador"), border=1, align="L", fill=True)
+        self.cell(value_w, 8, self._txt(" Valor / Descrição"), border=1, ln=1, align="L", fill=True)
 
         # --- Melhoria 2: Tabela com word-wrap (resolve overflow) ---
         campos: list[tuple[str, str]] = [
@@ -548,11 +724,11 @@ class PDFExecutivo(FPDF):
         self.ln(5)
         self._row("Segmentação de Patrimônio:", str(dados.get("segmentacao_patrimonio", "-")))
         self.ln(2)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
-        self.cell(0, CFG.LINE_HEIGHT_BODY, limpa_pdf("Conclusão Crítica (Fiador):"), ln=1)
-        self.set_font(CFG.FONT, "I", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
+        self.cell(0, CFG.LINE_HEIGHT_BODY, self._txt("Conclusão Crítica (Fiador):"), ln=1)
+        self.set_font(self._fonte, "I", CFG.FONT_SIZE_BODY)
         texto_limpo_fiador = limpa_markdown(str(dados.get("conclusao_fiador", "-")))
-        self.multi_cell(0, 5, limpa_pdf(texto_limpo_fiador), align="J")
+        self.multi_cell(0, 5, self._txt(texto_limpo_fiador), align="J")
 
     def render_credito_e_financeiro(self, dados: DadosRelatorio) -> None:
         """Página de análise de crédito e financeira."""
@@ -562,35 +738,36 @@ class PDFExecutivo(FPDF):
         self._row("Score Serasa:", str(dados.get("score_serasa", "-")))
         self._row("Nível de Risco:", str(dados.get("risco_serasa", "-")))
         self.ln(2)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
-        self.cell(0, CFG.LINE_HEIGHT_BODY, limpa_pdf("Apontamentos e Contágio Societário:"), ln=1)
-        self.set_font(CFG.FONT, "", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
+        self.cell(0, CFG.LINE_HEIGHT_BODY, self._txt("Apontamentos e Contágio Societário:"), ln=1)
+        self.set_font(self._fonte, "", CFG.FONT_SIZE_BODY)
         self.multi_cell(
             0, 5,
-            limpa_pdf(str(dados.get("mapeamento_dividas", "Sem restrições mapeadas."))),
+            self._txt(str(dados.get("mapeamento_dividas", "Sem restrições mapeadas."))),
             align="J",
         )
 
         self._next_section("Análise Contábil/Financeira")
 
         # --- Tabela DRE: Período × Receita × Resultado ---
-        self.set_font(CFG.FONT, "B", 11)
+        self.set_font(self._fonte, "B", 11)
         self.set_text_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
-        self.cell(0, CFG.LINE_HEIGHT_BODY, limpa_pdf("Demonstrativo de Resultados"), ln=1)
+        self.cell(0, CFG.LINE_HEIGHT_BODY, self._txt("Demonstrativo de Resultados"), ln=1)
         self.ln(2)
 
         self.set_fill_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
         self.set_text_color(255, 255, 255)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
-        self.cell(40, 8, limpa_pdf(" Período"), border=1, align="C", fill=True)
-        self.cell(65, 8, limpa_pdf(" Receita Bruta"), border=1, align="C", fill=True)
-        self.cell(65, 8, limpa_pdf(" Resultado (L/P)"), border=1, ln=1, align="C", fill=True)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
+        self.cell(40, 8, self._txt(" Período"), border=1, align="C", fill=True)
+        self.cell(65, 8, self._txt(" Receita Bruta"), border=1, align="C", fill=True)
+        self.cell(65, 8, self._txt(" Resultado (L/P)"), border=1, ln=1, align="C", fill=True)
 
         self.set_text_color(0, 0, 0)
-        self.set_font(CFG.FONT, "", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "", CFG.FONT_SIZE_BODY)
         periodos: list[str] = dados.get("periodos", [])
         receitas: list[str] = dados.get("receita_bruta", [])
         resultados: list[str] = dados.get("resultado", [])
+        tabela = tabela_financeira(dados)
 
         for i, periodo in enumerate(periodos):
             zebra = i % 2 == 0
@@ -598,9 +775,9 @@ class PDFExecutivo(FPDF):
                 self.set_fill_color(CFG.LIGHT_BG_R, CFG.LIGHT_BG_G, CFG.LIGHT_BG_B)
             else:
                 self.set_fill_color(255, 255, 255)
-            self.cell(40, 7, limpa_pdf(str(periodo)), border=1, align="C", fill=True)
-            self.cell(65, 7, limpa_pdf(str(receitas[i]) if i < len(receitas) else "-"), border=1, align="C", fill=True)
-            self.cell(65, 7, limpa_pdf(str(resultados[i]) if i < len(resultados) else "-"), border=1, ln=1, align="C", fill=True)
+            self.cell(40, 7, self._txt(str(periodo)), border=1, align="C", fill=True)
+            self.cell(65, 7, self._txt(str(receitas[i]) if i < len(receitas) else "-"), border=1, align="C", fill=True)
+            self.cell(65, 7, self._txt(str(resultados[i]) if i < len(resultados) else "-"), border=1, ln=1, align="C", fill=True)
 
         # --- Melhoria 3: Matriz Patrimonial (Balanço) ---
         patrimonio_liq = dados.get("patrimonio_liquido", [])
@@ -615,9 +792,9 @@ class PDFExecutivo(FPDF):
 
         if tem_patrimonial and periodos:
             self.ln(8)
-            self.set_font(CFG.FONT, "B", 11)
+            self.set_font(self._fonte, "B", 11)
             self.set_text_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
-            self.cell(0, CFG.LINE_HEIGHT_BODY, limpa_pdf("Balanço Patrimonial Consolidado"), ln=1)
+            self.cell(0, CFG.LINE_HEIGHT_BODY, self._txt("Balanço Patrimonial Consolidado"), ln=1)
             self.ln(2)
 
             # Header: Indicador | Período 1 | Período 2 | ...
@@ -627,10 +804,10 @@ class PDFExecutivo(FPDF):
 
             self.set_fill_color(CFG.DARK_R, CFG.DARK_G, CFG.DARK_B)
             self.set_text_color(255, 255, 255)
-            self.set_font(CFG.FONT, "B", 9)
-            self.cell(col_label_w, 8, limpa_pdf(" Indicador"), border=1, align="L", fill=True)
+            self.set_font(self._fonte, "B", 9)
+            self.cell(col_label_w, 8, self._txt(" Indicador"), border=1, align="L", fill=True)
             for p in periodos:
-                self.cell(col_val_w, 8, limpa_pdf(str(p)), border=1, align="C", fill=True)
+                self.cell(col_val_w, 8, self._txt(str(p)), border=1, align="C", fill=True)
             self.ln()
 
             # Linhas da matriz
@@ -642,6 +819,15 @@ class PDFExecutivo(FPDF):
                 ("Passivo Não Circulante", passivo_ncirc),
                 ("Imobilizado", imobilizado),
             ]
+            # Indicadores derivados, calculados sobre a tabela numérica
+            for nome_ind, serie, fmt in (
+                ("Liquidez Corrente", tabela.liquidez, "{:.2f}"),
+                ("Margem Líquida", tabela.margem, "{:.1f}%"),
+            ):
+                if not np.isnan(serie).all():
+                    indicadores.append((nome_ind, [
+                        "-" if np.isnan(v) else fmt.format(v).replace(".", ",") for v in serie
+                    ]))
 
             self.set_text_color(0, 0, 0)
             for idx, (nome_ind, valores) in enumerate(indicadores):
@@ -650,42 +836,41 @@ class PDFExecutivo(FPDF):
                     self.set_fill_color(CFG.LIGHT_BG_R, CFG.LIGHT_BG_G, CFG.LIGHT_BG_B)
                 else:
                     self.set_fill_color(255, 255, 255)
-                self.set_font(CFG.FONT, "B", 9)
-                self.cell(col_label_w, 7, limpa_pdf(f" {nome_ind}"), border=1, align="L", fill=True)
-                self.set_font(CFG.FONT, "", 9)
+                self.set_font(self._fonte, "B", 9)
+                self.cell(col_label_w, 7, self._txt(f" {nome_ind}"), border=1, align="L", fill=True)
+                self.set_font(self._fonte, "", 9)
                 for j in range(n_periodos):
                     val = str(valores[j]) if j < len(valores) else "-"
-                    self.cell(col_val_w, 7, limpa_pdf(val), border=1, align="C", fill=True)
+                    self.cell(col_val_w, 7, self._txt(val), border=1, align="C", fill=True)
                 self.ln()
 
         # --- Comprometimento de Renda ---
         self.ln(5)
-        aluguel_val = safe_float(dados.get("aluguel", 0))
+        aluguel_val = parse_moeda(dados.get("aluguel", 0))
         # Tentar renda do fiador primeiro, senão receita bruta mensal
-        renda_ref = safe_float(dados.get("renda_media_oficial", 0))
+        renda_ref = parse_moeda(dados.get("renda_media_oficial", 0))
+        ult = tabela.ultimo_indice()
 
-        if renda_ref <= 0 and receitas:
+        pct = 0.0
+        if renda_ref > 0:
+            pct = (aluguel_val / renda_ref) * 100
+        elif ult is not None:
             # Usar última receita bruta anual / 12
-            ultima_receita_str = str(receitas[-1]).replace("R$", "").replace(".", "").replace(",", ".").strip()
-            try:
-                renda_ref = float(ultima_receita_str) / 12
-            except (ValueError, ZeroDivisionError):
-                renda_ref = 0
+            pct = float(tabela.comprometimento(aluguel_val, meses=12)[ult])
 
-        if aluguel_val > 0 and renda_ref > 0:
-            pct = (aluguel_val / renda_ref) * 100
+        if aluguel_val > 0 and pct > 0:
             self._draw_commitment_card(pct)
 
         # --- Parecer Técnico do Auditor ---
         self.ln(3)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
         self.set_text_color(0, 0, 0)
-        self.cell(0, CFG.LINE_HEIGHT_BODY, limpa_pdf("Parecer Técnico do Auditor Financeiro:"), ln=1)
-        self.set_font(CFG.FONT, "", CFG.FONT_SIZE_BODY)
+        self.cell(0, CFG.LINE_HEIGHT_BODY, self._txt("Parecer Técnico do Auditor Financeiro:"), ln=1)
+        self.set_font(self._fonte, "", CFG.FONT_SIZE_BODY)
         texto_limpo_financeiro = limpa_markdown(str(dados.get("analise_executiva", "Análise não realizada.")))
         self.multi_cell(
             0, 5,
-            limpa_pdf(texto_limpo_financeiro),
+            self._txt(texto_limpo_financeiro),
             align="J",
         )
 
@@ -695,11 +880,11 @@ class PDFExecutivo(FPDF):
 
         self._next_section("Parecer Oficial Paulo Bio")
         # --- Melhoria 4: Texto em fonte regular (não bold) ---
-        self.set_font(CFG.FONT, "", 11)
+        self.set_font(self._fonte, "", 11)
         texto_limpo_parecer = limpa_markdown(str(dados.get("parecer_oficial", "Parecer não incluído.")))
         self.multi_cell(
             0, CFG.LINE_HEIGHT_BODY,
-            limpa_pdf(texto_limpo_parecer),
+            self._txt(texto_limpo_parecer),
             align="J",
         )
 
@@ -708,11 +893,11 @@ class PDFExecutivo(FPDF):
         if solucao:
             self.ln(8)
             self._next_section("Solução Complementar")
-            self.set_font(CFG.FONT, "", CFG.FONT_SIZE_BODY)
+            self.set_font(self._fonte, "", CFG.FONT_SIZE_BODY)
             texto_limpo_solucao = limpa_markdown(solucao)
             self.multi_cell(
                 0, CFG.LINE_HEIGHT_BODY,
-                limpa_pdf(texto_limpo_solucao),
+                self._txt(texto_limpo_solucao),
                 align="J",
             )
 
@@ -727,30 +912,30 @@ class PDFExecutivo(FPDF):
             if arquivos:
                 # ✓ Verde — documentos presentes
                 self.set_text_color(CFG.GREEN_R, CFG.GREEN_G, CFG.GREEN_B)
-                self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
+                self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
                 self.set_x(CFG.MARGIN_LEFT)
                 # Usar "V" como check visual (Helvetica não tem ✓)
-                self.cell(8, CFG.LINE_HEIGHT_BODY, limpa_pdf("[V]"), align="L")
+                self.cell(8, CFG.LINE_HEIGHT_BODY, self._txt("[V]"), align="L")
                 self.set_text_color(0, 0, 0)
-                self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
-                self.cell(55, CFG.LINE_HEIGHT_BODY, limpa_pdf(passo_desc))
-                self.set_font(CFG.FONT, "", 9)
+                self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
+                self.cell(55, CFG.LINE_HEIGHT_BODY, self._txt(passo_desc))
+                self.set_font(self._fonte, "", 9)
                 self.set_text_color(80, 80, 80)
                 nomes = ", ".join(arquivos)
                 remaining_w = CFG.CONTENT_WIDTH - 8 - 55
-                self.multi_cell(remaining_w, CFG.LINE_HEIGHT_BODY - 1, limpa_pdf(nomes), align="L")
+                self.multi_cell(remaining_w, CFG.LINE_HEIGHT_BODY - 1, self._txt(nomes), align="L")
             else:
                 # ✗ Vermelho — não anexado
                 self.set_text_color(CFG.RED_R, CFG.RED_G, CFG.RED_B)
-                self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
+                self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
                 self.set_x(CFG.MARGIN_LEFT)
-                self.cell(8, CFG.LINE_HEIGHT_BODY, limpa_pdf("[X]"), align="L")
+                self.cell(8, CFG.LINE_HEIGHT_BODY, self._txt("[X]"), align="L")
                 self.set_text_color(0, 0, 0)
-                self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
-                self.cell(55, CFG.LINE_HEIGHT_BODY, limpa_pdf(passo_desc))
-                self.set_font(CFG.FONT, "I", 9)
+                self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
+                self.cell(55, CFG.LINE_HEIGHT_BODY, self._txt(passo_desc))
+                self.set_font(self._fonte, "I", 9)
                 self.set_text_color(CFG.RED_R, CFG.RED_G, CFG.RED_B)
-                self.cell(0, CFG.LINE_HEIGHT_BODY, limpa_pdf("Não anexado"), ln=1, align="L")
+                self.cell(0, CFG.LINE_HEIGHT_BODY, self._txt("Não anexado"), ln=1, align="L")
 
             self.set_text_color(0, 0, 0)
 
@@ -758,15 +943,15 @@ class PDFExecutivo(FPDF):
         self.ln(10)
         self.set_fill_color(CFG.LIGHT_BG_R, CFG.LIGHT_BG_G, CFG.LIGHT_BG_B)
         self.rect(CFG.MARGIN_LEFT, self.get_y(), CFG.CONTENT_WIDTH, 15, "F")
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_VERDICT)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_VERDICT)
         self.set_text_color(CFG.PRIMARY_R, CFG.PRIMARY_G, CFG.PRIMARY_B)
-        self.cell(0, 15, limpa_pdf(f"VEREDITO: {decisao}"), ln=1, align="C")
+        self.cell(0, 15, self._txt(f"VEREDITO: {decisao}"), ln=1, align="C")
 
         self.ln(15)
-        self.set_font(CFG.FONT, "B", CFG.FONT_SIZE_BODY)
+        self.set_font(self._fonte, "B", CFG.FONT_SIZE_BODY)
         self.set_text_color(150, 150, 150)
-        self.cell(0, 5, limpa_pdf("____________________________________________________"), ln=1, align="C")
-        self.cell(0, 5, limpa_pdf("DEPARTAMENTO JURÍDICO / CRÉDITO - PAULO BIO IMÓVEIS"), ln=1, align="C")
+        self.cell(0, 5, self._txt("____________________________________________________"), ln=1, align="C")
+        self.cell(0, 5, self._txt("DEPARTAMENTO JURÍDICO / CRÉDITO - PAULO BIO IMÓVEIS"), ln=1, align="C")
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,41 @@
+"""
+Testes unitários para core/aquecimento.py
+Cobre: aquecer (uma vez por processo, falha de import não interrompe,
+desligado por AQUECER_IMPORTS=0)
+"""
+
+import sys
+import os
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import core.aquecimento as aquecimento
+
+
+@pytest.fixture(autouse=True)
+def novo_processo(monkeypatch):
+    monkeypatch.setattr(aquecimento, "_iniciado", False)
+    monkeypatch.delenv("AQUECER_IMPORTS", raising=False)
+
+
+def _esperar_thread():
+    for t in threading.enumerate():
+        if t.name == "aquecimento-imports":
+            t.join(timeout=10)
+
+
+class TestAquecer:
+    def test_importa_uma_vez_e_ignora_falhas(self):
+        sys.modules.pop("colorsys", None)
+        assert aquecimento.aquecer(("modulo_que_nao_existe", "colorsys"))
+        _esperar_thread()
+        assert "colorsys" in sys.modules
+        assert not aquecimento.aquecer(("colorsys",))
+
+    def test_desligado_pelo_ambiente(self, monkeypatch):
+        monkeypatch.setenv("AQUECER_IMPORTS", "0")
+        assert not aquecimento.aquecer(("colorsys",))
+        assert not aquecimento._iniciado
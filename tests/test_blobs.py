@@ -0,0 +1,87 @@
+"""
+Testes unitários para core/blobs.py
+Cobre: ArmazemBlobs (layout por digest, deduplicação, reabertura, blob
+ausente, gravação concorrente do mesmo conteúdo)
+"""
+
+import sys
+import os
+import hashlib
+import io
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.blobs import ArmazemBlobs
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return ArmazemBlobs(tmp_path / "blobs")
+
+
+def _pdf(conteudo: bytes, nome: str = "doc.pdf") -> io.BytesIO:
+    f = io.BytesIO(conteudo)
+    f.name = nome
+    return f
+
+
+def _arquivos(raiz):
+    return sorted(p for p in raiz.rglob("*") if p.is_file())
+
+
+# ─── gravação ─────────────────────────────────────────────────────────────────
+
+class TestGuardar:
+    def test_layout_por_digest(self, blobs):
+        digest = blobs.guardar(_pdf(b"%PDF serasa"))
+        assert digest == hashlib.sha256(b"%PDF serasa").hexdigest()
+        assert blobs.caminho(digest) == blobs.raiz / digest[:2] / digest[2:4] / digest
+        assert blobs.caminho(digest).read_bytes() == b"%PDF serasa"
+
+    def test_mesmo_conteudo_gravado_uma_vez(self, blobs):
+        a = blobs.guardar(_pdf(b"%PDF x", "a.pdf"))
+        b = blobs.guardar(_pdf(b"%PDF x", "outro_nome.pdf"))
+        assert a == b
+        assert len(_arquivos(blobs.raiz)) == 1
+
+    def test_aceita_bytes_e_preserva_posicao(self, blobs):
+        f = _pdf(b"%PDF abc")
+        f.seek(3)
+        assert blobs.guardar(f) == blobs.guardar(b"%PDF abc")
+        assert f.tell() == 3
+
+    def test_concorrentes_sem_temporarios(self, blobs):
+        barreira = threading.Barrier(4, timeout=5)
+        digests = []
+
+        def gravar():
+            barreira.wait()
+            digests.append(blobs.guardar(b"%PDF concorrente" * 1000))
+
+        threads = [threading.Thread(target=gravar) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(set(digests)) == 1
+        assert [p.name for p in _arquivos(blobs.raiz)] == [digests[0]]
+
+
+# ─── leitura ──────────────────────────────────────────────────────────────────
+
+class TestAbrir:
+    def test_reabre_com_nome(self, blobs):
+        digest = blobs.guardar(b"%PDF contabil")
+        f = blobs.abrir(digest, "balanco.pdf")
+        assert f.name == "balanco.pdf" and f.getvalue() == b"%PDF contabil"
+
+    def test_blob_ausente(self, blobs):
+        assert blobs.abrir("0" * 64) is None
+        assert not blobs.existe("0" * 64)
+
+    def test_persistente_entre_instancias(self, blobs):
+        digest = blobs.guardar(b"%PDF ir")
+        assert ArmazemBlobs(blobs.raiz).ler(digest) == b"%PDF ir"
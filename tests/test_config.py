@@ -0,0 +1,55 @@
+"""
+Testes unitários para core/config.py
+Cobre: _minificar (comentários, espaços, seletores preservados) e as folhas
+pré-montadas por tema (idênticas entre reruns, acima do limite do cache de
+mensagens do Streamlit)
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.config import _ESTILOS, _minificar, aplicar_estilo
+
+
+# ─── _minificar ───────────────────────────────────────────────────────────────
+
+class TestMinificar:
+    def test_remove_comentarios_e_espacos(self):
+        css = """
+            /* título */
+            h1, h2 {
+                color: #FFF !important;
+                margin: 0 auto;
+            }
+        """
+        assert _minificar(css) == "h1,h2{color:#FFF!important;margin:0 auto}"
+
+    def test_preserva_descendente_com_pseudo_classe(self):
+        assert _minificar("div :hover { color: red; }") == "div :hover{color:red}"
+
+    def test_combinador_filho(self):
+        assert _minificar(".a > div { x: 1 }") == ".a>div{x:1}"
+
+
+# ─── folhas por tema ──────────────────────────────────────────────────────────
+
+class TestEstilos:
+    def test_acima_do_limite_do_cache_de_mensagens(self):
+        # Streamlit só troca por ref_hash mensagens >= global.minCachedMessageSize (10 KB)
+        for folha in _ESTILOS.values():
+            assert len(folha.encode()) >= 10_000
+
+    def test_claro_sobrepoe_o_escuro(self):
+        escuro, claro = _ESTILOS[False], _ESTILOS[True]
+        assert escuro.startswith("<style>") and claro.startswith("<style>")
+        assert claro.split("</style>")[0].startswith(escuro.split("</style>")[0])
+        assert "bootstrap-icons" in escuro and "bootstrap-icons" in claro
+
+    def test_mesmo_texto_a_cada_chamada(self, monkeypatch):
+        enviados = []
+        monkeypatch.setattr("core.config.st.markdown", lambda corpo, **kw: enviados.append(corpo))
+        aplicar_estilo(tema_claro=True)
+        aplicar_estilo(tema_claro=True)
+        assert len(enviados) == 2 and enviados[0] is enviados[1]
@@ -0,0 +1,112 @@
+"""
+Testes unitários para core/consolidacao.py
+Cobre: consolidar_serasa, consolidar_certidoes, consolidar_contabil
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.consolidacao import consolidar_certidoes, consolidar_contabil, consolidar_serasa
+from core.models import CAMPOS_FINANCEIROS
+
+
+def _contabil(periodos, receita, resultado, analise="", **extra):
+    dados = {c: ["N/D"] * len(periodos) for c in CAMPOS_FINANCEIROS}
+    dados.update(periodos=periodos, receita_bruta=receita, resultado=resultado,
+                 analise_executiva=analise, empresa_documento="", cnpj_documento="")
+    dados.update(extra)
+    return dados
+
+
+# ─── consolidar_serasa ────────────────────────────────────────────────────────
+
+class TestConsolidarSerasa:
+    def test_arquivo_unico_retorna_copia(self):
+        r = {"score_serasa": "850", "mapeamento_dividas": "Nada consta"}
+        res = consolidar_serasa([r], ["a.pdf"])
+        assert res == r and res is not r
+
+    def test_score_do_primeiro_preenchido(self):
+        res = consolidar_serasa(
+            [{"score_serasa": "N/D", "mapeamento_dividas": ""},
+             {"score_serasa": "720", "risco_serasa": "médio", "mapeamento_dividas": "2 protestos"}],
+            ["a.pdf", "b.pdf"],
+        )
+        assert res["score_serasa"] == "720"
+        assert res["risco_serasa"] == "médio"
+        assert res["mapeamento_dividas"] == "2 protestos"
+
+    def test_apontamentos_identificados_por_arquivo(self):
+        res = consolidar_serasa(
+            [{"mapeamento_dividas": "Protesto A"}, {"mapeamento_dividas": "Pefin B"}],
+            ["a.pdf", "b.pdf"],
+        )
+        assert res["mapeamento_dividas"] == "[a.pdf] Protesto A\n\n[b.pdf] Pefin B"
+
+    def test_identificacao_do_primeiro_documento_que_a_traz(self):
+        res = consolidar_serasa(
+            [{"cnpj_documento": ""}, {"empresa_documento": "ACME LTDA", "cnpj_documento": "12.345.678/0001-90"}],
+            ["a.pdf", "b.pdf"],
+        )
+        assert res["cnpj_documento"] == "12.345.678/0001-90"
+        assert res["empresa_documento"] == "ACME LTDA"
+
+
+# ─── consolidar_certidoes ─────────────────────────────────────────────────────
+
+class TestConsolidarCertidoes:
+    def test_resumos_por_arquivo(self):
+        res = consolidar_certidoes(
+            [{"resumo_certidoes": "Federal: negativa"}, {"resumo_certidoes": "Trabalhista: positiva"}],
+            ["federal.pdf", "tst.pdf"],
+        )
+        assert "[federal.pdf] Federal: negativa" in res["resumo_certidoes"]
+        assert "[tst.pdf] Trabalhista: positiva" in res["resumo_certidoes"]
+
+
+# ─── consolidar_contabil ──────────────────────────────────────────────────────
+
+class TestConsolidarContabil:
+    def test_periodos_em_ordem_cronologica(self):
+        res = consolidar_contabil(
+            [_contabil(["2024"], ["R$ 2.000"], ["R$ 200"]),
+             _contabil(["2023"], ["R$ 1.000"], ["R$ 100"])],
+            ["b.pdf", "a.pdf"],
+        )
+        assert res["periodos"] == ["2023", "2024"]
+        assert res["receita_bruta"] == ["R$ 1.000", "R$ 2.000"]
+        assert res["resultado"] == ["R$ 100", "R$ 200"]
+
+    def test_periodo_repetido_usa_primeiro_valor_preenchido(self):
+        res = consolidar_contabil(
+            [_contabil(["2024"], ["N/D"], ["R$ 200"]),
+             _contabil(["2024"], ["R$ 2.000"], ["R$ 999"])],
+            ["a.pdf", "b.pdf"],
+        )
+        assert res["periodos"] == ["2024"]
+        assert res["receita_bruta"] == ["R$ 2.000"]
+        assert res["resultado"] == ["R$ 200"]
+
+    def test_campos_alinhados_com_periodos(self):
+        res = consolidar_contabil(
+            [_contabil(["2022", "2023"], ["1", "2"], ["N/D", "N/D"]),
+             _contabil(["2024"], ["3"], ["4"])],
+            ["a.pdf", "b.pdf"],
+        )
+        for campo in CAMPOS_FINANCEIROS:
+            assert len(res[campo]) == len(res["periodos"]) == 3
+        assert res["resultado"] == ["N/D", "N/D", "4"]
+
+    def test_analises_individuais_juntadas(self):
+        res = consolidar_contabil(
+            [_contabil(["2023"], ["1"], ["1"], analise="Lucro em 2023"),
+             _contabil(["2024"], ["2"], ["2"], analise="Prejuízo em 2024")],
+            ["a.pdf", "b.pdf"],
+        )
+        assert res["analise_executiva"] == "[a.pdf] Lucro em 2023\n\n[b.pdf] Prejuízo em 2024"
+
+    def test_arquivo_unico_inalterado(self):
+        r = _contabil(["Jan/2025"], ["10"], ["1"], analise="ok")
+        assert consolidar_contabil([r], ["a.pdf"]) == r
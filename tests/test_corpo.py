@@ -0,0 +1,117 @@
+"""
+Testes unitários para core/corpo.py
+Cobre: ler_blocos/hash_arquivo (posição preservada, arquivos sem getbuffer),
+base64_blocos, AnexoPDF e CorpoJSON (mesmo JSON que json.dumps, tamanho
+exato, reiterável)
+"""
+
+import sys
+import os
+import base64
+import hashlib
+import io
+import json
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.corpo import BLOCO, AnexoPDF, CorpoJSON, base64_blocos, hash_arquivo, ler_blocos, tamanho_arquivo
+
+
+def _pdf(conteudo: bytes, nome: str = "doc.pdf") -> io.BytesIO:
+    f = io.BytesIO(conteudo)
+    f.name = nome
+    return f
+
+
+def _esperado(valor: dict, anexos: dict[str, bytes]) -> dict:
+    """O mesmo corpo montado do jeito antigo (base64 inteiro em memória)."""
+    texto = json.dumps(valor, ensure_ascii=False)
+    for marca, conteudo in anexos.items():
+        texto = texto.replace(marca, "data:application/pdf;base64," + base64.b64encode(conteudo).decode())
+    return json.loads(texto)
+
+
+# ─── leitura em blocos ────────────────────────────────────────────────────────
+
+class TestLeitura:
+    @pytest.mark.parametrize("n", [0, 1, BLOCO - 1, BLOCO, 2 * BLOCO + 5])
+    def test_blocos_reconstroem_o_conteudo(self, n):
+        conteudo = os.urandom(n)
+        f = _pdf(conteudo)
+        f.seek(n // 2)
+        assert b"".join(ler_blocos(f)) == conteudo
+        assert all(len(b) <= BLOCO for b in ler_blocos(f))
+        assert f.tell() == n // 2
+        assert tamanho_arquivo(f) == n
+
+    def test_arquivo_em_disco(self):
+        conteudo = os.urandom(BLOCO + 10)
+        with tempfile.TemporaryFile() as f:
+            f.write(conteudo)
+            f.seek(7)
+            assert hash_arquivo(f) == hashlib.sha256(conteudo).hexdigest()
+            assert tamanho_arquivo(f) == len(conteudo)
+            assert f.tell() == 7
+
+    def test_base64_em_blocos_igual_ao_inteiro(self):
+        for n in (0, 1, 2, BLOCO + 1, 2 * BLOCO + 2):
+            conteudo = os.urandom(n)
+            assert b"".join(base64_blocos(conteudo)) == base64.b64encode(conteudo)
+
+    def test_base64_com_blocos_irregulares(self):
+        conteudo = os.urandom(1000)
+        # leitura que devolve menos que o pedido (ex.: arquivo não bufferizado)
+        class Curto(io.RawIOBase):
+            def __init__(self):
+                self.pos = 0
+            def readable(self):
+                return True
+            def seek(self, pos, whence=0):
+                self.pos = pos if whence == 0 else len(conteudo)
+                return self.pos
+            def tell(self):
+                return self.pos
+            def read(self, n=-1):
+                dados = conteudo[self.pos:self.pos + 7]
+                self.pos += len(dados)
+                return dados
+        assert b"".join(base64_blocos(Curto())) == base64.b64encode(conteudo)
+
+
+# ─── CorpoJSON ────────────────────────────────────────────────────────────────
+
+class TestCorpoJSON:
+    def test_igual_ao_json_antigo(self):
+        a, b = os.urandom(5000), os.urandom(BLOCO + 1)
+        valor = {
+            "model": "m",
+            "messages": [{"role": "user", "content": [
+                {"type": "file", "file": {"filename": "a.pdf", "file_data": AnexoPDF(_pdf(a))}},
+                {"type": "text", "text": "Análise \"ACME\" — 2024"},
+                {"type": "file", "file": {"filename": "b.pdf", "file_data": AnexoPDF(_pdf(b))}},
+            ]}],
+        }
+        corpo = CorpoJSON(valor)
+        bruto = b"".join(corpo)
+        partes = valor["messages"][0]["content"]
+        partes[0]["file"]["file_data"], partes[2]["file"]["file_data"] = "@A@", "@B@"
+        assert json.loads(bruto) == _esperado(valor, {"@A@": a, "@B@": b})
+        assert corpo.tamanho == len(bruto)
+        prefixo = len("data:application/pdf;base64,")
+        assert corpo.bytes_base64 == 2 * prefixo + len(base64.b64encode(a)) + len(base64.b64encode(b))
+
+    def test_sem_anexos(self):
+        corpo = CorpoJSON({"x": [1, "é"]})
+        assert b"".join(corpo) == json.dumps({"x": [1, "é"]}, ensure_ascii=False).encode()
+        assert corpo.bytes_base64 == 0
+
+    def test_reiteravel(self):
+        corpo = CorpoJSON({"f": AnexoPDF(_pdf(b"%PDF abc"))})
+        assert b"".join(corpo) == b"".join(corpo)
+
+    def test_objeto_desconhecido(self):
+        with pytest.raises(TypeError):
+            CorpoJSON({"x": object()})
@@ -0,0 +1,191 @@
+"""
+Testes unitários para core/estado.py
+Cobre: EstadoLocal (TTL, gerações, duas instâncias no mesmo arquivo como
+réplicas), EstadoRedis (cliente compatível), CacheCompartilhado
+(invalidação consistente, falha do armazém vira miss) e o segundo nível de
+core/cache.py (limpeza por sessão, invalidação global de manutenção)
+"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.cache import clear_cache, get_cached, invalidar_cache_compartilhado, set_cached, usar_cache
+from core.estado import CacheCompartilhado, EstadoLocal, EstadoRedis, configurar_estado
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return tmp_path / "estado.sqlite3"
+
+
+class ClienteRedisFalso:
+    """Subconjunto de comandos do Redis usado por EstadoRedis, em memória (bytes, como o redis-py)."""
+
+    def __init__(self):
+        self.dados: dict[str, tuple[bytes, float | None]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, chave):
+        valor, expira = self.dados.get(chave, (None, None))
+        return None if expira is not None and expira <= time.time() else valor
+
+    def set(self, chave, valor, ex=None):
+        self.dados[chave] = (valor.encode() if isinstance(valor, str) else valor, time.time() + ex if ex else None)
+
+    def delete(self, chave):
+        self.dados.pop(chave, None)
+
+    def incr(self, chave):
+        with self.lock:
+            n = int(self.get(chave) or 0) + 1
+            self.dados[chave] = (str(n).encode(), None)
+            return n
+
+
+class EstadoQuebrado:
+    def __getattr__(self, nome):
+        def falhar(*args, **kwargs):
+            raise ConnectionError("armazém fora do ar")
+        return falhar
+
+
+# ─── backends ─────────────────────────────────────────────────────────────────
+
+@pytest.fixture(params=["local", "redis"])
+def estado(request, caminho):
+    return EstadoLocal(caminho) if request.param == "local" else EstadoRedis(ClienteRedisFalso())
+
+
+class TestBackends:
+    def test_gravar_ler_apagar(self, estado):
+        assert estado.ler("a") is None
+        estado.gravar("a", "1")
+        estado.gravar("a", "é 2")
+        assert estado.ler("a") == "é 2"
+        estado.apagar("a")
+        assert estado.ler("a") is None
+
+    def test_ttl_ainda_valido(self, estado):
+        estado.gravar("longa", "y", ttl=60)
+        assert estado.ler("longa") == "y"
+
+    def test_geracoes(self, estado):
+        assert estado.geracao("analises") == 0
+        assert estado.invalidar("analises") == 1
+        assert estado.invalidar("analises") == 2
+        assert estado.geracao("analises") == 2
+        assert estado.geracao("outro") == 0
+
+
+class TestEstadoLocal:
+    def test_expirada_nao_e_lida(self, caminho):
+        estado = EstadoLocal(caminho)
+        estado.gravar("curta", "x", ttl=0.001)
+        time.sleep(0.01)
+        assert estado.ler("curta") is None
+
+    def test_replicas_no_mesmo_arquivo(self, caminho):
+        a, b = EstadoLocal(caminho), EstadoLocal(caminho)
+        a.gravar("k", "v")
+        assert b.ler("k") == "v"
+        b.invalidar("esp")
+        assert a.geracao("esp") == 1
+
+    def test_invalidacoes_concorrentes_nao_se_perdem(self, caminho):
+        EstadoLocal(caminho)
+        threads = [threading.Thread(target=lambda: [EstadoLocal(caminho).invalidar("esp") for _ in range(10)])
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert EstadoLocal(caminho).geracao("esp") == 40
+
+
+# ─── CacheCompartilhado ───────────────────────────────────────────────────────
+
+class TestCacheCompartilhado:
+    def test_invalidacao_vale_para_todas_as_replicas(self, caminho):
+        replica_a = CacheCompartilhado(EstadoLocal(caminho), "config_usuario")
+        replica_b = CacheCompartilhado(EstadoLocal(caminho), "config_usuario")
+        replica_a.definir("ana@x", {"nome_empresa": "ACME"})
+        assert replica_b.obter("ana@x") == {"nome_empresa": "ACME"}
+        replica_b.invalidar()
+        assert replica_a.obter("ana@x") is None
+
+    def test_espacos_isolados(self, caminho):
+        estado = EstadoLocal(caminho)
+        CacheCompartilhado(estado, "a").definir("k", 1)
+        CacheCompartilhado(estado, "b").invalidar()
+        assert CacheCompartilhado(estado, "a").obter("k") == 1
+        assert CacheCompartilhado(estado, "b").obter("k") is None
+
+    def test_remover(self, caminho):
+        cache = CacheCompartilhado(EstadoLocal(caminho), "config_usuario")
+        cache.definir("ana@x", {})
+        assert cache.obter("ana@x") == {}
+        cache.remover("ana@x")
+        assert cache.obter("ana@x") is None
+
+    def test_armazem_fora_do_ar_vira_miss(self):
+        cache = CacheCompartilhado(EstadoQuebrado(), "analises")
+        cache.definir("k", {"x": 1})
+        cache.invalidar()
+        assert cache.obter("k") is None
+
+
+# ─── core/cache.py (segundo nível) ────────────────────────────────────────────
+
+class TestCacheAnalises:
+    @pytest.fixture(autouse=True)
+    def compartilhado(self, caminho):
+        configurar_estado(EstadoLocal(caminho))
+        yield
+        configurar_estado(None)
+
+    def test_outra_sessao_acerta_pelo_compartilhado(self):
+        with usar_cache({}):
+            set_cached("passo_3:abc", {"score": 700})
+        sessao_b: dict = {}
+        with usar_cache(sessao_b):
+            assert get_cached("passo_3:abc") == {"score": 700}
+        assert sessao_b == {"passo_3:abc": {"score": 700}}
+
+    def test_invalidacao_compartilhada(self, caminho):
+        with usar_cache({}):
+            set_cached("passo_3:abc", {"score": 700})
+        CacheCompartilhado(EstadoLocal(caminho), "analises").invalidar()   # outra réplica
+        with usar_cache({}):
+            assert get_cached("passo_3:abc") is None
+
+    def test_limpar_cache_so_afeta_a_sessao(self):
+        sessao_a: dict = {}
+        with usar_cache(sessao_a):
+            set_cached("passo_3:abc", {"score": 700})
+            clear_cache()
+            assert get_cached("passo_3:abc") is None     # a sessão pede resultado novo
+        with usar_cache({}):
+            assert get_cached("passo_3:abc") == {"score": 700}
+
+    def test_resultado_gravado_depois_da_limpeza_vale(self):
+        sessao_a: dict = {}
+        with usar_cache(sessao_a):
+            clear_cache()
+        time.sleep(0.01)
+        with usar_cache({}):
+            set_cached("passo_3:abc", {"score": 710})
+        with usar_cache(sessao_a):
+            assert get_cached("passo_3:abc") == {"score": 710}
+
+    def test_invalidacao_para_todos_e_manutencao(self):
+        with usar_cache({}):
+            set_cached("passo_3:abc", {"score": 700})
+        invalidar_cache_compartilhado()
+        with usar_cache({}):
+            assert get_cached("passo_3:abc") is None
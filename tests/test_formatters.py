@@ -5,6 +5,7 @@ Cobre: str_to_float, formatar_valor_contabil, safe_float,
 """
 
 import pytest
+import re
 import sys
 import os
 
@@ -20,6 +21,40 @@ from utils.formatters import (
     formatar_moeda_br,
     limpa_markdown,
 )
+from utils.formatters import _MEMO_MAX_LEN
+
+
+# ─── Implementações anteriores (referência) ──────────────────────────────────
+
+def limpa_pdf_legado(texto):
+    texto_str = str(texto)
+    replacements = {
+        '“': '"', '”': '"', '‘': "'", '’': "'", '–': '-', '—': '-',
+        '…': '...', '•': '-', '\u200b': '', '\xa0': ' '
+    }
+    for k, v in replacements.items():
+        texto_str = texto_str.replace(k, v)
+    return texto_str.encode('latin-1', 'ignore').decode('latin-1').strip()
+
+
+def limpa_markdown_legado(texto):
+    texto_str = str(texto)
+    texto_str = re.sub(r'\*\*(.*?)\*\*', r'\1', texto_str)
+    texto_str = re.sub(r'__(.*?)__', r'\1', texto_str)
+    texto_str = re.sub(r'^#+\s*', '', texto_str, flags=re.MULTILINE)
+    texto_str = re.sub(r'^\|?[\s\-:]+\|[\s\-:|]+$', '', texto_str, flags=re.MULTILINE)
+    texto_str = texto_str.replace('|', '  ')
+    texto_str = re.sub(r'\n{3,}', '\n\n', texto_str)
+    return texto_str.strip()
+
+
+# Entradas acima de _MEMO_MAX_LEN: seguem o caminho sem memo
+TEXTOS_LONGOS = [
+    "\u2022 Score \u201calto\u201d\u2026 \U0001f44d\n" * 100,
+    "  Parecer t\u00e9cnico \u2014 loca\u00e7\u00e3o\xa0aprovada\u200b. " * 40,
+    "## **Indicadores**\n| A | B |\n|---|---|\n| 1 | 2 |\n\n\n\n__Nota__: ok\n" * 30,
+    "Texto ASCII simples, sem nada para trocar. " * 30,
+]
 
 
 # ─── str_to_float ─────────────────────────────────────────────────────────────
@@ -191,6 +226,18 @@ class TestLimpaPdf:
         resultado = limpa_pdf(None)
         assert isinstance(resultado, str)
 
+    def test_acentos_latin1_preservados(self):
+        assert limpa_pdf("  Não há objeção  ") == "Não há objeção"
+
+    @pytest.mark.parametrize("texto", TEXTOS_LONGOS)
+    def test_texto_longo_igual_ao_legado(self, texto):
+        assert len(texto) > _MEMO_MAX_LEN
+        assert limpa_pdf(texto) == limpa_pdf_legado(texto)
+
+    def test_texto_curto_igual_ao_legado(self):
+        trecho = "\u2022 Score \u201calto\u201d\u2026 \U0001f44d\n"
+        assert limpa_pdf(trecho) == limpa_pdf_legado(trecho) == '- Score "alto"...'
+
 
 # ─── formatar_moeda_br ────────────────────────────────────────────────────────
 
@@ -266,3 +313,17 @@ class TestLimpaMarkdown:
     def test_misto_bold_e_header(self):
         resultado = limpa_markdown("## **Título Negrito**")
         assert resultado == "Título Negrito"
+
+    def test_texto_longo_com_tabela(self):
+        texto = ("## Indicadores\n| A | B |\n|---|---|\n| 1 | 2 |\n\n\n\n" * 50).rstrip()
+        resultado = limpa_markdown(texto)
+        assert "|" not in resultado and "#" not in resultado
+        assert "\n\n\n" not in resultado
+
+    @pytest.mark.parametrize("texto", TEXTOS_LONGOS)
+    def test_texto_longo_igual_ao_legado(self, texto):
+        assert len(texto) > _MEMO_MAX_LEN
+        assert limpa_markdown(texto) == limpa_markdown_legado(texto)
+
+    def test_chamadas_repetidas_mesmo_resultado(self):
+        assert limpa_markdown("**Score:** 850") == limpa_markdown("**Score:** 850") == "Score: 850"
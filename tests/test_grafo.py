@@ -0,0 +1,173 @@
+"""
+Testes unitários para core/grafo.py
+Cobre: GrafoPassos (arestas, ordem, ciclos, camadas, invalidados, reexecutar),
+NoPasso (impressão, argumentos), GRAFO declarado dos passos da análise
+"""
+
+import sys
+import os
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.grafo import GRAFO, GrafoPassos, NoPasso
+
+
+def _grafo():
+    # a → b, a → c, (b, c) → d
+    return GrafoPassos((
+        NoPasso("a", "A", "m", saidas=("x",)),
+        NoPasso("b", "B", "m", entradas=("x",), saidas=("y",)),
+        NoPasso("c", "C", "m", entradas=("x",), saidas=("z",)),
+        NoPasso("d", "D", "m", entradas=("y", "z"), saidas=("w",)),
+    ))
+
+
+def _impressoes(grafo, dados, passos):
+    return {p: grafo.no(p).impressao(dados) for p in passos}
+
+
+# ─── estrutura ────────────────────────────────────────────────────────────────
+
+class TestEstrutura:
+    def test_dependencias_e_dependentes(self):
+        g = _grafo()
+        assert g.dependencias("d") == {"a", "b", "c"}
+        assert g.dependentes("a") == {"b", "c", "d"}
+        assert g.dependentes("d") == set()
+
+    def test_camadas_paralelizam_independentes(self):
+        assert _grafo().camadas(["d", "c", "b"]) == [["b", "c"], ["d"]]
+
+    def test_ciclo_rejeitado(self):
+        with pytest.raises(ValueError, match="Ciclo"):
+            GrafoPassos((
+                NoPasso("a", "A", "m", entradas=("y",), saidas=("x",)),
+                NoPasso("b", "B", "m", entradas=("x",), saidas=("y",)),
+            ))
+
+    def test_passo_duplicado_rejeitado(self):
+        with pytest.raises(ValueError, match="duplicado"):
+            GrafoPassos((NoPasso("a", "A", "m"), NoPasso("a", "A", "m")))
+
+
+# ─── NoPasso ──────────────────────────────────────────────────────────────────
+
+class TestNoPasso:
+    def test_impressao_so_das_entradas(self):
+        no = GRAFO.no("passo_3_serasa")
+        base = {"empresa": "ACME", "cnpj": "1"}
+        assert no.impressao(base) == no.impressao({**base, "aluguel": "5000"})
+        assert no.impressao(base) != no.impressao({**base, "cnpj": "2"})
+
+    def test_argumentos_na_ordem_dos_parametros(self):
+        dados = {"empresa": "ACME", "cnpj": "1", "aluguel": "5000"}
+        assert GRAFO.no("passo_5_contabil").argumentos(dados) == ("ACME", "1", "5000", "")
+
+    def test_sem_parametros_recebe_copia_dos_dados(self):
+        dados = {"empresa": "ACME"}
+        (arg,) = GRAFO.no("passo_6_patrimonio").argumentos(dados)
+        assert arg == dados and arg is not dados
+
+
+# ─── GRAFO da análise ─────────────────────────────────────────────────────────
+
+class TestGrafoAnalise:
+    def test_patrimonio_depende_dos_passos_anteriores(self):
+        acima = GRAFO.dependencias("passo_6_patrimonio")
+        assert {"passo_0_contrato", "passo_2_referencias", "passo_3_serasa", "passo_5_contabil"} <= acima
+        assert "passo_4_certidoes" not in acima
+
+    def test_fiador_depende_da_proposta(self):
+        assert GRAFO.dependencias("passo_2_fiador") == {"passo_1_proposta"}
+
+    def test_cnpj_invalida_extracoes_e_patrimonio(self):
+        passos = ("passo_3_serasa", "passo_4_certidoes", "passo_5_contabil", "passo_6_patrimonio")
+        dados = {"empresa": "ACME", "cnpj": "1", "score_serasa": "700"}
+        impressoes = _impressoes(GRAFO, dados, passos)
+        assert GRAFO.invalidados({**dados, "cnpj": "2"}, impressoes) == list(passos)
+
+    def test_score_invalida_so_patrimonio(self):
+        passos = ("passo_3_serasa", "passo_6_patrimonio")
+        dados = {"empresa": "ACME", "cnpj": "1", "score_serasa": "700"}
+        impressoes = _impressoes(GRAFO, dados, passos)
+        assert GRAFO.invalidados({**dados, "score_serasa": "650"}, impressoes) == ["passo_6_patrimonio"]
+
+
+# ─── invalidados ──────────────────────────────────────────────────────────────
+
+class TestInvalidados:
+    def test_nada_mudou(self):
+        g = _grafo()
+        dados = {"x": 1, "y": 2, "z": 3}
+        assert g.invalidados(dados, _impressoes(g, dados, "abcd")) == []
+
+    def test_propaga_para_dependentes_executados(self):
+        g = _grafo()
+        dados = {"x": 1, "y": 2, "z": 3}
+        impressoes = _impressoes(g, dados, "abcd")
+        assert g.invalidados({**dados, "x": 9}, impressoes) == ["b", "c", "d"]
+
+    def test_ignora_passos_nunca_executados(self):
+        g = _grafo()
+        dados = {"x": 1}
+        assert g.invalidados({"x": 9}, _impressoes(g, dados, "b")) == ["b"]
+
+
+# ─── reexecutar ───────────────────────────────────────────────────────────────
+
+class TestReexecutar:
+    def test_camada_de_cima_alimenta_a_de_baixo(self):
+        g = _grafo()
+        dados = {"x": 1, "y": 2, "z": 3}
+        impressoes = _impressoes(g, dados, "bcd")
+        vistos = {}
+
+        def executar(no, atual):
+            vistos[no.passo] = dict(atual)
+            return {"b": {"y": atual["x"] * 10}, "c": {"z": atual["x"] * 100}, "d": {"w": "novo"}}[no.passo]
+
+        r = g.reexecutar(["b", "c", "d"], {**dados, "x": 2}, impressoes, executar)
+        assert r.executados == ["b", "c", "d"]
+        assert vistos["d"]["y"] == 20 and vistos["d"]["z"] == 200
+        assert r.saidas == {"y": 20, "z": 200, "w": "novo"}
+        assert r.impressoes["d"] == g.no("d").impressao({"y": 20, "z": 200})
+
+    def test_dependente_reaproveitado_quando_saida_nao_muda(self):
+        g = _grafo()
+        dados = {"x": 1, "y": 2, "z": 3}
+        impressoes = _impressoes(g, dados, "bcd")
+        chamados = []
+
+        def executar(no, atual):
+            chamados.append(no.passo)
+            return {"b": {"y": 2}, "c": {"z": 3}}[no.passo]     # mesmas saídas de antes
+
+        r = g.reexecutar(["b", "c", "d"], {**dados, "x": 2}, impressoes, executar)
+        assert sorted(chamados) == ["b", "c"]
+        assert r.reaproveitados == ["d"]
+
+    def test_mesma_camada_em_paralelo(self):
+        g = _grafo()
+        barreira = threading.Barrier(2, timeout=5)
+
+        def executar(no, atual):
+            barreira.wait()          # só passa se b e c rodarem ao mesmo tempo
+            return {"ok": no.passo}
+
+        r = g.reexecutar(["b", "c"], {"x": 2}, {}, executar)
+        assert sorted(r.executados) == ["b", "c"]
+
+    def test_falha_mantem_saidas_antigas(self):
+        g = _grafo()
+
+        def executar(no, atual):
+            if no.passo == "b":
+                raise RuntimeError("provedor fora do ar")
+            return {} if no.passo == "c" else {"w": 1}
+
+        r = g.reexecutar(["b", "c"], {"x": 2}, {}, executar)
+        assert sorted(r.falhas) == ["b", "c"]
+        assert r.saidas == {} and r.impressoes == {}
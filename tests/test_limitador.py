@@ -0,0 +1,133 @@
+"""
+Testes unitários para core/limitador.py
+Cobre: Limitador (token bucket, concorrência, fila justa, pausa), retry_after
+"""
+
+import sys
+import os
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.limitador import FilaEsgotada, Limitador, retry_after
+
+
+def _esperar_fila(limitador, n, timeout=2.0):
+    fim = time.monotonic() + timeout
+    while limitador.na_fila < n:
+        assert time.monotonic() < fim, "fila não atingiu o tamanho esperado"
+        time.sleep(0.005)
+
+
+# ─── token bucket ─────────────────────────────────────────────────────────────
+
+class TestTokenBucket:
+    def test_rajada_inicial_liberada_sem_espera(self):
+        lim = Limitador(rpm=60, concorrencia=10, rajada=3)
+        inicio = time.monotonic()
+        for _ in range(3):
+            lim.adquirir()
+            lim.liberar()
+        assert time.monotonic() - inicio < 0.1
+
+    def test_apos_rajada_respeita_taxa(self):
+        lim = Limitador(rpm=1200, concorrencia=10, rajada=1)   # 1 token a cada 50ms
+        inicio = time.monotonic()
+        for _ in range(4):
+            with lim.slot():
+                pass
+        assert time.monotonic() - inicio >= 0.14
+
+    def test_parametros_invalidos(self):
+        with pytest.raises(ValueError):
+            Limitador(rpm=0)
+
+
+# ─── concorrência ─────────────────────────────────────────────────────────────
+
+class TestConcorrencia:
+    def test_nunca_excede_limite_em_voo(self):
+        lim = Limitador(rpm=60000, concorrencia=2, rajada=100)
+        pico = []
+        trava = threading.Lock()
+
+        def tarefa():
+            with lim.slot():
+                with trava:
+                    pico.append(lim.em_voo)
+                time.sleep(0.01)
+
+        threads = [threading.Thread(target=tarefa) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert max(pico) <= 2
+        assert lim.em_voo == 0 and lim.na_fila == 0
+
+    def test_timeout_levanta_fila_esgotada_e_sai_da_fila(self):
+        lim = Limitador(rpm=60000, concorrencia=1, rajada=10)
+        lim.adquirir()
+        with pytest.raises(FilaEsgotada):
+            lim.adquirir(timeout=0.05)
+        assert lim.na_fila == 0
+        lim.liberar()
+        lim.adquirir(timeout=0.05)
+
+
+# ─── fila justa ───────────────────────────────────────────────────────────────
+
+class TestFilaJusta:
+    def test_round_robin_entre_usuarios(self):
+        lim = Limitador(rpm=60000, concorrencia=1, rajada=100)
+        ordem = []
+        lim.adquirir("bloqueio")
+
+        def tarefa(usuario, rotulo):
+            with lim.slot(usuario):
+                ordem.append(rotulo)
+
+        threads = []
+        for usuario, rotulo in [("ana", "a1"), ("ana", "a2"), ("ana", "a3"), ("bia", "b1")]:
+            t = threading.Thread(target=tarefa, args=(usuario, rotulo))
+            t.start()
+            threads.append(t)
+            _esperar_fila(lim, len(threads))
+
+        lim.liberar()
+        for t in threads:
+            t.join()
+        assert ordem == ["a1", "b1", "a2", "a3"]
+
+
+# ─── pausa (Retry-After) ──────────────────────────────────────────────────────
+
+class TestPausa:
+    def test_pausa_bloqueia_novas_liberacoes(self):
+        lim = Limitador(rpm=60000, concorrencia=5, rajada=10)
+        lim.pausar(0.1)
+        inicio = time.monotonic()
+        with lim.slot():
+            pass
+        assert time.monotonic() - inicio >= 0.09
+
+
+# ─── retry_after ──────────────────────────────────────────────────────────────
+
+class TestRetryAfter:
+    def test_segundos(self):
+        assert retry_after({"retry-after": "12"}) == 12.0
+
+    def test_milissegundos_tem_prioridade(self):
+        assert retry_after({"retry-after-ms": "1500", "retry-after": "10"}) == 1.5
+
+    def test_data_http(self):
+        assert retry_after({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0.0
+
+    def test_ausente_ou_invalido(self):
+        assert retry_after({}) is None
+        assert retry_after(None) is None
+        assert retry_after({"retry-after": "amanhã"}) is None
@@ -0,0 +1,200 @@
+"""
+Testes unitários para core/metricas.py e core.prompt_loader.get_modelo
+Cobre: registrar_chamada, latencia_percentil, resumo_metricas, arquivos diários
+de eventos (período, retenção, parse em cache), get_modelo
+"""
+
+import sys
+import os
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import core.metricas as metricas
+from core.metricas import (
+    configurar_sink, latencia_percentil, ler_eventos, limpar_metricas, registrar_cache,
+    registrar_chamada, resumo_historico, resumo_metricas,
+)
+from core.prompt_loader import MODELO_PADRAO, get_modelo, get_modelo_reserva
+
+
+@pytest.fixture(autouse=True)
+def _metricas_limpas(tmp_path):
+    limpar_metricas()
+    configurar_sink(tmp_path / "metricas.jsonl")
+    yield
+    limpar_metricas()
+    configurar_sink(None)
+
+
+# ─── registrar_chamada / resumo_metricas ──────────────────────────────────────
+
+class TestResumoMetricas:
+    def test_agrega_por_passo_e_modelo(self):
+        registrar_chamada("passo_3_serasa", "m1", 2.0, tokens_entrada=100, tokens_saida=10, custo=0.01)
+        registrar_chamada("passo_3_serasa", "m1", 4.0, tokens_entrada=300, tokens_saida=30, custo=0.03)
+        registrar_chamada("passo_3_serasa", "m2", 1.0)
+        linhas = {(linha["passo"], linha["modelo"]): linha for linha in resumo_metricas()}
+        m1 = linhas[("passo_3_serasa", "m1")]
+        assert m1["chamadas"] == 2
+        assert m1["latencia_media"] == pytest.approx(3.0)
+        assert m1["tokens_entrada"] == 400 and m1["tokens_saida"] == 40
+        assert m1["custo_total"] == pytest.approx(0.04)
+        assert linhas[("passo_3_serasa", "m2")]["custo_total"] == 0.0
+
+    def test_ordenado_por_custo(self):
+        registrar_chamada("barato", "m", 1.0, custo=0.001)
+        registrar_chamada("caro", "m", 1.0, custo=0.5)
+        assert [linha["passo"] for linha in resumo_metricas()] == ["caro", "barato"]
+
+    def test_falhas_contadas(self):
+        registrar_chamada("p", "m", 1.0)
+        registrar_chamada("p", "m", 120.0, sucesso=False)
+        assert resumo_metricas()[0]["falhas"] == 1
+
+    def test_passo_none(self):
+        registrar_chamada(None, "m", 1.0)
+        assert resumo_metricas()[0]["passo"] == "-"
+
+
+# ─── sink JSONL / resumo_historico ───────────────────────────────────────────
+
+class TestSinkJsonl:
+    def test_eventos_gravados(self):
+        registrar_chamada("p", "m", 1.5, bytes_requisicao=2000, bytes_base64=1500, usuario="ana")
+        registrar_cache("p", acerto=True)
+        eventos = ler_eventos()
+        assert [e["tipo"] for e in eventos] == ["chamada", "cache"]
+        assert eventos[0]["bytes_base64"] == 1500 and eventos[0]["usuario"] == "ana"
+
+    def test_sink_desligado(self):
+        configurar_sink(None)
+        registrar_chamada("p", "m", 1.0)
+        assert ler_eventos() == []
+
+    def test_resumo_historico(self):
+        registrar_chamada("p", "m", 1.0, custo=0.01, bytes_requisicao=2_000_000)
+        registrar_chamada("p", "m", 3.0, custo=0.02, bytes_requisicao=1_000_000)
+        registrar_chamada("p", "m", 120.0, sucesso=False)
+        registrar_cache("p", acerto=True)
+        registrar_cache("p", acerto=False)
+        df = resumo_historico()
+        linha = df.iloc[0]
+        assert linha["chamadas"] == 3 and linha["falhas"] == 1
+        assert linha["latencia_media"] == pytest.approx(2.0)
+        assert linha["custo_total"] == pytest.approx(0.03)
+        assert linha["mb_enviados"] == pytest.approx(3.0)
+        assert linha["cache_acerto_pct"] == pytest.approx(50.0)
+
+    def test_resumo_historico_vazio(self):
+        assert resumo_historico().empty
+
+    def test_linha_corrompida_ignorada(self, tmp_path):
+        registrar_chamada("p", "m", 1.0)
+        with open(_arquivo(tmp_path, date.today()), "a", encoding="utf-8") as f:
+            f.write("{corrompida\n")
+        assert len(ler_eventos()) == 1
+
+
+def _arquivo(pasta, dia: date):
+    return pasta / f"metricas-{dia.isoformat()}.jsonl"
+
+
+def _evento_antigo(pasta, dias_atras: int, ts: datetime | None = None):
+    dia = date.today() - timedelta(days=dias_atras)
+    ts = ts or datetime.combine(dia, datetime.min.time())
+    evento = {"ts": ts.isoformat(timespec="seconds"), "tipo": "cache", "passo": "antigo", "acerto": True}
+    _arquivo(pasta, dia).write_text(json.dumps(evento) + "\n", encoding="utf-8")
+
+
+class TestArquivosDiarios:
+    def test_um_arquivo_por_dia(self, tmp_path):
+        registrar_chamada("p", "m", 1.0)
+        assert _arquivo(tmp_path, date.today()).exists()
+        assert not (tmp_path / "metricas.jsonl").exists()
+
+    def test_periodo_nao_abre_dias_anteriores(self, tmp_path):
+        # Evento com ts recente num arquivo de 10 dias atrás: o arquivo nem é lido
+        _evento_antigo(tmp_path, 10, ts=datetime.now())
+        registrar_chamada("p", "m", 1.0)
+        assert [e["tipo"] for e in ler_eventos(dias=7)] == ["chamada"]
+        assert len(ler_eventos()) == 2
+
+    def test_retencao_apaga_dias_antigos(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(metricas, "_RETENCAO_DIAS", 30)
+        _evento_antigo(tmp_path, 31)
+        _evento_antigo(tmp_path, 29)
+        registrar_chamada("p", "m", 1.0)
+        assert not _arquivo(tmp_path, date.today() - timedelta(days=31)).exists()
+        assert _arquivo(tmp_path, date.today() - timedelta(days=29)).exists()
+
+    def test_dia_fechado_lido_uma_vez(self, tmp_path, monkeypatch):
+        _evento_antigo(tmp_path, 3)
+        assert len(ler_eventos()) == 1
+        monkeypatch.setattr(metricas.json, "loads", lambda *_: pytest.fail("arquivo relido"))
+        assert len(ler_eventos()) == 1
+
+    def test_arquivo_unico_anterior_ainda_lido(self, tmp_path):
+        evento = {"ts": datetime.now().isoformat(timespec="seconds"), "tipo": "chamada", "passo": "p"}
+        (tmp_path / "metricas.jsonl").write_text(json.dumps(evento) + "\n", encoding="utf-8")
+        assert len(ler_eventos(dias=30)) == 1
+
+
+# ─── latencia_percentil ───────────────────────────────────────────────────────
+
+class TestLatenciaPercentil:
+    def test_sem_amostras(self):
+        assert latencia_percentil("p", "m") is None
+
+    def test_p95(self):
+        for i in range(1, 101):
+            registrar_chamada("p", "m", float(i))
+        assert latencia_percentil("p", "m", 95) == 95.0
+        assert latencia_percentil("p", "m", 50) == 50.0
+
+    def test_minimo_de_amostras(self):
+        registrar_chamada("p", "m", 1.0)
+        assert latencia_percentil("p", "m", minimo_amostras=2) is None
+        registrar_chamada("p", "m", 2.0)
+        assert latencia_percentil("p", "m", minimo_amostras=2) == 2.0
+
+    def test_falhas_fora_da_janela(self):
+        registrar_chamada("p", "m", 1.0)
+        registrar_chamada("p", "m", 120.0, sucesso=False)
+        assert latencia_percentil("p", "m", 95) == 1.0
+
+
+# ─── get_modelo ───────────────────────────────────────────────────────────────
+
+class TestGetModelo:
+    def test_passo_com_rota_no_yaml(self):
+        assert get_modelo("passo_6_patrimonio") == "google/gemini-2.5-pro"
+
+    def test_passo_sem_rota_usa_padrao(self):
+        assert get_modelo("passo_3_serasa") == "google/gemini-2.5-flash"
+        assert get_modelo(None) == "google/gemini-2.5-flash"
+
+    def test_sobrescrita_do_passo_tem_prioridade(self):
+        assert get_modelo("passo_6_patrimonio", {"passo_6_patrimonio": "x/y"}) == "x/y"
+
+    def test_sobrescrita_padrao_nao_afeta_rota_do_yaml(self):
+        sobrescritas = {"padrao": "x/padrao"}
+        assert get_modelo("passo_3_serasa", sobrescritas) == "x/padrao"
+        assert get_modelo("passo_6_patrimonio", sobrescritas) == "google/gemini-2.5-pro"
+
+    def test_modelo_padrao_definido(self):
+        assert MODELO_PADRAO
+
+
+# ─── get_modelo_reserva ───────────────────────────────────────────────────────
+
+class TestGetModeloReserva:
+    def test_reserva_do_passo_e_padrao(self):
+        assert get_modelo_reserva("passo_6_patrimonio") == "openai/gpt-4.1"
+        assert get_modelo_reserva("passo_3_serasa") == "openai/gpt-4.1-mini"
+
+    def test_sobrescrita(self):
+        assert get_modelo_reserva("passo_3_serasa", {"passo_3_serasa": "x/y"}) == "x/y"
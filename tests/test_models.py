@@ -0,0 +1,120 @@
+"""
+Testes unitários para core/models.py
+Cobre: TabelaFinanceira, tabela_financeira, ContabilModel.tabela,
+       schema_saida, validar_saida
+"""
+
+import json
+import math
+import sys
+import os
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.models import (
+    MODELOS_POR_PASSO,
+    ContabilModel,
+    SerasaModel,
+    schema_saida,
+    tabela_financeira,
+    validar_saida,
+)
+
+DADOS = {
+    "periodos": ["2023", "2024", "2025"],
+    "receita_bruta": ["R$ 1.200.000,00", "R$ 2.400.000,00", "-"],
+    "resultado": ["(120.000,00)", "R$ 240.000,00", "-"],
+    "ativo_circulante": ["R$ 500.000,00", "R$ 600.000,00"],
+    "passivo_circulante": ["R$ 250.000,00", "0"],
+}
+
+
+# ─── TabelaFinanceira ─────────────────────────────────────────────────────────
+
+class TestTabelaFinanceira:
+    def test_converte_para_float(self):
+        tabela = tabela_financeira(DADOS)
+        assert tabela.periodos == ("2023", "2024", "2025")
+        assert tabela.receita_bruta[0] == 1_200_000.0
+        assert tabela.resultado[0] == -120_000.0
+        assert math.isnan(tabela.receita_bruta[2])
+
+    def test_margem(self):
+        margem = tabela_financeira(DADOS).margem
+        assert margem[0] == pytest.approx(-10.0)
+        assert margem[1] == pytest.approx(10.0)
+        assert math.isnan(margem[2])
+
+    def test_liquidez_com_passivo_zero(self):
+        liquidez = tabela_financeira(DADOS).liquidez
+        assert liquidez[0] == pytest.approx(2.0)
+        assert math.isnan(liquidez[1])
+
+    def test_comprometimento_mensal(self):
+        pct = tabela_financeira(DADOS).comprometimento(20_000, meses=12)
+        assert pct[0] == pytest.approx(20.0)
+
+    def test_ultimo_indice_ignora_vazios(self):
+        assert tabela_financeira(DADOS).ultimo_indice() == 1
+        assert tabela_financeira({}).ultimo_indice() is None
+
+    def test_mesmo_conteudo_reaproveita_tabela(self):
+        assert tabela_financeira(dict(DADOS)) is tabela_financeira(DADOS)
+
+    def test_valores_somente_leitura(self):
+        with pytest.raises(ValueError):
+            tabela_financeira(DADOS).valores[0, 0] = 1.0
+
+    def test_campo_string_unica(self):
+        tabela = tabela_financeira({"periodos": "2024", "receita_bruta": "R$ 10,00"})
+        assert tabela.periodos == ("2024",)
+        assert tabela.receita_bruta[0] == 10.0
+
+
+# ─── ContabilModel ────────────────────────────────────────────────────────────
+
+class TestContabilModel:
+    def test_tabela_no_model(self):
+        modelo = ContabilModel.from_dict(DADOS)
+        assert modelo.tabela is tabela_financeira(DADOS)
+
+
+# ─── Saída estruturada ────────────────────────────────────────────────────────
+
+class TestSchemaSaida:
+    def test_schema_estrito(self):
+        schema = schema_saida(SerasaModel)
+        assert schema["additionalProperties"] is False
+        assert set(schema["required"]) == set(SerasaModel.model_fields)
+        assert all("default" not in p for p in schema["properties"].values())
+
+    def test_lista_de_strings(self):
+        prop = schema_saida(ContabilModel)["properties"]["receita_bruta"]
+        assert prop == {"type": "array", "items": {"type": "string"}}
+
+    def test_todos_os_passos_tem_schema(self):
+        for modelo in MODELOS_POR_PASSO.values():
+            assert schema_saida(modelo)["properties"]
+
+
+class TestValidarSaida:
+    def test_json_valido(self):
+        texto = json.dumps({"score_serasa": "850", "risco_serasa": "Baixo"})
+        dados = validar_saida(SerasaModel, texto)
+        assert dados["risco_serasa"] == "baixo"
+        assert dados["mapeamento_dividas"] == ""
+
+    def test_json_com_cerca_markdown_falha(self):
+        with pytest.raises(json.JSONDecodeError):
+            validar_saida(SerasaModel, '```json\n{"score_serasa": "850"}\n```')
+
+    def test_tipo_errado_falha(self):
+        with pytest.raises(ValidationError):
+            validar_saida(ContabilModel, json.dumps({"receita_bruta": [1200000]}))
+
+    def test_raiz_nao_objeto_falha(self):
+        with pytest.raises(json.JSONDecodeError):
+            validar_saida(SerasaModel, "[]")
@@ -0,0 +1,80 @@
+"""
+Testes unitários para utils/moeda.py
+Cobre: parse_moeda, parse_moeda_series
+"""
+
+import math
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.moeda import parse_moeda, parse_moeda_series
+
+
+# ─── parse_moeda ──────────────────────────────────────────────────────────────
+
+class TestParseMoeda:
+    def test_formato_br_com_rs(self):
+        assert parse_moeda("R$ 20.000,00") == 20000.0
+
+    def test_formato_br_sem_milhar(self):
+        assert parse_moeda("1234,56") == pytest.approx(1234.56)
+
+    def test_formato_us(self):
+        assert parse_moeda("1,234.56") == pytest.approx(1234.56)
+
+    def test_ponto_decimal_simples(self):
+        assert parse_moeda("1500.75") == pytest.approx(1500.75)
+
+    def test_ponto_como_milhar_br(self):
+        assert parse_moeda("1.500") == 1500.0
+        assert parse_moeda("1.234.567") == 1234567.0
+
+    def test_parenteses_contabeis_negativos(self):
+        assert parse_moeda("(15.000,00)") == -15000.0
+
+    def test_sinal_negativo(self):
+        assert parse_moeda("- R$ 500,00") == -500.0
+
+    def test_texto_com_sufixo(self):
+        assert parse_moeda("R$ 2.000,00 mensais") == 2000.0
+
+    def test_numeros_nativos(self):
+        assert parse_moeda(42) == 42.0
+        assert parse_moeda(1234.56) == pytest.approx(1234.56)
+
+    def test_vazios_retornam_padrao(self):
+        assert parse_moeda(None) == 0.0
+        assert parse_moeda("-") == 0.0
+        assert parse_moeda("") == 0.0
+        assert parse_moeda("Não informado") == 0.0
+        assert parse_moeda(float("nan")) == 0.0
+
+    def test_padrao_none(self):
+        assert parse_moeda("-", padrao=None) is None
+        assert parse_moeda("abc", padrao=None) is None
+
+
+# ─── parse_moeda_series ───────────────────────────────────────────────────────
+
+class TestParseMoedaSeries:
+    def test_coluna_texto(self):
+        serie = pd.Series(["R$ 1.500,00", "2.000", None, "-", "(300,00)"])
+        assert parse_moeda_series(serie).tolist() == [1500.0, 2000.0, 0.0, 0.0, -300.0]
+
+    def test_coluna_numerica(self):
+        serie = pd.Series([1500.0, None, 20])
+        assert parse_moeda_series(serie).tolist() == [1500.0, 0.0, 20.0]
+
+    def test_lista_e_padrao_none(self):
+        resultado = parse_moeda_series(["100,00", "x"], padrao=None)
+        assert resultado[0] == 100.0
+        assert math.isnan(resultado[1])
+
+    def test_preserva_indice(self):
+        serie = pd.Series(["1,00", "2,00"], index=[10, 20])
+        assert list(parse_moeda_series(serie).index) == [10, 20]
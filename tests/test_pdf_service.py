@@ -0,0 +1,84 @@
+"""
+Testes unitários para a fonte Unicode de services/pdf_service.py
+Cobre: texto fora do Latin-1 renderizado com a fonte embutida, pela cópia do
+modelo em cache (inclusive documentos gerados em paralelo) e pelo add_font()
+público (internos do fpdf2 ausentes ou outra versão)
+"""
+
+import sys
+import os
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from PyPDF2 import PdfReader
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import services.pdf_service as pdf_service
+from services.pdf_service import CFG, PDFExecutivo
+
+# Seta, check, euro, travessão, aspas curvas e Ł: nada disso existe no Latin-1
+TEXTO = "Score → 850 ✓ € 1.200 — “aprovado” Łódź"
+# Glifos disjuntos entre si: cada documento monta um subset diferente
+TEXTO_B = "Índice ≥ 1,5 ≠ ∑ ▲ ✗ ‰ ő ſ"
+
+pytestmark = pytest.mark.skipif(
+    pdf_service._localizar_fonte(CFG.FONT_UNICODE_ARQUIVOS[0][1]) is None,
+    reason="fonte DejaVuSans não instalada",
+)
+
+
+def _renderizar(texto: str = TEXTO) -> str:
+    pdf = PDFExecutivo()
+    assert pdf._fonte == CFG.FONT_UNICODE
+    pdf.add_page()
+    pdf.set_font(pdf._fonte, "", 10)
+    pdf.cell(text=pdf._txt(texto))
+    conteudo = bytes(pdf.output())
+    return PdfReader(io.BytesIO(conteudo)).pages[0].extract_text()
+
+
+# ─── fonte Unicode ────────────────────────────────────────────────────────────
+
+class TestFonteUnicode:
+    def test_texto_fora_do_latin1(self):
+        assert TEXTO in _renderizar()
+
+    def test_documentos_seguidos_nao_compartilham_estado(self):
+        assert _renderizar() == _renderizar()
+
+    def test_documentos_em_paralelo_com_glifos_diferentes(self):
+        textos = [TEXTO, TEXTO_B] * 12
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            extraidos = list(pool.map(_renderizar, textos))
+        assert all(texto in extraido for texto, extraido in zip(textos, extraidos))
+
+    def test_copia_nao_compartilha_estado_mutavel(self):
+        chave = CFG.FONT_UNICODE.lower()
+        modelo, _ = pdf_service._fonte_ttf_base(
+            str(pdf_service._localizar_fonte(CFG.FONT_UNICODE_ARQUIVOS[0][1])), "")
+        a, b = PDFExecutivo().fonts[chave], PDFExecutivo().fonts[chave]
+        for atributo in (*pdf_service._ATRIBUTOS_NOVOS, *pdf_service._ATRIBUTOS_COPIADOS):
+            valor = getattr(a, atributo)
+            if valor is not None and not isinstance(valor, (int, float)):
+                assert valor is not getattr(b, atributo), atributo
+                assert valor is not getattr(modelo, atributo), atributo
+
+    def test_outra_versao_do_fpdf2_usa_add_font(self, monkeypatch):
+        chamadas = []
+        add_font = PDFExecutivo.add_font
+        monkeypatch.setattr(pdf_service, "_FPDF_COMPATIVEL", False)
+        monkeypatch.setattr(PDFExecutivo, "add_font",
+                            lambda self, *args, **kw: chamadas.append(args) or add_font(self, *args, **kw))
+        assert TEXTO in _renderizar()
+        assert len(chamadas) == len(CFG.FONT_UNICODE_ARQUIVOS)
+
+    def test_sem_internos_do_fpdf2_usa_add_font(self, monkeypatch):
+        chamadas = []
+        add_font = PDFExecutivo.add_font
+        monkeypatch.setattr(pdf_service, "SubsetMap", None)
+        monkeypatch.setattr(PDFExecutivo, "add_font",
+                            lambda self, *args, **kw: chamadas.append(args) or add_font(self, *args, **kw))
+        assert TEXTO in _renderizar()
+        assert len(chamadas) == len(CFG.FONT_UNICODE_ARQUIVOS)
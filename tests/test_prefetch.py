@@ -0,0 +1,78 @@
+"""
+Testes unitários para core/prefetch.py
+Cobre: passos_prontos (documentos e entradas exigidas, passos já enviados),
+assinatura (estável, muda com PDFs e entradas do passo)
+"""
+
+import sys
+import os
+import io
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.grafo import GRAFO
+from core.prefetch import assinatura, passos_prontos
+
+
+def _pdf(conteudo: bytes, nome: str = "doc.pdf") -> io.BytesIO:
+    f = io.BytesIO(conteudo)
+    f.name = nome
+    return f
+
+
+def _regra(passo):
+    return GRAFO.no(passo)
+
+
+DADOS = {"empresa": "ACME LTDA", "cnpj": "12.345.678/0001-90", "aluguel": "10000", "iptu": ""}
+
+
+# ─── passos_prontos ───────────────────────────────────────────────────────────
+
+class TestPassosProntos:
+    def test_sem_documentos_nada_pronto(self):
+        assert passos_prontos(DADOS, {}, {}) == []
+
+    def test_exige_empresa_e_cnpj(self):
+        docs = {"passo_3_serasa": [_pdf(b"serasa")]}
+        assert passos_prontos({**DADOS, "cnpj": "  "}, docs, {}) == []
+        assert passos_prontos({**DADOS, "empresa": None}, docs, {}) == []
+        prontos = passos_prontos(DADOS, docs, {})
+        assert [r.passo for r, _ in prontos] == ["passo_3_serasa"]
+
+    def test_aluguel_vazio_nao_bloqueia_contabil(self):
+        docs = {"passo_5_contabil": [_pdf(b"balanco")]}
+        prontos = passos_prontos({"empresa": "ACME", "cnpj": "1"}, docs, {})
+        assert [r.passo for r, _ in prontos] == ["passo_5_contabil"]
+
+    def test_ignora_assinatura_ja_enviada(self):
+        docs = {"passo_3_serasa": [_pdf(b"serasa")], "passo_4_certidoes": [_pdf(b"cnd")]}
+        enviados = dict((r.passo, a) for r, a in passos_prontos(DADOS, docs, {}))
+        assert passos_prontos(DADOS, docs, enviados) == []
+
+    def test_reenvia_quando_campo_muda(self):
+        docs = {"passo_4_certidoes": [_pdf(b"cnd")]}
+        enviados = dict((r.passo, a) for r, a in passos_prontos(DADOS, docs, {}))
+        prontos = passos_prontos({**DADOS, "cnpj": "98.765.432/0001-10"}, docs, enviados)
+        assert [r.passo for r, _ in prontos] == ["passo_4_certidoes"]
+
+
+# ─── assinatura ───────────────────────────────────────────────────────────────
+
+class TestAssinatura:
+    def test_estavel(self):
+        regra = _regra("passo_3_serasa")
+        assert assinatura(regra, [_pdf(b"x")], DADOS) == assinatura(regra, [_pdf(b"x")], dict(DADOS))
+
+    def test_muda_com_conteudo_do_pdf(self):
+        regra = _regra("passo_3_serasa")
+        assert assinatura(regra, [_pdf(b"x")], DADOS) != assinatura(regra, [_pdf(b"y")], DADOS)
+
+    def test_ignora_campo_que_o_passo_nao_usa(self):
+        regra = _regra("passo_3_serasa")
+        assert assinatura(regra, [_pdf(b"x")], DADOS) == assinatura(regra, [_pdf(b"x")], {**DADOS, "aluguel": "1"})
+
+    def test_aluguel_nao_reenvia_contabil(self):
+        # a extração contábil não depende do aluguel/IPTU (só são repassados)
+        regra = _regra("passo_5_contabil")
+        assert assinatura(regra, [_pdf(b"x")], DADOS) == assinatura(regra, [_pdf(b"x")], {**DADOS, "iptu": "500"})
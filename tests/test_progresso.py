@@ -0,0 +1,130 @@
+"""
+Testes unitários para core/progresso.py
+Cobre: Progresso (fração por unidade, redesenho só na thread dona, throttling),
+acompanhar/reportar/unidade, submeter (contexto nas threads de trabalho)
+"""
+
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.progresso import (
+    Progresso,
+    acompanhar,
+    declarar_unidades,
+    despachar,
+    reportar,
+    submeter,
+    unidade,
+)
+
+
+def _coletor(intervalo=0.0):
+    estados = []
+    return Progresso(estados.append, intervalo=intervalo), estados
+
+
+# ─── Progresso ────────────────────────────────────────────────────────────────
+
+class TestProgresso:
+    def test_fracao_media_das_unidades(self):
+        p, _ = _coletor()
+        p.declarar_unidades(["a.pdf", "b.pdf"])
+        p.registrar("concluido", {"unidade": "a.pdf"})
+        estado = p.estado()
+        assert estado.fracao == 0.5
+        assert (estado.concluidas, estado.unidades) == (1, 2)
+
+    def test_fracao_nunca_recua(self):
+        p, _ = _coletor()
+        p.registrar("primeiro_token", {"unidade": "a.pdf"})
+        p.registrar("fila", {"unidade": "a.pdf"})      # nova tentativa
+        assert p.estado().fracao == 0.5
+
+    def test_recebimento_avanca_com_caracteres(self):
+        p, _ = _coletor()
+        p.registrar("recebendo", {"unidade": "a", "caracteres": 100})
+        pouco = p.estado().fracao
+        p.registrar("recebendo", {"unidade": "a", "caracteres": 10_000})
+        muito = p.estado().fracao
+        assert 0.5 < pouco < muito < 0.92
+
+    def test_evento_sem_unidade_so_atualiza_mensagem(self):
+        p, estados = _coletor()
+        p.registrar("hash", {"arquivos": 3})
+        assert p.estado().unidades == 0
+        assert "3 arquivo(s)" in estados[-1].mensagem
+
+    def test_redesenha_so_na_thread_dona(self):
+        p, estados = _coletor()
+        t = threading.Thread(target=p.registrar, args=("envio", {"unidade": "a", "bytes": 2048}))
+        t.start()
+        t.join()
+        assert estados == []
+        p.despachar()
+        assert len(estados) == 1 and estados[0].etapa == "envio"
+
+    def test_throttling_de_eventos_da_mesma_etapa(self):
+        p, estados = _coletor(intervalo=3600)
+        for n in range(1, 50):
+            p.registrar("recebendo", {"unidade": "a", "caracteres": n})
+        assert len(estados) == 1
+        p.registrar("interpretando", {"unidade": "a"})   # mudança de etapa redesenha
+        assert len(estados) == 2
+
+    def test_ignora_eventos_apos_encerrar(self):
+        p, estados = _coletor()
+        p.encerrar()
+        p.registrar("concluido", {"unidade": "a"})
+        assert estados == [] and p.estado().unidades == 0
+
+
+# ─── contexto ─────────────────────────────────────────────────────────────────
+
+class TestContexto:
+    def test_reportar_sem_progresso_ativo_nao_falha(self):
+        reportar("envio", bytes=1)
+        declarar_unidades(["a"])
+        despachar()
+
+    def test_unidade_do_contexto(self):
+        p, _ = _coletor()
+        with acompanhar(p):
+            with unidade("a.pdf"):
+                reportar("concluido")
+            reportar("concluido", unidade="b.pdf")
+        assert p.estado().concluidas == 2
+
+    def test_acompanhar_entrega_estado_final_e_encerra(self):
+        p, estados = _coletor(intervalo=3600)
+        with acompanhar(p):
+            reportar("recebendo", unidade="a", caracteres=1)
+            reportar("recebendo", unidade="a", caracteres=500)
+        assert estados[-1].mensagem.endswith("(500 caracteres)...")
+        reportar("concluido", unidade="a")
+        assert p.estado().concluidas == 0
+
+    def test_submeter_leva_contexto_para_threads(self):
+        p, estados = _coletor()
+
+        def trabalho(nome):
+            with unidade(nome):
+                reportar("concluido")
+
+        with acompanhar(p), ThreadPoolExecutor(max_workers=3) as pool:
+            declarar_unidades(["a", "b", "c"])
+            futuros = [submeter(pool, trabalho, n) for n in "abc"]
+            for f in futuros:
+                f.result()
+            despachar()
+        assert p.estado().concluidas == 3
+        assert estados[-1].fracao == 1.0
+
+    def test_pool_sem_submeter_nao_ve_progresso(self):
+        p, _ = _coletor()
+        with acompanhar(p), ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(reportar, "concluido", unidade="a").result()
+        assert p.estado().unidades == 0
@@ -0,0 +1,138 @@
+"""
+Testes unitários para core/prompt_loader.py
+Cobre: get_prompt_partes, get_prompt, listar_prompts, RegistroPrompts, versão na chave de cache
+"""
+
+import io
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.cache import build_cache_key
+from core.prompt_loader import (
+    PromptErro,
+    PromptPartes,
+    RegistroPrompts,
+    get_prompt,
+    get_prompt_partes,
+    listar_prompts,
+    variaveis_prompt,
+    versao_prompt,
+)
+
+
+# ─── get_prompt_partes ────────────────────────────────────────────────────────
+
+class TestGetPromptPartes:
+    def test_prompt_sem_variaveis_so_instrucoes(self):
+        partes = get_prompt_partes("passo_3_serasa")
+        assert partes.instrucoes and partes.dados == ""
+        assert "{{" not in partes.instrucoes
+
+    def test_dados_interpolados_e_instrucoes_fixas(self):
+        a = get_prompt_partes("passo_5_consolidacao", tabela="T1", analises="A1")
+        b = get_prompt_partes("passo_5_consolidacao", tabela="T2", analises="A2")
+        assert a.instrucoes == b.instrucoes
+        assert "T1" in a.dados and "A1" in a.dados
+        assert "T1" not in a.instrucoes
+
+    def test_instrucoes_sem_placeholders(self):
+        for chave, instrucoes in listar_prompts().items():
+            assert "{{" not in instrucoes, chave
+            valores = {v: "x" for v in variaveis_prompt(chave)}
+            assert get_prompt_partes(chave, **valores).instrucoes == instrucoes, chave
+
+    def test_chave_inexistente(self):
+        assert get_prompt_partes("nao_existe") == PromptPartes("")
+
+
+# ─── get_prompt ───────────────────────────────────────────────────────────────
+
+class TestGetPrompt:
+    def test_texto_unico_instrucoes_e_dados(self):
+        texto = get_prompt("reparo_json", erro="E1", resposta="R1")
+        partes = get_prompt_partes("reparo_json", erro="E1", resposta="R1")
+        assert texto == f"{partes.instrucoes}\n\n{partes.dados}"
+
+    def test_variavel_ausente_levanta_erro(self):
+        with pytest.raises(PromptErro, match="resposta"):
+            get_prompt("reparo_json", erro="E1")
+
+    def test_variaveis_declaradas(self):
+        assert variaveis_prompt("reparo_json") == {"erro", "resposta"}
+        assert variaveis_prompt("passo_3_serasa") == frozenset()
+
+
+# ─── RegistroPrompts ──────────────────────────────────────────────────────────
+
+def _escrever(caminho, texto, mtime):
+    caminho.write_text(texto, encoding="utf-8")
+    os.utime(caminho, (mtime, mtime))
+
+
+class TestRegistroPrompts:
+    def test_compila_e_separa_configuracao(self, tmp_path):
+        arq = tmp_path / "p.yaml"
+        _escrever(arq, "modelos:\n  padrao: x\na: 'Olá {{json}}'\nb:\n  instrucoes: I\n  dados: 'D={v}'\n", 1000)
+        reg = RegistroPrompts(arq, intervalo=0)
+        assert reg.chaves() == ["a", "b"]
+        assert reg.prompt("a").instrucoes == "Olá {json}"
+        assert reg.prompt("b").dados.campos == {"v"}
+        assert reg.yaml()["modelos"] == {"padrao": "x"}
+
+    def test_recarrega_quando_mtime_muda(self, tmp_path):
+        arq = tmp_path / "p.yaml"
+        _escrever(arq, "a: 'versão 1'\n", 1000)
+        reg = RegistroPrompts(arq, intervalo=0)
+        v1 = reg.prompt("a").versao
+        _escrever(arq, "a: 'versão 2'\n", 2000)
+        assert reg.prompt("a").instrucoes == "versão 2"
+        assert reg.prompt("a").versao != v1
+
+    def test_intervalo_evita_reler(self, tmp_path):
+        arq = tmp_path / "p.yaml"
+        _escrever(arq, "a: 'versão 1'\n", 1000)
+        reg = RegistroPrompts(arq, intervalo=3600)
+        reg.prompt("a")
+        _escrever(arq, "a: 'versão 2'\n", 2000)
+        assert reg.prompt("a").instrucoes == "versão 1"
+
+    def test_versao_estavel_para_mesmo_texto(self, tmp_path):
+        arq = tmp_path / "p.yaml"
+        _escrever(arq, "a: 'texto'\n", 1000)
+        v1 = RegistroPrompts(arq, intervalo=0).prompt("a").versao
+        _escrever(arq, "a: 'texto'\n", 2000)
+        assert RegistroPrompts(arq, intervalo=0).prompt("a").versao == v1
+
+    @pytest.mark.parametrize("conteudo", [
+        "a: 'chave {aberta'\n",
+        "a:\n  instrucoes: I\n  dados: '{x.y}'\n",
+        "a:\n  instrucoes: 'com {variavel}'\n  dados: D\n",
+        "a: [lista\n",
+    ])
+    def test_yaml_invalido_mantem_registro_anterior(self, tmp_path, conteudo):
+        arq = tmp_path / "p.yaml"
+        _escrever(arq, "a: 'válido'\n", 1000)
+        reg = RegistroPrompts(arq, intervalo=0)
+        assert reg.prompt("a").instrucoes == "válido"
+        _escrever(arq, conteudo, 2000)
+        assert reg.prompt("a").instrucoes == "válido"
+
+    def test_arquivo_ausente(self, tmp_path):
+        reg = RegistroPrompts(tmp_path / "nao_existe.yaml", intervalo=0)
+        assert reg.prompt("a") is None
+        assert reg.chaves() == []
+
+
+# ─── versão na chave de cache ─────────────────────────────────────────────────
+
+class TestChaveCache:
+    def test_inclui_versao_do_prompt(self):
+        chave = build_cache_key("passo_3_serasa", [io.BytesIO(b"pdf")], empresa="X")
+        assert f":v={versao_prompt('passo_3_serasa')}:" in chave
+
+    def test_passo_sem_prompt_sem_versao(self):
+        assert ":v=" not in build_cache_key("passo_inexistente", [io.BytesIO(b"pdf")])
@@ -0,0 +1,108 @@
+"""
+Testes unitários para core/rascunhos.py
+Cobre: RascunhosLocal (upsert, remoção, isolamento por usuário), Autosave
+(grava só a diferença, remoções, restauração, nova tentativa após falha)
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.rascunhos import Autosave, RascunhosLocal, serializar
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    return RascunhosLocal(tmp_path / "rascunhos.sqlite3")
+
+
+class ArmazemEspiao:
+    """Armazém em memória que registra cada gravação e pode falhar sob demanda."""
+
+    def __init__(self):
+        self.campos: dict[str, str] = {}
+        self.gravacoes: list[tuple[dict, list]] = []
+        self.falhar = False
+
+    def ler_rascunho(self, usuario):
+        return dict(self.campos)
+
+    def gravar_rascunho(self, usuario, campos, removidos):
+        self.gravacoes.append((dict(campos), list(removidos)))
+        if self.falhar:
+            return False
+        self.campos.update(campos)
+        for c in removidos:
+            self.campos.pop(c, None)
+        return True
+
+
+def _salvar(autosave, estado):
+    n = autosave.salvar(estado)
+    autosave.aguardar(timeout=5)
+    return n
+
+
+# ─── RascunhosLocal ───────────────────────────────────────────────────────────
+
+class TestRascunhosLocal:
+    def test_upsert_e_remocao(self, armazem):
+        assert armazem.gravar_rascunho("ana", {"step": "1", "dados.cnpj": '"1"'}, [])
+        assert armazem.gravar_rascunho("ana", {"step": "3"}, ["dados.cnpj"])
+        assert armazem.ler_rascunho("ana") == {"step": "3"}
+
+    def test_isolado_por_usuario(self, armazem):
+        armazem.gravar_rascunho("ana", {"step": "1"}, [])
+        armazem.gravar_rascunho("bia", {"step": "5"}, [])
+        assert armazem.ler_rascunho("ana") == {"step": "1"}
+        assert armazem.ler_rascunho("caio") == {}
+
+    def test_persistente_entre_instancias(self, armazem, tmp_path):
+        armazem.gravar_rascunho("ana", {"dados.empresa": '"ACME"'}, [])
+        assert RascunhosLocal(tmp_path / "rascunhos.sqlite3").ler_rascunho("ana") == {"dados.empresa": '"ACME"'}
+
+
+# ─── Autosave ─────────────────────────────────────────────────────────────────
+
+class TestAutosave:
+    def test_grava_so_o_que_mudou(self):
+        espiao = ArmazemEspiao()
+        autosave = Autosave(espiao, "ana")
+        estado = {"step": 0, "dados.empresa": "ACME", "dados.periodos": ["2023", "2024"]}
+        assert _salvar(autosave, estado) == 3
+        assert _salvar(autosave, estado) == 0
+        assert _salvar(autosave, {**estado, "step": 1}) == 1
+        assert espiao.gravacoes[-1] == ({"step": "1"}, [])
+
+    def test_campo_removido_e_apagado(self):
+        espiao = ArmazemEspiao()
+        autosave = Autosave(espiao, "ana")
+        _salvar(autosave, {"step": 2, "analise_id": "a1"})
+        _salvar(autosave, {"step": 0})
+        assert espiao.gravacoes[-1] == ({"step": "0"}, ["analise_id"])
+        assert espiao.campos == {"step": "0"}
+
+    def test_restaura_e_continua_incremental(self, armazem):
+        estado = {"step": 4, "dados.score_serasa": "700", "dados.checklist_docs": {"Passo 3 (Serasa)": ["a.pdf"]}}
+        _salvar(Autosave(armazem, "ana"), estado)
+
+        nova = Autosave(armazem, "ana")          # ex.: servidor reiniciou
+        assert nova.carregar() == estado
+        assert nova.diferenca(estado) == ({}, [])
+
+    def test_falha_fica_pendente_para_a_proxima(self):
+        espiao = ArmazemEspiao()
+        autosave = Autosave(espiao, "ana")
+        espiao.falhar = True
+        _salvar(autosave, {"dados.cnpj": "1"})
+        espiao.falhar = False
+        assert _salvar(autosave, {"dados.cnpj": "1"}) == 1
+        assert espiao.campos == {"dados.cnpj": serializar("1")}
+
+    def test_campo_ilegivel_ignorado(self):
+        espiao = ArmazemEspiao()
+        espiao.campos = {"step": "3", "dados.x": "{quebrado"}
+        assert Autosave(espiao, "ana").carregar() == {"step": 3}
@@ -0,0 +1,69 @@
+"""
+Testes unitários para core/regras.py
+Cobre: verificar_divergencia, aplicar_divergencia, aplicar_regras_fiador
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.regras import aplicar_divergencia, aplicar_regras_fiador, verificar_divergencia
+
+
+# ─── verificar_divergencia ────────────────────────────────────────────────────
+
+class TestVerificarDivergencia:
+    def test_cnpj_igual_com_mascaras_diferentes(self):
+        assert verificar_divergencia("", "12.345.678/0001-90", "", "12345678000190") == ""
+
+    def test_cnpj_diferente(self):
+        alerta = verificar_divergencia("", "12.345.678/0001-90", "", "98.765.432/0001-10")
+        assert "CNPJ" in alerta
+
+    def test_cnpj_tem_prioridade_sobre_nome(self):
+        assert verificar_divergencia("Outra Empresa", "12345678000190", "Acme", "12345678000190") == ""
+
+    def test_nome_com_sufixo_e_acento(self):
+        assert verificar_divergencia("AÇAÍ COMÉRCIO LTDA", "", "Açaí Comércio Ltda.", "") == ""
+
+    def test_nome_diferente(self):
+        assert "empresa" in verificar_divergencia("Beta S.A.", "", "Acme Ltda", "")
+
+    def test_sem_dados_nao_alerta(self):
+        assert verificar_divergencia("", "", "Acme", "") == ""
+
+
+class TestAplicarDivergencia:
+    def test_preenche_campo_sem_alterar_original(self):
+        extraido = {"cnpj_documento": "111", "score_serasa": "850"}
+        resultado = aplicar_divergencia(extraido, "alerta_divergencia_serasa", "Acme", "222")
+        assert resultado["alerta_divergencia_serasa"]
+        assert resultado["score_serasa"] == "850"
+        assert "alerta_divergencia_serasa" not in extraido
+
+
+# ─── aplicar_regras_fiador ────────────────────────────────────────────────────
+
+class TestAplicarRegrasFiador:
+    def test_atende_criterio(self):
+        res = aplicar_regras_fiador(
+            {"renda_media_oficial": "R$ 45.000,00", "analise_fiador": "Patrimônio sólido."},
+            "15.000,00",
+        )
+        assert res["aluguel_pretendido"] == "R$ 15.000,00"
+        assert res["conclusao_fiador"].startswith("Patrimônio sólido.")
+        assert "3,0x" in res["conclusao_fiador"]
+        assert "NÃO ATENDE" not in res["conclusao_fiador"]
+
+    def test_nao_atende_criterio(self):
+        res = aplicar_regras_fiador({"renda_media_oficial": "R$ 20.000,00"}, "R$ 10.000,00")
+        assert "NÃO ATENDE" in res["conclusao_fiador"]
+
+    def test_usa_renda_atual_sem_oficial(self):
+        res = aplicar_regras_fiador({"renda_media_atual": "R$ 40.000,00"}, 10000)
+        assert "4,0x" in res["conclusao_fiador"]
+
+    def test_sem_renda(self):
+        res = aplicar_regras_fiador({}, "10.000,00")
+        assert "Não foi possível comparar" in res["conclusao_fiador"]
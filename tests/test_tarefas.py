@@ -0,0 +1,282 @@
+"""
+Testes unitários para core/tarefas.py
+Cobre: FilaTarefas (execução, falha, deduplicação por passo e entradas, progresso,
+recuperação após reinício, várias filas no mesmo banco, isolamento de contexto), usar_cache
+"""
+
+import sys
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from core.cache import get_cached, set_cached, usar_cache
+from core.estado import EstadoLocal, configurar_estado
+from core.progresso import Progresso, acompanhar, reportar
+import core.tarefas as tarefas
+from core.tarefas import CONCLUIDA, EXECUTANDO, FALHOU, FilaTarefas
+
+
+@pytest.fixture
+def fila(tmp_path):
+    f = FilaTarefas(tmp_path / "tarefas.sqlite3", trabalhadores=2)
+    yield f
+    f.encerrar()
+
+
+def _esperar(fila, tarefa_id, timeout=5.0):
+    fim = time.monotonic() + timeout
+    while True:
+        tarefa = fila.obter(tarefa_id)
+        if tarefa.finalizada:
+            return tarefa
+        assert time.monotonic() < fim, "tarefa não terminou a tempo"
+        time.sleep(0.01)
+
+
+# ─── execução ─────────────────────────────────────────────────────────────────
+
+class TestExecucao:
+    def test_resultado_persistido(self, fila):
+        tid = fila.submeter("a1", "passo_3_serasa", lambda: {"score_serasa": "750"}, usuario="ana")
+        tarefa = _esperar(fila, tid)
+        assert tarefa.status == CONCLUIDA
+        assert tarefa.resultado == {"score_serasa": "750"}
+        assert tarefa.progresso == 1.0 and tarefa.usuario == "ana"
+        assert tarefa.iniciada_em is not None and tarefa.concluida_em >= tarefa.iniciada_em
+
+    def test_falha_registra_erro(self, fila):
+        def quebra():
+            raise RuntimeError("provedor fora do ar")
+        tarefa = _esperar(fila, fila.submeter("a1", "passo_4_certidoes", quebra))
+        assert tarefa.status == FALHOU
+        assert tarefa.erro == "provedor fora do ar"
+        assert tarefa.resultado is None
+
+    def test_resultado_visivel_em_outra_instancia(self, fila, tmp_path):
+        tid = fila.submeter("a1", "passo_5_contabil", lambda: {"ok": True})
+        _esperar(fila, tid)
+        outra = FilaTarefas(tmp_path / "tarefas.sqlite3", trabalhadores=1)
+        try:
+            assert outra.ultima("a1", "passo_5_contabil").resultado == {"ok": True}
+        finally:
+            outra.encerrar()
+
+    def test_analises_em_paralelo(self, fila):
+        barreira = threading.Barrier(2, timeout=5)
+
+        def junto():
+            barreira.wait()          # só passa se as duas rodarem ao mesmo tempo
+            return {"ok": True}
+
+        ids = [fila.submeter(a, "passo_5_contabil", junto) for a in ("a1", "a2")]
+        assert all(_esperar(fila, t).status == CONCLUIDA for t in ids)
+
+
+# ─── chave análise + passo ────────────────────────────────────────────────────
+
+class TestChave:
+    def test_nao_duplica_tarefa_em_andamento(self, fila):
+        liberar = threading.Event()
+        tid = fila.submeter("a1", "passo_5_contabil", lambda: liberar.wait(5) and {})
+        assert fila.submeter("a1", "passo_5_contabil", lambda: {}) == tid
+        liberar.set()
+        _esperar(fila, tid)
+        assert fila.submeter("a1", "passo_5_contabil", lambda: {}) != tid
+
+    def test_mesma_assinatura_reaproveita(self, fila):
+        liberar = threading.Event()
+        tid = fila.submeter("a1", "passo_3_serasa", lambda: liberar.wait(5) and {}, assinatura="pdfs-a")
+        assert fila.submeter("a1", "passo_3_serasa", lambda: {}, assinatura="pdfs-a") == tid
+        liberar.set()
+        _esperar(fila, tid)
+
+    def test_entradas_diferentes_substituem_tarefa_em_andamento(self, fila):
+        # Pré-busca com os PDFs antigos ainda rodando; o analista envia outros
+        liberar = threading.Event()
+        antiga = fila.submeter("a1", "passo_3_serasa", lambda: liberar.wait(5) and {"pdf": "a"},
+                               assinatura="pdfs-a")
+        nova = fila.submeter("a1", "passo_3_serasa", lambda: {"pdf": "b"}, assinatura="pdfs-b")
+        assert nova != antiga
+        assert _esperar(fila, nova).resultado == {"pdf": "b"}
+        liberar.set()
+        _esperar(fila, antiga)
+        assert fila.ultima("a1", "passo_3_serasa").id == nova
+
+    def test_ultima_por_analise_e_passo(self, fila):
+        t1 = _esperar(fila, fila.submeter("a1", "passo_3_serasa", lambda: {"v": 1}))
+        t2 = _esperar(fila, fila.submeter("a1", "passo_3_serasa", lambda: {"v": 2}))
+        _esperar(fila, fila.submeter("a2", "passo_3_serasa", lambda: {"v": 3}))
+        assert fila.ultima("a1", "passo_3_serasa").id == t2.id
+        assert [t.id for t in fila.da_analise("a1")] == [t1.id, t2.id]
+        assert fila.ultima("a1", "passo_4_certidoes") is None
+
+
+# ─── progresso e contexto ─────────────────────────────────────────────────────
+
+class TestProgresso:
+    def test_progresso_gravado_durante_execucao(self, fila):
+        liberar = threading.Event()
+
+        def trabalho():
+            reportar("envio", unidade="doc.pdf", bytes=2048, modelo="m")
+            reportar("primeiro_token", unidade="doc.pdf", caracteres=10)
+            liberar.wait(5)
+            return {}
+
+        tid = fila.submeter("a1", "passo_3_serasa", trabalho)
+        fim = time.monotonic() + 5
+        while (t := fila.obter(tid)).progresso < 0.5:
+            assert time.monotonic() < fim
+            time.sleep(0.01)
+        assert t.status == EXECUTANDO and "respondendo" in t.mensagem
+        liberar.set()
+        _esperar(fila, tid)
+
+    def test_tarefa_nao_herda_progresso_de_quem_submeteu(self, fila):
+        estados = []
+        with acompanhar(Progresso(estados.append, intervalo=0)):
+            tid = fila.submeter("a1", "passo_3_serasa", lambda: reportar("concluido", unidade="x") or {})
+            _esperar(fila, tid)
+        assert estados == []
+
+
+# ─── recuperação após reinício ────────────────────────────────────────────────
+
+def _inserir(caminho, tarefa_id, execucao, colunas_execucao=True, batimento=0.0):
+    con = sqlite3.connect(caminho)
+    if colunas_execucao:
+        con.execute(
+            "INSERT INTO tarefas (id, analise, passo, status, pid, execucao, batimento, criada_em) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (tarefa_id, "a1", "passo_5_contabil", EXECUTANDO, os.getpid(), execucao, batimento, time.time()),
+        )
+    else:
+        con.execute(
+            "INSERT INTO tarefas (id, analise, passo, status, pid, criada_em) VALUES (?, ?, ?, ?, ?, ?)",
+            (tarefa_id, "a1", "passo_5_contabil", EXECUTANDO, os.getpid(), time.time()),
+        )
+    con.commit()
+    con.close()
+
+
+class TestRecuperacao:
+    def test_batimento_vencido_vira_falha(self, tmp_path):
+        # Após reiniciar o contêiner o pid se repete (muitas vezes 1): vale o batimento
+        caminho = tmp_path / "tarefas.sqlite3"
+        FilaTarefas(caminho, trabalhadores=1).encerrar()
+        _inserir(caminho, "t1", "execucao-anterior")
+
+        fila = FilaTarefas(caminho, trabalhadores=1)
+        try:
+            tarefa = fila.obter("t1")
+            assert tarefa.status == FALHOU and "reiniciou" in tarefa.erro
+            novo = fila.submeter("a1", "passo_5_contabil", lambda: {"ok": True})
+            assert novo != "t1"
+            assert _esperar(fila, novo).status == CONCLUIDA
+        finally:
+            fila.encerrar()
+
+    def test_batimento_recente_de_outra_execucao_preservado(self, tmp_path):
+        caminho = tmp_path / "tarefas.sqlite3"
+        FilaTarefas(caminho, trabalhadores=1).encerrar()
+        _inserir(caminho, "t1", "outro-processo", batimento=time.time())
+        fila = FilaTarefas(caminho, trabalhadores=1)
+        try:
+            assert fila.obter("t1").status == EXECUTANDO
+        finally:
+            fila.encerrar()
+
+    def test_banco_sem_coluna_execucao(self, tmp_path):
+        caminho = tmp_path / "tarefas.sqlite3"
+        con = sqlite3.connect(caminho)
+        esquema = tarefas._ESQUEMA
+        for coluna in tarefas._COLUNAS_NOVAS:
+            esquema = "\n".join(linha for linha in esquema.splitlines() if not linha.strip().startswith(coluna))
+        con.executescript(esquema)
+        con.close()
+        _inserir(caminho, "t1", None, colunas_execucao=False)
+
+        fila = FilaTarefas(caminho, trabalhadores=1)
+        try:
+            assert fila.obter("t1").status == FALHOU
+        finally:
+            fila.encerrar()
+
+
+# ─── várias filas no mesmo banco ──────────────────────────────────────────────
+
+class TestFilasCompartilhadas:
+    @pytest.fixture(autouse=True)
+    def batimento_curto(self, monkeypatch):
+        monkeypatch.setattr(tarefas, "_INTERVALO_BATIMENTO", 0.05)
+        monkeypatch.setattr(tarefas, "_VALIDADE_BATIMENTO", 0.3)
+
+    def test_segunda_fila_nao_derruba_tarefa_em_andamento(self, tmp_path):
+        # Outro processo (ou réplica) abre o mesmo arquivo com a tarefa rodando
+        caminho = tmp_path / "tarefas.sqlite3"
+        primeira = FilaTarefas(caminho, trabalhadores=1)
+        liberar = threading.Event()
+        tid = primeira.submeter("a1", "passo_5_contabil", lambda: liberar.wait(5) and {"ok": True})
+        time.sleep(0.6)                           # mais que a validade: só o batimento a mantém
+        segunda = FilaTarefas(caminho, trabalhadores=1)
+        try:
+            assert segunda.obter(tid).status == EXECUTANDO
+            time.sleep(0.4)                       # a segunda também verifica a cada batimento
+            assert segunda.obter(tid).status == EXECUTANDO
+            liberar.set()
+            tarefa = _esperar(segunda, tid)
+            assert tarefa.status == CONCLUIDA and tarefa.resultado == {"ok": True}
+        finally:
+            liberar.set()
+            primeira.encerrar()
+            segunda.encerrar()
+
+    def test_fila_que_parou_tem_tarefas_marcadas_como_falha(self, tmp_path):
+        caminho = tmp_path / "tarefas.sqlite3"
+        FilaTarefas(caminho, trabalhadores=1).encerrar()
+        _inserir(caminho, "t1", "processo-morto", batimento=time.time())
+        viva = FilaTarefas(caminho, trabalhadores=1)
+        try:
+            assert viva.obter("t1").status == EXECUTANDO
+            _esperar(viva, "t1", timeout=2)       # vence sem renovação e a fila viva detecta
+            assert "reiniciou" in viva.obter("t1").erro
+        finally:
+            viva.encerrar()
+
+    def test_resultado_nao_sobrescreve_falha_ja_gravada(self, fila, tmp_path):
+        liberar = threading.Event()
+        tid = fila.submeter("a1", "passo_5_contabil", lambda: liberar.wait(5) and {"ok": True})
+        fim = time.monotonic() + 5
+        while fila.obter(tid).status != EXECUTANDO:
+            assert time.monotonic() < fim
+            time.sleep(0.01)
+        con = sqlite3.connect(tmp_path / "tarefas.sqlite3")
+        con.execute("UPDATE tarefas SET status = ?, erro = ? WHERE id = ?", (FALHOU, "interrompida", tid))
+        con.commit()
+        con.close()
+        liberar.set()
+        fila.encerrar()
+        tarefa = fila.obter(tid)
+        assert tarefa.status == FALHOU and tarefa.resultado is None
+
+
+# ─── usar_cache ───────────────────────────────────────────────────────────────
+
+class TestUsarCache:
+    @pytest.fixture(autouse=True)
+    def estado(self, tmp_path):
+        configurar_estado(EstadoLocal(tmp_path / "estado.sqlite3"))
+        yield
+        configurar_estado(None)
+
+    def test_get_set_no_dict_informado(self):
+        cache = {}
+        with usar_cache(cache):
+            set_cached("passo:abc", {"ok": True})
+            assert get_cached("passo:abc") == {"ok": True}
+        assert cache == {"passo:abc": {"ok": True}}
@@ -1,8 +1,14 @@
+import functools
 import json
 import re
 
+from utils.moeda import parse_moeda
+
 def str_to_float(val):
-    """Converte string formatada em Real (R$ 1.000,00) para float (1000.0)."""
+    """
+    Converte string formatada em Real (R$ 1.000,00) para float (1000.0).
+    Trata todo ponto como milhar; para valores de origem variada, use utils.moeda.parse_moeda.
+    """
     try: 
         return float(str(val).replace('R$', '').replace('.', '').replace(',', '.').strip())
     except Exception:
@@ -19,12 +25,7 @@ def formatar_valor_contabil(valor):
 def safe_float(valor):
     """Conversão ultra-segura para float, lidando com diversos formatos numéricos."""
     try:
-        if isinstance(valor, (int, float)): return float(valor)
-        v = str(valor).upper().replace('R$', '').strip()
-        if '.' in v and ',' in v: v = v.replace('.', '').replace(',', '.')
-        elif ',' in v: v = v.replace(',', '.')
-        v = re.sub(r'[^\d.-]', '', v)
-        return float(v) if v else 0.0
+        return parse_moeda(valor)
     except Exception:
         return 0.0
 
@@ -47,45 +48,76 @@ def extrair_json_seguro(texto):
         pass
     return {}
 
+def formatar_moeda_br(valor):
+    """Formata float para R$ 1.234,56."""
+    try:
+        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    except Exception:
+        return str(valor)
+
+# ─── Sanitização de texto (PDF / Markdown) ───────────────────────────────────
+# Tabelas e regex são compiladas uma única vez no import. Strings curtas
+# (rótulos, células, valores) se repetem muito no PDF e passam por memo LRU.
+
+_MEMO_MAX_LEN = 512
+
+_PDF_SUBSTITUICOES = (
+    ('“', '"'), ('”', '"'), ('‘', "'"), ('’', "'"), ('–', '-'), ('—', '-'),
+    ('…', '...'), ('•', '-'), ('\u200b', ''), ('\xa0', ' '),
+)
+
+def _sanitiza_pdf(texto_str: str) -> str:
+    """Texto ASCII sai direto; nos demais, só aplica as substituições presentes."""
+    if texto_str.isascii():
+        return texto_str.strip()
+    for antigo, novo in _PDF_SUBSTITUICOES:
+        if antigo in texto_str:
+            texto_str = texto_str.replace(antigo, novo)
+    return texto_str.encode('latin-1', 'ignore').decode('latin-1').strip()
+
+_sanitiza_pdf_memo = functools.lru_cache(maxsize=4096)(_sanitiza_pdf)
+
 def limpa_pdf(texto):
     """Remove emojis e caracteres problemáticos para compatibilidade com FPDF (Latin-1)."""
     try:
         texto_str = str(texto)
-        # Substitui caracteres comuns incompatíveis com latin-1
-        replacements = {
-            '“': '"', '”': '"', '‘': "'", '’': "'", '–': '-', '—': '-',
-            '…': '...', '•': '-', '\u200b': '', '\xa0': ' '
-        }
-        for k, v in replacements.items():
-            texto_str = texto_str.replace(k, v)
-        # Primeiro tenta direto (funciona com ISO-8859-1/Latin-1)
-        return texto_str.encode('latin-1', 'ignore').decode('latin-1').strip()
+        if len(texto_str) <= _MEMO_MAX_LEN:
+            return _sanitiza_pdf_memo(texto_str)
+        return _sanitiza_pdf(texto_str)
     except Exception:
         # Fallback: remover tudo que não for ASCII básico
         return ''.join(c for c in str(texto) if ord(c) < 128).strip()
 
-def formatar_moeda_br(valor):
-    """Formata float para R$ 1.234,56."""
-    try:
-        return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    except Exception:
-        return str(valor)
+_RE_NEGRITO = re.compile(r'\*\*(.*?)\*\*')
+_RE_SUBLINHADO = re.compile(r'__(.*?)__')
+_RE_TITULO = re.compile(r'^#+\s*', re.MULTILINE)
+_RE_SEPARADOR_TABELA = re.compile(r'^\|?[\s\-:]+\|[\s\-:|]+$', re.MULTILINE)
+
+def _sanitiza_markdown(texto_str: str) -> str:
+    # Cada passada só roda se o marcador aparece no texto
+    if '**' in texto_str:
+        texto_str = _RE_NEGRITO.sub(r'\1', texto_str)
+    if '__' in texto_str:
+        texto_str = _RE_SUBLINHADO.sub(r'\1', texto_str)
+    if '#' in texto_str:
+        texto_str = _RE_TITULO.sub('', texto_str)
+    if '|' in texto_str:
+        texto_str = _RE_SEPARADOR_TABELA.sub('', texto_str)
+        # Pipes viram espaços: mantém a separação mas remove as bordas de tabela
+        texto_str = texto_str.replace('|', '  ')
+    # Colapsa 3+ quebras em 2 (replace em laço é mais rápido que \n{3,})
+    while '\n\n\n' in texto_str:
+        texto_str = texto_str.replace('\n\n\n', '\n\n')
+    return texto_str.strip()
+
+_sanitiza_markdown_memo = functools.lru_cache(maxsize=4096)(_sanitiza_markdown)
 
 def limpa_markdown(texto):
     """Remove marcações Markdown (como negrito, subtítulos e tabelas) devolvendo texto limpo."""
     try:
         texto_str = str(texto)
-        # Remove bold/italic (**, __)
-        texto_str = re.sub(r'\*\*(.*?)\*\*', r'\1', texto_str)
-        texto_str = re.sub(r'__(.*?)__', r'\1', texto_str)
-        # Remove headers (## Header -> Header)
-        texto_str = re.sub(r'^#+\s*', '', texto_str, flags=re.MULTILINE)
-        # Remove table separator lines like |---|---|
-        texto_str = re.sub(r'^\|?[\s\-:]+\|[\s\-:|]+$', '', texto_str, flags=re.MULTILINE)
-        # Replace pipes with spaces to keep separation but remove table borders
-        texto_str = texto_str.replace('|', '  ')
-        # Remove multiple empty lines
-        texto_str = re.sub(r'\n{3,}', '\n\n', texto_str)
-        return texto_str.strip()
+        if len(texto_str) <= _MEMO_MAX_LEN:
+            return _sanitiza_markdown_memo(texto_str)
+        return _sanitiza_markdown(texto_str)
     except Exception:
         return str(texto)
@@ -0,0 +1,133 @@
+"""
+utils/moeda.py
+Parser único de valores monetários/contábeis vindos da IA, do formulário e do banco.
+
+Aceita "R$ 1.234,56", "1234,56", "1,234.56", "1.500" (milhar BR), "(15.000,00)"
+(negativo contábil), "-500", números nativos e texto com sufixos ("R$ 2.000 mensais").
+Strings são memoizadas (LRU) — os mesmos valores se repetem entre passos e reruns.
+
+Uso:
+    from utils.moeda import parse_moeda, parse_moeda_series
+    parse_moeda("R$ 20.000,00")           # 20000.0
+    parse_moeda("-", padrao=None)         # None
+    parse_moeda_series(df["aluguel"])     # pd.Series[float], vazios → 0.0
+"""
+
+import functools
+import math
+import re
+
+# Caminho rápido: formato canônico BR ("R$ -1.234,56", "1500", "20.000,00")
+_RE_CANONICO_BR = re.compile(r'\s*(?:R\$\s*)?(-?)\s*(\d{1,3}(?:\.\d{3})+|\d+)(?:,(\d+))?\s*')
+_RE_NAO_NUMERICO = re.compile(r'[^\d.,\-]')
+_RE_MILHAR_BR = re.compile(r'\d{1,3}(?:\.\d{3})+')
+
+
+def _parse_texto(texto: str) -> float | None:
+    """Converte uma string para float; None quando não há número reconhecível."""
+    m = _RE_CANONICO_BR.fullmatch(texto)
+    if m is not None:
+        sinal, inteiro, decimal = m.groups()
+        return float(sinal + inteiro.replace('.', '') + '.' + (decimal or '0'))
+
+    t = texto.strip()
+    if not t:
+        return None
+
+    negativo = False
+    if t[0] == '(' and t[-1] == ')':
+        negativo = True
+        t = t[1:-1]
+
+    t = _RE_NAO_NUMERICO.sub('', t)
+    if t.startswith('-'):
+        negativo = True
+        t = t.lstrip('-')
+    if not t:
+        return None
+
+    virgula = t.rfind(',')
+    ponto = t.rfind('.')
+    if virgula >= 0 and ponto >= 0:
+        # O separador que aparece por último é o decimal
+        if virgula > ponto:
+            t = t.replace('.', '').replace(',', '.')
+        else:
+            t = t.replace(',', '')
+    elif virgula >= 0:
+        t = t.replace(',', '.') if t.count(',') == 1 else t.replace(',', '')
+    elif ponto >= 0 and _RE_MILHAR_BR.fullmatch(t):
+        # "1.500" / "1.234.567" → milhar BR; "1500.75" segue como decimal
+        t = t.replace('.', '')
+
+    try:
+        valor = float(t)
+    except ValueError:
+        return None
+    return -valor if negativo else valor
+
+_parse_texto_memo = functools.lru_cache(maxsize=65536)(_parse_texto)
+
+
+def parse_moeda(valor, padrao: float | None = 0.0) -> float | None:
+    """
+    Converte um valor monetário (str/int/float) para float.
+    Retorna `padrao` para None, vazio, "-", NaN ou texto sem número.
+    """
+    if isinstance(valor, (int, float)):
+        valor = float(valor)
+        return padrao if math.isnan(valor) else valor
+    if valor is None:
+        return padrao
+    resultado = _parse_texto_memo(str(valor))
+    return padrao if resultado is None else resultado
+
+
+def _parse_unicos(unicos):
+    """
+    Converte valores já deduplicados. Texto no formato canônico BR é resolvido
+    com operações de string vetorizadas (Arrow, quando disponível); o restante
+    cai no parser escalar.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if pd.api.types.infer_dtype(unicos, skipna=True) != "string":
+        return np.fromiter(
+            (parse_moeda(u, padrao=math.nan) for u in unicos),
+            dtype=float, count=len(unicos),
+        )
+
+    textos = pd.Series(unicos).astype("string")
+    canonicos = textos.str.fullmatch(_RE_CANONICO_BR.pattern).fillna(False).to_numpy(dtype=bool)
+    convertidos = np.full(len(textos), math.nan)
+    limpos = (
+        textos[canonicos]
+        .str.replace(r'[^\d,\-]', '', regex=True)
+        .str.replace(',', '.', regex=False)
+    )
+    convertidos[canonicos] = pd.to_numeric(limpos, errors="coerce").to_numpy(dtype=float)
+    for i in np.flatnonzero(~canonicos):
+        resultado = _parse_texto(unicos[i])
+        convertidos[i] = math.nan if resultado is None else resultado
+    return convertidos
+
+
+def parse_moeda_series(valores, padrao: float | None = 0.0):
+    """
+    Versão vetorizada para colunas do pandas (ou qualquer iterável).
+    Colunas numéricas são só convertidas; colunas texto são fatoradas e cada
+    valor distinto é convertido uma única vez.
+    Com padrao=None, valores inválidos ficam NaN.
+    """
+    import numpy as np
+    import pandas as pd
+
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+    if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+        resultado = serie.astype(float)
+    else:
+        codigos, unicos = pd.factorize(serie)
+        convertidos = np.append(_parse_unicos(unicos), math.nan)  # código -1 (nulo) → NaN
+        resultado = pd.Series(convertidos[codigos], index=serie.index, name=serie.name)
+    return resultado if padrao is None else resultado.fillna(padrao)
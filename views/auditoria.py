@@ -7,7 +7,7 @@ Paginação manual, filtros por ação, usuário e período.
 import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
-from services.db_service import DBService
+from services.db_service import DBService, obter_db
 from core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -47,12 +47,11 @@ def _listar_eventos(db: DBService, limite: int = 500) -> list:
             "Authorization": f"Bearer {db.supabase_key}",
             "Content-Type": "application/json",
         }
-        import requests
         url = (
             f"{db.supabase_url}/rest/v1/audit_log"
             f"?select=*&order=timestamp.desc&limit={limite}"
         )
-        res = requests.get(url, headers=headers)
+        res = db.http.get(url, headers=headers)
         if res.status_code == 200:
             return res.json()
         logger.warning("audit_log retornou status %d", res.status_code)
@@ -117,7 +116,7 @@ def show_auditoria():
     </p>
     """, unsafe_allow_html=True)
 
-    db = DBService()
+    db = obter_db()
     with st.spinner("Carregando eventos..."):
         eventos = _listar_eventos(db, limite=500)
 
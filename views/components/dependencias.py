@@ -0,0 +1,92 @@
+"""
+views/components/dependencias.py
+Passos desatualizados pelo grafo de dependências (core/grafo.py).
+
+A cada rerun da "Nova Análise" compara as entradas atuais com as usadas na
+última execução de cada passo. Se o analista corrigiu um campo de que algum
+passo depende (CNPJ, aluguel, score...), mostra quais ficaram desatualizados
+e oferece reprocessar só esses — em segundo plano (core/tarefas.py), camada
+a camada, com os PDFs já enviados e o cache da sessão.
+
+Uso:
+    render_dependencias()      # em app.py, antes do roteador de passos
+"""
+
+import streamlit as st
+
+from core.grafo import GRAFO
+from core.logger import get_logger
+from core.tarefas import obter_fila
+from views.components.tarefas import (
+    ARQUIVOS_PASSOS,
+    IMPRESSOES_PASSOS,
+    acompanhar_passo,
+    enviar_tarefa,
+    id_analise,
+)
+from views.components.uicomponents import show_toast
+
+logger = get_logger(__name__)
+
+_PASSO_REPROCESSAMENTO = "reprocessamento"
+
+
+def _parado(tarefa) -> bool:
+    """O passo não tem tarefa própria rodando (o resultado dela já vai atualizá-lo)."""
+    return tarefa is None or tarefa.finalizada
+
+
+def _ao_concluir(res: dict, _arquivos: list[str]) -> None:
+    if not res:
+        st.error("Não foi possível reprocessar os passos desatualizados. Tente novamente.")
+        return
+    st.session_state.dados.update(res["saidas"])
+    st.session_state.setdefault(IMPRESSOES_PASSOS, {}).update(res["impressoes"])
+    titulos = [GRAFO.no(p).titulo for p in res["executados"]]
+    if res["falhas"]:
+        st.warning("Não foi possível reprocessar: " + ", ".join(GRAFO.no(p).titulo for p in res["falhas"]))
+    if titulos:
+        show_toast("✅ Atualizado: " + ", ".join(titulos), "success")
+
+
+def _reprocessar(passos: list[str]) -> None:
+    dados = dict(st.session_state.dados)
+    impressoes = dict(st.session_state.get(IMPRESSOES_PASSOS) or {})
+    arquivos = dict(st.session_state.get(ARQUIVOS_PASSOS) or {})
+
+    def executar(ai) -> dict:
+        r = GRAFO.reexecutar(
+            passos, dados, impressoes,
+            lambda no, atual: getattr(ai, no.metodo)(arquivos[no.passo], *no.argumentos(atual)),
+        )
+        return {
+            "saidas": r.saidas, "impressoes": r.impressoes,
+            "executados": r.executados, "falhas": r.falhas,
+        }
+
+    enviar_tarefa(_PASSO_REPROCESSAMENTO, executar)
+    logger.info("Reprocessamento submetido: %s.", ", ".join(passos))
+
+
+def render_dependencias() -> None:
+    """Aviso + botão para reprocessar os passos cujas entradas mudaram."""
+    if acompanhar_passo(_PASSO_REPROCESSAMENTO, "reprocessamento", _ao_concluir):
+        return
+    impressoes = st.session_state.get(IMPRESSOES_PASSOS) or {}
+    arquivos = st.session_state.get(ARQUIVOS_PASSOS) or {}
+    fila = obter_fila()
+    passos = [
+        p for p in GRAFO.invalidados(st.session_state.dados, impressoes)
+        if arquivos.get(p) and _parado(fila.ultima(id_analise(), p))
+    ]
+    if not passos:
+        return
+    with st.container(border=True):
+        c_aviso, c_botao = st.columns([5, 1.5])
+        c_aviso.warning(
+            "Dados alterados depois da análise — desatualizado(s): "
+            + ", ".join(GRAFO.no(p).titulo for p in passos)
+        )
+        if c_botao.button("Reprocessar", key="reprocessar_dependencias", use_container_width=True):
+            _reprocessar(passos)
+            st.rerun()
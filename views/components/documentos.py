@@ -0,0 +1,67 @@
+"""
+views/components/documentos.py
+PDFs da análise no armazém endereçado por conteúdo (core/blobs.py).
+
+registrar_documentos() substitui a escrita direta em checklist_docs: além dos
+nomes (que o checklist, o PDF e o histórico continuam lendo), grava os PDFs
+no armazém e guarda os digests em dados["checklist_blobs"], com os mesmos
+rótulos e a mesma ordem. Como checklist_blobs faz parte de `dados`, vai junto
+no rascunho e no registro da análise; documentos_salvos() reabre os PDFs de
+um passo sem novo upload (rascunho restaurado, reprocessamento).
+
+Uso:
+    registrar_documentos("Passo 3 (Serasa)", uploaded)
+    arquivos = uploaded or documentos_salvos("Passo 3 (Serasa)")
+"""
+
+import streamlit as st
+
+from core.blobs import obter_blobs
+
+CHECKLIST_BLOBS = "checklist_blobs"    # rótulo do checklist → [sha256], na ordem dos nomes
+_REABERTOS = "_documentos_reabertos"   # (digests) → [BytesIO], evita reler o disco a cada rerun
+
+
+def guardar_pdfs(arquivos: list) -> list[str]:
+    """Grava os PDFs no armazém (idempotente) e anota `.sha256` em cada um."""
+    blobs = obter_blobs()
+    digests = []
+    for f in arquivos:
+        digest = getattr(f, "sha256", None) or blobs.guardar(f)
+        f.sha256 = digest
+        digests.append(digest)
+    return digests
+
+
+def registrar_documentos(rotulo: str, arquivos: list) -> None:
+    """Nomes em checklist_docs[rotulo] e digests em checklist_blobs[rotulo]."""
+    dados = st.session_state.dados
+    dados["checklist_docs"][rotulo] = [f.name for f in arquivos]
+    dados.setdefault(CHECKLIST_BLOBS, {})[rotulo] = guardar_pdfs(arquivos)
+
+
+def reabrir(pares: list[tuple[str, str]]) -> list:
+    """[(nome, sha256)] → BytesIO com `.name` e `.sha256`; blobs ausentes ficam de fora."""
+    blobs = obter_blobs()
+    arquivos = []
+    for nome, digest in pares:
+        f = blobs.abrir(digest, nome)
+        if f is not None:
+            f.sha256 = digest
+            arquivos.append(f)
+    return arquivos
+
+
+def documentos_salvos(rotulo: str) -> list:
+    """PDFs já registrados no passo `rotulo` ([] se não houver ou se algum sumiu)."""
+    dados = st.session_state.dados
+    nomes = dados.get("checklist_docs", {}).get(rotulo) or []
+    digests = (dados.get(CHECKLIST_BLOBS) or {}).get(rotulo) or []
+    if not digests or len(nomes) != len(digests):
+        return []
+    chave = tuple(digests)
+    reabertos: dict = st.session_state.setdefault(_REABERTOS, {})
+    if chave not in reabertos:
+        arquivos = reabrir(list(zip(nomes, digests)))
+        reabertos[chave] = arquivos if len(arquivos) == len(digests) else []
+    return reabertos[chave]
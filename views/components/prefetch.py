@@ -0,0 +1,86 @@
+"""
+views/components/prefetch.py
+Upload antecipado de documentos e agendamento da pré-busca (core/prefetch.py).
+
+Os PDFs enviados antes da hora ficam copiados na sessão (o uploader some ao
+trocar de passo). agendar_prefetch() roda a cada rerun da "Nova Análise" e
+submete como tarefa (views/components/tarefas.py) cada passo que ficou pronto;
+o passo, ao ser aberto, aplica o resultado via acompanhar_passo().
+
+Uso:
+    render_uploads_antecipados()        # no Passo 0
+    agendar_prefetch()                  # em app.py, antes do roteador
+    arquivos = uploaded or docs_antecipados("passo_3_serasa")
+"""
+
+import streamlit as st
+
+from core.logger import get_logger
+from core.prefetch import passos_prontos
+from core.tarefas import obter_fila
+from views.components.documentos import registrar_documentos
+from views.components.tarefas import copiar_upload, enviar_passo, id_analise
+
+logger = get_logger(__name__)
+
+_DOCS = "_docs_antecipados"       # passo → [BytesIO]
+_ENVIADOS = "_prefetch_enviados"  # passo → assinatura já submetida
+
+# passo → (rótulo do uploader, chave do widget, item do checklist)
+_UPLOADS: dict[str, tuple[str, str, str]] = {
+    "passo_3_serasa": ("Serasa", "pre3", "Passo 3 (Serasa)"),
+    "passo_4_certidoes": ("Certidões", "pre4", "Passo 4 (Certidões)"),
+    "passo_5_contabil": ("Balanços e DREs", "pre5", "Passo 5 (Contábil)"),
+}
+
+
+def docs_antecipados(passo: str) -> list:
+    """PDFs do passo enviados antecipadamente ([] se nenhum)."""
+    return (st.session_state.get(_DOCS) or {}).get(passo, [])
+
+
+def _guardar(passo: str, chave: str) -> None:
+    """on_change do uploader: roda antes do rerun, então app.py já agenda com os PDFs novos."""
+    enviados = st.session_state.get(chave) or []
+    docs: dict = st.session_state.setdefault(_DOCS, {})
+    if enviados:
+        docs[passo] = copiar_upload(list(enviados))
+    else:
+        docs.pop(passo, None)
+
+
+def render_uploads_antecipados() -> None:
+    """Uploaders opcionais dos próximos passos, guardados na sessão."""
+    docs = st.session_state.get(_DOCS) or {}
+    with st.expander("📎 Adiantar documentos dos próximos passos (opcional)", expanded=bool(docs)):
+        st.caption(
+            "Envie agora e a IA começa a analisar assim que empresa e CNPJ estiverem "
+            "preenchidos — o resultado estará pronto ao chegar no passo."
+        )
+        for passo, (rotulo, chave, _) in _UPLOADS.items():
+            # Só o on_change altera o guardado: ao voltar ao Passo 0 o
+            # uploader reaparece vazio, mas os PDFs continuam na sessão
+            st.file_uploader(
+                rotulo, type="pdf", accept_multiple_files=True, key=chave,
+                on_change=_guardar, args=(passo, chave),
+            )
+            if docs.get(passo) and not st.session_state.get(chave):
+                st.caption("Guardados: " + ", ".join(f.name for f in docs[passo]))
+
+
+def agendar_prefetch() -> None:
+    """Submete em segundo plano os passos cujos documentos e campos já estão disponíveis."""
+    docs = st.session_state.get(_DOCS) or {}
+    if not docs:
+        return
+    dados = st.session_state.dados
+    enviados: dict = st.session_state.setdefault(_ENVIADOS, {})
+    fila = obter_fila()
+    for no, assinatura in passos_prontos(dados, docs, enviados):
+        atual = fila.ultima(id_analise(), no.passo)
+        if atual is not None and not atual.finalizada:
+            continue    # já há tarefa do passo rodando; reavalia quando ela terminar
+        enviar_passo(no.passo, no.metodo, docs[no.passo], *no.argumentos(dados))
+        enviados[no.passo] = assinatura
+        registrar_documentos(_UPLOADS[no.passo][2], docs[no.passo])
+        logger.info("Pré-busca de %s submetida (análise %s).", no.passo, id_analise())
@@ -0,0 +1,112 @@
+"""
+views/components/rascunho.py
+Autosave do rascunho da "Nova Análise" (core/rascunhos.py).
+
+restaurar_rascunho() roda uma vez por sessão, logo após o login: se o
+analista tinha uma análise em andamento, devolve `dados`, o passo e o id da
+análise (as tarefas de IA em segundo plano continuam vinculadas a ele).
+autosalvar() roda no fim de cada rerun e grava só os campos que mudaram.
+
+Os PDFs não vão no rascunho, só os digests: na restauração são reabertos do
+armazém por conteúdo (core/blobs.py).
+
+O armazém é o SQLite local por padrão; RASCUNHOS_BACKEND = "supabase" nos
+secrets usa a tabela `rascunhos` do Supabase (services/db_service.py).
+
+Uso:
+    restaurar_rascunho()     # em app.py, após inicializar o estado
+    autosalvar()             # em app.py, na última linha
+"""
+
+import streamlit as st
+
+from core.logger import get_logger
+from core.rascunhos import Autosave, obter_rascunhos_local
+from views.components.documentos import guardar_pdfs, reabrir
+from views.components.tarefas import ARQUIVOS_PASSOS, IMPRESSOES_PASSOS, TAREFAS_APLICADAS
+
+logger = get_logger(__name__)
+
+_AUTOSAVE = "_autosave"
+_DIGESTS = "_digests_rascunho"     # passo → [[nome, sha256]] restaurados (sem os bytes)
+_PREFIXO_DADOS = "dados."
+
+
+def _usuario() -> str:
+    return st.session_state.get("email_usuario") or st.session_state.get("usuario_logado", "")
+
+
+def _armazem():
+    if st.secrets.get("RASCUNHOS_BACKEND", "local") == "supabase":
+        from services.db_service import obter_db
+        return obter_db()
+    return obter_rascunhos_local()
+
+
+def _estado() -> dict:
+    """Rascunho achatado: um item por campo de `dados` + passo, análise e PDFs."""
+    estado = {f"{_PREFIXO_DADOS}{k}": v for k, v in st.session_state.dados.items()}
+    estado["step"] = st.session_state.step
+    if "analise_id" in st.session_state:
+        estado["analise_id"] = st.session_state.analise_id
+    impressoes = st.session_state.get(IMPRESSOES_PASSOS)
+    if impressoes:
+        estado["impressoes"] = impressoes
+    aplicadas = st.session_state.get(TAREFAS_APLICADAS)
+    if aplicadas:
+        estado["aplicadas"] = sorted(aplicadas)   # não reaplica resultado sobre edições posteriores
+    digests = dict(st.session_state.get(_DIGESTS) or {})
+    for passo, arquivos in (st.session_state.get(ARQUIVOS_PASSOS) or {}).items():
+        digests[passo] = [[f.name, d] for f, d in zip(arquivos, guardar_pdfs(arquivos))]
+    if digests:
+        estado["arquivos"] = digests
+    return estado
+
+
+def _vazio(dados: dict) -> bool:
+    return not any(v for k, v in dados.items() if k != "checklist_docs") and not dados.get("checklist_docs")
+
+
+def restaurar_rascunho() -> None:
+    """Na primeira execução após o login, recupera a análise em andamento salva."""
+    if _AUTOSAVE in st.session_state:
+        return
+    usuario = _usuario()
+    if not usuario:
+        return
+    autosave = Autosave(_armazem(), usuario)
+    st.session_state[_AUTOSAVE] = autosave
+    salvo = autosave.carregar()
+    if not salvo or not _vazio(st.session_state.dados):
+        return
+
+    dados = {k[len(_PREFIXO_DADOS):]: v for k, v in salvo.items() if k.startswith(_PREFIXO_DADOS)}
+    dados.setdefault("checklist_docs", {})
+    st.session_state.dados = dados
+    st.session_state.step = int(salvo.get("step", 0))
+    if salvo.get("analise_id"):
+        st.session_state.analise_id = salvo["analise_id"]
+    if salvo.get("impressoes"):
+        st.session_state[IMPRESSOES_PASSOS] = salvo["impressoes"]
+    if salvo.get("arquivos"):
+        st.session_state[_DIGESTS] = salvo["arquivos"]
+        # PDFs de volta do armazém de blobs: o reprocessamento funciona sem novo upload
+        reabertos = {p: reabrir(pares) for p, pares in salvo["arquivos"].items()}
+        st.session_state[ARQUIVOS_PASSOS] = {
+            p: fs for p, fs in reabertos.items() if len(fs) == len(salvo["arquivos"][p])
+        }
+    if salvo.get("aplicadas"):
+        st.session_state[TAREFAS_APLICADAS] = set(salvo["aplicadas"])
+    logger.info("Rascunho de %s restaurado (%d campos, passo %s).", usuario, len(dados), st.session_state.step)
+    if not _vazio(dados):
+        st.toast(f"Análise em andamento restaurada — Passo {st.session_state.step + 1}.", icon="💾")
+
+
+def autosalvar() -> None:
+    """Grava as mudanças do rascunho desde o último rerun (sem bloquear a página)."""
+    autosave: Autosave | None = st.session_state.get(_AUTOSAVE)
+    if autosave is None:
+        return
+    n = autosave.salvar(_estado())
+    if n:
+        logger.debug("Rascunho: %d campo(s) agendado(s) para gravação.", n)
@@ -0,0 +1,198 @@
+"""
+views/components/tarefas.py
+Passos da IA como tarefas em segundo plano (core/tarefas.py).
+
+enviar_passo() copia os PDFs do upload, captura o cache da sessão e submete a
+chamada ao AIService para a fila — o script termina na hora e a chamada
+continua mesmo com rerun, troca de menu ou queda da conexão. acompanhar_passo()
+mostra o progresso num fragmento que consulta o status a cada segundo (sem
+rerodar a página) e, ao fim, aplica o resultado uma única vez na sessão.
+
+Cada execução de um passo do grafo (core/grafo.py) guarda na sessão os PDFs
+usados e a impressão das entradas, que views/components/dependencias.py usa
+para detectar passos desatualizados e reprocessá-los.
+
+Uso:
+    if uploaded and st.button("Mapear Pendências"):
+        enviar_passo("passo_3_serasa", "mapear_serasa", uploaded, empresa, cnpj)
+    acompanhar_passo("passo_3_serasa", "serasa", _ao_concluir)
+"""
+
+import hashlib
+import io
+import json
+import uuid
+from typing import TYPE_CHECKING, Any, Callable
+
+import streamlit as st
+
+from core.cache import cache_da_sessao, usar_cache
+from core.corpo import hash_arquivo
+from core.grafo import GRAFO
+from core.tarefas import FALHOU, Tarefa, obter_fila
+from views.components.documentos import guardar_pdfs
+from views.components.uicomponents import TITULOS_IA
+
+if TYPE_CHECKING:
+    from services.ai_service import AIService
+
+# Intervalo de consulta do status pela interface (segundos)
+_INTERVALO_CONSULTA = 1.0
+
+TAREFAS_APLICADAS = "_tarefas_aplicadas"
+ARQUIVOS_PASSOS = "_arquivos_passos"       # passo → PDFs da última execução
+IMPRESSOES_PASSOS = "_impressoes_passos"   # passo → impressão das entradas usadas
+
+
+def id_analise() -> str:
+    """Identificador da análise em andamento na sessão (novo a cada "Reiniciar")."""
+    if "analise_id" not in st.session_state:
+        st.session_state.analise_id = uuid.uuid4().hex[:12]
+    return st.session_state.analise_id
+
+
+def copiar_upload(valor: Any) -> Any:
+    """
+    Fotografia dos argumentos no momento do envio: UploadedFile vira BytesIO
+    com o mesmo nome (o upload não sobrevive à sessão) e dicts são copiados
+    (st.session_state.dados continua sendo editado enquanto a tarefa roda).
+    """
+    if isinstance(valor, list):
+        return [copiar_upload(v) for v in valor]
+    if isinstance(valor, dict):
+        return dict(valor)
+    if hasattr(valor, "getvalue") and hasattr(valor, "name"):
+        copia = io.BytesIO(valor.getvalue())
+        copia.name = valor.name
+        if getattr(valor, "sha256", None):
+            copia.sha256 = valor.sha256
+        return copia
+    return valor
+
+
+def registrar_execucao(passo: str, arquivos: list, impressao: str | None = None) -> None:
+    """
+    Guarda os PDFs (copiados) e a impressão das entradas de uma execução do
+    `passo`; sem `impressao`, usa a dos dados atuais. Passos fora do grafo
+    são ignorados.
+    """
+    if passo not in GRAFO:
+        return
+    copias = copiar_upload(list(arquivos))
+    guardar_pdfs(copias)
+    st.session_state.setdefault(ARQUIVOS_PASSOS, {})[passo] = copias
+    if impressao is None:
+        impressao = GRAFO.no(passo).impressao(st.session_state.dados)
+    st.session_state.setdefault(IMPRESSOES_PASSOS, {})[passo] = impressao
+
+
+def servico_ia() -> "AIService":
+    """
+    AIService criado sob demanda: o openai só é importado quando há IA a
+    chamar. É leve (dados da sessão); o cliente e o limitador são do processo.
+    """
+    from services.ai_service import AIService
+
+    return AIService()
+
+
+def assinatura_entradas(metodo: str, args: tuple) -> str:
+    """Hash do método, dos PDFs (por conteúdo) e dos demais argumentos de um envio."""
+    partes: list[Any] = [metodo]
+    for arg in args:
+        if isinstance(arg, list):
+            partes.append([getattr(f, "sha256", None) or hash_arquivo(f) for f in arg])
+        else:
+            partes.append(arg)
+    texto = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def enviar_tarefa(passo: str, funcao: Callable[["AIService"], dict],
+                  arquivos: list[str] | None = None, impressao: str | None = None,
+                  assinatura: str = "") -> str:
+    """
+    Submete `funcao(ai)` como tarefa do `passo` na análise atual, com o cache
+    da sessão e as mensagens do AIService guardadas no resultado. Tarefa do
+    passo ainda em andamento só é reaproveitada com a mesma `assinatura`.
+    """
+    from services.ai_service import guardar_mensagens
+
+    ai = servico_ia()
+    cache = cache_da_sessao()
+
+    def executar() -> dict:
+        with usar_cache(cache), guardar_mensagens() as mensagens:
+            dados = funcao(ai)
+        return {"dados": dados or {}, "mensagens": mensagens, "arquivos": arquivos or [], "impressao": impressao}
+
+    return obter_fila().submeter(id_analise(), passo, executar, usuario=ai.usuario, assinatura=assinatura)
+
+
+def enviar_passo(passo: str, metodo: str, *args: Any) -> str:
+    """
+    Submete `AIService.<metodo>(*args)` como tarefa do `passo` na análise
+    atual. O primeiro argumento, se for lista, é a lista de PDFs (os nomes
+    voltam no resultado). Devolve o id da tarefa. Uma tarefa do passo em
+    andamento com outras entradas (ex.: pré-busca com PDFs antigos) não é
+    reaproveitada: a nova a substitui.
+    """
+    args = tuple(copiar_upload(a) for a in args)
+    pdfs = args[0] if args and isinstance(args[0], list) else []
+    guardar_pdfs(pdfs)      # armazém por conteúdo: reprocessamentos futuros não pedem novo upload
+    impressao = None
+    if passo in GRAFO:
+        st.session_state.setdefault(ARQUIVOS_PASSOS, {})[passo] = pdfs
+        impressao = GRAFO.no(passo).impressao(st.session_state.dados)
+    return enviar_tarefa(
+        passo, lambda ai: getattr(ai, metodo)(*args),
+        arquivos=[f.name for f in pdfs], impressao=impressao,
+        assinatura=assinatura_entradas(metodo, args),
+    )
+
+
+@st.fragment(run_every=_INTERVALO_CONSULTA)
+def _painel(tarefa_id: str, titulo: str) -> None:
+    tarefa = obter_fila().obter(tarefa_id)
+    if tarefa is None or tarefa.finalizada:
+        st.rerun(scope="app")     # o script completo aplica o resultado
+    st.caption(titulo)
+    texto = tarefa.mensagem or "⏳ Na fila de análise..."
+    st.progress(min(99, int(tarefa.progresso * 100)), text=texto)
+
+
+def _aplicar(tarefa: Tarefa, ao_concluir: Callable[[dict, list[str]], None]) -> None:
+    aplicadas: set = st.session_state.setdefault(TAREFAS_APLICADAS, set())
+    if tarefa.id in aplicadas:
+        return
+    aplicadas.add(tarefa.id)
+
+    if tarefa.status == FALHOU:
+        # O erro já está no log do worker; a mensagem ao analista fica com ao_concluir
+        ao_concluir({}, [])
+        return
+    resultado = tarefa.resultado or {}
+    for nivel, mensagem in resultado.get("mensagens", []):
+        getattr(st, nivel)(mensagem)
+    if resultado.get("dados") and resultado.get("impressao"):
+        # Entradas com que o resultado foi gerado (não as de agora, que podem ter mudado)
+        st.session_state.setdefault(IMPRESSOES_PASSOS, {})[tarefa.passo] = resultado["impressao"]
+    ao_concluir(resultado.get("dados") or {}, resultado.get("arquivos") or [])
+
+
+def acompanhar_passo(passo: str, chave_titulo: str,
+                     ao_concluir: Callable[[dict, list[str]], None]) -> bool:
+    """
+    Mostra o progresso da tarefa mais recente do `passo` nesta análise ou,
+    se ela terminou e ainda não foi aplicada, chama ao_concluir(dados,
+    arquivos) — dados vazio = falha, e ao_concluir mostra o erro. Devolve
+    True enquanto a tarefa roda.
+    """
+    tarefa = obter_fila().ultima(id_analise(), passo)
+    if tarefa is None:
+        return False
+    if tarefa.finalizada:
+        _aplicar(tarefa, ao_concluir)
+        return False
+    _painel(tarefa.id, TITULOS_IA.get(chave_titulo, "📄 Analisando documentos..."))
+    return True
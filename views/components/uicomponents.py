@@ -1,58 +1,22 @@
-import time
 from contextlib import contextmanager
 
 import streamlit as st
 
-# ── Mensagens padrão por passo ─────────────────────────────────────────────────
-_MSGS_PADRAO: dict[str, list[str]] = {
-    "contrato": [
-        "📄 Lendo Contrato Social e Aditivos...",
-        "🏢 Identificando quadro societário...",
-        "🔍 Extraindo capital social e administradores...",
-        "🧠 Consolidando estrutura da empresa...",
-    ],
-    "proposta": [
-        "📋 Lendo proposta de locação...",
-        "🏠 Identificando imóvel e condições...",
-        "💰 Extraindo valores e prazos...",
-        "🧠 Consolidando dados da proposta...",
-    ],
-    "fiador": [
-        "📑 Lendo declarações do fiador...",
-        "💰 Mapeando rendimentos tributáveis...",
-        "🏦 Analisando patrimônio declarado...",
-        "🧠 Consolidando matriz financeira do fiador...",
-    ],
-    "referencias": [
-        "📇 Lendo referências...",
-        "🏠 Identificando referências locatícias...",
-        "🏢 Mapeando referências comerciais e bancárias...",
-        "🧠 Consolidando referências...",
-    ],
-    "serasa": [
-        "📄 Lendo PDFs do Serasa...",
-        "🔍 Identificando pendências e credores...",
-        "🔗 Analisando contágio societário...",
-        "🧠 Consolidando o mapa de riscos...",
-    ],
-    "certidoes": [
-        "📄 Lendo certidões judiciais...",
-        "⚖️ Identificando ações e processos...",
-        "🔍 Verificando divergências de CNPJ...",
-        "🧠 Consolidando auditoria jurídica...",
-    ],
-    "contabil": [
-        "📊 Lendo DRE e Balanço Patrimonial...",
-        "💹 Calculando receita bruta e resultado...",
-        "🏦 Analisando patrimônio líquido e passivos...",
-        "🧠 Consolidando auditoria financeira...",
-    ],
-    "patrimonio": [
-        "📑 Lendo IR dos sócios/responsáveis...",
-        "💰 Mapeando patrimônio declarado...",
-        "📝 Redigindo parecer executivo final...",
-        "🧠 Consolidando análise patrimonial...",
-    ],
+from core.progresso import EstadoProgresso, Progresso, acompanhar
+
+# ── Título exibido durante a chamada à IA, por passo ─────────────────────────
+# As etapas em si (hash, cache, fila, envio, resposta) vêm dos eventos reais do
+# AIService — ver core/progresso.py.
+TITULOS_IA: dict[str, str] = {
+    "contrato": "📄 Lendo Contrato Social e Aditivos...",
+    "proposta": "📋 Lendo proposta de locação...",
+    "fiador": "📑 Lendo declarações do fiador...",
+    "referencias": "📇 Lendo referências...",
+    "serasa": "📄 Lendo PDFs do Serasa...",
+    "certidoes": "📄 Lendo certidões judiciais...",
+    "contabil": "📊 Lendo DRE e Balanço Patrimonial...",
+    "patrimonio": "📑 Lendo IR dos sócios/responsáveis...",
+    "reprocessamento": "🔁 Reprocessando passos desatualizados...",
 }
 
 
@@ -71,7 +35,12 @@ def render_upload_status(uploaded_files: list, resultados: dict[str, bool] | Non
     itens_html = []
     for f in uploaded_files:
         nome = f.name
-        tamanho_kb = round(f.size / 1024, 1) if hasattr(f, "size") else "?"
+        if hasattr(f, "size"):
+            tamanho_kb = round(f.size / 1024, 1)
+        elif hasattr(f, "getbuffer"):   # cópia em memória (upload antecipado)
+            tamanho_kb = round(f.getbuffer().nbytes / 1024, 1)
+        else:
+            tamanho_kb = "?"
 
         if resultados is None:
             # Estado neutro — arquivo carregado mas ainda não processado
@@ -142,43 +111,39 @@ def empty_state(icon: str, title: str, description: str) -> None:
 @contextmanager
 def ai_progress(passo: str, mensagem_final: str = "Finalizando análise..."):
     """
-    Context manager que exibe progress bar animada durante chamadas à IA.
+    Context manager que exibe o progresso real das chamadas à IA feitas no
+    bloco: a barra avança com os eventos do AIService (assinatura dos PDFs,
+    cache, fila, envio, primeiro token, validação), sem etapas simuladas nem
+    espera artificial.
 
     Uso:
         with ai_progress("serasa"):
             resultado = ai.mapear_serasa(files, empresa, cnpj)
 
     Args:
-        passo: chave do dicionário _MSGS_PADRAO (ex: "serasa", "contrato").
-               Se não existir, usa mensagens genéricas.
-        mensagem_final: texto exibido na última etapa.
+        passo: chave do dicionário TITULOS_IA (ex: "serasa", "contrato").
+               Se não existir, usa um título genérico.
+        mensagem_final: texto exibido quando todas as chamadas terminaram
+                        (consolidação local dos resultados).
     """
-    msgs = _MSGS_PADRAO.get(passo, [
-        "📄 Enviando documentos para análise...",
-        "🔍 Processando com IA...",
-        "🧠 Consolidando resultados...",
-        mensagem_final,
-    ])
+    titulo = TITULOS_IA.get(passo, "📄 Enviando documentos para análise...")
 
     placeholder = st.empty()
+    placeholder.info(titulo)
     barra = st.progress(0, text="Iniciando análise...")
 
-    total = len(msgs) + 1  # +1 para etapa final
+    def desenhar(estado: EstadoProgresso) -> None:
+        if estado.unidades and estado.concluidas == estado.unidades:
+            texto = f"⚙️ {mensagem_final}"
+        else:
+            texto = estado.mensagem or titulo
+            if estado.unidades > 1:
+                texto += f" · {estado.concluidas}/{estado.unidades} concluído(s)"
+        barra.progress(min(99, int(estado.fracao * 100)), text=texto)
 
     try:
-        for i, msg in enumerate(msgs):
-            placeholder.info(msg)
-            barra.progress(int((i + 1) / total * 85), text=msg)
-            time.sleep(0.55)
-
-        placeholder.info(f"⚙️ {mensagem_final}")
-        barra.progress(90, text=mensagem_final)
-
-        yield  # ← chamada real à IA acontece aqui
-
-        barra.progress(100, text="✅ Concluído!")
-        time.sleep(0.4)
-
+        with acompanhar(Progresso(desenhar)):
+            yield  # ← chamada real à IA acontece aqui
     finally:
         placeholder.empty()
         barra.empty()
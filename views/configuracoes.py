@@ -7,13 +7,17 @@ Permite que cada analista personalize:
   - Cabeçalho do laudo (texto livre inserido antes do parecer)
   - Rodapé do laudo (texto livre inserido ao final do PDF)
 
+Ao final, a seção "Consumo da IA" agrega as métricas das chamadas
+(core/metricas.py): latência, tokens, custo, volume enviado e cache por passo.
+
 As configurações são salvas na tabela `configuracoes_usuario` do Supabase
 e carregadas em `st.session_state["config_usuario"]` no início de cada sessão.
 """
 
 import streamlit as st
-from services.db_service import DBService
+from services.db_service import obter_db
 from core.logger import get_logger
+from core.metricas import resumo_historico
 
 logger = get_logger(__name__)
 
@@ -44,7 +48,7 @@ def show_configuracoes() -> None:
     # mas faz fallback ao banco se necessário)
     config_atual: dict = st.session_state.get("config_usuario") or {}
     if not config_atual:
-        db = DBService()
+        db = obter_db()
         config_atual = db.get_config_usuario(email)
         st.session_state["config_usuario"] = config_atual
 
@@ -96,7 +100,7 @@ def show_configuracoes() -> None:
                 "cabecalho_laudo": cabecalho.strip(),
                 "rodape_laudo": rodape.strip(),
             }
-            db = DBService()
+            db = obter_db()
             if db.salvar_config_usuario(email, nova_config):
                 st.session_state["config_usuario"] = nova_config
                 st.success("Configurações salvas com sucesso!")
@@ -115,7 +119,7 @@ def show_configuracoes() -> None:
                 "cabecalho_laudo": "",
                 "rodape_laudo": "",
             }
-            db = DBService()
+            db = obter_db()
             if db.salvar_config_usuario(email, defaults):
                 st.session_state["config_usuario"] = defaults
                 st.success("Configurações restauradas para o padrão.")
@@ -135,3 +139,46 @@ def show_configuracoes() -> None:
         if rodape.strip():
             st.caption(rodape.strip())
         st.markdown("---")
+
+    _mostrar_consumo_ia()
+
+
+def _mostrar_consumo_ia() -> None:
+    """Visão agregada do consumo da IA por passo/modelo (todas as sessões desta instância)."""
+    st.markdown("<br>", unsafe_allow_html=True)
+    with st.expander(":material/monitoring: Consumo da IA", expanded=False):
+        dias = st.selectbox(
+            "Período", options=[1, 7, 30, 90], index=2,
+            format_func=lambda d: "Últimas 24 horas" if d == 1 else f"Últimos {d} dias",
+        )
+        df = resumo_historico(dias)
+        if df.empty:
+            st.caption("Nenhuma chamada à IA registrada no período.")
+            return
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Chamadas", f"{int(df['chamadas'].sum()):,}".replace(",", "."))
+        c2.metric("Custo (US$)", f"{df['custo_total'].sum():.2f}")
+        c3.metric("Enviado", f"{df['mb_enviados'].sum():.1f} MB")
+        c4.metric("Falhas", int(df["falhas"].sum()))
+
+        st.dataframe(
+            df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "passo": "Passo",
+                "modelo": "Modelo",
+                "chamadas": "Chamadas",
+                "falhas": "Falhas",
+                "latencia_media": st.column_config.NumberColumn("Latência média (s)", format="%.1f"),
+                "latencia_p95": st.column_config.NumberColumn("Latência p95 (s)", format="%.1f"),
+                "tokens_entrada": "Tokens entrada",
+                "tokens_saida": "Tokens saída",
+                "custo_total": st.column_config.NumberColumn("Custo (US$)", format="%.4f"),
+                "mb_enviados": st.column_config.NumberColumn("MB enviados", format="%.1f"),
+                "mb_base64": st.column_config.NumberColumn("MB em PDFs (base64)", format="%.1f"),
+                "cache_acerto_pct": st.column_config.NumberColumn("Cache (% acertos)", format="%.0f%%"),
+            },
+        )
+        st.caption("Custo informado pelo OpenRouter; vazio para provedores que não o reportam.")
@@ -2,9 +2,10 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from services.db_service import DBService
+from services.db_service import obter_db
 from core.config import COR_PRIMARIA
 from utils.formatters import formatar_moeda_br
+from utils.moeda import parse_moeda_series
 from views.components.skeletons import skeleton_dashboard
 
 # ── Constantes ────────────────────────────────────────────────────────────────
@@ -49,7 +50,7 @@ def _label_mes(mes_str: str) -> str:
 def _preparar_df(registros: list) -> pd.DataFrame:
     df = pd.DataFrame(registros)
     df["Status"] = df.get("status", "—")
-    df["Aluguel"] = pd.to_numeric(df.get("aluguel", 0), errors="coerce").fillna(0)
+    df["Aluguel"] = parse_moeda_series(df["aluguel"]) if "aluguel" in df else 0.0
     df["Empresa"] = df.get("empresa", "—")
     df["Analista"] = df.get("usuario_nome", "—")
 
@@ -373,7 +374,7 @@ def show_dashboard():
     </p>
     """, unsafe_allow_html=True)
 
-    db = DBService()
+    db = obter_db()
     _placeholder = st.empty()
     with _placeholder.container():
         skeleton_dashboard()
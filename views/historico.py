@@ -1,11 +1,12 @@
 import streamlit as st
 import pandas as pd
 from datetime import date, timedelta
-from services.db_service import DBService
+from services.db_service import obter_db
 from services.pdf_service import gerar_pdf_bytes
 from services.excel_service import gerar_excel_bytes
 from views.components.skeletons import skeleton_historico
 from core.logger import get_logger
+from utils.moeda import parse_moeda_series
 
 logger = get_logger(__name__)
 
@@ -36,7 +37,7 @@ def _preparar_df(registros: list) -> pd.DataFrame:
     df["CNPJ"] = df.get("cnpj", "—")
     df["Status"] = df.get("status", "—")
     df["Analista"] = df.get("usuario_nome", "—")
-    df["Aluguel"] = pd.to_numeric(df.get("aluguel", 0), errors="coerce").fillna(0)
+    df["Aluguel"] = parse_moeda_series(df["aluguel"]) if "aluguel" in df else 0.0
     return df
 
 
@@ -71,7 +72,7 @@ def show_historico():
     </p>
     """, unsafe_allow_html=True)
 
-    db = DBService()
+    db = obter_db()
 
     # Paginação server-side: carrega em blocos de 200, evitando queries gigantes.
     # Os filtros client-side operam sobre o bloco carregado.
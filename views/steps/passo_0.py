@@ -1,10 +1,11 @@
 import streamlit as st
-from services.ai_service import AIService
 from views.components.uicomponents import show_toast, empty_state, ai_progress, render_upload_status
+from views.components.prefetch import render_uploads_antecipados
+from views.components.documentos import registrar_documentos
+from views.components.tarefas import servico_ia
 
 def show_passo_0():
     d = st.session_state.dados
-    ai = AIService()
     
     st.markdown("""
     <h3 style="font-weight: 700; margin-bottom: 20px;">
@@ -21,9 +22,9 @@ def show_passo_0():
             if uploaded:
                 render_upload_status(uploaded, res_up0)
             if uploaded and st.button("Extrair Dados Societários"):
-                st.session_state.dados["checklist_docs"]["Passo 0 (Contrato Social)"] = [f.name for f in uploaded]
+                registrar_documentos("Passo 0 (Contrato Social)", uploaded)
                 with ai_progress("contrato", "Consolidando dados societários..."):
-                    res = ai.extrair_contrato(uploaded)
+                    res = servico_ia().extrair_contrato(uploaded)
                     if res:
                         st.session_state.dados.update(res)
                         # Marcar todos os arquivos como bem-sucedidos
@@ -37,6 +38,7 @@ def show_passo_0():
                         st.rerun()
                     else:
                         st.error("Não foi possível extrair os dados. Verifique se o PDF é válido e tente novamente.")
+        render_uploads_antecipados()
     with c2:
         with st.container(border=True):
             if not d.get("empresa"):
@@ -1,11 +1,11 @@
 import streamlit as st
-from services.ai_service import AIService
 from views.components.uicomponents import show_toast, ai_progress
+from views.components.tarefas import registrar_execucao, servico_ia
+from views.components.documentos import registrar_documentos
 from utils.formatters import safe_float
 
 def show_passo_1():
     d = st.session_state.dados
-    ai = AIService()
     
     st.markdown("""
     <h3 style="font-weight: 700; margin-bottom: 20px;">
@@ -18,9 +18,9 @@ def show_passo_1():
         with st.container(border=True):
             uploaded = st.file_uploader("Upload Proposta (PDF)", type="pdf", key="up1")
             if uploaded and st.button("Extrair Proposta"):
-                st.session_state.dados["checklist_docs"]["Passo 1 (Proposta)"] = [uploaded.name]
+                registrar_documentos("Passo 1 (Proposta)", [uploaded])
                 with ai_progress("proposta", "Consolidando dados da proposta..."):
-                    res = ai.extrair_proposta(uploaded)
+                    res = servico_ia().extrair_proposta(uploaded)
                     if res:
                         st.session_state.dados.update(res)
                         aluguel = st.session_state.dados.get("aluguel", "")
@@ -66,11 +66,12 @@ def show_passo_1():
             with st.container(border=True):
                 up_fiador = st.file_uploader("Upload Docs do Fiador (IR, Matrícula)", type="pdf", accept_multiple_files=True, key="up_fiador")
                 if up_fiador and st.button("Analisar Capacidade do Fiador"):
-                    st.session_state.dados["checklist_docs"]["Passo 1 (Fiador)"] = [f.name for f in up_fiador]
+                    registrar_documentos("Passo 1 (Fiador)", up_fiador)
                     with ai_progress("fiador", "Consolidando matriz do fiador..."):
-                        res_fiador = ai.analisar_fiador(up_fiador, d.get("aluguel", "0"))
+                        res_fiador = servico_ia().analisar_fiador(up_fiador, d.get("aluguel", "0"))
                         if res_fiador:
                             st.session_state.dados.update(res_fiador)
+                            registrar_execucao("passo_2_fiador", up_fiador)   # aluguel mudou → reprocessa
                             show_toast("✅ Fiador analisado!", "success")
                             st.rerun()
                         else:
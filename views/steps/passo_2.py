@@ -1,10 +1,10 @@
 import streamlit as st
-from services.ai_service import AIService
 from views.components.uicomponents import show_toast, ai_progress
+from views.components.documentos import registrar_documentos
+from views.components.tarefas import servico_ia
 
 def show_passo_2():
     d = st.session_state.dados
-    ai = AIService()
     
     st.markdown("""
     <h3 style="font-weight: 700; margin-bottom: 20px;">
@@ -17,9 +17,9 @@ def show_passo_2():
         with st.container(border=True):
             uploaded = st.file_uploader("Upload Ficha Cadastral (PDF)", type="pdf", key="up2")
             if uploaded and st.button("Extrair Referências"):
-                st.session_state.dados["checklist_docs"]["Passo 2 (Ficha Cadastral)"] = [uploaded.name]
+                registrar_documentos("Passo 2 (Ficha Cadastral)", [uploaded])
                 with ai_progress("referencias", "Consolidando referências..."):
-                    res = ai.extrair_referencias(uploaded)
+                    res = servico_ia().extrair_referencias(uploaded)
                     if res:
                         st.session_state.dados.update(res)
                         show_toast("✅ Referências extraídas!", "success")
@@ -1,6 +1,8 @@
 import streamlit as st
-from services.ai_service import AIService
-from views.components.uicomponents import show_toast, ai_progress, render_upload_status
+from views.components.uicomponents import show_toast, render_upload_status
+from views.components.tarefas import acompanhar_passo, enviar_passo
+from views.components.prefetch import docs_antecipados
+from views.components.documentos import documentos_salvos, registrar_documentos
 
 # Mapeia risco para classe CSS e emoji
 def _classe_risco(risco: str):
@@ -10,9 +12,20 @@ def _classe_risco(risco: str):
     if "alto" in r: return "vermelho", "🔴"
     return "", ""
 
+def _ao_concluir(res, arquivos):
+    if not res:
+        st.error("Não foi possível extrair os dados do Serasa. Verifique se os PDFs são válidos e tente novamente.")
+        return
+    st.session_state.dados.update(res)
+    st.session_state["_res_up3"] = {nome: True for nome in arquivos}
+    score = st.session_state.dados.get("score_serasa", "")
+    risco = st.session_state.dados.get("risco_serasa", "")
+    partes = [p for p in [score and f"Score {score}", risco and f"Risco {risco}"] if p]
+    sufixo = " — " + " · ".join(partes) if partes else ""
+    show_toast(f"✅ Mapa de riscos Serasa consolidado{sufixo}!", "success")
+
 def show_passo_3():
     d = st.session_state.dados
-    ai = AIService()
 
     st.markdown("""
     <h3 style="color:#FFFFFF; font-family:'Space Grotesk',sans-serif; font-weight:700; margin-bottom:20px;">
@@ -29,25 +42,17 @@ def show_passo_3():
     with c1:
         with st.container(border=True):
             uploaded = st.file_uploader("Upload Serasa (Múltiplos PDFs)", type="pdf", accept_multiple_files=True, key="up3")
+            # Sem upload aqui, usa os PDFs adiantados no Passo 0 (já em pré-busca)
+            # ou os já registrados nesta análise (armazém de blobs)
+            arquivos = uploaded or docs_antecipados("passo_3_serasa") or documentos_salvos("Passo 3 (Serasa)")
             res_up3 = st.session_state.get("_res_up3")
-            if uploaded:
-                render_upload_status(uploaded, res_up3)
-            if uploaded and st.button("Mapear Pendências"):
-                st.session_state.dados["checklist_docs"]["Passo 3 (Serasa)"] = [f.name for f in uploaded]
-                with ai_progress("serasa", "Consolidando mapa de riscos..."):
-                    res = ai.mapear_serasa(uploaded, d.get('empresa', ''), d.get('cnpj', ''))
-                    if res:
-                        st.session_state.dados.update(res)
-                if res:
-                    st.session_state["_res_up3"] = {f.name: True for f in uploaded}
-                    score = st.session_state.dados.get("score_serasa", "")
-                    risco = st.session_state.dados.get("risco_serasa", "")
-                    partes = [p for p in [score and f"Score {score}", risco and f"Risco {risco}"] if p]
-                    sufixo = " — " + " · ".join(partes) if partes else ""
-                    show_toast(f"✅ Mapa de riscos Serasa consolidado{sufixo}!", "success")
-                    st.rerun()
-                else:
-                    st.error("Não foi possível extrair os dados do Serasa. Verifique se os PDFs são válidos e tente novamente.")
+            if arquivos:
+                render_upload_status(arquivos, res_up3)
+            if arquivos and st.button("Mapear Pendências"):
+                registrar_documentos("Passo 3 (Serasa)", arquivos)
+                enviar_passo("passo_3_serasa", "mapear_serasa", arquivos, d.get('empresa', ''), d.get('cnpj', ''))
+            # Roda em segundo plano: sobrevive a rerun e troca de menu
+            acompanhar_passo("passo_3_serasa", "serasa", _ao_concluir)
 
     # ── COLUNA RESULTADOS ────────────────────────────────────────
     with c2:
@@ -1,10 +1,19 @@
 import streamlit as st
-from services.ai_service import AIService
-from views.components.uicomponents import show_toast, ai_progress, render_upload_status
+from views.components.uicomponents import show_toast, render_upload_status
+from views.components.tarefas import acompanhar_passo, enviar_passo
+from views.components.prefetch import docs_antecipados
+from views.components.documentos import documentos_salvos, registrar_documentos
+
+def _ao_concluir(res, arquivos):
+    if not res:
+        st.error("Não foi possível auditar as certidões. Verifique se os PDFs são válidos e tente novamente.")
+        return
+    st.session_state.dados.update(res)
+    st.session_state["_res_up4"] = {nome: True for nome in arquivos}
+    show_toast("✅ Certidões auditadas!", "success")
 
 def show_passo_4():
     d = st.session_state.dados
-    ai = AIService()
     
     st.markdown("""
     <h3 style="font-weight: 700; margin-bottom: 20px;">
@@ -19,20 +28,14 @@ def show_passo_4():
     with c1:
         with st.container(border=True):
             uploaded = st.file_uploader("Upload Lote de Certidões", type="pdf", accept_multiple_files=True, key="up4")
+            arquivos = uploaded or docs_antecipados("passo_4_certidoes") or documentos_salvos("Passo 4 (Certidões)")
             res_up4 = st.session_state.get("_res_up4")
-            if uploaded:
-                render_upload_status(uploaded, res_up4)
-            if uploaded and st.button("Auditar Certidões"):
-                st.session_state.dados["checklist_docs"]["Passo 4 (Certidões)"] = [f.name for f in uploaded]
-                with ai_progress("certidoes", "Consolidando auditoria jurídica..."):
-                    res = ai.auditar_certidoes(uploaded, d.get('empresa', ''), d.get('cnpj', ''))
-                    if res:
-                        st.session_state.dados.update(res)
-                        st.session_state["_res_up4"] = {f.name: True for f in uploaded}
-                        show_toast("✅ Certidões auditadas!", "success")
-                        st.rerun()
-                    else:
-                        st.error("Não foi possível auditar as certidões. Verifique se os PDFs são válidos e tente novamente.")
+            if arquivos:
+                render_upload_status(arquivos, res_up4)
+            if arquivos and st.button("Auditar Certidões"):
+                registrar_documentos("Passo 4 (Certidões)", arquivos)
+                enviar_passo("passo_4_certidoes", "auditar_certidoes", arquivos, d.get('empresa', ''), d.get('cnpj', ''))
+            acompanhar_passo("passo_4_certidoes", "certidoes", _ao_concluir)
     with c2:
         with st.container(border=True):
             st.session_state.dados["resumo_certidoes"] = st.text_area("Apontamentos Jurídicos", d.get("resumo_certidoes", ""), height=250)
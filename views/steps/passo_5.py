@@ -1,20 +1,20 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-from services.ai_service import AIService
-from views.components.uicomponents import show_toast, ai_progress, render_upload_status
-
-def _calcular_comprometimento(aluguel_raw, receita_list):
-    """Calcula % de comprometimento da receita pelo aluguel."""
-    try:
-        aluguel_val = float(str(aluguel_raw).replace('R$', '').replace('.', '').replace(',', '.').strip())
-        if not receita_list or receita_list[-1] in ["-", ""]:
-            return None
-        receita_val = float(str(receita_list[-1]).replace('R$', '').replace('.', '').replace(',', '.').strip())
-        if receita_val <= 0:
-            return None
-        return round((aluguel_val / receita_val) * 100, 1)
-    except Exception:
+from views.components.uicomponents import show_toast, render_upload_status
+from views.components.tarefas import acompanhar_passo, enviar_passo
+from views.components.prefetch import docs_antecipados
+from views.components.documentos import documentos_salvos, registrar_documentos
+from core.models import tabela_financeira
+from utils.moeda import parse_moeda
+
+def _calcular_comprometimento(aluguel_raw, tabela):
+    """Calcula % de comprometimento da receita (último período) pelo aluguel."""
+    aluguel_val = parse_moeda(aluguel_raw, padrao=None)
+    if aluguel_val is None or not tabela.periodos:
         return None
+    pct = tabela.comprometimento(aluguel_val)[-1]
+    return None if np.isnan(pct) else round(float(pct), 1)
 
 def _cor_comprometimento(pct):
     if pct is None: return "", "—"
@@ -22,9 +22,23 @@ def _cor_comprometimento(pct):
     if pct <= 15: return "amarelo", f"{pct}%"
     return "vermelho", f"{pct}%"
 
+def _ao_concluir(res, arquivos):
+    if not res:
+        st.error("Não foi possível realizar a auditoria contábil. Verifique se os PDFs são válidos e tente novamente.")
+        return
+    st.session_state.dados.update(res)
+    st.session_state["_res_up5"] = {nome: True for nome in arquivos}
+    if not (res.get("receita_bruta") or res.get("analise_executiva")):
+        st.warning("Análise concluída, mas alguns dados financeiros não foram identificados nos documentos. Verifique se os PDFs contêm Balanço e DRE.")
+    n_per = len(st.session_state.dados.get("periodos", []))
+    receitas_ext = st.session_state.dados.get("receita_bruta", [])
+    msg_contabil = f"✅ Auditoria contábil concluída — {n_per} período(s) processado(s)" if n_per else "✅ Auditoria contábil concluída!"
+    if receitas_ext:
+        msg_contabil += f" · Receita {receitas_ext[-1]}"
+    show_toast(msg_contabil, "success")
+
 def show_passo_5():
     d = st.session_state.dados
-    ai = AIService()
 
     st.markdown("""
     <h3 style="font-family:'Space Grotesk',sans-serif; font-weight:700; margin-bottom:20px;">
@@ -32,49 +46,27 @@ def show_passo_5():
     </h3>
     """, unsafe_allow_html=True)
 
-    # Mensagens persistidas via session_state (sobrevivem ao st.rerun)
-    if st.session_state.get('_contabil_erro'):
-        st.error("Não foi possível realizar a auditoria contábil. Verifique se os PDFs são válidos e tente novamente.")
-        del st.session_state['_contabil_erro']
-    if st.session_state.get('_contabil_aviso'):
-        st.warning(st.session_state['_contabil_aviso'])
-        del st.session_state['_contabil_aviso']
-
     if d.get("alerta_divergencia_contabil"):
         st.error(f"🚨 **ALERTA DE DIVERGÊNCIA:** {d.get('alerta_divergencia_contabil')}")
 
     with st.container(border=True):
         uploaded = st.file_uploader("PDFs Contábeis (Balanços e DREs)", type="pdf", accept_multiple_files=True, key="up5")
+        arquivos = uploaded or docs_antecipados("passo_5_contabil") or documentos_salvos("Passo 5 (Contábil)")
         res_up5 = st.session_state.get("_res_up5")
-        if uploaded:
-            render_upload_status(uploaded, res_up5)
-        if uploaded and st.button("Executar Auditoria Avançada"):
-            with ai_progress("contabil", "Consolidando auditoria financeira..."):
-                res = ai.auditar_contabil(
-                    uploaded,
-                    d.get('empresa', ''),
-                    d.get('cnpj', ''),
-                    d.get('aluguel', 0),
-                    d.get('iptu', 0)
-                )
-                if res:
-                    st.session_state.dados.update(res)
-                    st.session_state.dados["checklist_docs"]["Passo 5 (Contábil)"] = [f.name for f in uploaded]
-                    st.session_state["_res_up5"] = {f.name: True for f in uploaded}
-                    if not (res.get("receita_bruta") or res.get("analise_executiva")):
-                        st.session_state['_contabil_aviso'] = "Análise concluída, mas alguns dados financeiros não foram identificados nos documentos. Verifique se os PDFs contêm Balanço e DRE."
-            if res:
-                periodos_ext = st.session_state.dados.get("periodos", [])
-                receitas_ext = st.session_state.dados.get("receita_bruta", [])
-                n_per = len(periodos_ext)
-                msg_contabil = f"✅ Auditoria contábil concluída — {n_per} período(s) processado(s)" if n_per else "✅ Auditoria contábil concluída!"
-                if receitas_ext:
-                    msg_contabil += f" · Receita {receitas_ext[-1]}"
-                show_toast(msg_contabil, "success")
-                st.rerun()
-            else:
-                st.session_state['_contabil_erro'] = True
-                st.rerun()
+        if arquivos:
+            render_upload_status(arquivos, res_up5)
+        if arquivos and st.button("Executar Auditoria Avançada"):
+            registrar_documentos("Passo 5 (Contábil)", arquivos)
+            enviar_passo(
+                "passo_5_contabil", "auditar_contabil",
+                arquivos,
+                d.get('empresa', ''),
+                d.get('cnpj', ''),
+                d.get('aluguel', 0),
+                d.get('iptu', 0)
+            )
+        # A auditoria leva 60–120 s: roda em segundo plano e sobrevive a reruns
+        acompanhar_passo("passo_5_contabil", "contabil", _ao_concluir)
 
     # ── VISUALIZAÇÃO FINANCEIRA (Matriz e Gráfico) ────────────────
     if "periodos" in d or d.get("receita_bruta") or d.get("analise_executiva"):
@@ -109,20 +101,12 @@ def show_passo_5():
         with c2:
             st.markdown("#### Evolução do Resultado")
             try:
-                valores = []
-                for x in lucros:
-                    if x == "-":
-                        valores.append(0.0)
-                    else:
-                        v = str(x).replace('R$', '').strip().replace('.', '').replace(',', '.')
-                        v = ''.join([c for c in v if c.isdigit() or c in '.-'])
-                        try:
-                            valores.append(float(v) if v and v not in ['.', '-', '.-'] else 0.0)
-                        except Exception:
-                            valores.append(0.0)
-
+                tabela = tabela_financeira(d)
                 st.bar_chart(
-                    pd.DataFrame({"Resultado (R$)": valores}, index=periodos),
+                    pd.DataFrame(
+                        {"Resultado (R$)": np.nan_to_num(tabela.resultado, nan=0.0)},
+                        index=list(tabela.periodos),
+                    ),
                     color="#F47920"
                 )
             except Exception:
@@ -1,10 +1,17 @@
 import streamlit as st
-from services.ai_service import AIService
-from views.components.uicomponents import show_toast, ai_progress
+from views.components.uicomponents import show_toast
+from views.components.tarefas import acompanhar_passo, enviar_passo
+from views.components.documentos import documentos_salvos, registrar_documentos
+
+def _ao_concluir(res, arquivos):
+    if not res:
+        st.error("Não foi possível analisar o patrimônio. Verifique se os PDFs são válidos e tente novamente.")
+        return
+    st.session_state.dados.update(res)
+    show_toast("✅ Patrimônio dos sócios analisado!", "success")
 
 def show_passo_6():
     d = st.session_state.dados
-    ai = AIService()
     
     st.markdown("""
     <h3 style="font-weight: 700; margin-bottom: 20px;">
@@ -16,16 +23,13 @@ def show_passo_6():
     with c1:
         with st.container(border=True):
             uploaded = st.file_uploader("Upload IR Sócios (Múltiplos PDFs)", type="pdf", accept_multiple_files=True, key="up6")
-            if uploaded and st.button("Analisar Patrimônio"):
-                with ai_progress("patrimonio", "Consolidando análise patrimonial..."):
-                    res = ai.analisar_patrimonio_socios(uploaded, d)
-                    if res:
-                        st.session_state.dados.update(res)
-                        st.session_state.dados["checklist_docs"]["Passo 6 (IR Sócios)"] = [f.name for f in uploaded]
-                        show_toast("✅ Patrimônio dos sócios analisado!", "success")
-                        st.rerun()
-                    else:
-                        st.error("Não foi possível analisar o patrimônio. Verifique se os PDFs são válidos e tente novamente.")
+            arquivos = uploaded or documentos_salvos("Passo 6 (IR Sócios)")
+            if arquivos and not uploaded:
+                st.caption("Declarações já enviadas: " + ", ".join(f.name for f in arquivos))
+            if arquivos and st.button("Analisar Patrimônio"):
+                registrar_documentos("Passo 6 (IR Sócios)", arquivos)
+                enviar_passo("passo_6_patrimonio", "analisar_patrimonio_socios", arquivos, d)
+            acompanhar_passo("passo_6_patrimonio", "patrimonio", _ao_concluir)
     with c2:
         with st.container(border=True):
             st.session_state.dados["conclusao_socio"] = st.text_area("Conclusão Patrimonial (Sócios) *", d.get("conclusao_socio", ""), height=150)
@@ -1,7 +1,5 @@
 import difflib
 import streamlit as st
-from services.pdf_service import gerar_pdf_bytes
-from services.db_service import DBService
 from views.components.uicomponents import show_toast
 
 
@@ -104,7 +102,6 @@ _VEREDITOS = {
 
 def show_passo_7():
     d = st.session_state.dados
-    db = DBService()
 
     st.markdown("""
     <h3 style="font-family:'Space Grotesk',sans-serif; font-weight:700; margin-bottom:20px;">
@@ -198,7 +195,8 @@ def show_passo_7():
                 # 1. Tenta salvar no Supabase primeiro (independente do PDF)
                 salvo = False
                 try:
-                    salvo = db.salvar_analise(d, decisao)
+                    from services.db_service import obter_db
+                    salvo = obter_db().salvar_analise(d, decisao)
                     if salvo:
                         st.success("✅ Análise salva no histórico!")
                 except Exception as e:
@@ -206,6 +204,7 @@ def show_passo_7():
 
                 # 2. Gera PDF
                 try:
+                    from services.pdf_service import gerar_pdf_bytes   # fpdf2 só ao gerar o laudo
                     cfg_usr = st.session_state.get("config_usuario", {})
                     pdf_data = gerar_pdf_bytes(d, decisao, config_usuario=cfg_usr)
                 except Exception as e: